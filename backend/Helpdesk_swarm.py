@@ -3,8 +3,11 @@ Haunted Helpdesk Swarm Orchestration
 
 Creates and configures the Haunted Helpdesk multi-agent swarm with all six specialized agents.
 Manages swarm parameters including handoff limits, timeouts, and repetitive handoff detection.
+Handoff limits and timeouts come from a per-ticket TimeoutPolicy (see timeout_policy).
 """
 
+from typing import Optional
+
 from strands.multiagent import Swarm
 from agents.orchestrator_agent import create_orchestrator_agent
 from agents.memory_agent import create_memory_agent
@@ -12,9 +15,10 @@ from agents.ticketing_agent import create_ticketing_agent
 from agents.network_diagnostic_agent import create_network_diagnostic_agent
 from agents.cloud_service_agent import create_cloud_service_agent
 from agents.summarization_agent import create_summarization_agent
+from timeout_policy import TimeoutPolicy
 
 
-def create_Haunted_Helpdesk_swarm() -> Swarm:
+def create_Haunted_Helpdesk_swarm(policy: Optional[TimeoutPolicy] = None) -> Swarm:
     """
     Create and configure the Haunted Helpdesk multi-agent swarm.
     
@@ -26,6 +30,9 @@ def create_Haunted_Helpdesk_swarm() -> Swarm:
     5. Cloud Service Agent - AWS/cloud diagnostics
     6. Summarization Agent - Resolution summary creation
     
+    Args:
+        policy: Handoff limits and timeouts for the ticket (defaults to the static limits)
+    
     Returns:
         Configured Swarm instance ready for ticket processing
     """
@@ -36,6 +43,7 @@ def create_Haunted_Helpdesk_swarm() -> Swarm:
     network_diagnostic = create_network_diagnostic_agent()
     cloud_service = create_cloud_service_agent()
     summarization = create_summarization_agent()
+    policy = policy or TimeoutPolicy()
     
     # Create swarm with all agents and configuration parameters
     swarm = Swarm(
@@ -48,10 +56,10 @@ def create_Haunted_Helpdesk_swarm() -> Swarm:
             summarization
         ],
         entry_point=orchestrator,
-        max_handoffs=12,  # Maximum number of agent handoffs before termination
-        max_iterations=15,  # Maximum iterations per agent
-        execution_timeout=120.0,  # Total workflow timeout in seconds (2 minutes)
-        node_timeout=90.0,  # Individual agent timeout in seconds (90 seconds - agents need time for diagnostics)
+        max_handoffs=policy.max_handoffs,  # Maximum number of agent handoffs before termination
+        max_iterations=policy.max_iterations,  # Maximum iterations per agent
+        execution_timeout=policy.execution_timeout,  # Total workflow timeout in seconds
+        node_timeout=policy.node_timeout,  # Individual agent timeout in seconds
         repetitive_handoff_detection_window=3,  # Window size for detecting loops (reduced from 4 to 3 for faster detection)
         repetitive_handoff_min_unique_agents=2  # Minimum unique agents to avoid loop detection
     )
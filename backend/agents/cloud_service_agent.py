@@ -6,8 +6,12 @@ Analyzes S3 bucket issues and provides resolution steps for cloud service proble
 """
 
 from strands.agent import Agent
-from strands.models.bedrock import BedrockModel
-from tools.cloud_tools import list_all_buckets, get_bucket_location, check_bucket_exists
+from bedrock_model import create_model
+from model_retry import HelpdeskRetryStrategy
+from metrics import AgentMetricsHooks
+from tracing import AgentTracingHooks
+from simulation import agent_tools
+from tools.cloud_tools import list_all_buckets, search_buckets, get_bucket_location, check_bucket_exists, audit_buckets
 
 
 def create_cloud_service_agent() -> Agent:
@@ -22,25 +26,41 @@ def create_cloud_service_agent() -> Agent:
 Your role is to diagnose and troubleshoot AWS cloud service issues using specialized diagnostic tools.
 
 AVAILABLE TOOLS:
-1. list_all_buckets(): List all S3 buckets in the AWS account
-   - Returns success status, list of bucket names, and count
-   - Use to verify bucket existence and get overview of S3 resources
+1. list_all_buckets(limit=100): List S3 buckets in the AWS account
+   - Returns success status, up to `limit` bucket names, the total count and a truncated flag
+   - Use for a quick overview; large accounts are truncated, so prefer search_buckets
    - Handles ExpiredToken errors gracefully
 
-2. get_bucket_location(bucket_name): Get the AWS region of a specific bucket
+2. search_buckets(pattern="*", region=None, limit=50): Find buckets without listing them all
+   - Glob pattern such as "haunt*" or "*-logs"; a plain string matches as a prefix
+   - Optionally restrict to one region, e.g. search_buckets("haunt*", region="us-west-1")
+   - Returns name, region and creation date of each match plus the total match count
+
+3. get_bucket_location(bucket_name): Get the AWS region of a specific bucket
    - Returns success status, bucket name, and region
    - Use to verify bucket location and region configuration
    - Handles NoSuchBucket and AccessDenied errors
 
-3. check_bucket_exists(bucket_name): Check if a bucket exists and is accessible
+4. check_bucket_exists(bucket_name): Check if a bucket exists and is accessible
    - Returns success status, exists flag, and accessible flag
    - Use to verify bucket existence and access permissions
    - Distinguishes between non-existent buckets (404) and access denied (403)
 
+5. audit_buckets(bucket_names=None, all_buckets=False): Audit many buckets in ONE call
+   - Checks existence, access, region, public ACL and public policy concurrently
+   - Returns a compact table (columns + rows) and a summary of problems found
+   - PREFER this tool whenever more than one bucket is involved, or set all_buckets=True
+     for account-wide questions (e.g. "which buckets are public?")
+
+Results of identical recent checks are shared across tickets during an outage. Every result
+has "cached" and "cache_age_seconds"; mention the age in your findings when a result was cached.
+
 DIAGNOSTIC WORKFLOW:
 1. Analyze the ticket to understand the cloud/AWS issue
 2. Select and execute appropriate diagnostic tools:
    - For general S3 issues: Start with list_all_buckets to get overview
+   - To find buckets by name or region: Use search_buckets rather than scanning the full list
+   - For several buckets or account-wide audits: Use audit_buckets in a single call
    - For specific bucket issues: Use check_bucket_exists to verify existence and access
    - For region/location issues: Use get_bucket_location
    - You may use multiple tools to get complete picture
@@ -78,7 +98,8 @@ WORKFLOW RULES:
 Remember: Your goal is to diagnose the cloud issue and provide complete, actionable resolution steps based on diagnostic tool results."""
 
     # Configure Bedrock model with temperature 0.3 for technical accuracy
-    model = BedrockModel(
+    model = create_model(
+        agent_name="cloud_service_agent",
         model_id="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
         temperature=0.3
     )
@@ -87,8 +108,10 @@ Remember: Your goal is to diagnose the cloud issue and provide complete, actiona
     agent = Agent(
         name="cloud_service_agent",
         model=model,
+        retry_strategy=HelpdeskRetryStrategy(),
+        hooks=[AgentMetricsHooks(), AgentTracingHooks()],
         system_prompt=system_prompt,
-        tools=[list_all_buckets, get_bucket_location, check_bucket_exists]
+        tools=agent_tools([list_all_buckets, search_buckets, get_bucket_location, check_bucket_exists, audit_buckets])
     )
     
     return agent
@@ -6,12 +6,19 @@ Uses JSON file storage with keyword matching for resolution retrieval.
 """
 
 import json
+import logging
 import os
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from strands.agent import Agent
 from strands.tools import tool
-from strands.models.bedrock import BedrockModel
+from bedrock_model import create_model
+from model_retry import HelpdeskRetryStrategy
+from metrics import AgentMetricsHooks
+from tracing import AgentTracingHooks
+
+
+logger = logging.getLogger("haunted_helpdesk.memory")
 
 
 # Memory file path
@@ -103,7 +110,7 @@ def retrieve_memory(query: str) -> str:
             
     except Exception as e:
         # On error, return NO_MEMORY_FOUND to allow workflow to continue
-        print(f"Error retrieving memory: {str(e)}")
+        logger.error(f"Error retrieving memory: {str(e)}")
         return "NO_MEMORY_FOUND"
 
 
@@ -209,7 +216,8 @@ KEYWORD MATCHING:
 Remember: Your responses must follow the exact formats specified above for the workflow to function correctly."""
 
     # Configure Bedrock model with temperature 0.3
-    model = BedrockModel(
+    model = create_model(
+        agent_name="memory_agent",
         model_id="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
         temperature=0.3
     )
@@ -218,6 +226,8 @@ Remember: Your responses must follow the exact formats specified above for the w
     agent = Agent(
         name="memory_agent",
         model=model,
+        retry_strategy=HelpdeskRetryStrategy(),
+        hooks=[AgentMetricsHooks(), AgentTracingHooks()],
         system_prompt=system_prompt,
         tools=[retrieve_memory, store_memory, list_memories]
     )
@@ -6,8 +6,19 @@ Analyzes connectivity, routing, and DNS issues to provide root cause analysis.
 """
 
 from strands.agent import Agent
-from strands.models.bedrock import BedrockModel
-from tools.network_tools import ping_host, traceroute_host, check_dns_resolution
+from bedrock_model import create_model
+from model_retry import HelpdeskRetryStrategy
+from metrics import AgentMetricsHooks
+from tracing import AgentTracingHooks
+from simulation import agent_tools
+from tools.network_tools import (
+    ping_host,
+    traceroute_host,
+    check_dns_resolution,
+    check_tcp_port,
+    check_tls_endpoint,
+    diagnose_hosts,
+)
 
 
 def create_network_diagnostic_agent() -> Agent:
@@ -23,23 +34,39 @@ Your role is to diagnose and troubleshoot network-related issues using specializ
 
 AVAILABLE TOOLS:
 1. ping_host(hostname, count=4): Test network connectivity to a host
-   - Returns success status, output, and return code
+   - Returns success status, packet loss %, min/avg/max/mdev RTT and per-packet timings
    - Use to verify if a host is reachable
 
 2. traceroute_host(hostname): Trace the network route to a host
-   - Returns hop-by-hop path information
+   - Returns parsed hop-by-hop path (addresses, RTTs, lost probes, unreachable flags)
    - Use to identify where network connectivity breaks
 
-3. check_dns_resolution(hostname): Check DNS resolution for a hostname
-   - Returns DNS lookup results including IP addresses
+3. check_dns_resolution(hostname, record_types=None, bypass_cache=False): Check DNS resolution for a hostname
+   - Returns resolved IP addresses per record type (A/AAAA) with lookup times
    - Use to verify DNS is working correctly
+   - Set bypass_cache=True to re-check a record that may have just changed
+
+4. check_tcp_port(hostname, port): Check whether a TCP port accepts connections
+   - Returns connect latency or the failure reason (refused, timed out, unresolvable)
+   - Use when a host answers ping but a specific service is unreachable
+
+5. check_tls_endpoint(hostname, port=443): Check a TLS/HTTPS endpoint
+   - Returns connect and handshake latency, TLS version and certificate expiry
+   - Use for HTTPS errors, certificate warnings or slow secure connections
+
+6. diagnose_hosts(hostnames, probes=None): Run ping, DNS and traceroute against several hosts in parallel
+   - Returns per-host results for every probe in one call
+   - PREFER this tool whenever you need more than one probe or more than one host
+   - Use probes=["ping", "dns"] to skip the slower traceroute when routing is not in question
 
 DIAGNOSTIC WORKFLOW:
 1. Analyze the ticket to understand the network issue
 2. Select and execute appropriate diagnostic tools:
+   - For a full picture of one or more hosts: Use diagnose_hosts in a single call
    - For connectivity issues: Start with ping_host
    - For routing problems: Use traceroute_host
    - For DNS issues: Use check_dns_resolution
+   - For service/port issues: Use check_tcp_port or check_tls_endpoint
    - You may use multiple tools to get complete picture
 
 3. Analyze the tool results to determine root cause:
@@ -49,6 +76,12 @@ DIAGNOSTIC WORKFLOW:
 
 4. Provide clear root cause analysis and resolution steps
 
+Results of identical recent checks are shared across tickets during an outage. Every result
+has "cached" and "cache_age_seconds"; mention the age in your findings when a result was cached.
+
+Tool results contain parsed metrics. Only pass include_raw=True when the metrics are
+missing something you need - raw output is long and slows the workflow down.
+
 OUTPUT FORMAT:
 Structure your response for the Summarization Agent with:
 - **Diagnostic Results**: What tools you ran and what they showed
@@ -68,7 +101,8 @@ WORKFLOW RULES:
 Remember: Your goal is to diagnose the network issue and provide actionable resolution steps based on diagnostic tool results."""
 
     # Configure Bedrock model with temperature 0.3 for technical accuracy
-    model = BedrockModel(
+    model = create_model(
+        agent_name="network_diagnostic_agent",
         model_id="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
         temperature=0.3
     )
@@ -77,8 +111,17 @@ Remember: Your goal is to diagnose the network issue and provide actionable reso
     agent = Agent(
         name="network_diagnostic_agent",
         model=model,
+        retry_strategy=HelpdeskRetryStrategy(),
+        hooks=[AgentMetricsHooks(), AgentTracingHooks()],
         system_prompt=system_prompt,
-        tools=[ping_host, traceroute_host, check_dns_resolution]
+        tools=agent_tools([
+            ping_host,
+            traceroute_host,
+            check_dns_resolution,
+            check_tcp_port,
+            check_tls_endpoint,
+            diagnose_hosts
+        ])
     )
     
     return agent
@@ -6,7 +6,10 @@ Enforces the mandatory workflow sequence and ensures proper agent handoffs.
 """
 
 from strands.agent import Agent
-from strands.models.bedrock import BedrockModel
+from bedrock_model import create_model
+from model_retry import HelpdeskRetryStrategy
+from metrics import AgentMetricsHooks
+from tracing import AgentTracingHooks
 
 
 def create_orchestrator_agent() -> Agent:
@@ -35,7 +38,8 @@ ROUTING (do ONCE per agent):
 CRITICAL: Hand off to each agent ONLY ONCE. If you already handed to an agent, DON'T do it again."""
 
     # Configure Bedrock model with temperature 0.3 (balanced for routing decisions)
-    model = BedrockModel(
+    model = create_model(
+        agent_name="orchestrator_agent",
         model_id="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
         temperature=0.3
     )
@@ -44,6 +48,8 @@ CRITICAL: Hand off to each agent ONLY ONCE. If you already handed to an agent, D
     agent = Agent(
         name="orchestrator_agent",
         model=model,
+        retry_strategy=HelpdeskRetryStrategy(),
+        hooks=[AgentMetricsHooks(), AgentTracingHooks()],
         system_prompt=system_prompt,
         tools=[]  # Orchestrator doesn't need tools, only routing logic
     )
@@ -6,7 +6,10 @@ Extracts key information and signals workflow completion.
 """
 
 from strands.agent import Agent
-from strands.models.bedrock import BedrockModel
+from bedrock_model import create_model
+from model_retry import HelpdeskRetryStrategy
+from metrics import AgentMetricsHooks
+from tracing import AgentTracingHooks
 
 
 def create_summarization_agent() -> Agent:
@@ -63,7 +66,8 @@ TONE AND STYLE:
 Remember: Your summary will be stored in the ticket and used for future reference. Make it comprehensive yet concise."""
 
     # Configure Bedrock model with temperature 0.2 for deterministic output
-    model = BedrockModel(
+    model = create_model(
+        agent_name="summarization_agent",
         model_id="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
         temperature=0.2
     )
@@ -72,6 +76,8 @@ Remember: Your summary will be stored in the ticket and used for future referenc
     agent = Agent(
         name="summarization_agent",
         model=model,
+        retry_strategy=HelpdeskRetryStrategy(),
+        hooks=[AgentMetricsHooks(), AgentTracingHooks()],
         system_prompt=system_prompt,
         tools=[]  # No tools needed for summarization
     )
@@ -12,7 +12,10 @@ happen through its response format, and the backend interprets these signals.
 """
 
 from strands.agent import Agent
-from strands.models.bedrock import BedrockModel
+from bedrock_model import create_model
+from model_retry import HelpdeskRetryStrategy
+from metrics import AgentMetricsHooks
+from tracing import AgentTracingHooks
 
 
 def create_ticketing_agent() -> Agent:
@@ -35,7 +38,8 @@ Scenarios 1 & 3: TERMINATE and STOP (no handoff).
 Scenario 2: Hand to orchestrator ONCE."""
 
     # Configure Bedrock model with temperature 0.4 for structured analysis
-    model = BedrockModel(
+    model = create_model(
+        agent_name="ticketing_agent",
         model_id="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
         temperature=0.4
     )
@@ -48,6 +52,8 @@ Scenario 2: Hand to orchestrator ONCE."""
     agent = Agent(
         name="ticketing_agent",
         model=model,
+        retry_strategy=HelpdeskRetryStrategy(),
+        hooks=[AgentMetricsHooks(), AgentTracingHooks()],
         system_prompt=system_prompt,
         tools=[]  # No tools - DynamoDB updates handled by backend based on response signals
     )
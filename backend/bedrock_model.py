@@ -0,0 +1,360 @@
+"""
+Bedrock Model for Haunted Helpdesk
+
+HelpdeskBedrockModel, the BedrockModel every agent uses: an opt-in SQLite response cache
+for deterministic steps, with Bedrock calls behind the shared rate limiter and breaker.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from botocore.config import Config
+from strands.models.bedrock import BedrockModel
+
+from resilience import Downstream, bedrock_downstream
+
+
+logger = logging.getLogger("haunted_helpdesk.model_cache")
+
+
+# Model response cache configuration
+MODEL_CACHE_ENABLED = os.getenv("MODEL_CACHE_ENABLED", "true").lower() == "true"
+MODEL_CACHE_PATH = os.getenv("MODEL_CACHE_PATH", "backend/cache/model_responses.sqlite3")
+MODEL_CACHE_TTL_SECONDS = float(os.getenv("MODEL_CACHE_TTL_SECONDS", "86400"))
+MODEL_CACHE_MAX_ENTRIES = int(os.getenv("MODEL_CACHE_MAX_ENTRIES", "2000"))
+# Agents whose responses may be replayed from the cache
+MODEL_CACHE_AGENTS = {
+    name.strip()
+    for name in os.getenv("MODEL_CACHE_AGENTS", "summarization_agent,ticketing_agent").split(",")
+    if name.strip()
+}
+
+DEFAULT_MODEL_ID = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
+# "bedrock", or "simulated" for offline load tests
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "bedrock").lower()
+BEDROCK_READ_TIMEOUT = float(os.getenv("BEDROCK_READ_TIMEOUT", "120"))
+
+
+def _json_default(value: Any) -> str:
+    """Serialize message content JSON can't represent (image bytes) by its digest."""
+    if isinstance(value, (bytes, bytearray)):
+        return "sha256:" + hashlib.sha256(value).hexdigest()
+    return str(value)
+
+
+def _normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Strip surrounding whitespace from text blocks so trivially different prompts match."""
+    normalized = []
+    for message in messages:
+        content = []
+        for block in message.get("content", []):
+            if isinstance(block.get("text"), str):
+                block = dict(block, text=block["text"].strip())
+            content.append(block)
+        normalized.append({"role": message.get("role"), "content": content})
+    return normalized
+
+
+def response_cache_key(
+    model_id: str,
+    system_prompt: Optional[str],
+    messages: List[Dict[str, Any]],
+    temperature: Optional[float],
+    tool_specs: Optional[List[Dict[str, Any]]] = None
+) -> str:
+    """
+    Build the cache key of a model call.
+
+    Args:
+        model_id: Bedrock model ID
+        system_prompt: System prompt text
+        messages: Conversation messages sent to the model
+        temperature: Sampling temperature
+        tool_specs: Tool specifications offered to the model
+
+    Returns:
+        Hex digest identifying the call
+    """
+    system_hash = hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()
+    payload = json.dumps(
+        [model_id, system_hash, _normalize_messages(messages), temperature, tool_specs or []],
+        sort_keys=True,
+        default=_json_default
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ModelResponseCache:
+    """On-disk cache of model stream events with TTL expiry and LRU eviction."""
+
+    def __init__(
+        self,
+        path: str = MODEL_CACHE_PATH,
+        ttl: float = MODEL_CACHE_TTL_SECONDS,
+        max_entries: int = MODEL_CACHE_MAX_ENTRIES
+    ):
+        """
+        Initialize the cache. The SQLite file is opened on first use.
+
+        Args:
+            path: SQLite database path
+            ttl: Seconds an entry stays valid
+            max_entries: Maximum number of entries (least recently used are evicted)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+        self._by_agent: Dict[str, Dict[str, int]] = {}
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database and create the table. Caller must hold the lock."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, agent TEXT, events TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            self._conn.commit()
+        return self._conn
+
+    def _count(self, agent_name: str, outcome: str) -> None:
+        self._stats[outcome] += 1
+        agent = self._by_agent.setdefault(agent_name, {"hits": 0, "misses": 0})
+        agent[outcome] += 1
+
+    def get(self, key: str, agent_name: str = "unknown") -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the cached stream events for a key, or None on a miss.
+
+        Args:
+            key: Cache key from response_cache_key()
+            agent_name: Agent making the call (for hit-rate metrics)
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute("SELECT events, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and now - row[1] > self.ttl:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    conn.commit()
+                    row = None
+                if row is None:
+                    self._count(agent_name, "misses")
+                    return None
+                conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self._count(agent_name, "hits")
+                return json.loads(row[0])
+            except (sqlite3.Error, json.JSONDecodeError) as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Model response cache read failed: {str(e)}")
+                return None
+
+    def put(self, key: str, events: List[Dict[str, Any]], agent_name: str = "unknown") -> None:
+        """
+        Store the stream events of a completed response, evicting the least recently used entries.
+
+        Args:
+            key: Cache key from response_cache_key()
+            events: Stream events of the response
+            agent_name: Agent that made the call
+        """
+        now = time.time()
+        try:
+            payload = json.dumps(events)
+        except (TypeError, ValueError):
+            return  # events with non-JSON content are not cached
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, agent, events, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, agent_name, payload, now, now)
+                )
+                conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+                overflow = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+                if overflow > 0:
+                    conn.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)",
+                        (overflow,)
+                    )
+                    self._stats["evictions"] += overflow
+                conn.commit()
+                self._stats["stores"] += 1
+            except sqlite3.Error as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Model response cache write failed: {str(e)}")
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters overall and per agent, plus the current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            by_agent = {name: dict(counts) for name, counts in self._by_agent.items()}
+            try:
+                stats["entries"] = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            except sqlite3.Error:
+                stats["entries"] = None
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        for counts in by_agent.values():
+            agent_lookups = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = round(counts["hits"] / agent_lookups, 4) if agent_lookups else 0.0
+        stats["by_agent"] = by_agent
+        stats["enabled"] = MODEL_CACHE_ENABLED
+        stats["agents"] = sorted(MODEL_CACHE_AGENTS)
+        return stats
+
+
+# Shared response cache instance
+model_response_cache = ModelResponseCache()
+
+
+def _replay_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Zero the usage and latency of a replayed metadata event; the call cost nothing."""
+    if "metadata" not in event:
+        return event
+    metadata = dict(event["metadata"])
+    metadata["usage"] = {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0}
+    metadata["metrics"] = {"latencyMs": 0}
+    return {"metadata": metadata}
+
+
+class HelpdeskBedrockModel(BedrockModel):
+    """BedrockModel with an opt-in response cache for deterministic agent steps."""
+
+    def __init__(
+        self,
+        agent_name: str,
+        cache_responses: Optional[bool] = None,
+        response_cache: Optional[ModelResponseCache] = None,
+        downstream: Optional[Downstream] = None,
+        **model_config: Any
+    ):
+        """
+        Initialize the model.
+
+        Args:
+            agent_name: Name of the agent using the model
+            cache_responses: Replay cached responses (defaults to agent_name being in MODEL_CACHE_AGENTS)
+            response_cache: Cache instance (defaults to the shared model response cache)
+            downstream: Rate limiter and circuit breaker for Bedrock calls (defaults to the shared guard)
+            **model_config: BedrockModel configuration (model_id, temperature, ...)
+        """
+        model_config.setdefault("model_id", DEFAULT_MODEL_ID)
+        model_config.setdefault("boto_client_config", Config(
+            read_timeout=BEDROCK_READ_TIMEOUT,
+            retries={"total_max_attempts": 1, "mode": "standard"}
+        ))
+        super().__init__(**model_config)
+        self.agent_name = agent_name
+        if cache_responses is None:
+            cache_responses = MODEL_CACHE_ENABLED and agent_name in MODEL_CACHE_AGENTS
+        self.cache_responses = cache_responses
+        self.response_cache = response_cache if response_cache is not None else model_response_cache
+        self.downstream = downstream if downstream is not None else bedrock_downstream
+        # Number of responses this model instance replayed from the cache
+        self.cache_hits = 0
+
+    def _cache_key(self, messages: List[Dict[str, Any]], tool_specs: Optional[List[Dict[str, Any]]],
+                   system_prompt: Optional[str], system_prompt_content: Optional[List[Dict[str, Any]]]) -> str:
+        config = self.get_config()
+        if system_prompt is None and system_prompt_content:
+            system_prompt = json.dumps(system_prompt_content, sort_keys=True, default=_json_default)
+        return response_cache_key(config["model_id"], system_prompt, messages, config.get("temperature"), tool_specs)
+
+    async def _guarded_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: Optional[List[Dict[str, Any]]],
+        system_prompt: Optional[str],
+        **kwargs: Any
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream from Bedrock through the shared rate limiter and circuit breaker."""
+        async with self.downstream.guard_async():
+            async for event in self._bedrock_stream(messages, tool_specs, system_prompt, **kwargs):
+                yield event
+
+    async def _bedrock_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: Optional[List[Dict[str, Any]]],
+        system_prompt: Optional[str],
+        **kwargs: Any
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """The Bedrock ConverseStream call itself (replaced by the simulated model)."""
+        async for event in super().stream(messages, tool_specs, system_prompt, **kwargs):
+            yield event
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: Optional[List[Dict[str, Any]]] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a response, replaying it from the cache when the agent opted in."""
+        if not self.cache_responses:
+            async for event in self._guarded_stream(messages, tool_specs, system_prompt, **kwargs):
+                yield event
+            return
+
+        key = self._cache_key(messages, tool_specs, system_prompt, kwargs.get("system_prompt_content"))
+        cached = await asyncio.to_thread(self.response_cache.get, key, self.agent_name)
+        if cached is not None:
+            self.cache_hits += 1
+            logger.info(f"Replaying cached response for {self.agent_name}")
+            for event in cached:
+                yield _replay_event(event)
+            return
+
+        events = []
+        async for event in self._guarded_stream(messages, tool_specs, system_prompt, **kwargs):
+            events.append(event)
+            yield event
+        stop_reasons = [event["messageStop"].get("stopReason") for event in events if "messageStop" in event]
+        if stop_reasons == ["end_turn"]:
+            await asyncio.to_thread(self.response_cache.put, key, events, self.agent_name)
+
+
+def create_model(agent_name: str, **model_config: Any) -> HelpdeskBedrockModel:
+    """
+    Create the model an agent uses.
+
+    Args:
+        agent_name: Name of the agent using the model
+        **model_config: Model configuration (model_id, temperature, ...)
+
+    Returns:
+        A HelpdeskBedrockModel, or a SimulatedBedrockModel when MODEL_BACKEND=simulated
+    """
+    if MODEL_BACKEND == "simulated":
+        from simulation import SimulatedBedrockModel
+        return SimulatedBedrockModel(agent_name=agent_name, **model_config)
+    return HelpdeskBedrockModel(agent_name=agent_name, **model_config)
+
+
+def replayed_from_cache(agent: Any) -> bool:
+    """Whether an agent's model replayed any response from the cache."""
+    return getattr(getattr(agent, "model", None), "cache_hits", 0) > 0
@@ -2,28 +2,71 @@
 DynamoDB utilities for Haunted Helpdesk ticket management.
 
 This module provides a DynamoDBManager class for CRUD operations on the HauntedHelpdeskTickets table.
+Table calls pass through the DynamoDB rate limiter and circuit breaker (see resilience)
+and their latency and consumed capacity are recorded per operation (see metrics) and traced
+(see tracing). The table comes from a storage backend (DynamoDB or in memory, see
+storage_backends) and is opened on first use, so importing this module needs no AWS setup.
+Calls block (the boto3 request, and up to RATE_LIMIT_MAX_WAIT_SECONDS waiting for a rate
+limiter token), so async callers run them in a worker thread with asyncio.to_thread.
 """
 
-import boto3
 from botocore.exceptions import ClientError
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 import json
 
+from metrics import DYNAMODB_CALL_DURATION, DYNAMODB_CONSUMED_CAPACITY
+from tracing import tracer
+from resilience import Downstream, dynamodb_downstream
+from storage_backends import StorageBackend, create_storage_backend
+
 
 class DynamoDBManager:
     """Manager class for DynamoDB operations on HauntedHelpdeskTickets table."""
     
-    def __init__(self, table_name: str = "HauntedHelpdeskTickets"):
+    def __init__(
+        self,
+        table_name: str = "HauntedHelpdeskTickets",
+        downstream: Optional[Downstream] = None,
+        backend: Optional[Union[StorageBackend, str]] = None
+    ):
         """
-        Initialize DynamoDB manager with connection to HauntedHelpdeskTickets table.
+        Initialize DynamoDB manager for the HauntedHelpdeskTickets table.
         
         Args:
             table_name: Name of the DynamoDB table (default: HauntedHelpdeskTickets)
+            downstream: Rate limiter and circuit breaker for table calls (defaults to the shared guard)
+            backend: Storage backend or its name, "dynamodb" or "memory" (defaults to TICKET_STORAGE_BACKEND)
         """
-        self.dynamodb = boto3.resource('dynamodb')
         self.table_name = table_name
-        self.table = self.dynamodb.Table(table_name)
+        self.backend = backend if isinstance(backend, StorageBackend) else create_storage_backend(backend)
+        self.downstream = downstream if downstream is not None else dynamodb_downstream
+        self._table = None
+    
+    @property
+    def table(self) -> Any:
+        """The table handle, opened on first use."""
+        if self._table is None:
+            self._table = self.backend.open_table(self.table_name)
+        return self._table
+    
+    @table.setter
+    def table(self, table: Any) -> None:
+        self._table = table
+    
+    def check_table(self) -> Dict[str, Any]:
+        """Health check result for the table from its storage backend (see health.check_dynamodb)."""
+        return self.backend.check_table(self.table_name)
+    
+    def _call(self, operation: str, **kwargs: Any) -> Any:
+        """Call a table operation through the DynamoDB guard, recording its latency, capacity and a span."""
+        with tracer.span(f"dynamodb.{operation}", "dynamodb", table=self.table_name), \
+                DYNAMODB_CALL_DURATION.time(operation=operation):
+            response = self.downstream.call(getattr(self.table, operation), ReturnConsumedCapacity="TOTAL", **kwargs)
+        consumed = response.get("ConsumedCapacity") if isinstance(response, dict) else None
+        if consumed:
+            DYNAMODB_CONSUMED_CAPACITY.inc(float(consumed.get("CapacityUnits", 0)), operation=operation)
+        return response
     
     def create_ticket(self, ticket_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -37,6 +80,7 @@ class DynamoDBManager:
             
         Raises:
             ClientError: If DynamoDB operation fails
+            DownstreamUnavailable: If DynamoDB is rate limited or its circuit is open
         """
         try:
             # Ensure timestamps are present
@@ -49,7 +93,7 @@ class DynamoDBManager:
             serialized_data = self._serialize_for_dynamodb(ticket_data)
             
             # Put item in DynamoDB
-            self.table.put_item(Item=serialized_data)
+            self._call("put_item", Item=serialized_data)
             
             return ticket_data
             
@@ -78,9 +122,10 @@ class DynamoDBManager:
             
         Raises:
             ClientError: If DynamoDB operation fails
+            DownstreamUnavailable: If DynamoDB is rate limited or its circuit is open
         """
         try:
-            response = self.table.get_item(Key={'ticket_id': ticket_id})
+            response = self._call("get_item", Key={'ticket_id': ticket_id})
             
             if 'Item' in response:
                 return self._deserialize_from_dynamodb(response['Item'])
@@ -108,14 +153,15 @@ class DynamoDBManager:
             
         Raises:
             ClientError: If DynamoDB operation fails
+            DownstreamUnavailable: If DynamoDB is rate limited or its circuit is open
         """
         try:
-            response = self.table.scan()
+            response = self._call("scan")
             items = response.get('Items', [])
             
             # Handle pagination if there are more items
             while 'LastEvaluatedKey' in response:
-                response = self.table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
+                response = self._call("scan", ExclusiveStartKey=response['LastEvaluatedKey'])
                 items.extend(response.get('Items', []))
             
             return [self._deserialize_from_dynamodb(item) for item in items]
@@ -146,6 +192,7 @@ class DynamoDBManager:
             
         Raises:
             ClientError: If DynamoDB operation fails
+            DownstreamUnavailable: If DynamoDB is rate limited or its circuit is open
         """
         try:
             # Always update the updated_at timestamp
@@ -167,7 +214,8 @@ class DynamoDBManager:
             
             update_expression = "SET " + ", ".join(update_expression_parts)
             
-            response = self.table.update_item(
+            response = self._call(
+                "update_item",
                 Key={'ticket_id': ticket_id},
                 UpdateExpression=update_expression,
                 ExpressionAttributeNames=expression_attribute_names,
@@ -0,0 +1,184 @@
+"""
+Ticket Event Stream for Haunted Helpdesk
+
+Per-ticket channels of workflow and agent events, replayed to late subscribers and
+served as Server-Sent Events on GET /api/tickets/{ticket_id}/events.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+
+logger = logging.getLogger("haunted_helpdesk.events")
+
+
+# Event stream configuration
+EVENT_HISTORY_LIMIT = int(os.getenv("EVENT_HISTORY_LIMIT", "500"))
+EVENT_RETENTION_SECONDS = float(os.getenv("EVENT_RETENTION_SECONDS", "600"))
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+# Minimum characters of model output per agent_output event
+EVENT_OUTPUT_MIN_CHARS = int(os.getenv("EVENT_OUTPUT_MIN_CHARS", "40"))
+
+TERMINAL_EVENTS = {"workflow_completed", "workflow_failed"}
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Format an event as a Server-Sent Events message."""
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+class _TicketChannel:
+    """Event history and live subscribers of one ticket."""
+
+    def __init__(self, history_limit: int):
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_limit)
+        self.subscribers: List[asyncio.Queue] = []
+        self.next_id = 1
+        # Last publish, subscribe or unsubscribe on the channel
+        self.last_active = time.time()
+
+
+class TicketEventBroker:
+    """In-process publish/subscribe of workflow events per ticket."""
+
+    def __init__(self, history_limit: int = EVENT_HISTORY_LIMIT, retention: float = EVENT_RETENTION_SECONDS):
+        """
+        Initialize the broker.
+
+        Args:
+            history_limit: Events kept per ticket for late subscribers
+            retention: Seconds an idle ticket's events are kept
+        """
+        self.history_limit = history_limit
+        self.retention = retention
+        self._channels: Dict[str, _TicketChannel] = {}
+
+    def _prune(self) -> None:
+        """Drop channels nobody follows that have been idle past their retention."""
+        now = time.time()
+        for ticket_id, channel in list(self._channels.items()):
+            if not channel.subscribers and now - channel.last_active > self.retention:
+                del self._channels[ticket_id]
+
+    def publish(self, ticket_id: str, event: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Publish an event to a ticket's subscribers.
+
+        A workflow_started event starts a fresh history for the ticket.
+
+        Args:
+            ticket_id: Ticket the event belongs to
+            event: Event type
+            data: Event payload
+
+        Returns:
+            The published event (id, event, data, timestamp)
+        """
+        if event == "workflow_started":
+            self._prune()
+            previous = self._channels.get(ticket_id)
+            channel = _TicketChannel(self.history_limit)
+            if previous is not None:
+                # Clients already following the ticket keep receiving the new run
+                channel.subscribers = previous.subscribers
+                channel.next_id = previous.next_id
+            self._channels[ticket_id] = channel
+        channel = self._channels.setdefault(ticket_id, _TicketChannel(self.history_limit))
+
+        message = {"id": channel.next_id, "event": event, "data": data or {}, "timestamp": time.time()}
+        channel.next_id += 1
+        channel.history.append(message)
+        channel.last_active = message["timestamp"]
+        for queue in channel.subscribers:
+            queue.put_nowait(message)
+        return message
+
+    def history(self, ticket_id: str) -> List[Dict[str, Any]]:
+        """Return the events kept for a ticket."""
+        channel = self._channels.get(ticket_id)
+        return list(channel.history) if channel else []
+
+    async def subscribe(
+        self,
+        ticket_id: str,
+        keepalive: float = EVENT_KEEPALIVE_SECONDS
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Follow a ticket's events, starting with the ones already published.
+
+        Ends after a workflow_completed or workflow_failed event.
+
+        Args:
+            ticket_id: Ticket to follow
+            keepalive: Seconds without events after which None is yielded (keepalive)
+
+        Yields:
+            Events, or None when no event arrived within the keepalive interval
+        """
+        self._prune()
+        channel = self._channels.setdefault(ticket_id, _TicketChannel(self.history_limit))
+        channel.last_active = time.time()
+        queue: asyncio.Queue = asyncio.Queue()
+        for message in channel.history:
+            queue.put_nowait(message)
+        channel.subscribers.append(queue)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield message
+                if message["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            current = self._channels.get(ticket_id, channel)
+            if queue in current.subscribers:
+                current.subscribers.remove(queue)
+            current.last_active = time.time()
+
+
+# Shared broker instance
+ticket_events = TicketEventBroker()
+
+
+class AgentOutputPublisher:
+    """Coalesces one agent's streamed text deltas into agent_output events."""
+
+    def __init__(
+        self,
+        broker: TicketEventBroker,
+        ticket_id: str,
+        agent_name: str,
+        step: str,
+        min_chars: int = EVENT_OUTPUT_MIN_CHARS
+    ):
+        self.broker = broker
+        self.ticket_id = ticket_id
+        self.agent_name = agent_name
+        self.step = step
+        self.min_chars = min_chars
+        self._buffer: List[str] = []
+        self._buffered = 0
+
+    def write(self, text: str) -> None:
+        """Buffer a text delta, publishing once enough text has accumulated."""
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.min_chars or "\n" in text:
+            self.flush()
+
+    def flush(self) -> None:
+        """Publish the buffered text, if any."""
+        if not self._buffer:
+            return
+        self.broker.publish(self.ticket_id, "agent_output", {
+            "agent_name": self.agent_name, "step": self.step, "text": "".join(self._buffer)
+        })
+        self._buffer, self._buffered = [], 0
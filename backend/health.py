@@ -0,0 +1,362 @@
+"""
+Health Monitoring for Haunted Helpdesk
+
+Keeps downstream status in memory, refreshed by a background prober using cheap
+control-plane calls, and answers the liveness and readiness endpoints from it.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import boto3
+from botocore.exceptions import ClientError, NoCredentialsError
+
+from bedrock_model import DEFAULT_MODEL_ID
+from resilience import OPEN, Downstream
+
+
+logger = logging.getLogger("haunted_helpdesk.health")
+
+
+# Health monitoring configuration
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "30"))
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "5"))
+HEALTH_PASSIVE_WINDOW_SECONDS = float(os.getenv("HEALTH_PASSIVE_WINDOW_SECONDS", "60"))
+HEALTH_STALE_SECONDS = float(os.getenv("HEALTH_STALE_SECONDS", str(HEALTH_PROBE_INTERVAL_SECONDS * 3)))
+HEALTH_BEDROCK_MODEL_ID = os.getenv("HEALTH_BEDROCK_MODEL_ID", DEFAULT_MODEL_ID)
+
+# Model ids with a geographic prefix are cross-region inference profiles
+INFERENCE_PROFILE_PREFIXES = ("us.", "eu.", "apac.", "global.")
+
+
+def _credential_error(e: Exception) -> Optional[Dict[str, Any]]:
+    """Status for missing or expired credentials, or None for other errors."""
+    if isinstance(e, NoCredentialsError):
+        return {
+            "available": False,
+            "status": "error",
+            "message": "AWS credentials not found or expired. Please refresh your credentials."
+        }
+    if isinstance(e, ClientError) and e.response['Error']['Code'] in ['ExpiredToken', 'ExpiredTokenException']:
+        return {
+            "available": False,
+            "status": "error",
+            "message": "AWS credentials have expired. Please refresh your credentials."
+        }
+    return None
+
+
+def check_bedrock(model_id: str = HEALTH_BEDROCK_MODEL_ID) -> Dict[str, Any]:
+    """
+    Check that the Bedrock model is accessible without invoking it.
+
+    Args:
+        model_id: Inference profile or foundation model id used by the agents
+
+    Returns:
+        Dictionary containing:
+        - available: Boolean indicating if the model can be used
+        - status: "operational", "error" or the model's lifecycle status
+        - model: The model id
+        - message: Human readable detail
+    """
+    try:
+        bedrock_client = boto3.client('bedrock')
+        if model_id.startswith(INFERENCE_PROFILE_PREFIXES):
+            status = bedrock_client.get_inference_profile(inferenceProfileIdentifier=model_id).get('status', 'ACTIVE')
+        else:
+            details = bedrock_client.get_foundation_model(modelIdentifier=model_id).get('modelDetails', {})
+            status = details.get('modelLifecycle', {}).get('status', 'ACTIVE')
+
+        available = status in ('ACTIVE', 'LEGACY')
+        return {
+            "available": available,
+            "status": "operational" if available else status.lower(),
+            "model": model_id,
+            "message": "AWS Bedrock is accessible" if available else f"Bedrock model is {status}"
+        }
+
+    except (ClientError, NoCredentialsError) as e:
+        credential_status = _credential_error(e)
+        if credential_status:
+            return {**credential_status, "model": model_id}
+        error_code = e.response['Error']['Code']
+        if error_code == 'AccessDeniedException':
+            message = "Access denied to AWS Bedrock. Please check IAM permissions."
+        elif error_code in ('ResourceNotFoundException', 'ValidationException'):
+            message = "Bedrock model not found. Please verify model access in your region."
+        else:
+            message = f"AWS Bedrock error: {error_code}"
+        return {"available": False, "status": "error", "model": model_id, "message": message}
+    except Exception as e:
+        return {
+            "available": False,
+            "status": "error",
+            "model": model_id,
+            "message": f"Unexpected error checking Bedrock: {str(e)}"
+        }
+
+
+def check_dynamodb(table_name: str) -> Dict[str, Any]:
+    """
+    Check that the tickets table exists and is active.
+
+    Args:
+        table_name: Name of the DynamoDB table
+
+    Returns:
+        Dictionary containing:
+        - available: Boolean indicating if the table is ACTIVE
+        - status: Table status (lowercase) or "error"
+        - table_name: The table name
+        - message: Human readable detail
+    """
+    try:
+        dynamodb_client = boto3.client('dynamodb')
+        table_status = dynamodb_client.describe_table(TableName=table_name)['Table']['TableStatus']
+        return {
+            "available": table_status == 'ACTIVE',
+            "status": table_status.lower(),
+            "table_name": table_name,
+            "message": f"DynamoDB table is {table_status}"
+        }
+
+    except (ClientError, NoCredentialsError) as e:
+        credential_status = _credential_error(e)
+        if credential_status:
+            return {**credential_status, "table_name": table_name}
+        error_code = e.response['Error']['Code']
+        if error_code == 'ResourceNotFoundException':
+            message = f"DynamoDB table '{table_name}' not found. Please create the table."
+        elif error_code == 'AccessDeniedException':
+            message = "Access denied to DynamoDB. Please check IAM permissions."
+        else:
+            message = f"DynamoDB error: {error_code}"
+        return {"available": False, "status": "error", "table_name": table_name, "message": message}
+    except Exception as e:
+        return {
+            "available": False,
+            "status": "error",
+            "table_name": table_name,
+            "message": f"Unexpected error checking DynamoDB: {str(e)}"
+        }
+
+
+class HealthMonitor:
+    """
+    In-memory downstream status, refreshed by a background prober and by real traffic.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = HEALTH_PROBE_INTERVAL_SECONDS,
+        timeout_seconds: float = HEALTH_PROBE_TIMEOUT_SECONDS,
+        passive_window_seconds: float = HEALTH_PASSIVE_WINDOW_SECONDS,
+        stale_seconds: float = HEALTH_STALE_SECONDS
+    ):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval_seconds: Time between background probe rounds
+            timeout_seconds: Longest a single probe may take
+            passive_window_seconds: How recent a successful real call must be to skip the probe
+            stale_seconds: Age after which a status no longer counts as healthy
+        """
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.passive_window_seconds = passive_window_seconds
+        self.stale_seconds = stale_seconds
+        self.started_at = time.time()
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._counters = {"rounds": 0, "probes": 0, "passive": 0, "circuit_open": 0}
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        check: Callable[[], Dict[str, Any]],
+        downstream: Optional[Downstream] = None,
+        required: bool = True
+    ) -> None:
+        """
+        Register a downstream to monitor.
+
+        Args:
+            name: Service name reported in health responses
+            check: Blocking probe returning a status dictionary with "available"
+            downstream: Guard whose breaker state and recent calls are used as passive signals
+            required: Whether the instance is not ready while this service is unavailable
+        """
+        self._components[name] = {"check": check, "downstream": downstream, "required": required}
+
+    # Probing
+
+    def _passive_status(self, downstream: Optional[Downstream], now: float) -> Optional[Dict[str, Any]]:
+        """Status derived from real traffic, or None if the service needs an active probe."""
+        if downstream is None or not downstream.enabled:
+            return None
+        breaker = downstream.breaker
+        if breaker.state == OPEN and breaker.opened_at + breaker.recovery_seconds > time.monotonic():
+            retry_after = breaker.opened_at + breaker.recovery_seconds - time.monotonic()
+            self._counters["circuit_open"] += 1
+            return {
+                "available": False,
+                "status": "circuit_open",
+                "message": f"Circuit breaker is open after repeated failures ({downstream.last_error}); "
+                           f"retry in {retry_after:.0f}s",
+                "source": "circuit"
+            }
+        last_success = downstream.last_success_at
+        if last_success is None or now - last_success > self.passive_window_seconds:
+            return None
+        if downstream.last_failure_at is not None and downstream.last_failure_at > last_success:
+            return None
+        self._counters["passive"] += 1
+        return {
+            "available": True,
+            "status": "operational",
+            "message": f"Real calls succeeded {now - last_success:.0f}s ago",
+            "source": "traffic"
+        }
+
+    async def _probe(self, name: str, component: Dict[str, Any]) -> None:
+        now = time.time()
+        status = self._passive_status(component["downstream"], now)
+        if status is None:
+            self._counters["probes"] += 1
+            start = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(asyncio.to_thread(component["check"]), self.timeout_seconds)
+            except asyncio.TimeoutError:
+                status = {
+                    "available": False,
+                    "status": "timeout",
+                    "message": f"Health probe did not answer within {self.timeout_seconds:.0f}s"
+                }
+            except Exception as e:
+                status = {"available": False, "status": "error", "message": f"Health probe failed: {str(e)}"}
+            status = {**status, "source": "probe", "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+            if not status["available"]:
+                logger.warning(f"Health probe for {name} failed: {status.get('message')}")
+        self._status[name] = {**status, "checked_at": now}
+
+    async def probe_all(self) -> None:
+        """Refresh the status of every registered service concurrently."""
+        await asyncio.gather(*(self._probe(name, component) for name, component in self._components.items()))
+        self._counters["rounds"] += 1
+
+    async def _probe_loop(self) -> None:
+        """Refresh statuses periodically."""
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Health probe round failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start_background_probing(self) -> None:
+        """Start the periodic probe task on the running event loop."""
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    async def stop_background_probing(self) -> None:
+        """Cancel the periodic probe task."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    # Reporting
+
+    def _services(self) -> Dict[str, Dict[str, Any]]:
+        """Current status per service, with stale and never-checked services marked unavailable."""
+        now = time.time()
+        services = {}
+        for name in self._components:
+            status = self._status.get(name)
+            if status is None:
+                services[name] = {"available": False, "status": "unknown", "message": "Not checked yet"}
+                continue
+            age = now - status["checked_at"]
+            service = {**status, "checked_at": datetime.utcfromtimestamp(status["checked_at"]).isoformat(),
+                       "age_seconds": round(age, 1)}
+            if age > self.stale_seconds:
+                service.update(available=False, status="stale",
+                               message=f"Last checked {age:.0f}s ago: {status.get('message')}")
+            services[name] = service
+        return services
+
+    def liveness(self) -> Dict[str, Any]:
+        """
+        Report that the process is serving requests.
+
+        Returns:
+            Dictionary containing:
+            - status: Always "alive"
+            - uptime_seconds: Seconds since the monitor was created
+            - prober_running: Whether the background prober task is running
+            - timestamp: ISO 8601 time of the response
+        """
+        return {
+            "status": "alive",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "prober_running": self._probe_task is not None and not self._probe_task.done(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    def readiness(self) -> Dict[str, Any]:
+        """
+        Report whether every required service was recently seen healthy.
+
+        Returns:
+            Dictionary containing:
+            - ready: Boolean readiness
+            - status: "ready", "not_ready" or "starting" (no probe round finished yet)
+            - services: Status per service
+            - timestamp: ISO 8601 time of the response
+        """
+        services = self._services()
+        ready = all(services[name]["available"] for name, component in self._components.items()
+                    if component["required"])
+        if ready:
+            status = "ready"
+        else:
+            status = "starting" if self._counters["rounds"] == 0 else "not_ready"
+        return {
+            "ready": ready,
+            "status": status,
+            "services": services,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    def get_health(self) -> Dict[str, Any]:
+        """
+        Report overall health: "healthy" when every service is available, otherwise "degraded".
+
+        Returns:
+            Dictionary containing:
+            - status: "healthy" or "degraded"
+            - services: Status per service
+            - probes: Probe rounds, active probes, passive and open-circuit answers so far
+            - timestamp: ISO 8601 time of the response
+        """
+        services = self._services()
+        return {
+            "status": "healthy" if all(service["available"] for service in services.values()) else "degraded",
+            "timestamp": datetime.utcnow().isoformat(),
+            "services": services,
+            "probes": dict(self._counters)
+        }
+
+
+# Shared health monitor; services are registered by the API
+health_monitor = HealthMonitor()
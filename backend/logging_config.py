@@ -0,0 +1,218 @@
+"""
+Logging Configuration for Haunted Helpdesk
+
+Configures JSON (or text) logging through a bounded queue and a writer thread, with
+ticket and agent context from the current span and sampling of repeated errors.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+
+from metrics import LOG_RECORDS_DROPPED, LOG_RECORDS_SUPPRESSED
+from tracing import tracer
+
+
+# Logging configuration
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_WINDOW_SECONDS = float(os.getenv("LOG_SAMPLE_WINDOW_SECONDS", "60"))
+LOG_SAMPLE_BURST = int(os.getenv("LOG_SAMPLE_BURST", "10"))
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Ids and numbers are masked so "ticket 1 failed" and "ticket 2 failed" are sampled together
+_VARIABLE_PARTS = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|0x[0-9a-f]+|\d+(\.\d+)?", re.IGNORECASE
+)
+
+# Most distinct messages tracked by the sampler
+_MAX_SAMPLED_MESSAGES = 1000
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """
+    Parse per-logger levels.
+
+    Args:
+        spec: Comma-separated "logger=LEVEL" pairs
+
+    Returns:
+        Dictionary mapping logger names to numeric levels (invalid entries are skipped)
+    """
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        level = logging.getLevelName(level.strip().upper())
+        if name.strip() and isinstance(level, int):
+            levels[name.strip()] = level
+    return levels
+
+
+class ContextFilter(logging.Filter):
+    """Adds the ticket_id and agent of the current tracing span to each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = tracer.current_span()
+        if not hasattr(record, "ticket_id"):
+            record.ticket_id = span.trace_id if span is not None else None
+        if not hasattr(record, "agent"):
+            agent = None
+            while span is not None and agent is None:
+                if span.kind == "agent":
+                    agent = span.attributes.get("agent")
+                span = span.parent
+            record.agent = agent
+        return True
+
+
+class ErrorSamplingFilter(logging.Filter):
+    """
+    Bounds repeated warnings and errors during incident storms.
+
+    Records below WARNING always pass. For each (logger, masked message) the first
+    `burst` records of a window pass; later ones are dropped and counted, and the
+    count is attached as `suppressed` to the first record let through afterwards.
+    """
+
+    def __init__(self, window_seconds: float = LOG_SAMPLE_WINDOW_SECONDS, burst: int = LOG_SAMPLE_BURST):
+        super().__init__()
+        self.window_seconds = window_seconds
+        self.burst = burst
+        # key -> [window start, records passed in window, records suppressed]
+        self._windows: "OrderedDict[Tuple[str, int, str], list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or self.burst <= 0:
+            return True
+        key = (record.name, record.levelno, _VARIABLE_PARTS.sub("#", str(record.msg)))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = [now, 0, 0]
+                while len(self._windows) > _MAX_SAMPLED_MESSAGES:
+                    self._windows.popitem(last=False)
+            else:
+                self._windows.move_to_end(key)
+            if now - window[0] >= self.window_seconds:
+                window[0], window[1] = now, 0
+            if window[1] >= self.burst:
+                window[2] += 1
+                LOG_RECORDS_SUPPRESSED.inc(logger=record.name)
+                return False
+            window[1] += 1
+            if window[2]:
+                record.suppressed = window[2]
+                window[2] = 0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that drops records when the queue is full instead of blocking the caller."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback here (arguments may change after the call)
+        # but leave formatting to the listener thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    log_format: str = LOG_FORMAT,
+    module_levels: str = LOG_LEVELS,
+    stream: Any = None
+) -> None:
+    """
+    Route all logging through a bounded queue to a single stream handler.
+
+    Replaces the root logger's handlers; calling it again reconfigures logging.
+
+    Args:
+        level: Root log level
+        log_format: "json" for JSON lines, "text" for the plain format
+        module_levels: Per-logger levels, e.g. "haunted_helpdesk.router=DEBUG"
+        stream: Stream written to (defaults to stderr)
+    """
+    global _listener
+    stop_logging()
+
+    output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    output.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    handler.addFilter(ContextFilter())
+    handler.addFilter(ErrorSamplingFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    for name, module_level in parse_levels(module_levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
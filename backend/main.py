@@ -5,28 +5,41 @@ Main FastAPI application for the Haunted Helpdesk AI-powered multi-agent IT oper
 Provides REST API endpoints for ticket management and workflow processing.
 """
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Awaitable, Callable
 from datetime import datetime
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+from botocore.exceptions import ClientError
+import asyncio
 import os
+import time
 import uuid
-import shutil
 import logging
 
 # Import Haunted Helpdesk components
 from dynamodb_utils import db_manager
 from Helpdesk_swarm import create_Haunted_Helpdesk_swarm
+from workflow_router import WORKFLOW_MODE, format_ticket_content, run_routed_workflow
 from multimodal_input import process_multimodal_input
+from upload_storage import upload_storage
+from tools.s3_inventory import bucket_inventory
+from usage_accounting import UsageLedger, usage_aggregator
+from bedrock_model import model_response_cache
+from event_stream import format_sse, ticket_events
+from model_retry import get_retry_stats
+from workflow_checkpoints import workflow_checkpoints
+from timeout_policy import TIMEOUT_POLICY_ENABLED, TimeoutPolicy, timeout_policy
+from ticket_scheduler import SchedulerFull, TicketAlreadyScheduled, ticket_scheduler
+from resilience import DownstreamUnavailable, bedrock_downstream, dynamodb_downstream, get_resilience_status
+from health import check_bedrock, health_monitor
+from metrics import HTTP_REQUEST_DURATION, QUEUE_DEPTH, RUNNING_WORKFLOWS, observe_workflow, registry
+from tracing import tracer
+from logging_config import configure_logging, stop_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (JSON lines written by a background thread, see logging_config)
+configure_logging()
 logger = logging.getLogger("haunted_helpdesk.workflow")
 
 
@@ -53,6 +66,58 @@ app.add_middleware(
 )
 
 
+# Request latency per route template (unmatched paths share one label to bound cardinality).
+# Each request also opens a span; handlers that work on a ticket bind it to the ticket's trace.
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next: Callable[[Request], Awaitable[Any]]) -> Any:
+    """Observe the latency of every API request until its response starts."""
+    start = time.perf_counter()
+    status = 500
+    with tracer.span(f"{request.method} {request.url.path}", "api", root=True, method=request.method) as span:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method=request.method, route=route, status=status)
+            if span is not None:
+                span.set_attribute("route", route)
+                span.set_attribute("status_code", status)
+                if status >= 500:
+                    span.set_error(f"HTTP {status}")
+
+
+# Scheduler gauges are computed when metrics are scraped
+QUEUE_DEPTH.set_function(lambda: ticket_scheduler.get_load()["queued"])
+RUNNING_WORKFLOWS.set_function(lambda: ticket_scheduler.get_load()["running"])
+
+
+# Health monitoring: services probed in the background and answered from memory
+health_monitor.register("bedrock", check_bedrock, bedrock_downstream)
+health_monitor.register("dynamodb", db_manager.check_table, dynamodb_downstream)
+
+
+# Application lifecycle
+
+@app.on_event("startup")
+async def start_background_tasks() -> None:
+    """Start background maintenance tasks."""
+    upload_storage.start_background_gc()
+    bucket_inventory.start_background_refresh()
+    health_monitor.start_background_probing()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks() -> None:
+    """Stop background maintenance tasks."""
+    await upload_storage.stop_background_gc()
+    await bucket_inventory.stop_background_refresh()
+    await health_monitor.stop_background_probing()
+    await asyncio.to_thread(tracer.exporter.close)
+    stop_logging()
+
+
 # Pydantic Models
 
 class TicketCreate(BaseModel):
@@ -81,10 +146,13 @@ class TicketResponse(BaseModel):
     description: str = Field(..., description="Detailed description of the issue")
     severity: str = Field(..., description="Severity level")
     category: str = Field(..., description="Category")
-    status: str = Field(..., description="Current status: pending, processing, resolved")
+    status: str = Field(..., description="Current status: pending, queued, processing, resolved")
     created_at: str = Field(..., description="ISO 8601 timestamp of creation")
     updated_at: str = Field(..., description="ISO 8601 timestamp of last update")
     resolution: Optional[str] = Field(None, description="Resolution summary if resolved")
+    usage: Optional[Dict[str, Any]] = Field(None, description="Bedrock tokens, latency, retries and cost if processed")
+    queue_position: Optional[int] = Field(None, description="Position in the workflow queue if queued")
+    estimated_start_time: Optional[str] = Field(None, description="ISO 8601 projected workflow start if queued")
     
     model_config = ConfigDict(
         json_schema_extra = {
@@ -108,168 +176,60 @@ class TicketResponse(BaseModel):
 @app.get("/health")
 async def health_check() -> Dict[str, Any]:
     """
-    Health check endpoint that verifies AWS service availability.
+    Health check endpoint reporting AWS service availability.
     
     Checks:
     - AWS Bedrock availability (Claude 3.5 Sonnet model)
     - DynamoDB table accessibility (HauntedHelpdeskTickets)
     
+    Statuses are answered from memory: a background prober refreshes them with
+    control-plane calls, and recent real traffic or an open circuit breaker stands in
+    for a probe (see health).
+    
     Returns:
-        JSON object with overall status and individual service statuses
+        JSON object with overall status, individual service statuses and circuit breaker states
     """
-    health_status = {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "services": {}
+    health_status = health_monitor.get_health()
+    health_status["circuit_breakers"] = {
+        name: status["state"] for name, status in get_resilience_status()["downstreams"].items()
     }
-    
-    # Check AWS Bedrock availability
-    bedrock_status = await _check_bedrock_availability()
-    health_status["services"]["bedrock"] = bedrock_status
-    
-    # Check DynamoDB table accessibility
-    dynamodb_status = await _check_dynamodb_accessibility()
-    health_status["services"]["dynamodb"] = dynamodb_status
-    
-    # Determine overall health status
-    if not bedrock_status["available"] or not dynamodb_status["available"]:
-        health_status["status"] = "degraded"
-    
     return health_status
 
 
-async def _check_bedrock_availability() -> Dict[str, Any]:
+@app.get("/health/live")
+async def liveness_check() -> Dict[str, Any]:
     """
-    Check if AWS Bedrock service is available and accessible.
+    Liveness probe: the process is up and serving requests.
     
     Returns:
-        Dictionary with availability status and details
+        JSON object with status "alive", uptime and whether the background prober runs
     """
-    try:
-        bedrock_client = boto3.client('bedrock-runtime')
-        
-        # The model ID we're using for Haunted Helpdesk
-        model_id = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
-        
-        # Try a minimal invocation to verify access
-        # We use a very short prompt to minimize cost and latency
-        response = bedrock_client.invoke_model(
-            modelId=model_id,
-            body='{"anthropic_version":"bedrock-2023-05-31","max_tokens":1,"messages":[{"role":"user","content":"test"}]}'
-        )
-        
-        return {
-            "available": True,
-            "status": "operational",
-            "model": model_id,
-            "message": "AWS Bedrock is accessible"
-        }
-        
-    except NoCredentialsError:
-        return {
-            "available": False,
-            "status": "error",
-            "message": "AWS credentials not found or expired. Please refresh your credentials."
-        }
-    except ClientError as e:
-        error_code = e.response['Error']['Code']
-        
-        if error_code in ['ExpiredToken', 'ExpiredTokenException']:
-            return {
-                "available": False,
-                "status": "error",
-                "message": "AWS credentials have expired. Please refresh your credentials."
-            }
-        elif error_code == 'AccessDeniedException':
-            return {
-                "available": False,
-                "status": "error",
-                "message": "Access denied to AWS Bedrock. Please check IAM permissions."
-            }
-        elif error_code == 'ResourceNotFoundException':
-            return {
-                "available": False,
-                "status": "error",
-                "message": "Bedrock model not found. Please verify model access in your region."
-            }
-        else:
-            return {
-                "available": False,
-                "status": "error",
-                "message": f"AWS Bedrock error: {error_code}"
-            }
-    except Exception as e:
-        return {
-            "available": False,
-            "status": "error",
-            "message": f"Unexpected error checking Bedrock: {str(e)}"
-        }
+    return health_monitor.liveness()
 
 
-async def _check_dynamodb_accessibility() -> Dict[str, Any]:
+@app.get("/health/ready")
+async def readiness_check() -> JSONResponse:
     """
-    Check if DynamoDB table is accessible.
+    Readiness probe: every required AWS service was recently seen healthy.
     
     Returns:
-        Dictionary with availability status and details
+        JSON object with readiness and per-service status; 503 while not ready
     """
-    try:
-        # Try to describe the table to verify it exists and is accessible
-        dynamodb_client = boto3.client('dynamodb')
-        response = dynamodb_client.describe_table(TableName=db_manager.table_name)
-        
-        table_status = response['Table']['TableStatus']
-        
-        return {
-            "available": table_status == 'ACTIVE',
-            "status": table_status.lower(),
-            "table_name": db_manager.table_name,
-            "message": f"DynamoDB table is {table_status}"
-        }
-        
-    except NoCredentialsError:
-        return {
-            "available": False,
-            "status": "error",
-            "message": "AWS credentials not found or expired. Please refresh your credentials."
-        }
-    except ClientError as e:
-        error_code = e.response['Error']['Code']
-        
-        if error_code in ['ExpiredToken', 'ExpiredTokenException']:
-            return {
-                "available": False,
-                "status": "error",
-                "message": "AWS credentials have expired. Please refresh your credentials."
-            }
-        elif error_code == 'ResourceNotFoundException':
-            return {
-                "available": False,
-                "status": "error",
-                "message": f"DynamoDB table '{db_manager.table_name}' not found. Please create the table."
-            }
-        elif error_code == 'AccessDeniedException':
-            return {
-                "available": False,
-                "status": "error",
-                "message": "Access denied to DynamoDB. Please check IAM permissions."
-            }
-        else:
-            return {
-                "available": False,
-                "status": "error",
-                "message": f"DynamoDB error: {error_code}"
-            }
-    except Exception as e:
-        return {
-            "available": False,
-            "status": "error",
-            "message": f"Unexpected error checking DynamoDB: {str(e)}"
-        }
+    readiness = health_monitor.readiness()
+    return JSONResponse(content=readiness, status_code=200 if readiness["ready"] else 503)
 
 
 # Ticket CRUD Endpoints
 
+def _downstream_error(error: DownstreamUnavailable) -> HTTPException:
+    """429/503 response for a call turned away by a downstream's rate limiter or circuit breaker."""
+    return HTTPException(
+        status_code=error.status_code,
+        detail=f"{str(error)}. Please retry later.",
+        headers={"Retry-After": str(max(1, int(round(error.retry_after))))}
+    )
+
+
 @app.post("/api/tickets", response_model=TicketResponse, status_code=201)
 async def create_ticket(ticket: TicketCreate) -> TicketResponse:
     """
@@ -290,6 +250,7 @@ async def create_ticket(ticket: TicketCreate) -> TicketResponse:
     try:
         # Generate unique ticket ID
         ticket_id = str(uuid.uuid4())
+        tracer.bind_trace(ticket_id)
         
         # Prepare ticket data
         ticket_data = {
@@ -305,7 +266,7 @@ async def create_ticket(ticket: TicketCreate) -> TicketResponse:
         }
         
         # Create ticket in DynamoDB
-        created_ticket = db_manager.create_ticket(ticket_data)
+        created_ticket = await asyncio.to_thread(db_manager.create_ticket, ticket_data)
         
         return TicketResponse(**created_ticket)
         
@@ -328,6 +289,8 @@ async def create_ticket(ticket: TicketCreate) -> TicketResponse:
                 status_code=500,
                 detail=f"Failed to create ticket: {error_message}"
             )
+    except DownstreamUnavailable as e:
+        raise _downstream_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -335,6 +298,26 @@ async def create_ticket(ticket: TicketCreate) -> TicketResponse:
         )
 
 
+def _with_queue_status(ticket: Dict[str, Any], queue_status: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Add the scheduler's queue position and estimated start time to a queued ticket.
+    
+    Args:
+        ticket: Ticket record from DynamoDB
+        queue_status: Scheduler status of all tickets (looked up when not given)
+    
+    Returns:
+        The ticket, with queue_position and estimated_start_time while it waits for a workflow slot
+    """
+    if queue_status is None:
+        queue_status = ticket_scheduler.get_queue_status()
+    scheduled = queue_status.get(ticket["ticket_id"])
+    if scheduled is None or scheduled["state"] != "queued":
+        return ticket
+    return dict(ticket, queue_position=scheduled["queue_position"],
+                estimated_start_time=scheduled["estimated_start_time"])
+
+
 @app.get("/api/tickets", response_model=list[TicketResponse])
 async def list_tickets() -> list[TicketResponse]:
     """
@@ -350,10 +333,11 @@ async def list_tickets() -> list[TicketResponse]:
     
     try:
         # Retrieve all tickets from DynamoDB
-        tickets = db_manager.list_tickets()
+        tickets = await asyncio.to_thread(db_manager.list_tickets)
         
         # Convert to response models
-        return [TicketResponse(**ticket) for ticket in tickets]
+        queue_status = ticket_scheduler.get_queue_status()
+        return [TicketResponse(**_with_queue_status(ticket, queue_status)) for ticket in tickets]
         
     except ClientError as e:
         error_code = e.response['Error']['Code']
@@ -374,6 +358,8 @@ async def list_tickets() -> list[TicketResponse]:
                 status_code=500,
                 detail=f"Failed to list tickets: {error_message}"
             )
+    except DownstreamUnavailable as e:
+        raise _downstream_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -399,7 +385,7 @@ async def get_ticket(ticket_id: str) -> TicketResponse:
     
     try:
         # Retrieve ticket from DynamoDB
-        ticket = db_manager.get_ticket(ticket_id)
+        ticket = await asyncio.to_thread(db_manager.get_ticket, ticket_id)
         
         # Return 404 if ticket not found
         if ticket is None:
@@ -408,7 +394,7 @@ async def get_ticket(ticket_id: str) -> TicketResponse:
                 detail=f"Ticket with ID '{ticket_id}' not found"
             )
         
-        return TicketResponse(**ticket)
+        return TicketResponse(**_with_queue_status(ticket))
         
     except HTTPException:
         # Re-raise HTTP exceptions (like 404)
@@ -432,6 +418,8 @@ async def get_ticket(ticket_id: str) -> TicketResponse:
                 status_code=500,
                 detail=f"Failed to get ticket: {error_message}"
             )
+    except DownstreamUnavailable as e:
+        raise _downstream_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -439,22 +427,254 @@ async def get_ticket(ticket_id: str) -> TicketResponse:
         )
 
 
+@app.get("/api/tickets/{ticket_id}/events")
+async def stream_ticket_events(ticket_id: str) -> StreamingResponse:
+    """
+    Stream a ticket's workflow progress as Server-Sent Events.
+    
+    Events already published for the current run are replayed first, followed by
+    live events: workflow_started, agent_started, agent_output (streamed model
+    text), agent_completed, routing, and finally workflow_completed or
+    workflow_failed, after which the stream ends. Tickets that already finished
+    without retained events get a single event with their current status.
+    
+    Args:
+        ticket_id: Unique identifier of the ticket
+        
+    Returns:
+        text/event-stream response
+        
+    Raises:
+        HTTPException: If ticket not found (404) or DynamoDB is unavailable (429/503)
+    """
+    try:
+        ticket = await asyncio.to_thread(db_manager.get_ticket, ticket_id)
+    except DownstreamUnavailable as e:
+        raise _downstream_error(e)
+    if ticket is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Ticket with ID '{ticket_id}' not found"
+        )
+    
+    async def event_source():
+        status = ticket.get("status")
+        if not ticket_events.history(ticket_id) and status in ("resolved", "error"):
+            event = "workflow_completed" if status == "resolved" else "workflow_failed"
+            yield format_sse({"id": 0, "event": event, "data": {"status": status, "resolution": ticket.get("resolution")}})
+            return
+        async for event in ticket_events.subscribe(ticket_id):
+            yield format_sse(event) if event is not None else ": keepalive\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/tickets/{ticket_id}/checkpoints")
+async def get_ticket_checkpoints(ticket_id: str) -> Dict[str, Any]:
+    """
+    Report the checkpointed steps of a ticket's unfinished workflow.
+    
+    Reprocessing the ticket resumes after these steps.
+    
+    Args:
+        ticket_id: Unique identifier of the ticket
+        
+    Returns:
+        Dictionary with the completed step keys, their agents in execution order
+        and the time of the latest checkpoint
+    """
+    return await asyncio.to_thread(workflow_checkpoints.get_status, ticket_id)
+
+
+@app.get("/api/tickets/{ticket_id}/trace")
+async def get_ticket_trace(ticket_id: str) -> Dict[str, Any]:
+    """
+    Return a ticket's workflow trace as a waterfall.
+    
+    Args:
+        ticket_id: Unique identifier of the ticket (the trace id)
+        
+    Returns:
+        Dictionary with the trace start and duration, total time per span kind and
+        every span (API request, queue wait, image analysis, workflow, agent turns,
+        model, tool and DynamoDB calls) with its offset, duration and depth
+        
+    Raises:
+        HTTPException: If no spans were recorded for the ticket
+    """
+    # Older traces are read back from the span file
+    trace = await asyncio.to_thread(tracer.get_trace, ticket_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"No trace recorded for ticket '{ticket_id}'")
+    return trace
+
+
 # Ticket Processing Endpoint
 
+async def _record_resolution(ticket_id: str, workflow_result: Dict[str, Any]) -> None:
+    """
+    Mark a ticket resolved with the summary, token usage and cache replays of a completed workflow,
+    then tell event stream clients the workflow is done.
+    
+    Args:
+        ticket_id: Unique identifier of the ticket
+        workflow_result: Result returned by the workflow router
+    """
+    resolution = workflow_result.get("summary") or workflow_result.get("final_response")
+    await asyncio.to_thread(db_manager.update_ticket, ticket_id, {
+        "status": "resolved",
+        "updated_at": datetime.utcnow().isoformat(),
+        "resolution": resolution,
+        "usage": workflow_result.get("usage", {}).get("total", {}),
+        "cached_steps": workflow_result.get("cached_steps", [])
+    })
+    ticket_events.publish(ticket_id, "workflow_completed", {
+        "status": "resolved",
+        "resolution": resolution,
+        "handoff_sequence": workflow_result.get("handoff_sequence", []),
+        "execution_time": workflow_result.get("execution_time")
+    })
+
+
+def _swarm_timeout_policy(ticket: Dict[str, Any]) -> TimeoutPolicy:
+    """Choose the swarm's handoff limits and timeouts for a ticket from past runs of its category."""
+    if not TIMEOUT_POLICY_ENABLED:
+        return TimeoutPolicy(category=ticket.get("category", "unknown"))
+    return timeout_policy.policy_for(ticket.get("category"))
+
+
+def _schedule_workflow(
+    ticket: Dict[str, Any],
+    workflow: Callable[[], Awaitable[Any]],
+    registered: Optional[Awaitable[Any]] = None
+) -> asyncio.Future:
+    """
+    Queue a ticket's workflow behind the scheduler; the ticket is marked processing once it starts.
+    
+    Callers check admission and call this without awaiting in between, so the check holds.
+    Writing the ticket's queued status therefore runs concurrently (registered) and the
+    workflow waits for it, so the processing status can't be overwritten by it.
+    
+    Args:
+        ticket: Ticket record from DynamoDB
+        workflow: Coroutine function running the workflow
+        registered: Pending write of the queued ticket, awaited before the workflow starts
+    
+    Returns:
+        Future resolving to the workflow's result
+    
+    Raises:
+        TicketAlreadyScheduled: If the ticket's workflow is already queued or running
+        SchedulerFull: If the ticket queue is full and the ticket is not critical
+    """
+    ticket_id = ticket["ticket_id"]
+    # The workflow task is started by the scheduler, so the request's span is handed over explicitly
+    request_span = tracer.current_span()
+    queued_at = time.time()
+    
+    async def start() -> Any:
+        tracer.record_span("scheduler.queue", "queue", queued_at, time.time(), parent=request_span,
+                           trace_id=ticket_id, severity=ticket.get("severity"))
+        if registered is not None:
+            await registered
+        with tracer.span("workflow", "workflow", parent=request_span, trace_id=ticket_id,
+                         mode=WORKFLOW_MODE, category=ticket.get("category")) as span:
+            await asyncio.to_thread(db_manager.update_ticket, ticket_id, {
+                "status": "processing",
+                "updated_at": datetime.utcnow().isoformat()
+            })
+            started = time.perf_counter()
+            result = None
+            try:
+                result = await workflow()
+                return result
+            finally:
+                outcome, handoff_sequence = _workflow_outcome(result)
+                observe_workflow(WORKFLOW_MODE, ticket.get("category", "unknown"), outcome,
+                                 time.perf_counter() - started, handoff_sequence)
+                if span is not None:
+                    span.set_attribute("outcome", outcome)
+                    if outcome not in ("completed", "success"):
+                        span.set_error(outcome)
+    
+    return ticket_scheduler.submit(ticket_id, ticket.get("severity"), ticket.get("category"), start)
+
+
+def _workflow_outcome(result: Any) -> tuple:
+    """
+    Outcome and handoff sequence of a workflow run for metrics.
+    
+    Args:
+        result: Router result dict, (SwarmResult, execution_time) tuple, SwarmResult,
+            or None if the workflow raised
+    
+    Returns:
+        Tuple of (outcome, handoff sequence or None)
+    """
+    if result is None:
+        return "error", None
+    if isinstance(result, dict):
+        return result.get("status", "completed"), result.get("handoff_sequence")
+    if isinstance(result, tuple):
+        result = result[0]
+    status = getattr(result, "status", "completed")
+    outcome = str(getattr(status, "value", status)).lower()
+    handoff_sequence = [node.node_id for node in getattr(result, "node_history", []) if hasattr(node, "node_id")]
+    return outcome, handoff_sequence or None
+
+
+def _admit(severity: Optional[str], ticket_id: Optional[str] = None) -> None:
+    """
+    Refuse a ticket before creating or updating it if the scheduler would not take it.
+    
+    Raises:
+        TicketAlreadyScheduled: If the ticket's workflow is already queued or running
+        SchedulerFull: If the ticket queue is full and the ticket is not critical
+    """
+    try:
+        ticket_scheduler.check_admission(severity, ticket_id)
+    except (SchedulerFull, TicketAlreadyScheduled) as e:
+        ticket_scheduler.record_rejection(e)
+        raise
+
+
+def _already_scheduled_error(error: TicketAlreadyScheduled) -> HTTPException:
+    """409 response for a ticket whose workflow is already queued or running."""
+    return HTTPException(status_code=409, detail=str(error))
+
+
+def _queue_full_error(error: SchedulerFull) -> HTTPException:
+    """503 response for a ticket rejected by admission control."""
+    return HTTPException(
+        status_code=503,
+        detail=f"Helpdesk is at capacity: {str(error)}. Please retry later.",
+        headers={"Retry-After": str(int(ticket_scheduler.service_seconds))}
+    )
+
+
 @app.post("/api/process-ticket/{ticket_id}")
-async def process_ticket(ticket_id: str) -> Dict[str, Any]:
+async def process_ticket(ticket_id: str, resume: bool = True) -> Dict[str, Any]:
     """
     Process a ticket through the Haunted Helpdesk multi-agent workflow.
     
     This endpoint initiates the complete workflow sequence:
     1. Retrieves the ticket from DynamoDB
-    2. Updates ticket status to "processing"
-    3. Initializes the Haunted Helpdesk swarm
-    4. Executes the swarm with the ticket content
+    2. Queues the workflow by severity (status "queued", then "processing" once
+       a workflow slot is free); returns 503 when the queue is full
+       and 409 when the ticket is already queued or running
+    3. Runs the workflow: the deterministic router by default, or the
+       LLM-orchestrated swarm when WORKFLOW_MODE=swarm. In router mode a ticket
+       whose previous run failed resumes from its last checkpointed step
+    4. Marks the ticket resolved with the summary (router mode)
     5. Returns the workflow result with handoff sequence and final response
     
     Args:
         ticket_id: Unique identifier of the ticket to process
+        resume: Reuse the checkpointed steps of a failed run (false starts over)
         
     Returns:
         Dictionary containing:
@@ -466,17 +686,22 @@ async def process_ticket(ticket_id: str) -> Dict[str, Any]:
             - conversation_history: All messages exchanged
             - execution_time: Time taken in seconds
             - terminated_by: Agent that terminated the workflow
+            - routing: How the worker agent was chosen (router mode)
+            - resumed_steps: Steps reused from checkpoints (router mode)
+            - timeout_policy: Handoff limits and timeouts chosen for the ticket
         
     Raises:
-        HTTPException: If ticket not found or processing fails
+        HTTPException: If ticket not found (404), already queued or running (409), the queue is full (503)
+            or processing fails
     """
     from fastapi import HTTPException
     import json
     import time
     
+    tracer.bind_trace(ticket_id)
     try:
         # Step 1: Retrieve ticket from DynamoDB
-        ticket = db_manager.get_ticket(ticket_id)
+        ticket = await asyncio.to_thread(db_manager.get_ticket, ticket_id)
         
         # Return 404 if ticket not found
         if ticket is None:
@@ -485,63 +710,59 @@ async def process_ticket(ticket_id: str) -> Dict[str, Any]:
                 detail=f"Ticket with ID '{ticket_id}' not found"
             )
         
-        # Step 2: Update ticket status to "processing"
+        # Step 2: Admit the ticket and mark it queued until a workflow slot is free
+        # (nothing awaits from the admission check to queueing)
+        _admit(ticket.get("severity"), ticket_id)
         update_data = {
-            "status": "processing",
+            "status": "queued",
             "updated_at": datetime.utcnow().isoformat()
         }
-        db_manager.update_ticket(ticket_id, update_data)
+        queued = asyncio.ensure_future(asyncio.to_thread(db_manager.update_ticket, ticket_id, update_data))
+        ticket_events.publish(ticket_id, "workflow_started", {"mode": WORKFLOW_MODE})
+        
+        # Step 3: Route the ticket deterministically unless the LLM swarm is configured
+        if WORKFLOW_MODE == "router":
+            logger.info(f"Workflow queued: ticket_id={ticket_id}, mode=router")
+            workflow_result = await _schedule_workflow(ticket, lambda: run_routed_workflow(ticket, resume=resume),
+                                                       registered=queued)
+            logger.info(
+                f"Workflow completed: ticket_id={ticket_id}, execution_time={workflow_result['execution_time']:.2f}s, "
+                f"agent_invocations={workflow_result['agent_invocations']}"
+            )
+            await _record_resolution(ticket_id, workflow_result)
+            
+            return {
+                "ticket_id": ticket_id,
+                "status": "resolved",
+                "workflow_result": workflow_result
+            }
         
-        # Step 3: Initialize Haunted Helpdesk swarm
-        swarm = create_Haunted_Helpdesk_swarm()
+        policy = await asyncio.to_thread(_swarm_timeout_policy, ticket)
+        swarm = create_Haunted_Helpdesk_swarm(policy)
         
         # Prepare ticket content for workflow
-        ticket_content = f"""
-Ticket ID: {ticket['ticket_id']}
-Title: {ticket['title']}
-Description: {ticket['description']}
-Severity: {ticket['severity']}
-Category: {ticket['category']}
-Created: {ticket['created_at']}
-"""
+        ticket_content = format_ticket_content(ticket)
         
-        # Step 4: Execute swarm with ticket content
+        # Step 4: Execute swarm with ticket content once the scheduler starts it
         # The swarm starts with the orchestrator agent by default
-        start_time = time.time()
-        
-        # Log workflow start
-        logger.info(f"Workflow started: ticket_id={ticket_id}, entry_agent=orchestrator_agent")
-        
-        # Retry logic for AWS Bedrock intermittent errors
-        max_retries = 2
-        last_error = None
+        async def run_swarm():
+            start_time = time.time()
+            logger.info(
+                f"Workflow started: ticket_id={ticket_id}, entry_agent=orchestrator_agent, "
+                f"execution_timeout={policy.execution_timeout}s, max_handoffs={policy.max_handoffs} ({policy.source})"
+            )
+            # Transient Bedrock errors are retried per model call by each agent's retry strategy
+            with tracer.span("swarm", "workflow", execution_timeout=policy.execution_timeout,
+                             max_handoffs=policy.max_handoffs):
+                swarm_result = await swarm.invoke_async(task=ticket_content)
+            return swarm_result, time.time() - start_time
         
-        for attempt in range(max_retries):
-            try:
-                result = await swarm.invoke_async(task=ticket_content)
-                execution_time = time.time() - start_time
-                
-                # Log workflow completion
-                logger.info(f"Workflow completed: ticket_id={ticket_id}, execution_time={execution_time:.2f}s, attempt={attempt+1}")
-                break
-            except Exception as e:
-                last_error = e
-                error_str = str(e).lower()
-                
-                # Check if it's a retryable AWS error
-                if "modelstreamerror" in error_str or "unexpected error" in error_str:
-                    if attempt < max_retries - 1:
-                        logger.warning(f"AWS Bedrock error on attempt {attempt+1}, retrying: {str(e)}")
-                        continue
-                    else:
-                        logger.error(f"AWS Bedrock error after {max_retries} attempts: {str(e)}")
-                        raise
-                else:
-                    # Non-retryable error, raise immediately
-                    raise
+        result, execution_time = await _schedule_workflow(ticket, run_swarm, registered=queued)
         
-        if last_error and attempt == max_retries - 1:
-            raise last_error
+        # Log workflow completion
+        logger.info(f"Workflow completed: ticket_id={ticket_id}, execution_time={execution_time:.2f}s")
+        if TIMEOUT_POLICY_ENABLED:
+            await asyncio.to_thread(timeout_policy.record_swarm_result, ticket.get("category"), result, execution_time)
         
         # Step 5: Serialize swarm result to JSON
         # Extract handoff sequence from the result
@@ -572,7 +793,8 @@ Created: {ticket['created_at']}
             "handoff_sequence": handoff_sequence,
             "execution_time": execution_time,
             "status": "completed",
-            "summary": summary  # Add summary as separate field
+            "summary": summary,  # Add summary as separate field
+            "timeout_policy": policy.to_dict()
         }
         
         # Add conversation history if available
@@ -590,6 +812,13 @@ Created: {ticket['created_at']}
         if hasattr(result, 'terminated_by'):
             workflow_result["terminated_by"] = result.terminated_by
         
+        ticket_events.publish(ticket_id, "workflow_completed", {
+            "status": "processing",
+            "resolution": summary,
+            "handoff_sequence": handoff_sequence,
+            "execution_time": execution_time
+        })
+        
         # Return workflow result
         return {
             "ticket_id": ticket_id,
@@ -600,9 +829,14 @@ Created: {ticket['created_at']}
     except HTTPException:
         # Re-raise HTTP exceptions (like 404)
         raise
+    except SchedulerFull as e:
+        raise _queue_full_error(e)
+    except TicketAlreadyScheduled as e:
+        raise _already_scheduled_error(e)
     except ClientError as e:
         error_code = e.response['Error']['Code']
         error_message = e.response['Error']['Message']
+        ticket_events.publish(ticket_id, "workflow_failed", {"status": "error", "error": error_message})
         
         if error_code in ['ExpiredToken', 'ExpiredTokenException']:
             raise HTTPException(
@@ -619,10 +853,19 @@ Created: {ticket['created_at']}
                 status_code=500,
                 detail=f"AWS error during ticket processing: {error_message}"
             )
+    except DownstreamUnavailable as e:
+        logger.warning(f"Ticket {ticket_id} not processed: {str(e)}")
+        try:
+            await asyncio.to_thread(db_manager.update_ticket, ticket_id, {
+                "status": "error",
+                "updated_at": datetime.utcnow().isoformat(),
+                "resolution": f"Service temporarily unavailable: {str(e)}"
+            })
+        except Exception:
+            pass  # The ticket table may be the downstream that is unavailable
+        ticket_events.publish(ticket_id, "workflow_failed", {"status": "error", "error": str(e)})
+        raise _downstream_error(e)
     except Exception as e:
-        # Log the error for debugging
-        import traceback
-        error_trace = traceback.format_exc()
         error_message = str(e)
         
         # Check for specific error types
@@ -638,7 +881,7 @@ Created: {ticket['created_at']}
         elif is_timeout:
             logger.error(f"Workflow timeout: ticket_id={ticket_id}, error={error_message}")
         else:
-            logger.error(f"Error processing ticket {ticket_id}: {error_trace}")
+            logger.error(f"Error processing ticket {ticket_id}: {error_message}", exc_info=True)
         
         # Try to update ticket status to indicate error
         try:
@@ -655,13 +898,14 @@ Created: {ticket['created_at']}
                 "updated_at": datetime.utcnow().isoformat(),
                 "resolution": error_resolution
             }
-            db_manager.update_ticket(ticket_id, error_update)
+            await asyncio.to_thread(db_manager.update_ticket, ticket_id, error_update)
         except:
             pass  # If we can't update, at least return the error
+        ticket_events.publish(ticket_id, "workflow_failed", {"status": "error", "error": error_message})
         
         raise HTTPException(
             status_code=500,
-            detail=f"Unexpected error processing ticket: {error_message}\n\nTraceback:\n{error_trace}"
+            detail=f"Unexpected error processing ticket: {error_message}"
         )
 
 
@@ -669,7 +913,6 @@ Created: {ticket['created_at']}
 
 @app.post("/api/submit-ticket")
 async def submit_ticket(
-    background_tasks: BackgroundTasks,
     title: str = Form(..., description="Brief title of the issue"),
     description: str = Form(..., description="Detailed description of the issue"),
     severity: str = Form(..., description="Severity level: low, medium, high, critical"),
@@ -682,14 +925,13 @@ async def submit_ticket(
     This endpoint:
     1. Accepts form fields (title, description, severity, category)
     2. Accepts file uploads (error screenshots)
-    3. Saves uploaded files to backend/uploads/ directory
+    3. Saves uploaded files through upload storage and links them to the ticket
     4. Processes multimodal input combining text and images
     5. Creates ticket with combined content
-    6. Initiates workflow processing in background task
-    7. Returns ticket_id and processing status
+    6. Queues workflow processing by severity (see ticket_scheduler)
+    7. Returns ticket_id, status and queue position
     
     Args:
-        background_tasks: FastAPI background tasks for async processing
         title: Brief title of the issue
         description: Detailed description of the issue
         severity: Severity level (low, medium, high, critical)
@@ -699,11 +941,13 @@ async def submit_ticket(
     Returns:
         Dictionary containing:
         - ticket_id: Unique identifier for the created ticket
-        - status: Current ticket status (processing)
+        - status: Current ticket status (queued or processing)
         - message: Confirmation message
+        - queue_position: Position in the workflow queue (None if processing started)
+        - estimated_start_time: ISO 8601 projected workflow start (None if processing started)
         
     Raises:
-        HTTPException: If validation fails or ticket creation fails
+        HTTPException: If validation fails, the queue is full (503) or ticket creation fails
     """
     try:
         # Validate that title and description are not empty or whitespace-only
@@ -719,12 +963,15 @@ async def submit_ticket(
                 detail="Ticket description cannot be empty"
             )
         
-        # Ensure uploads directory exists
-        upload_dir = "backend/uploads"
-        os.makedirs(upload_dir, exist_ok=True)
+        # Refuse early when the workflow queue is full, before uploads and image analysis
+        _admit(severity)
+        
+        # Generate unique ticket ID up front so uploads can reference it
+        ticket_id = str(uuid.uuid4())
+        tracer.bind_trace(ticket_id)
         
         # Process uploaded files
-        saved_file_paths = []
+        saved_uploads = []
         
         if files and len(files) > 0:
             for file in files:
@@ -733,10 +980,7 @@ async def submit_ticket(
                     continue
                 
                 try:
-                    # Generate unique filename to avoid collisions
                     file_extension = os.path.splitext(file.filename)[1]
-                    unique_filename = f"{uuid.uuid4()}{file_extension}"
-                    file_path = os.path.join(upload_dir, unique_filename)
                     
                     # Check file size (limit to 10MB as per design doc)
                     file.file.seek(0, 2)  # Seek to end
@@ -760,11 +1004,9 @@ async def submit_ticket(
                             detail=f"Unsupported file type '{file_extension}'. Supported types: {', '.join(allowed_extensions)}"
                         )
                     
-                    # Save file to uploads directory
-                    with open(file_path, "wb") as buffer:
-                        shutil.copyfileobj(file.file, buffer)
-                    
-                    saved_file_paths.append(file_path)
+                    # Save file through upload storage (unique key, not yet referenced by a ticket);
+                    # the S3 backend uploads and may wait for a rate limiter token, so keep it off the loop
+                    saved_uploads.append(await asyncio.to_thread(upload_storage.save_upload, file.file, file.filename))
                     
                 except HTTPException:
                     # Re-raise HTTP exceptions
@@ -776,19 +1018,25 @@ async def submit_ticket(
                         detail=f"Failed to save file '{file.filename}': {str(e)}"
                     )
         
+        saved_file_paths = [upload["path"] for upload in saved_uploads]
+        
+        # Track Bedrock usage of this ticket from image analysis onwards
+        usage = UsageLedger(ticket_id, category)
+        
         # Process multimodal input combining text and images
         try:
             combined_content = process_multimodal_input(
                 text_description=description,
-                image_paths=saved_file_paths if saved_file_paths else None
+                image_paths=saved_file_paths if saved_file_paths else None,
+                usage=usage
             )
         except Exception as e:
             # If multimodal processing fails, fall back to text-only
-            print(f"Warning: Multimodal processing failed: {str(e)}")
+            logger.warning(f"Multimodal processing failed, using text only: {str(e)}")
             combined_content = description
         
-        # Generate unique ticket ID
-        ticket_id = str(uuid.uuid4())
+        # Admission may have changed while files were processed; nothing awaits from here to queueing
+        _admit(severity)
         
         # Prepare ticket data with combined content
         ticket_data = {
@@ -797,33 +1045,45 @@ async def submit_ticket(
             "description": combined_content,
             "severity": severity,
             "category": category,
-            "status": "processing",  # Start as processing since we'll initiate workflow
+            "status": "queued",  # Processing starts when the scheduler frees a workflow slot
             "created_at": datetime.utcnow().isoformat(),
             "updated_at": datetime.utcnow().isoformat(),
             "resolution": None
         }
         
-        # Create ticket in DynamoDB
-        created_ticket = db_manager.create_ticket(ticket_data)
-        
-        # Initiate workflow processing in background task
-        background_tasks.add_task(
-            process_ticket_workflow,
+        # Create ticket in DynamoDB and queue workflow processing; it runs in the background
+        # once a slot is free and the ticket is written
+        created = asyncio.ensure_future(asyncio.to_thread(db_manager.create_ticket, ticket_data))
+        _schedule_workflow(ticket_data, lambda: process_ticket_workflow(
             ticket_id=ticket_id,
-            ticket_content=combined_content
-        )
+            ticket_content=combined_content,
+            usage=usage
+        ), registered=created)
+        await created
         
-        # Return ticket_id and processing status
+        # Uploads stay orphaned (and are garbage-collected) unless the ticket was created
+        for upload in saved_uploads:
+            await asyncio.to_thread(upload_storage.attach_to_ticket, upload["key"], ticket_id)
+        
+        scheduled = ticket_scheduler.get_ticket_status(ticket_id) or {}
+        queued = scheduled.get("state") == "queued"
+        
+        # Return ticket_id, processing status and queue position
         return {
             "ticket_id": ticket_id,
-            "status": "processing",
-            "message": "Ticket submitted successfully and processing has been initiated",
-            "files_processed": len(saved_file_paths)
+            "status": "queued" if queued else "processing",
+            "message": "Ticket submitted successfully and queued for processing" if queued
+                       else "Ticket submitted successfully and processing has been initiated",
+            "files_processed": len(saved_file_paths),
+            "queue_position": scheduled.get("queue_position"),
+            "estimated_start_time": scheduled.get("estimated_start_time") if queued else None
         }
         
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
+    except SchedulerFull as e:
+        raise _queue_full_error(e)
     except ClientError as e:
         error_code = e.response['Error']['Code']
         error_message = e.response['Error']['Message']
@@ -843,11 +1103,11 @@ async def submit_ticket(
                 status_code=500,
                 detail=f"AWS error during ticket submission: {error_message}"
             )
+    except DownstreamUnavailable as e:
+        raise _downstream_error(e)
     except Exception as e:
         # Log unexpected errors
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"Error submitting ticket: {error_trace}")
+        logger.error(f"Error submitting ticket: {str(e)}", exc_info=True)
         
         raise HTTPException(
             status_code=500,
@@ -855,7 +1115,7 @@ async def submit_ticket(
         )
 
 
-async def process_ticket_workflow(ticket_id: str, ticket_content: str):
+async def process_ticket_workflow(ticket_id: str, ticket_content: str, usage: Optional[UsageLedger] = None):
     """
     Background task to process ticket through Haunted Helpdesk workflow.
     
@@ -865,27 +1125,37 @@ async def process_ticket_workflow(ticket_id: str, ticket_content: str):
     Args:
         ticket_id: Unique identifier of the ticket
         ticket_content: Combined ticket content (text + image analysis)
+        usage: Usage ledger already holding the ticket's image analysis calls
+    
+    Returns:
+        The workflow result, or a dict with status "error" if the workflow failed
+        (errors are recorded on the ticket rather than raised)
     """
-    import time
     
     try:
-        # Initialize Haunted Helpdesk swarm
-        swarm = create_Haunted_Helpdesk_swarm()
-        
         # Prepare ticket content for workflow
-        ticket = db_manager.get_ticket(ticket_id)
+        ticket = await asyncio.to_thread(db_manager.get_ticket, ticket_id)
         if not ticket:
-            print(f"Error: Ticket {ticket_id} not found for background processing")
+            logger.error(f"Ticket {ticket_id} not found for background processing")
             return
+        ticket_events.publish(ticket_id, "workflow_started", {"mode": WORKFLOW_MODE})
+        
+        if WORKFLOW_MODE == "router":
+            logger.info(f"Background workflow started: ticket_id={ticket_id}, mode=router")
+            workflow_result = await run_routed_workflow(ticket, description=ticket_content, usage=usage)
+            logger.info(
+                f"Background workflow completed: ticket_id={ticket_id}, "
+                f"execution_time={workflow_result['execution_time']:.2f}s, "
+                f"agent_invocations={workflow_result['agent_invocations']}"
+            )
+            await _record_resolution(ticket_id, workflow_result)
+            return workflow_result
         
-        formatted_content = f"""
-Ticket ID: {ticket['ticket_id']}
-Title: {ticket['title']}
-Description: {ticket_content}
-Severity: {ticket['severity']}
-Category: {ticket['category']}
-Created: {ticket['created_at']}
-"""
+        # Initialize Haunted Helpdesk swarm with the ticket's limits
+        policy = await asyncio.to_thread(_swarm_timeout_policy, ticket)
+        swarm = create_Haunted_Helpdesk_swarm(policy)
+        
+        formatted_content = format_ticket_content(ticket, description=ticket_content)
         
         # Execute swarm with ticket content
         start_time = time.time()
@@ -893,49 +1163,32 @@ Created: {ticket['created_at']}
         # Log workflow start
         logger.info(f"Background workflow started: ticket_id={ticket_id}, entry_agent=orchestrator_agent")
         
-        # Retry logic for AWS Bedrock intermittent errors
-        max_retries = 2
-        last_error = None
+        # Transient Bedrock errors are retried per model call by each agent's retry strategy
+        with tracer.span("swarm", "workflow", execution_timeout=policy.execution_timeout,
+                         max_handoffs=policy.max_handoffs):
+            result = swarm.execute(
+                initial_message=formatted_content,
+                starting_agent_name="orchestrator_agent"
+            )
         
-        for attempt in range(max_retries):
-            try:
-                result = swarm.execute(
-                    initial_message=formatted_content,
-                    starting_agent_name="orchestrator_agent"
-                )
-                
-                execution_time = time.time() - start_time
-                
-                # Log workflow completion
-                logger.info(f"Background workflow completed: ticket_id={ticket_id}, execution_time={execution_time:.2f}s, attempt={attempt+1}")
-                print(f"Ticket {ticket_id} workflow completed in {execution_time:.2f} seconds")
-                break
-            except Exception as e:
-                last_error = e
-                error_str = str(e).lower()
-                
-                # Check if it's a retryable AWS error
-                if "modelstreamerror" in error_str or "unexpected error" in error_str:
-                    if attempt < max_retries - 1:
-                        logger.warning(f"AWS Bedrock error on attempt {attempt+1}, retrying: {str(e)}")
-                        continue
-                    else:
-                        logger.error(f"AWS Bedrock error after {max_retries} attempts: {str(e)}")
-                        raise
-                else:
-                    # Non-retryable error, raise immediately
-                    raise
+        execution_time = time.time() - start_time
         
-        if last_error and attempt == max_retries - 1:
-            raise last_error
+        # Log workflow completion
+        logger.info(f"Background workflow completed: ticket_id={ticket_id}, execution_time={execution_time:.2f}s")
+        if TIMEOUT_POLICY_ENABLED:
+            await asyncio.to_thread(timeout_policy.record_swarm_result, ticket.get("category"), result, execution_time)
         
         # The workflow should update the ticket status through the Ticketing Agent
         # No need to manually update here as the agent handles it
+        ticket_events.publish(ticket_id, "workflow_completed", {
+            "status": "processing",
+            "execution_time": execution_time,
+            "timeout_policy": policy.to_dict()
+        })
+        return result
         
     except Exception as e:
         # Log error and update ticket status
-        import traceback
-        error_trace = traceback.format_exc()
         error_message = str(e)
         
         # Check for specific error types
@@ -951,9 +1204,7 @@ Created: {ticket['created_at']}
         elif is_timeout:
             logger.error(f"Background workflow timeout: ticket_id={ticket_id}, error={error_message}")
         else:
-            logger.error(f"Error processing ticket {ticket_id} in background: {error_trace}")
-        
-        print(f"Error processing ticket {ticket_id} in background: {error_trace}")
+            logger.error(f"Error processing ticket {ticket_id} in background: {error_message}", exc_info=True)
         
         try:
             # Update ticket to error status with specific error type
@@ -970,7 +1221,111 @@ Created: {ticket['created_at']}
                 "updated_at": datetime.utcnow().isoformat(),
                 "resolution": error_resolution
             }
-            db_manager.update_ticket(ticket_id, error_update)
+            await asyncio.to_thread(db_manager.update_ticket, ticket_id, error_update)
         except Exception as update_error:
             logger.error(f"Failed to update ticket status after error: {str(update_error)}")
-            print(f"Failed to update ticket status after error: {str(update_error)}")
+        ticket_events.publish(ticket_id, "workflow_failed", {"status": "error", "error": error_message})
+        return {"status": "error", "error": error_message}
+
+
+# Metrics Endpoint
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """
+    Expose metrics in the Prometheus text exposition format.
+    
+    Returns:
+        Request latency per route, workflow duration and handoffs, agent, model and
+        tool call latency, DynamoDB call latency and scheduler queue depth
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+# Usage Accounting Endpoint
+
+@app.get("/api/usage")
+async def get_usage() -> Dict[str, Any]:
+    """
+    Report Bedrock token usage aggregated per agent, category and day.
+    
+    Returns:
+        Dictionary with by_agent, by_category and by_day totals (calls, input/output
+        tokens, model latency, retries, estimated cost), the configured budgets and
+        model_retries (retry outcomes per error class and the remaining retry budget)
+    """
+    summary = usage_aggregator.get_summary()
+    summary["model_retries"] = get_retry_stats()
+    return summary
+
+
+# Model Response Cache Endpoint
+
+@app.get("/api/model-cache/metrics")
+async def get_model_cache_metrics() -> Dict[str, Any]:
+    """
+    Report model response cache statistics.
+    
+    Returns:
+        Dictionary with hits, misses, hit rate (overall and per agent), stores,
+        evictions, current entry count and the agents that opted in
+    """
+    return model_response_cache.get_stats()
+
+
+# Timeout Policy Endpoint
+
+@app.get("/api/timeout-policy")
+async def get_timeout_policy() -> Dict[str, Any]:
+    """
+    Report the handoff limits and timeouts currently chosen per workflow mode and category.
+    
+    Returns:
+        Dictionary with the policy per "mode:category" key (learned or default, with
+        sample counts) and the policy parameters
+    """
+    return await asyncio.to_thread(timeout_policy.get_policies)
+
+
+# Scheduler Endpoint
+
+@app.get("/api/scheduler")
+async def get_scheduler_stats() -> Dict[str, Any]:
+    """
+    Report the workflow scheduler's queues, running workflows and wait times.
+    
+    Returns:
+        Dictionary with queued tickets per severity, running workflows per category,
+        the concurrency caps and weights, admission counters and p50/p95 queue wait and
+        p95 time to resolution per severity
+    """
+    return ticket_scheduler.get_stats()
+
+
+# Resilience Endpoint
+
+@app.get("/api/resilience")
+async def get_resilience() -> Dict[str, Any]:
+    """
+    Report the rate limiter and circuit breaker state of each downstream.
+    
+    Returns:
+        Dictionary with whether the guards are enabled and, per downstream (bedrock,
+        dynamodb, s3), the breaker state, consecutive failures, seconds until an open
+        circuit is probed, available tokens and call/failure/rejection counters
+    """
+    return get_resilience_status()
+
+
+# Upload Storage Endpoint
+
+@app.get("/api/uploads/metrics")
+async def get_upload_metrics() -> Dict[str, Any]:
+    """
+    Report upload storage usage.
+    
+    Returns:
+        Dictionary with file counts, bytes used, quota utilization and
+        garbage collection statistics
+    """
+    return upload_storage.get_usage_metrics()
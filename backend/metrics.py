@@ -0,0 +1,343 @@
+"""
+Metrics Registry for Haunted Helpdesk
+
+In-process counters, gauges and histograms for API, workflow, agent, tool and DynamoDB
+latency, served in the Prometheus text format on GET /metrics.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from strands.hooks import (
+    AfterInvocationEvent, AfterModelCallEvent, AfterToolCallEvent, BeforeInvocationEvent, BeforeModelCallEvent,
+    HookProvider, HookRegistry,
+)
+
+
+logger = logging.getLogger("haunted_helpdesk.metrics")
+
+
+# Metrics configuration
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Histogram buckets in seconds (handoff counts for HANDOFF_BUCKETS)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+WORKFLOW_BUCKETS = (1.0, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 180.0, 300.0, 600.0)
+HANDOFF_BUCKETS = (1, 2, 3, 4, 6, 8, 10, 12, 15, 20)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base of all metric types: a name, help text and one value per label combination."""
+
+    type_name = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in sorted(values.items())]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        return "\n".join(lines + self._samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; either set directly or computed by a function when scraped."""
+
+    type_name = "gauge"
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._function: Optional[Callable[[], Any]] = None
+
+    def set(self, value: float, **labels: Any) -> None:
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], Any]) -> None:
+        """
+        Compute the gauge when scraped.
+
+        Args:
+            function: Returns a number, or for a labelled gauge a dictionary mapping the
+                label value (or a tuple of label values) to a number
+        """
+        self._function = function
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                result = self._function()
+            except Exception as e:
+                logger.warning(f"Gauge {self.name} could not be computed: {str(e)}")
+                return []
+            if not isinstance(result, dict):
+                result = {(): result}
+            with self._lock:
+                self._values = {
+                    key if isinstance(key, tuple) else (str(key),): value for key, value in result.items()
+                }
+        return super()._samples()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(self, *args: Any, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any):
+        """
+        Observe the duration of a block; an "outcome" label is set to success or error.
+        """
+        start = time.perf_counter()
+        outcome = "success"
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            if "outcome" in self.labelnames:
+                labels["outcome"] = outcome
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(state[0]), state[1], state[2]) for key, state in self._values.items()}
+        lines = []
+        for key, (bucket_counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{self._labels(key, {'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of the process, rendered together for a scrape."""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        """
+        Initialize an empty registry.
+
+        Args:
+            enabled: False turns every recording call into a no-op
+        """
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class: type, name: str, help_text: str, labelnames: Sequence[str], **kwargs: Any):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(self, name, help_text, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Shared registry and the helpdesk's metrics
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "helpdesk_http_request_duration_seconds", "API request latency until the response starts",
+    ("method", "route", "status"))
+WORKFLOW_DURATION = registry.histogram(
+    "helpdesk_workflow_duration_seconds", "Ticket workflow duration from start to result",
+    ("mode", "category", "outcome"), buckets=WORKFLOW_BUCKETS)
+WORKFLOW_HANDOFFS = registry.histogram(
+    "helpdesk_workflow_handoffs", "Handoffs between agents per workflow", ("mode",), buckets=HANDOFF_BUCKETS)
+AGENT_HANDOFFS = registry.counter(
+    "helpdesk_agent_handoffs_total", "Handoffs from one agent to the next", ("from_agent", "to_agent"))
+AGENT_INVOCATION_DURATION = registry.histogram(
+    "helpdesk_agent_invocation_duration_seconds", "Duration of one agent step (invocation)",
+    ("agent", "outcome"), buckets=WORKFLOW_BUCKETS)
+MODEL_CALL_DURATION = registry.histogram(
+    "helpdesk_model_call_duration_seconds", "Bedrock model call latency per agent (each retry counts)",
+    ("agent", "outcome"))
+TOOL_CALL_DURATION = registry.histogram(
+    "helpdesk_tool_call_duration_seconds", "Tool call latency", ("tool", "outcome"))
+DYNAMODB_CALL_DURATION = registry.histogram(
+    "helpdesk_dynamodb_call_duration_seconds", "DynamoDB call latency", ("operation", "outcome"))
+DYNAMODB_CONSUMED_CAPACITY = registry.counter(
+    "helpdesk_dynamodb_consumed_capacity_units_total", "DynamoDB read and write capacity units consumed",
+    ("operation",))
+QUEUE_DEPTH = registry.gauge(
+    "helpdesk_queue_depth", "Tickets waiting for a workflow slot", ("severity",))
+RUNNING_WORKFLOWS = registry.gauge(
+    "helpdesk_running_workflows", "Workflows currently running", ("category",))
+LOG_RECORDS_SUPPRESSED = registry.counter(
+    "helpdesk_log_records_suppressed_total", "Repeated warnings and errors dropped by log sampling", ("logger",))
+LOG_RECORDS_DROPPED = registry.counter(
+    "helpdesk_log_records_dropped_total", "Log records dropped because the log queue was full")
+TRACE_SPANS_DROPPED = registry.counter(
+    "helpdesk_trace_spans_dropped_total", "Finished spans not written because the span queue was full")
+
+
+def observe_workflow(
+    mode: str,
+    category: str,
+    outcome: str,
+    duration: float,
+    handoff_sequence: Optional[Sequence[str]] = None
+) -> None:
+    """
+    Record a finished workflow.
+
+    Args:
+        mode: Workflow mode (router or swarm)
+        category: Ticket category
+        outcome: completed, error, or the swarm's final status
+        duration: Seconds from workflow start to result
+        handoff_sequence: Agent names in execution order, if known
+    """
+    WORKFLOW_DURATION.observe(duration, mode=mode, category=category, outcome=outcome)
+    if handoff_sequence:
+        WORKFLOW_HANDOFFS.observe(len(handoff_sequence) - 1, mode=mode)
+        for from_agent, to_agent in zip(handoff_sequence, handoff_sequence[1:]):
+            AGENT_HANDOFFS.inc(from_agent=from_agent, to_agent=to_agent)
+
+
+class AgentMetricsHooks(HookProvider):
+    """
+    Records an agent's invocation, model call and tool call latency.
+
+    An agent handles one invocation at a time, so start times are kept on the
+    provider; register one instance per agent (Agent(hooks=[AgentMetricsHooks()])).
+    """
+
+    def __init__(self):
+        self._invocation_start: Optional[float] = None
+        self._model_call_start: Optional[float] = None
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._before_invocation)
+        registry.add_callback(AfterInvocationEvent, self._after_invocation)
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._after_model_call)
+        registry.add_callback(AfterToolCallEvent, self._after_tool_call)
+
+    def _before_invocation(self, event: BeforeInvocationEvent) -> None:
+        self._invocation_start = time.perf_counter()
+
+    def _after_invocation(self, event: AfterInvocationEvent) -> None:
+        if self._invocation_start is None:
+            return
+        AGENT_INVOCATION_DURATION.observe(
+            time.perf_counter() - self._invocation_start,
+            agent=event.agent.name, outcome="success" if event.result is not None else "error"
+        )
+        self._invocation_start = None
+
+    def _before_model_call(self, event: BeforeModelCallEvent) -> None:
+        self._model_call_start = time.perf_counter()
+
+    def _after_model_call(self, event: AfterModelCallEvent) -> None:
+        if self._model_call_start is None:
+            return
+        MODEL_CALL_DURATION.observe(
+            time.perf_counter() - self._model_call_start,
+            agent=event.agent.name, outcome="success" if event.exception is None else "error"
+        )
+        self._model_call_start = None
+
+    def _after_tool_call(self, event: AfterToolCallEvent) -> None:
+        failed = event.exception is not None or (event.result or {}).get("status") == "error"
+        TOOL_CALL_DURATION.observe(
+            event.duration or 0.0,
+            tool=event.tool_use.get("name", "unknown"), outcome="error" if failed else "success"
+        )
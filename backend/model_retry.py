@@ -0,0 +1,277 @@
+"""
+Model Call Retries for Haunted Helpdesk
+
+Retries transient Bedrock failures per model call, with classified errors, jittered
+backoff and a retry budget shared by all agents.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from botocore.exceptions import (
+    ClientError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    NoCredentialsError,
+    ReadTimeoutError,
+)
+from strands import ModelRetryStrategy
+from strands.hooks import AfterInvocationEvent, AfterModelCallEvent, HookRegistry
+from strands.types.exceptions import ContextWindowOverflowException, ModelThrottledException
+
+
+logger = logging.getLogger("haunted_helpdesk.model_retry")
+
+
+# Model retry configuration
+MODEL_RETRY_MAX_ATTEMPTS = int(os.getenv("MODEL_RETRY_MAX_ATTEMPTS", "4"))
+MODEL_RETRY_BASE_DELAY = float(os.getenv("MODEL_RETRY_BASE_DELAY", "1.0"))
+MODEL_RETRY_MAX_DELAY = float(os.getenv("MODEL_RETRY_MAX_DELAY", "30.0"))
+MODEL_RETRY_BUDGET = float(os.getenv("MODEL_RETRY_BUDGET", "20"))
+MODEL_RETRY_BUDGET_REFILL_PER_SECOND = float(os.getenv("MODEL_RETRY_BUDGET_REFILL_PER_SECOND", "0.5"))
+
+# Error classes
+THROTTLING = "throttling"
+STREAM_ERROR = "stream_error"
+TIMEOUT = "timeout"
+AUTH = "auth"
+CONTEXT_OVERFLOW = "context_overflow"
+OTHER = "other"
+
+RETRYABLE_CLASSES = {THROTTLING, STREAM_ERROR, TIMEOUT}
+
+THROTTLING_CODES = {
+    "ThrottlingException", "throttlingException", "TooManyRequestsException", "ServiceQuotaExceededException",
+}
+STREAM_ERROR_CODES = {
+    "ModelStreamErrorException", "InternalServerException", "ServiceUnavailableException",
+    "ServiceUnavailable", "ModelNotReadyException",
+}
+TIMEOUT_CODES = {"ModelTimeoutException", "RequestTimeout", "RequestTimeoutException"}
+AUTH_CODES = {
+    "AccessDeniedException", "ExpiredToken", "ExpiredTokenException", "UnrecognizedClientException",
+    "InvalidSignatureException",
+}
+
+
+def _exception_chain(exception: BaseException):
+    """Yield an exception and the exceptions it was raised from."""
+    seen = set()
+    while exception is not None and id(exception) not in seen:
+        seen.add(id(exception))
+        yield exception
+        exception = exception.__cause__ or exception.__context__
+
+
+def classify_error(exception: BaseException) -> str:
+    """
+    Classify a model call failure.
+
+    Args:
+        exception: Exception raised by the model call
+
+    Returns:
+        One of throttling, stream_error, timeout, auth, context_overflow or other
+    """
+    for error in _exception_chain(exception):
+        if isinstance(error, ModelThrottledException):
+            return THROTTLING
+        if isinstance(error, ContextWindowOverflowException):
+            return CONTEXT_OVERFLOW
+        if isinstance(error, (ReadTimeoutError, ConnectTimeoutError, asyncio.TimeoutError, TimeoutError)):
+            return TIMEOUT
+        if isinstance(error, EndpointConnectionError):
+            return STREAM_ERROR
+        if isinstance(error, NoCredentialsError):
+            return AUTH
+        if isinstance(error, ClientError):
+            code = error.response.get("Error", {}).get("Code", "")
+            if code in THROTTLING_CODES:
+                return THROTTLING
+            if code in STREAM_ERROR_CODES:
+                return STREAM_ERROR
+            if code in TIMEOUT_CODES:
+                return TIMEOUT
+            if code in AUTH_CODES:
+                return AUTH
+    return OTHER
+
+
+def retry_after_seconds(exception: BaseException) -> Optional[float]:
+    """Return the retry-after hint (seconds) of a failed AWS call, if the response carried one."""
+    for error in _exception_chain(exception):
+        response = getattr(error, "response", None)
+        if not isinstance(response, dict):
+            continue
+        headers = response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+        for header in ("retry-after", "x-amzn-retry-after"):
+            try:
+                return max(float(headers[header]), 0.0)
+            except (KeyError, TypeError, ValueError):
+                continue
+    return None
+
+
+class RetryBudget:
+    """Thread-safe token bucket shared by all agents; each retry spends one token."""
+
+    def __init__(self, capacity: float = MODEL_RETRY_BUDGET, refill_per_second: float = MODEL_RETRY_BUDGET_REFILL_PER_SECOND):
+        """
+        Initialize a full bucket.
+
+        Args:
+            capacity: Maximum number of tokens (retries available in a burst)
+            refill_per_second: Tokens added per second
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def available(self) -> float:
+        """Tokens currently available."""
+        with self._lock:
+            self._refill()
+            return round(self._tokens, 2)
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff parameters for model call retries."""
+    max_attempts: int = MODEL_RETRY_MAX_ATTEMPTS
+    base_delay: float = MODEL_RETRY_BASE_DELAY
+    max_delay: float = MODEL_RETRY_MAX_DELAY
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Delay before retry number `attempt` (1-based): full jitter over an exponential window.
+
+        A retry-after hint is a lower bound; every delay is capped at max_delay.
+        """
+        window = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(0, window)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return min(delay, self.max_delay)
+
+
+class RetryStats:
+    """Process-wide counters of model call failures and retries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def count(self, error_class: str, outcome: str) -> None:
+        """Count a failure outcome (retried, exhausted, budget_denied, not_retryable) of an error class."""
+        with self._lock:
+            counters = self._counters.setdefault(error_class, {})
+            counters[outcome] = counters.get(outcome, 0) + 1
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return counters per error class."""
+        with self._lock:
+            return {error_class: dict(counters) for error_class, counters in self._counters.items()}
+
+
+# Shared retry budget and statistics
+retry_budget = RetryBudget()
+retry_stats = RetryStats()
+
+
+class HelpdeskRetryStrategy(ModelRetryStrategy):
+    """
+    Retry strategy for helpdesk agents: classified errors, jittered backoff, shared budget.
+
+    Agent(retry_strategy=...) only accepts ModelRetryStrategy instances, but the
+    strategy registers its own hook callbacks and keeps its own attempt count, so it
+    relies only on the public hook API rather than the base class internals.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        budget: Optional[RetryBudget] = None,
+        stats: Optional[RetryStats] = None
+    ):
+        """
+        Initialize the strategy (one per agent; the budget is shared).
+
+        Args:
+            policy: Backoff parameters (defaults to the configured policy)
+            budget: Retry budget (defaults to the shared budget)
+            stats: Statistics sink (defaults to the shared statistics)
+        """
+        self.policy = policy or RetryPolicy()
+        super().__init__(max_attempts=self.policy.max_attempts)
+        self.budget = budget if budget is not None else retry_budget
+        self.stats = stats if stats is not None else retry_stats
+        self.attempt = 0
+
+    def is_retryable(self, exception: Exception) -> bool:
+        """Whether the failure is transient: throttling, stream errors and timeouts."""
+        return classify_error(exception) in RETRYABLE_CLASSES
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(AfterModelCallEvent, self.after_model_call)
+        registry.add_callback(AfterInvocationEvent, self.after_invocation)
+
+    def after_invocation(self, event: AfterInvocationEvent) -> None:
+        """Start the next invocation with a fresh attempt count."""
+        self.attempt = 0
+
+    async def after_model_call(self, event: AfterModelCallEvent) -> None:
+        """Decide whether a failed model call is retried and wait out the backoff."""
+        if event.retry:
+            return
+        if event.exception is None:
+            self.attempt = 0
+            return
+
+        error_class = classify_error(event.exception)
+        if error_class not in RETRYABLE_CLASSES:
+            self.stats.count(error_class, "not_retryable")
+            return
+
+        self.attempt += 1
+        if self.attempt >= self.policy.max_attempts:
+            self.stats.count(error_class, "exhausted")
+            logger.warning(f"Model call failed after {self.attempt} attempts ({error_class}): {event.exception}")
+            return
+        if not self.budget.try_acquire():
+            self.stats.count(error_class, "budget_denied")
+            logger.warning(f"Retry budget exhausted; not retrying {error_class} failure: {event.exception}")
+            return
+
+        delay = self.policy.delay(self.attempt, retry_after_seconds(event.exception))
+        self.stats.count(error_class, "retried")
+        logger.info(f"Retrying model call in {delay:.2f}s (attempt {self.attempt + 1}, {error_class})")
+        await asyncio.sleep(delay)
+        event.retry = True
+
+
+def get_retry_stats() -> Dict[str, Any]:
+    """Retry counters per error class plus the remaining shared retry budget."""
+    return {"by_error_class": retry_stats.get_stats(), "budget_available": retry_budget.available(),
+            "budget_capacity": retry_budget.capacity}
@@ -5,10 +5,17 @@ Processes combined text and image inputs for ticket creation.
 Analyzes error screenshots using AI vision capabilities and combines with text descriptions.
 """
 
+import logging
 import os
 from typing import List, Optional, Dict, Any
 from strands.agent import Agent
-from strands.models.bedrock import BedrockModel
+from bedrock_model import create_model
+from model_retry import HelpdeskRetryStrategy
+from metrics import AgentMetricsHooks
+from tracing import AgentTracingHooks, tracer
+
+
+logger = logging.getLogger("haunted_helpdesk.multimodal")
 
 
 def create_image_analysis_agent() -> Agent:
@@ -48,7 +55,8 @@ ANALYSIS GUIDELINES:
 Remember: Your analysis will be combined with user-provided text to create a complete ticket."""
 
     # Configure Bedrock model with temperature 0.1 for precise extraction
-    model = BedrockModel(
+    model = create_model(
+        agent_name="image_analysis_agent",
         model_id="us.anthropic.claude-3-5-sonnet-20241022-v2:0",
         temperature=0.1
     )
@@ -57,6 +65,8 @@ Remember: Your analysis will be combined with user-provided text to create a com
     agent = Agent(
         name="image_analysis_agent",
         model=model,
+        retry_strategy=HelpdeskRetryStrategy(),
+        hooks=[AgentMetricsHooks(), AgentTracingHooks()],
         instructions=system_prompt,
         tools=[image_reader]
     )
@@ -66,7 +76,8 @@ Remember: Your analysis will be combined with user-provided text to create a com
 
 def process_multimodal_input(
     text_description: str,
-    image_paths: Optional[List[str]] = None
+    image_paths: Optional[List[str]] = None,
+    usage: Optional[Any] = None
 ) -> str:
     """
     Process combined text and image inputs for ticket creation.
@@ -74,6 +85,7 @@ def process_multimodal_input(
     Args:
         text_description: User-provided text description of the issue
         image_paths: Optional list of file paths to error screenshots
+        usage: Optional UsageLedger that records the image analysis calls
     
     Returns:
         Combined formatted content with text description and image analyses
@@ -104,7 +116,11 @@ def process_multimodal_input(
                     
                     # Run the agent with the analysis prompt
                     # The agent will use the image_reader tool internally
-                    result = analysis_agent.run(analysis_prompt)
+                    with tracer.span(f"multimodal.image_{idx}", "multimodal", image=os.path.basename(image_path)):
+                        result = analysis_agent.run(analysis_prompt)
+                    
+                    if usage is not None:
+                        usage.record_agent_result("image_analysis_agent", result, analysis_prompt)
                     
                     # Extract the analysis from the result
                     # The result structure depends on strands_agents implementation
@@ -121,19 +137,19 @@ def process_multimodal_input(
                 except FileNotFoundError as fnf_error:
                     # Handle missing file specifically
                     error_msg = f"Image file not found: {str(fnf_error)}"
-                    print(error_msg)
+                    logger.warning(error_msg)
                     combined_content += f"**Image Analysis {idx}:**\nUnable to process image - file not found\n\n"
                     
                 except Exception as img_error:
                     # Handle individual image processing errors gracefully
                     error_msg = f"Error processing image {idx}: {str(img_error)}"
-                    print(error_msg)
+                    logger.warning(error_msg)
                     combined_content += f"**Image Analysis {idx}:**\nUnable to process image - {str(img_error)}\n\n"
                     
         except Exception as e:
             # Handle agent creation or general processing errors gracefully
             error_msg = f"Error in multimodal processing: {str(e)}"
-            print(error_msg)
+            logger.error(error_msg)
             combined_content += f"\n**Note:** Image analysis unavailable - {str(e)}\n"
     
     return combined_content.strip()
@@ -0,0 +1,376 @@
+"""
+Resilience Layer for Haunted Helpdesk
+
+Guards calls to Bedrock, DynamoDB and S3 with a token-bucket rate limiter and a
+circuit breaker per downstream.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from botocore.exceptions import ClientError
+
+from model_retry import STREAM_ERROR, THROTTLING, TIMEOUT, classify_error
+
+
+logger = logging.getLogger("haunted_helpdesk.resilience")
+
+
+# Resilience configuration
+RESILIENCE_ENABLED = os.getenv("RESILIENCE_ENABLED", "true").lower() == "true"
+BEDROCK_RATE_PER_SECOND = float(os.getenv("BEDROCK_RATE_PER_SECOND", "5"))
+BEDROCK_RATE_BURST = float(os.getenv("BEDROCK_RATE_BURST", "10"))
+DYNAMODB_RATE_PER_SECOND = float(os.getenv("DYNAMODB_RATE_PER_SECOND", "50"))
+DYNAMODB_RATE_BURST = float(os.getenv("DYNAMODB_RATE_BURST", "100"))
+S3_RATE_PER_SECOND = float(os.getenv("S3_RATE_PER_SECOND", "50"))
+S3_RATE_BURST = float(os.getenv("S3_RATE_BURST", "100"))
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "2"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RECOVERY_SECONDS = float(os.getenv("BREAKER_RECOVERY_SECONDS", "30"))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# AWS error codes (beyond the model retry classes) that mean the downstream itself is struggling
+DOWNSTREAM_FAILURE_CODES = {
+    "ProvisionedThroughputExceededException", "RequestLimitExceeded", "InternalServerError",
+    "InternalError", "SlowDown", "ServiceUnavailable", "503", "500",
+}
+
+
+class DownstreamUnavailable(Exception):
+    """Raised instead of calling a downstream that is rate limited or behind an open circuit."""
+
+    status_code = 503
+
+    def __init__(self, downstream: str, message: str, retry_after: float):
+        super().__init__(message)
+        self.downstream = downstream
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(DownstreamUnavailable):
+    """The downstream's circuit breaker is open."""
+
+    status_code = 503
+
+
+class RateLimitedError(DownstreamUnavailable):
+    """No rate limiter token became available within the maximum wait."""
+
+    status_code = 429
+
+
+def is_downstream_failure(exception: BaseException) -> bool:
+    """Whether a failed call counts against the downstream's circuit breaker."""
+    if classify_error(exception) in (THROTTLING, STREAM_ERROR, TIMEOUT):
+        return True
+    if isinstance(exception, ClientError):
+        error = exception.response.get("Error", {})
+        status = exception.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return error.get("Code") in DOWNSTREAM_FAILURE_CODES or status >= 500
+    return False
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers reserve a token and wait for it to accrue."""
+
+    def __init__(self, rate_per_second: float, burst: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate_per_second: Tokens added per second (0 disables limiting)
+            burst: Maximum number of tokens
+        """
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Reserve a token.
+
+        Args:
+            max_wait: Longest acceptable wait in seconds
+
+        Returns:
+            Seconds to wait before using the token, or None if the wait would exceed max_wait
+            (nothing is reserved then)
+        """
+        if self.rate_per_second <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_second)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate_per_second)
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def wait_for_token(self) -> float:
+        """Seconds until the next token is available without waiting in line."""
+        with self._lock:
+            tokens = min(self.burst, self._tokens + (time.monotonic() - self._updated) * self.rate_per_second)
+        return max(0.0, (1 - tokens) / self.rate_per_second) if self.rate_per_second > 0 else 0.0
+
+    def available(self) -> float:
+        with self._lock:
+            tokens = min(self.burst, self._tokens + (time.monotonic() - self._updated) * self.rate_per_second)
+        return round(max(tokens, 0.0), 2)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing."""
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        recovery_seconds: float = BREAKER_RECOVERY_SECONDS,
+        half_open_probes: int = BREAKER_HALF_OPEN_PROBES
+    ):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_seconds: Seconds the circuit stays open before probing
+            half_open_probes: Calls let through at once while probing
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> Optional[float]:
+        """
+        Admit a call.
+
+        Returns:
+            None if the call may proceed, otherwise seconds until the circuit may be probed
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.recovery_seconds - time.monotonic()
+                if remaining > 0:
+                    return remaining
+                self.state = HALF_OPEN
+                self._probes_in_flight = 0
+            if self.state == HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_probes:
+                    return self.recovery_seconds
+                self._probes_in_flight += 1
+            return None
+
+    def release(self) -> None:
+        """Return a half-open probe slot for a call that was admitted but never made."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes_in_flight > 0:
+                self._probes_in_flight -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Circuit closed after a successful probe")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._probes_in_flight = 0
+
+    def record_failure(self) -> bool:
+        """Count a downstream failure; returns True if the circuit opened."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                opened = self.state != OPEN
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._probes_in_flight = 0
+                return opened
+            return False
+
+
+class Downstream:
+    """Rate limiter and circuit breaker guarding calls to one downstream service."""
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_second: float,
+        burst: float,
+        breaker: Optional[CircuitBreaker] = None,
+        max_wait: float = RATE_LIMIT_MAX_WAIT_SECONDS,
+        enabled: bool = RESILIENCE_ENABLED
+    ):
+        """
+        Initialize the guard.
+
+        Args:
+            name: Downstream name used in errors and status (bedrock, dynamodb, s3)
+            rate_per_second: Sustained calls per second
+            burst: Calls allowed in a burst
+            breaker: Circuit breaker (defaults to the configured thresholds)
+            max_wait: Longest a caller waits for a rate limiter token
+            enabled: False passes every call straight through
+        """
+        self.name = name
+        self.limiter = TokenBucket(rate_per_second, burst)
+        self.breaker = breaker or CircuitBreaker()
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self._counters = {"calls": 0, "failures": 0, "rejected_open": 0, "rate_limited": 0}
+        self._counter_lock = threading.Lock()
+        # Wall-clock times of the last call that succeeded / failed against the downstream
+        self.last_success_at: Optional[float] = None
+        self.last_failure_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def _count(self, counter: str) -> None:
+        with self._counter_lock:
+            self._counters[counter] += 1
+
+    def _admit(self, wait: bool) -> float:
+        """Check the breaker and reserve a token; returns the seconds to wait for the token."""
+        retry_after = self.breaker.allow()
+        if retry_after is not None:
+            self._count("rejected_open")
+            raise CircuitOpenError(
+                self.name, f"{self.name} is unavailable (circuit open); retry in {retry_after:.0f}s", retry_after
+            )
+        delay = self.limiter.reserve(self.max_wait if wait else 0.0)
+        if delay is None:
+            self.breaker.release()
+            self._count("rate_limited")
+            retry_after = self.limiter.wait_for_token()
+            raise RateLimitedError(
+                self.name, f"{self.name} rate limit reached; retry in {retry_after:.1f}s", retry_after
+            )
+        self._count("calls")
+        return delay
+
+    def _record(self, exception: Optional[BaseException]) -> None:
+        if exception is None or not is_downstream_failure(exception):
+            self.breaker.record_success()
+            if exception is None:
+                self.last_success_at = time.time()
+            return
+        self._count("failures")
+        self.last_failure_at = time.time()
+        self.last_error = str(exception)
+        if self.breaker.record_failure():
+            logger.warning(f"Circuit opened for {self.name} after {self.breaker.consecutive_failures} "
+                           f"consecutive failures: {exception}")
+
+    @contextmanager
+    def guard(self, wait: bool = True):
+        """
+        Guard a block of synchronous calls to the downstream.
+
+        Args:
+            wait: Wait up to max_wait for a rate limiter token (False fails at once)
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            RateLimitedError: If no token became available in time
+        """
+        if not self.enabled:
+            yield
+            return
+        delay = self._admit(wait)
+        if delay:
+            time.sleep(delay)
+        try:
+            yield
+        except Exception as e:
+            self._record(e)
+            raise
+        except BaseException:
+            # Cancelled or abandoned: the call neither succeeded nor failed
+            self.breaker.release()
+            raise
+        self._record(None)
+
+    @asynccontextmanager
+    async def guard_async(self, wait: bool = True):
+        """Guard a block of asynchronous calls to the downstream (see guard)."""
+        if not self.enabled:
+            yield
+            return
+        delay = self._admit(wait)
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            yield
+        except Exception as e:
+            self._record(e)
+            raise
+        except BaseException:
+            # Cancelled or abandoned: the call neither succeeded nor failed
+            self.breaker.release()
+            raise
+        self._record(None)
+
+    def call(self, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call a synchronous function under the guard."""
+        with self.guard():
+            return function(*args, **kwargs)
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Describe the guard.
+
+        Returns:
+            Dictionary containing:
+            - state: Breaker state (closed, open, half_open)
+            - consecutive_failures: Failures since the last success
+            - retry_after: Seconds until an open circuit may be probed (None unless open)
+            - tokens_available, rate_per_second, burst: Rate limiter state and configuration
+            - calls, failures, rejected_open, rate_limited: Counters
+        """
+        breaker = self.breaker
+        retry_after = None
+        if breaker.state == OPEN:
+            retry_after = round(max(0.0, breaker.opened_at + breaker.recovery_seconds - time.monotonic()), 1)
+        with self._counter_lock:
+            counters = dict(self._counters)
+        return {
+            "state": breaker.state,
+            "consecutive_failures": breaker.consecutive_failures,
+            "retry_after": retry_after,
+            "tokens_available": self.limiter.available(),
+            "rate_per_second": self.limiter.rate_per_second,
+            "burst": self.limiter.burst,
+            **counters,
+        }
+
+
+# Shared guards per downstream
+bedrock_downstream = Downstream("bedrock", BEDROCK_RATE_PER_SECOND, BEDROCK_RATE_BURST)
+dynamodb_downstream = Downstream("dynamodb", DYNAMODB_RATE_PER_SECOND, DYNAMODB_RATE_BURST)
+s3_downstream = Downstream("s3", S3_RATE_PER_SECOND, S3_RATE_BURST)
+
+
+def get_resilience_status() -> Dict[str, Any]:
+    """Breaker and rate limiter status per downstream."""
+    return {
+        "enabled": RESILIENCE_ENABLED,
+        "downstreams": {
+            downstream.name: downstream.get_status()
+            for downstream in (bedrock_downstream, dynamodb_downstream, s3_downstream)
+        },
+    }
@@ -0,0 +1,285 @@
+"""
+Offline Simulation for Haunted Helpdesk
+
+Simulated Bedrock model and tools for MODEL_BACKEND=simulated: scripted replies with
+seeded, configurable latency and failures, so workflows run without AWS or network access.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+from strands.tools.tools import PythonAgentTool
+from strands.types.exceptions import ModelThrottledException
+
+from bedrock_model import MODEL_BACKEND, HelpdeskBedrockModel
+
+
+logger = logging.getLogger("haunted_helpdesk.simulation")
+
+
+# Simulation configuration
+SIM_SEED = int(os.getenv("SIM_SEED", "42"))
+SIM_MODEL_LATENCY = os.getenv("SIM_MODEL_LATENCY", "lognormal:1.5,0.4")
+SIM_TOOL_LATENCY = os.getenv("SIM_TOOL_LATENCY", "lognormal:0.8,0.6")
+SIM_TIME_SCALE = float(os.getenv("SIM_TIME_SCALE", "1.0"))
+SIM_THROTTLE_RATE = float(os.getenv("SIM_THROTTLE_RATE", "0"))
+SIM_STREAM_ERROR_RATE = float(os.getenv("SIM_STREAM_ERROR_RATE", "0"))
+SIM_MEMORY_HIT_RATE = float(os.getenv("SIM_MEMORY_HIT_RATE", "0.2"))
+
+# Share of a model call's latency spent before the first token
+FIRST_TOKEN_SHARE = 0.3
+STREAM_CHUNKS = 8
+
+
+class LatencyDistribution:
+    """Samples delays in seconds from a distribution given as "<kind>:<parameters>"."""
+
+    KINDS = {"fixed": 1, "uniform": 2, "lognormal": 2, "exponential": 1}
+
+    def __init__(self, spec: str):
+        """
+        Parse a distribution.
+
+        Args:
+            spec: "fixed:<seconds>", "uniform:<low>,<high>", "lognormal:<median>,<sigma>"
+                or "exponential:<mean>"
+
+        Raises:
+            ValueError: If the kind is unknown or the parameters don't fit it
+        """
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(value) for value in params.split(",") if value.strip()]
+        if self.KINDS.get(self.kind) != len(self.params):
+            raise ValueError(f"Invalid latency distribution '{spec}'")
+        self.spec = spec
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+
+
+@dataclass
+class SimulationConfig:
+    """Latency, failure and scripting settings of a simulation."""
+
+    seed: int = SIM_SEED
+    model_latency: str = SIM_MODEL_LATENCY
+    tool_latency: str = SIM_TOOL_LATENCY
+    time_scale: float = SIM_TIME_SCALE
+    throttle_rate: float = SIM_THROTTLE_RATE
+    stream_error_rate: float = SIM_STREAM_ERROR_RATE
+    memory_hit_rate: float = SIM_MEMORY_HIT_RATE
+
+    def __post_init__(self) -> None:
+        self.model_distribution = LatencyDistribution(self.model_latency)
+        self.tool_distribution = LatencyDistribution(self.tool_latency)
+
+    def rng(self, *parts: Any) -> random.Random:
+        """Random generator seeded from the simulation seed and the given parts."""
+        digest = hashlib.sha256(json.dumps([self.seed, *parts], default=str).encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+# Shared configuration
+simulation_config = SimulationConfig()
+
+
+# Tool each worker calls before answering, with its input
+SCRIPTED_TOOL_CALLS = {
+    "network_diagnostic_agent": ("diagnose_hosts", {"hostnames": ["gateway.internal"], "probes": ["ping", "dns"]}),
+    "cloud_service_agent": ("audit_buckets", {"all_buckets": True}),
+}
+
+SCRIPTED_REPLIES = {
+    "ticketing_agent": "Ticket analysis: the issue is reproducible and affects several users. "
+                       "Priority confirmed; diagnosis required.",
+    "orchestrator_agent": "network_diagnostic_agent",
+    "network_diagnostic_agent": "**Diagnostic Results**: gateway.internal answers ping with 0% loss and resolves "
+                                "correctly.\n**Root Cause Analysis**: stale route on the branch router.\n"
+                                "**Resolution Steps**: flush the route cache and re-announce the prefix.",
+    "cloud_service_agent": "**Audit Results**: bucket policy denies the application role.\n"
+                           "**Resolution Steps**: add s3:GetObject for the role to the bucket policy.",
+    "summarization_agent": "Summary: the issue was diagnosed and the documented fix was applied. WORKFLOW_COMPLETE",
+    "image_analysis_agent": "Error screenshot shows a connection timeout dialog.",
+}
+
+
+def _last_text(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        for block in message.get("content", []):
+            if isinstance(block.get("text"), str):
+                return block["text"]
+    return ""
+
+
+def conversation_digest(messages: List[Dict[str, Any]]) -> str:
+    """Hash the roles and content of a conversation, leaving out per-run message metadata."""
+    turns = [{"role": message.get("role"), "content": message.get("content")} for message in messages]
+    return hashlib.sha256(json.dumps(turns, default=str).encode("utf-8")).hexdigest()
+
+
+def scripted_reply(agent_name: str, messages: List[Dict[str, Any]], config: SimulationConfig) -> str:
+    """Final text an agent answers with for a conversation."""
+    prompt = _last_text(messages)
+    if agent_name == "memory_agent":
+        if prompt.startswith("STORE"):
+            return "Memory stored successfully with ID: mem_simulated"
+        hit = config.rng("memory", prompt).random() < config.memory_hit_rate
+        return "MEMORY_FOUND: Restarted the gateway and verified connectivity" if hit else "NO_MEMORY_FOUND"
+    if agent_name == "ticketing_agent" and prompt.startswith("WORKFLOW_COMPLETE"):
+        return "Ticket updated to resolved. WORKFLOW_COMPLETE"
+    return SCRIPTED_REPLIES.get(agent_name, "Done.")
+
+
+class SimulatedBedrockModel(HelpdeskBedrockModel):
+    """HelpdeskBedrockModel whose Bedrock stream is replaced by scripted, delayed replies."""
+
+    def __init__(self, agent_name: str, config: Optional[SimulationConfig] = None, **model_config: Any):
+        """
+        Initialize the model.
+
+        Args:
+            agent_name: Name of the agent using the model (selects its script)
+            config: Simulation settings (defaults to the shared configuration)
+            **model_config: HelpdeskBedrockModel configuration; responses are not cached
+                unless cache_responses is given
+        """
+        model_config.setdefault("cache_responses", False)
+        super().__init__(agent_name=agent_name, **model_config)
+        self.simulation = config if config is not None else simulation_config
+        self.calls = 0
+
+    async def _bedrock_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tool_specs: Optional[List[Dict[str, Any]]],
+        system_prompt: Optional[str],
+        **kwargs: Any
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        self.calls += 1
+        config = self.simulation
+        # Strands tags messages with a random tracking_id, so hash the content only
+        conversation = conversation_digest(messages)
+        rng = config.rng(self.agent_name, conversation, self.calls)
+        latency = config.model_distribution.sample(rng) * config.time_scale
+        started = time.perf_counter()
+
+        await asyncio.sleep(latency * FIRST_TOKEN_SHARE)
+        if rng.random() < config.throttle_rate:
+            raise ModelThrottledException("Simulated throttling: too many requests")
+        fail_at = rng.randrange(STREAM_CHUNKS) if rng.random() < config.stream_error_rate else None
+
+        yield {"messageStart": {"role": "assistant"}}
+        tool_names = {spec.get("name") for spec in tool_specs or []}
+        tool_call = SCRIPTED_TOOL_CALLS.get(self.agent_name)
+        answered_tool = any("toolResult" in block for message in messages for block in message.get("content", []))
+        if tool_call is not None and tool_call[0] in tool_names and not answered_tool:
+            name, tool_input = tool_call
+            text, stop_reason = "", "tool_use"
+            # Drawn from the seeded rng: the id ends up in the next call's conversation hash
+            yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": f"tooluse_{rng.getrandbits(48):012x}",
+                                                               "name": name}}}}
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(tool_input)}}}}
+            yield {"contentBlockStop": {}}
+        else:
+            text, stop_reason = scripted_reply(self.agent_name, messages, config), "end_turn"
+            words = text.split(" ")
+            size = max(1, math.ceil(len(words) / STREAM_CHUNKS))
+            chunks = [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+            for index, chunk in enumerate(chunks):
+                if index == fail_at:
+                    raise ClientError({"Error": {"Code": "ModelStreamErrorException",
+                                                 "Message": "Simulated stream error"}}, "ConverseStream")
+                await asyncio.sleep(latency * (1 - FIRST_TOKEN_SHARE) / len(chunks))
+                yield {"contentBlockDelta": {"delta": {"text": chunk}}}
+            yield {"contentBlockStop": {}}
+
+        yield {"messageStop": {"stopReason": stop_reason}}
+        input_tokens = len(json.dumps(messages, default=str)) // 4 + len(system_prompt or "") // 4
+        output_tokens = max(1, len(text) // 4)
+        yield {"metadata": {
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens,
+                      "totalTokens": input_tokens + output_tokens},
+            "metrics": {"latencyMs": int((time.perf_counter() - started) * 1000)},
+        }}
+
+
+# Canned results of the simulated network and cloud tools
+SIMULATED_TOOL_RESULTS: Dict[str, Dict[str, Any]] = {
+    "ping_host": {"success": True, "hostname": "gateway.internal", "return_code": 0,
+                  "metrics": {"packet_loss": 0.0, "rtt_avg_ms": 12.4}},
+    "traceroute_host": {"success": True, "hostname": "gateway.internal",
+                        "hops": [{"hop": 1, "address": "10.0.0.1", "rtt_ms": 0.8}]},
+    "check_dns_resolution": {"success": True, "hostname": "gateway.internal", "records": {"A": ["10.0.0.10"]}},
+    "check_tcp_port": {"success": True, "hostname": "gateway.internal", "open": True, "connect_ms": 3.1},
+    "check_tls_endpoint": {"success": True, "hostname": "gateway.internal", "tls_version": "TLSv1.3",
+                           "days_until_expiry": 74},
+    "diagnose_hosts": {"success": True, "hosts": {"gateway.internal": {
+        "ping": {"success": True, "metrics": {"packet_loss": 0.0, "rtt_avg_ms": 12.4}},
+        "dns": {"success": True, "records": {"A": ["10.0.0.10"]}}}}},
+    "list_all_buckets": {"success": True, "buckets": ["app-assets", "app-logs"], "count": 2},
+    "search_buckets": {"success": True, "buckets": ["app-assets"], "count": 1},
+    "get_bucket_location": {"success": True, "bucket_name": "app-assets", "region": "us-west-2"},
+    "check_bucket_exists": {"success": True, "bucket_name": "app-assets", "exists": True, "accessible": False},
+    "audit_buckets": {"success": True, "buckets": {"app-assets": {"policy": "denies application role"}}},
+}
+
+# Tools that block a worker thread in production (boto3); the network probes are async
+BLOCKING_TOOLS = {"list_all_buckets", "search_buckets", "get_bucket_location", "check_bucket_exists",
+                  "audit_buckets"}
+
+
+def simulated_tool(real_tool: Any, config: Optional[SimulationConfig] = None) -> PythonAgentTool:
+    """
+    Build a stand-in for a tool with the same name and spec, returning a canned result after a delay.
+
+    Args:
+        real_tool: Tool to stand in for
+        config: Simulation settings (defaults to the shared configuration)
+    """
+    config = config if config is not None else simulation_config
+    name = real_tool.tool_name
+    calls = {"count": 0}
+
+    def result_for(tool_use: Dict[str, Any]) -> tuple:
+        calls["count"] += 1
+        rng = config.rng("tool", name, tool_use.get("input"), calls["count"])
+        delay = config.tool_distribution.sample(rng) * config.time_scale
+        result = dict(SIMULATED_TOOL_RESULTS.get(name, {"success": True}), cached=False, simulated=True)
+        return delay, {"toolUseId": tool_use["toolUseId"], "status": "success", "content": [{"json": result}]}
+
+    if name in BLOCKING_TOOLS:
+        def run_blocking(tool_use: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+            delay, result = result_for(tool_use)
+            time.sleep(delay)
+            return result
+        return PythonAgentTool(name, real_tool.tool_spec, run_blocking)
+
+    async def run(tool_use: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        delay, result = result_for(tool_use)
+        await asyncio.sleep(delay)
+        return result
+    return PythonAgentTool(name, real_tool.tool_spec, run)
+
+
+def agent_tools(tools: List[Any]) -> List[Any]:
+    """An agent's tools, replaced by simulated stand-ins when MODEL_BACKEND=simulated."""
+    if MODEL_BACKEND != "simulated":
+        return tools
+    return [simulated_tool(tool) if tool.tool_name in SIMULATED_TOOL_RESULTS else tool for tool in tools]
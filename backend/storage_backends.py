@@ -0,0 +1,738 @@
+"""
+Ticket Storage Backends for Haunted Helpdesk
+
+Provides the table DynamoDBManager works on, chosen by TICKET_STORAGE_BACKEND: the boto3
+DynamoDB table, or an in-memory table with optional latency and capacity modelling.
+"""
+
+import copy
+import logging
+import math
+import operator
+import os
+import random
+import re
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+from boto3.dynamodb.conditions import Size
+from botocore.exceptions import ClientError
+
+from simulation import SIM_SEED, LatencyDistribution
+
+
+logger = logging.getLogger("haunted_helpdesk.storage")
+
+
+# Storage configuration
+TICKET_STORAGE_BACKEND = os.getenv("TICKET_STORAGE_BACKEND", "dynamodb").lower()
+MEMORY_STORAGE_LATENCY = os.getenv("MEMORY_STORAGE_LATENCY", "fixed:0")
+MEMORY_STORAGE_READ_CAPACITY = float(os.getenv("MEMORY_STORAGE_READ_CAPACITY", "0"))
+MEMORY_STORAGE_WRITE_CAPACITY = float(os.getenv("MEMORY_STORAGE_WRITE_CAPACITY", "0"))
+MEMORY_STORAGE_BURST_SECONDS = float(os.getenv("MEMORY_STORAGE_BURST_SECONDS", "300"))
+MEMORY_STORAGE_INDEXES = os.getenv("MEMORY_STORAGE_INDEXES", "")
+
+# DynamoDB sizing rules
+READ_UNIT_BYTES = 4096
+WRITE_UNIT_BYTES = 1024
+PAGE_BYTES = 1024 * 1024
+
+_MISSING = object()
+_COMPARISONS = {"=": operator.eq, "<>": operator.ne, "<": operator.lt, "<=": operator.le,
+                ">": operator.gt, ">=": operator.ge}
+_UPDATE_CLAUSE = re.compile(r"\b(SET|REMOVE|ADD|DELETE)\b", re.IGNORECASE)
+_FUNCTION = re.compile(r"(if_not_exists|list_append)\s*\((.*)\)", re.DOTALL)
+
+
+def _client_error(code: str, message: str, operation: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation)
+
+
+def _validation_error(message: str, operation: str) -> ClientError:
+    return _client_error("ValidationException", message, operation)
+
+
+def parse_indexes(spec: str) -> Dict[str, Tuple[str, Optional[str]]]:
+    """
+    Parse global secondary index definitions.
+
+    Args:
+        spec: Comma-separated "<index>=<partition key>[:<sort key>]",
+            e.g. "status-index=status:created_at,category-index=category"
+
+    Returns:
+        Partition and sort key (or None) by index name
+
+    Raises:
+        ValueError: If an entry has no index name or partition key
+    """
+    indexes = {}
+    for entry in [entry.strip() for entry in spec.split(",") if entry.strip()]:
+        name, _, keys = entry.partition("=")
+        partition_key, _, sort_key = keys.partition(":")
+        if not name.strip() or not partition_key.strip():
+            raise ValueError(f"Invalid index definition '{entry}'")
+        indexes[name.strip()] = (partition_key.strip(), sort_key.strip() or None)
+    return indexes
+
+
+def _value_size(value: Any) -> int:
+    """Approximate stored size of an attribute value in bytes, as DynamoDB counts it."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float, Decimal)):
+        digits = len(str(value).lstrip("-").replace(".", "").lstrip("0")) or 1
+        return 1 + (digits + 1) // 2
+    if isinstance(value, dict):
+        return 3 + sum(len(str(key).encode("utf-8")) + _value_size(item) + 1 for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return 3 + sum(_value_size(item) + 1 for item in value)
+    return len(str(value).encode("utf-8"))
+
+
+def item_size(item: Dict[str, Any]) -> int:
+    """Approximate size of an item in bytes: attribute names plus values."""
+    return sum(len(name.encode("utf-8")) + _value_size(value) for name, value in item.items())
+
+
+def _copy_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an item, deep-copying only container values (flat tickets stay cheap to copy)."""
+    return {name: copy.deepcopy(value) if isinstance(value, (dict, list, set)) else value
+            for name, value in item.items()}
+
+
+def _resolve(item: Dict[str, Any], path: List[str]) -> Any:
+    value: Any = item
+    for part in path:
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _type_code(value: Any) -> str:
+    if isinstance(value, str):
+        return "S"
+    if isinstance(value, bool):
+        return "BOOL"
+    if isinstance(value, (int, float, Decimal)):
+        return "N"
+    if isinstance(value, (bytes, bytearray)):
+        return "B"
+    if value is None:
+        return "NULL"
+    if isinstance(value, dict):
+        return "M"
+    if isinstance(value, list):
+        return "L"
+    if isinstance(value, (set, frozenset)):
+        sample = next(iter(value), "")
+        return "NS" if isinstance(sample, (int, float, Decimal)) else "BS" if isinstance(sample, bytes) else "SS"
+    return "S"
+
+
+def evaluate_condition(condition: Any, item: Dict[str, Any], operation: str = "Query") -> bool:
+    """
+    Evaluate a boto3 condition (boto3.dynamodb.conditions Key/Attr expressions) against an item.
+
+    Args:
+        condition: Condition built with Key or Attr
+        item: Item to test
+        operation: DynamoDB operation name used in errors
+
+    Returns:
+        True if the item satisfies the condition
+
+    Raises:
+        ClientError: ValidationException for string expressions and unsupported operators
+    """
+    if not hasattr(condition, "get_expression"):
+        raise _validation_error("InMemoryTable supports boto3.dynamodb.conditions expressions only", operation)
+    expression = condition.get_expression()
+    op, values = expression["operator"], expression["values"]
+    if op == "AND":
+        return all(evaluate_condition(value, item, operation) for value in values)
+    if op == "OR":
+        return any(evaluate_condition(value, item, operation) for value in values)
+    if op == "NOT":
+        return not evaluate_condition(values[0], item, operation)
+
+    attribute = values[0]
+    operand = _resolve(item, attribute.name.split("."))
+    if isinstance(attribute, Size) and operand is not _MISSING:
+        operand = len(operand) if not isinstance(operand, (int, float, Decimal, bool)) else _MISSING
+    if op == "attribute_exists":
+        return operand is not _MISSING
+    if op == "attribute_not_exists":
+        return operand is _MISSING
+    if operand is _MISSING:
+        return False
+    try:
+        if op == "attribute_type":
+            return _type_code(operand) == values[1]
+        if op == "begins_with":
+            return isinstance(operand, (str, bytes)) and operand.startswith(values[1])
+        if op == "contains":
+            return values[1] in operand
+        if op == "IN":
+            return operand in values[1]
+        if op == "BETWEEN":
+            return values[1] <= operand <= values[2]
+        if op in _COMPARISONS:
+            return _COMPARISONS[op](operand, values[1])
+    except TypeError:
+        # Values of different types never match, as in DynamoDB
+        return False
+    raise _validation_error(f"Unsupported condition operator '{op}'", operation)
+
+
+def _split_top_level(text: str, separators: str = ",") -> List[str]:
+    """Split on separators outside parentheses, keeping the separators as their own parts."""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char in separators and depth == 0:
+            parts.append("".join(current).strip())
+            if separators != ",":
+                parts.append(char)
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current).strip())
+    return parts
+
+
+class _CapacityBucket:
+    """Provisioned capacity: refills at the provisioned rate and banks up to burst_seconds of it."""
+
+    def __init__(self, units_per_second: float, burst_seconds: float):
+        self.units_per_second = units_per_second
+        self.burst = units_per_second * max(burst_seconds, 1.0)
+        self._units = self.burst
+        self._updated = time.monotonic()
+
+    def admit(self) -> bool:
+        """Whether a request may start; like DynamoDB, it may then overdraw the balance."""
+        if self.units_per_second <= 0:
+            return True
+        now = time.monotonic()
+        self._units = min(self.burst, self._units + (now - self._updated) * self.units_per_second)
+        self._updated = now
+        return self._units > 0
+
+    def consume(self, units: float) -> None:
+        if self.units_per_second > 0:
+            self._units -= units
+
+
+class _KeyIndex:
+    """Partition key -> primary keys of the items in it, for the table or a global secondary index."""
+
+    def __init__(self, partition_key: str, sort_key: Optional[str]):
+        self.partition_key = partition_key
+        self.sort_key = sort_key
+        self.partitions: Dict[Any, Dict[tuple, None]] = {}
+
+    def covers(self, item: Optional[Dict[str, Any]]) -> bool:
+        """Whether the item appears in the index (indexes are sparse: every key attribute is needed)."""
+        return item is not None and self.partition_key in item and (
+            self.sort_key is None or self.sort_key in item)
+
+    def add(self, key: tuple, item: Dict[str, Any]) -> None:
+        if self.covers(item):
+            self.partitions.setdefault(item[self.partition_key], {})[key] = None
+
+    def remove(self, key: tuple, item: Optional[Dict[str, Any]]) -> None:
+        if self.covers(item):
+            members = self.partitions.get(item[self.partition_key], {})
+            members.pop(key, None)
+            if not members:
+                self.partitions.pop(item[self.partition_key], None)
+
+
+class InMemoryTable:
+    """Dictionary-backed table with the boto3 Table interface DynamoDBManager uses."""
+
+    def __init__(
+        self,
+        table_name: str = "HauntedHelpdeskTickets",
+        key: str = "ticket_id",
+        sort_key: Optional[str] = None,
+        indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None,
+        latency: str = MEMORY_STORAGE_LATENCY,
+        read_capacity: float = MEMORY_STORAGE_READ_CAPACITY,
+        write_capacity: float = MEMORY_STORAGE_WRITE_CAPACITY,
+        burst_seconds: float = MEMORY_STORAGE_BURST_SECONDS,
+        page_size: Optional[int] = None,
+        page_bytes: int = PAGE_BYTES,
+        seed: int = SIM_SEED
+    ):
+        """
+        Initialize an empty table.
+
+        Args:
+            table_name: Table name reported in consumed capacity
+            key: Partition key attribute
+            sort_key: Sort key attribute, if the table has one
+            indexes: Global secondary indexes: partition and sort key (or None) by name
+            latency: Latency distribution slept before each call ("fixed:0" for none)
+            read_capacity: Provisioned read capacity units per second (0 = on-demand, never throttled)
+            write_capacity: Provisioned write capacity units per second (0 = on-demand); index
+                writes draw on it too
+            burst_seconds: Unused capacity banked for bursts, in seconds of provisioned rate
+            page_size: Default item limit per scan or query page
+            page_bytes: Bytes read per scan or query page (DynamoDB stops at 1 MB)
+            seed: Seed for sampled latencies
+        """
+        self.table_name = table_name
+        self.key = key
+        self.sort_key = sort_key
+        self.latency = LatencyDistribution(latency)
+        self.page_size = page_size
+        self.page_bytes = page_bytes
+        self.items: Dict[tuple, Dict[str, Any]] = {}
+        self._sizes: Dict[tuple, int] = {}
+        self._order: List[Optional[tuple]] = []
+        self._positions: Dict[tuple, int] = {}
+        self._primary = _KeyIndex(key, sort_key)
+        self.indexes = {name: _KeyIndex(*keys) for name, keys in (indexes or {}).items()}
+        self._read_bucket = _CapacityBucket(read_capacity, burst_seconds)
+        self._write_bucket = _CapacityBucket(write_capacity, burst_seconds)
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._stats = {"read_capacity_units": 0.0, "write_capacity_units": 0.0,
+                       "throttled_reads": 0, "throttled_writes": 0}
+        self._operations: Dict[str, int] = {}
+
+    # Keys and bookkeeping
+
+    def _key_of(self, item: Dict[str, Any], operation: str) -> tuple:
+        try:
+            if self.sort_key is None:
+                return (item[self.key],)
+            return (item[self.key], item[self.sort_key])
+        except KeyError:
+            raise _validation_error("The provided key element does not match the schema", operation)
+
+    def _key_attributes(self, item: Dict[str, Any], index: Optional[_KeyIndex] = None) -> Dict[str, Any]:
+        names = [self.key, self.sort_key] + ([index.partition_key, index.sort_key] if index else [])
+        return {name: item[name] for name in names if name is not None and name in item}
+
+    def _store(self, key: tuple, item: Optional[Dict[str, Any]]) -> None:
+        """Replace (or delete, with None) the item under key, keeping indexes and scan order current."""
+        old = self.items.get(key)
+        for index in (self._primary, *self.indexes.values()):
+            index.remove(key, old)
+        if item is None:
+            if old is not None:
+                del self.items[key], self._sizes[key]
+                self._order[self._positions.pop(key)] = None
+            return
+        if old is None:
+            self._positions[key] = len(self._order)
+            self._order.append(key)
+        self.items[key] = item
+        self._sizes[key] = item_size(item)
+        for index in (self._primary, *self.indexes.values()):
+            index.add(key, item)
+
+    def load(self, items: List[Dict[str, Any]]) -> None:
+        """Bulk-load items without latency, capacity accounting or throttling."""
+        with self._lock:
+            for item in items:
+                self._store(self._key_of(item, "BatchWriteItem"), _copy_item(item))
+
+    # Cost model
+
+    def _begin(self, operation: str, write: bool) -> None:
+        """Sleep the sampled latency, then throttle if provisioned capacity is spent."""
+        with self._lock:
+            delay = self.latency.sample(self._rng)
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self._operations[operation] = self._operations.get(operation, 0) + 1
+            if not (self._write_bucket if write else self._read_bucket).admit():
+                self._stats["throttled_writes" if write else "throttled_reads"] += 1
+                raise _client_error(
+                    "ProvisionedThroughputExceededException",
+                    f"The level of configured provisioned throughput for the table was exceeded ({operation})",
+                    operation)
+
+    def _read_units(self, size: int, consistent: bool) -> float:
+        units = max(1, math.ceil(size / READ_UNIT_BYTES))
+        return float(units) if consistent else units / 2
+
+    def _consume(self, write: bool, table_units: float, index_units: Dict[str, float],
+                 return_consumed: str) -> Dict[str, Any]:
+        """Charge the units and build the ConsumedCapacity part of the response."""
+        total = table_units + sum(index_units.values())
+        with self._lock:
+            (self._write_bucket if write else self._read_bucket).consume(total)
+            self._stats["write_capacity_units" if write else "read_capacity_units"] += total
+        if return_consumed not in ("TOTAL", "INDEXES"):
+            return {}
+        consumed: Dict[str, Any] = {"TableName": self.table_name, "CapacityUnits": total,
+                                    "WriteCapacityUnits" if write else "ReadCapacityUnits": total}
+        if return_consumed == "INDEXES":
+            consumed["Table"] = {"CapacityUnits": table_units}
+            if index_units:
+                consumed["GlobalSecondaryIndexes"] = {name: {"CapacityUnits": units}
+                                                      for name, units in index_units.items()}
+        return {"ConsumedCapacity": consumed}
+
+    def _write_units(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> Tuple[float, Dict[str, float]]:
+        sizes = [item_size(item) for item in (old, new) if item is not None] or [0]
+        units = float(max(1, math.ceil(max(sizes) / WRITE_UNIT_BYTES)))
+        index_units = {}
+        for name, index in self.indexes.items():
+            in_old, in_new = index.covers(old), index.covers(new)
+            moved = in_old and in_new and any(old.get(k) != new.get(k) for k in (index.partition_key, index.sort_key) if k)
+            if in_old or in_new:
+                # Changing an index key deletes the old index entry and writes a new one
+                index_units[name] = units * (2 if moved else 1)
+        return units, index_units
+
+    # Item operations
+
+    def _check(self, condition: Any, item: Optional[Dict[str, Any]], operation: str) -> None:
+        if condition is not None and not evaluate_condition(condition, item or {}, operation):
+            raise _client_error("ConditionalCheckFailedException", "The conditional request failed", operation)
+
+    def get_item(self, Key: Dict[str, Any], ConsistentRead: bool = False, ReturnConsumedCapacity: str = "NONE",
+                 **kwargs: Any) -> Dict[str, Any]:
+        self._begin("GetItem", write=False)
+        with self._lock:
+            key = self._key_of(Key, "GetItem")
+            item = self.items.get(key)
+            response = {"Item": _copy_item(item)} if item is not None else {}
+            size = self._sizes.get(key, 0)
+        response.update(self._consume(False, self._read_units(size, ConsistentRead), {}, ReturnConsumedCapacity))
+        return response
+
+    def put_item(self, Item: Dict[str, Any], ConditionExpression: Any = None, ReturnValues: str = "NONE",
+                 ReturnConsumedCapacity: str = "NONE", **kwargs: Any) -> Dict[str, Any]:
+        self._begin("PutItem", write=True)
+        with self._lock:
+            key = self._key_of(Item, "PutItem")
+            old = self.items.get(key)
+            self._check(ConditionExpression, old, "PutItem")
+            new = _copy_item(Item)
+            units, index_units = self._write_units(old, new)
+            self._store(key, new)
+        response = {"Attributes": _copy_item(old)} if ReturnValues == "ALL_OLD" and old is not None else {}
+        response.update(self._consume(True, units, index_units, ReturnConsumedCapacity))
+        return response
+
+    def delete_item(self, Key: Dict[str, Any], ConditionExpression: Any = None, ReturnValues: str = "NONE",
+                    ReturnConsumedCapacity: str = "NONE", **kwargs: Any) -> Dict[str, Any]:
+        self._begin("DeleteItem", write=True)
+        with self._lock:
+            key = self._key_of(Key, "DeleteItem")
+            old = self.items.get(key)
+            self._check(ConditionExpression, old, "DeleteItem")
+            units, index_units = self._write_units(old, None)
+            self._store(key, None)
+        response = {"Attributes": old} if ReturnValues == "ALL_OLD" and old is not None else {}
+        response.update(self._consume(True, units, index_units, ReturnConsumedCapacity))
+        return response
+
+    def update_item(
+        self,
+        Key: Dict[str, Any],
+        UpdateExpression: str,
+        ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+        ExpressionAttributeValues: Optional[Dict[str, Any]] = None,
+        ConditionExpression: Any = None,
+        ReturnValues: str = "NONE",
+        ReturnConsumedCapacity: str = "NONE",
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        self._begin("UpdateItem", write=True)
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        with self._lock:
+            key = self._key_of(Key, "UpdateItem")
+            old = self.items.get(key)
+            self._check(ConditionExpression, old, "UpdateItem")
+            # Like DynamoDB, updating a missing item creates it
+            new = _copy_item(old) if old is not None else dict(Key)
+            updated = self._apply_update(new, UpdateExpression, names, values)
+            units, index_units = self._write_units(old, new)
+            self._store(key, new)
+
+        response: Dict[str, Any] = {}
+        if ReturnValues == "ALL_NEW":
+            response["Attributes"] = _copy_item(new)
+        elif ReturnValues == "ALL_OLD" and old is not None:
+            response["Attributes"] = _copy_item(old)
+        elif ReturnValues in ("UPDATED_NEW", "UPDATED_OLD"):
+            source = new if ReturnValues == "UPDATED_NEW" else (old or {})
+            response["Attributes"] = {name: copy.deepcopy(source[name]) for name in updated if name in source}
+        response.update(self._consume(True, units, index_units, ReturnConsumedCapacity))
+        return response
+
+    def _path(self, text: str, names: Dict[str, str]) -> List[str]:
+        parts = []
+        for part in text.strip().split("."):
+            if part.startswith("#"):
+                if part not in names:
+                    raise _validation_error(f"Unknown attribute name placeholder {part}", "UpdateItem")
+                part = names[part]
+            parts.append(part)
+        return parts
+
+    def _operand(self, text: str, item: Dict[str, Any], names: Dict[str, str], values: Dict[str, Any]) -> Any:
+        text = text.strip()
+        function = _FUNCTION.fullmatch(text)
+        if function:
+            first, second = _split_top_level(function.group(2))
+            if function.group(1) == "if_not_exists":
+                current = _resolve(item, self._path(first, names))
+                return current if current is not _MISSING else self._operand(second, item, names, values)
+            return list(self._operand(first, item, names, values)) + list(self._operand(second, item, names, values))
+        parts = _split_top_level(text, "+-")
+        if len(parts) == 3:
+            left, sign, right = parts
+            left, right = self._operand(left, item, names, values), self._operand(right, item, names, values)
+            return left + right if sign == "+" else left - right
+        if text.startswith(":"):
+            if text not in values:
+                raise _validation_error(f"Unknown attribute value placeholder {text}", "UpdateItem")
+            return copy.deepcopy(values[text])
+        value = _resolve(item, self._path(text, names))
+        if value is _MISSING:
+            raise _validation_error(f"The update expression refers to a missing attribute: {text}", "UpdateItem")
+        return copy.deepcopy(value)
+
+    def _target(self, item: Dict[str, Any], path: List[str]) -> Tuple[Dict[str, Any], str]:
+        if path[0] in (self.key, self.sort_key):
+            raise _validation_error(f"Cannot update attribute {path[0]}. This attribute is part of the key",
+                                    "UpdateItem")
+        parent = _resolve(item, path[:-1]) if len(path) > 1 else item
+        if not isinstance(parent, dict):
+            raise _validation_error("The document path provided in the update expression is invalid", "UpdateItem")
+        return parent, path[-1]
+
+    def _apply_update(self, item: Dict[str, Any], expression: str, names: Dict[str, str],
+                      values: Dict[str, Any]) -> List[str]:
+        """Apply SET/REMOVE/ADD/DELETE clauses in place; returns the top-level attributes touched."""
+        updated = []
+        pieces = _UPDATE_CLAUSE.split(expression)
+        if pieces[0].strip():
+            raise _validation_error(f"Invalid UpdateExpression: {expression}", "UpdateItem")
+        for clause, body in zip(pieces[1::2], pieces[2::2]):
+            clause = clause.upper()
+            for action in [action for action in _split_top_level(body) if action]:
+                if clause == "SET":
+                    target, _, value = action.partition("=")
+                    path = self._path(target, names)
+                    parent, name = self._target(item, path)
+                    parent[name] = self._operand(value, item, names, values)
+                elif clause == "REMOVE":
+                    path = self._path(action, names)
+                    parent, name = self._target(item, path)
+                    parent.pop(name, None)
+                else:
+                    target, _, value = action.strip().partition(" ")
+                    path = self._path(target, names)
+                    parent, name = self._target(item, path)
+                    operand = self._operand(value, item, names, values)
+                    current = parent.get(name)
+                    if clause == "DELETE":
+                        if current is not None:
+                            parent[name] = set(current) - set(operand)
+                    elif isinstance(operand, (int, float, Decimal)):
+                        parent[name] = (current or 0) + operand
+                    else:
+                        parent[name] = set(current or ()) | set(operand)
+                updated.append(path[0])
+        return updated
+
+    # Scan and query
+
+    def _page(self, keys: Any, operation: str, index: Optional[_KeyIndex], limit: Optional[int],
+              filter_expression: Any, consistent: bool, index_name: Optional[str],
+              return_consumed: str) -> Dict[str, Any]:
+        """Read keys in order until the item limit or page byte limit, then filter and charge the read."""
+        limit = limit or self.page_size
+        items, scanned, size, last = [], 0, 0, None
+        with self._lock:
+            more = False
+            for key in keys:
+                if scanned and ((limit and scanned >= limit) or size >= self.page_bytes):
+                    more = True
+                    break
+                item = self.items[key]
+                scanned += 1
+                size += self._sizes[key]
+                last = key
+                if filter_expression is None or evaluate_condition(filter_expression, item, operation):
+                    items.append(_copy_item(item))
+            last_item = self.items[last] if more else None
+        response: Dict[str, Any] = {"Items": items, "Count": len(items), "ScannedCount": scanned}
+        if last_item is not None:
+            response["LastEvaluatedKey"] = self._key_attributes(last_item, index)
+        units = self._read_units(size, consistent)
+        response.update(self._consume(False, 0.0 if index_name else units,
+                                      {index_name: units} if index_name else {}, return_consumed))
+        return response
+
+    def _index(self, index_name: Optional[str], consistent: bool, operation: str) -> _KeyIndex:
+        if index_name is None:
+            return self._primary
+        if index_name not in self.indexes:
+            raise _validation_error(f"The table does not have the specified index: {index_name}", operation)
+        if consistent:
+            raise _validation_error("Consistent reads are not supported on global secondary indexes", operation)
+        return self.indexes[index_name]
+
+    def scan(self, ExclusiveStartKey: Optional[Dict[str, Any]] = None, Limit: Optional[int] = None,
+             FilterExpression: Any = None, IndexName: Optional[str] = None, ConsistentRead: bool = False,
+             ReturnConsumedCapacity: str = "NONE", **kwargs: Any) -> Dict[str, Any]:
+        self._begin("Scan", write=False)
+        index = self._index(IndexName, ConsistentRead, "Scan")
+        with self._lock:
+            start = 0
+            if ExclusiveStartKey is not None:
+                start = self._positions[self._key_of(ExclusiveStartKey, "Scan")] + 1
+        # Consumed by _page under the lock; deleted items leave None in the scan order
+        keys = (key for key in (self._order[position] for position in range(start, len(self._order)))
+                if key is not None and (IndexName is None or index.covers(self.items[key])))
+        return self._page(keys, "Scan", index if IndexName else None, Limit, FilterExpression, ConsistentRead,
+                          IndexName, ReturnConsumedCapacity)
+
+    def query(self, KeyConditionExpression: Any, IndexName: Optional[str] = None, ScanIndexForward: bool = True,
+              ExclusiveStartKey: Optional[Dict[str, Any]] = None, Limit: Optional[int] = None,
+              FilterExpression: Any = None, ConsistentRead: bool = False, ReturnConsumedCapacity: str = "NONE",
+              **kwargs: Any) -> Dict[str, Any]:
+        self._begin("Query", write=False)
+        index = self._index(IndexName, ConsistentRead, "Query")
+        conditions = [KeyConditionExpression]
+        while conditions[0].get_expression()["operator"] == "AND":
+            conditions = list(conditions[0].get_expression()["values"]) + conditions[1:]
+        partition = [condition for condition in conditions
+                     if condition.get_expression()["values"][0].name == index.partition_key
+                     and condition.get_expression()["operator"] == "="]
+        if len(partition) != 1 or len(conditions) > 2:
+            raise _validation_error(
+                f"Query key condition must be an equality on {index.partition_key} and at most one sort key "
+                "condition", "Query")
+
+        with self._lock:
+            members = list(index.partitions.get(partition[0].get_expression()["values"][1], {}))
+            candidates = [key for key in members if evaluate_condition(KeyConditionExpression, self.items[key])]
+            if index.sort_key is not None:
+                candidates.sort(key=lambda key: self.items[key][index.sort_key], reverse=not ScanIndexForward)
+            if ExclusiveStartKey is not None:
+                start = self._key_of(ExclusiveStartKey, "Query")
+                candidates = candidates[candidates.index(start) + 1:] if start in candidates else []
+        return self._page(iter(candidates), "Query", index if IndexName else None, Limit, FilterExpression,
+                          ConsistentRead, IndexName, ReturnConsumedCapacity)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get item count, consumed capacity and throttling totals.
+
+        Returns:
+            Dictionary containing:
+            - items: Number of items
+            - read_capacity_units / write_capacity_units: Units consumed so far (index writes included)
+            - throttled_reads / throttled_writes: Requests rejected for exceeding provisioned capacity
+            - operations: Calls per operation (throttled calls included)
+        """
+        with self._lock:
+            return {"items": len(self.items), **{key: round(value, 2) if isinstance(value, float) else value
+                                                 for key, value in self._stats.items()},
+                    "operations": dict(self._operations)}
+
+
+class StorageBackend:
+    """Where DynamoDBManager's table lives: opens table handles and reports their health."""
+
+    name = ""
+
+    def open_table(self, table_name: str) -> Any:
+        """Return a handle with the boto3 Table interface for the named table."""
+        raise NotImplementedError
+
+    def check_table(self, table_name: str) -> Dict[str, Any]:
+        """Health check result for the table, shaped like health.check_dynamodb."""
+        raise NotImplementedError
+
+
+class DynamoDBBackend(StorageBackend):
+    """Tables in AWS DynamoDB, through the boto3 resource API."""
+
+    name = "dynamodb"
+
+    def open_table(self, table_name: str) -> Any:
+        return boto3.resource("dynamodb").Table(table_name)
+
+    def check_table(self, table_name: str) -> Dict[str, Any]:
+        from health import check_dynamodb
+
+        return check_dynamodb(table_name)
+
+
+class InMemoryBackend(StorageBackend):
+    """Tables held in this process; each table name opens the same InMemoryTable."""
+
+    name = "memory"
+
+    def __init__(self, indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None, **table_options: Any):
+        """
+        Initialize the backend.
+
+        Args:
+            indexes: Global secondary indexes of every table (defaults to MEMORY_STORAGE_INDEXES)
+            **table_options: InMemoryTable options (latency, read_capacity, write_capacity, ...)
+        """
+        self.indexes = parse_indexes(MEMORY_STORAGE_INDEXES) if indexes is None else indexes
+        self.table_options = table_options
+        self.tables: Dict[str, InMemoryTable] = {}
+        self._lock = threading.Lock()
+
+    def open_table(self, table_name: str) -> InMemoryTable:
+        with self._lock:
+            if table_name not in self.tables:
+                self.tables[table_name] = InMemoryTable(table_name, indexes=self.indexes, **self.table_options)
+                logger.info(f"Using in-memory ticket table {table_name}; its data is lost when the process exits")
+            return self.tables[table_name]
+
+    def check_table(self, table_name: str) -> Dict[str, Any]:
+        return {
+            "available": True,
+            "status": "active",
+            "table_name": table_name,
+            "message": "In-memory table (data is lost on restart)",
+        }
+
+
+STORAGE_BACKENDS = {"dynamodb": DynamoDBBackend, "memory": InMemoryBackend}
+
+
+def create_storage_backend(name: Optional[str] = None) -> StorageBackend:
+    """
+    Create a storage backend by name.
+
+    Args:
+        name: "dynamodb" or "memory" (defaults to TICKET_STORAGE_BACKEND)
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    name = (name or TICKET_STORAGE_BACKEND).lower()
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown ticket storage backend '{name}' (expected one of: {', '.join(STORAGE_BACKENDS)})")
+    return STORAGE_BACKENDS[name]()
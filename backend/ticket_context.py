@@ -0,0 +1,256 @@
+"""
+Ticket Context Compaction for Haunted Helpdesk
+
+Keeps a structured TicketState for routed workflows and renders a compact, token-budgeted
+prompt view of it for each agent step.
+"""
+
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Context compaction configuration
+CONTEXT_COMPACTION_ENABLED = os.getenv("CONTEXT_COMPACTION_ENABLED", "true").lower() == "true"
+
+# Rough characters-per-token ratio for English text and logs
+CHARS_PER_TOKEN = 4
+
+DEFAULT_TOKEN_BUDGETS = {
+    "orchestrator_agent": 1000,
+    "memory_agent": 1000,
+    "ticketing_agent": 1500,
+    "network_diagnostic_agent": 3000,
+    "cloud_service_agent": 3000,
+    "summarization_agent": 2500,
+}
+
+
+def _parse_budget_overrides(value: str) -> Dict[str, int]:
+    """Parse "agent=tokens,agent=tokens" into a dictionary."""
+    overrides = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, tokens = item.split("=", 1)
+            overrides[name.strip()] = int(tokens)
+    return overrides
+
+
+# Per-agent budget overrides, e.g. CONTEXT_TOKEN_BUDGETS="summarization_agent=1500"
+CONTEXT_TOKEN_BUDGETS = dict(DEFAULT_TOKEN_BUDGETS, **_parse_budget_overrides(os.getenv("CONTEXT_TOKEN_BUDGETS", "")))
+
+# Fields each workflow step needs, in prompt order. "ticket" is the fixed ticket header.
+STEP_VIEWS: Dict[str, Dict[str, Any]] = {
+    "memory_lookup": {
+        "agent": "memory_agent",
+        "preamble": "Retrieve any stored resolution for this ticket:",
+        "fields": ["title", "description"],
+    },
+    "ticket_analysis": {
+        "agent": "ticketing_agent",
+        "preamble": "NO_MEMORY_FOUND",
+        "fields": ["ticket", "description"],
+    },
+    "routing": {
+        "agent": "orchestrator_agent",
+        "fields": ["ticket", "description", "analysis"],
+        "closing": "Which worker should diagnose this ticket? Reply with the agent name: network_diagnostic_agent "
+                   "or cloud_service_agent, or both names if the issue involves both.",
+    },
+    "diagnosis": {
+        "agent": None,  # network and/or cloud worker
+        "fields": ["ticket", "description", "analysis"],
+        "closing": "Diagnose and resolve this issue.",
+    },
+    "memory_store": {
+        "agent": "memory_agent",
+        "preamble": "STORE this resolution.",
+        "fields": ["query", "resolution"],
+    },
+    "summarization": {
+        "agent": "summarization_agent",
+        "fields": ["ticket", "description", "resolution"],
+    },
+    "ticket_close": {
+        "agent": "ticketing_agent",
+        "preamble": "WORKFLOW_COMPLETE: Update the ticket with this summary.",
+        "fields": ["summary"],
+    },
+}
+
+FIELD_LABELS = {
+    "title": "Title",
+    "description": "Description",
+    "analysis": "Ticketing analysis",
+    "query": "Query",
+    "resolution": "Resolution details",
+    "summary": None,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def _trim_middle(text: str, max_chars: int) -> str:
+    """Shorten text to about max_chars, keeping its head and tail."""
+    if len(text) <= max_chars:
+        return text
+    omitted = len(text) - max_chars
+    head = max_chars * 2 // 3
+    tail = max_chars - head
+    return f"{text[:head]}\n...[{omitted} characters omitted]...\n{text[len(text) - tail:] if tail else ''}"
+
+
+def _fit_fields(values: List[str], available_chars: int) -> List[str]:
+    """
+    Trim fields to fit in available_chars, cutting the longest fields first.
+
+    Finds the largest per-field cap such that all fields, each capped, fit; short
+    fields are left untouched.
+    """
+    if sum(len(value) for value in values) <= available_chars:
+        return values
+
+    remaining = max(available_chars, 0)
+    ordered = sorted(range(len(values)), key=lambda index: len(values[index]))
+    cap = None
+    for position, index in enumerate(ordered):
+        share = remaining // (len(values) - position)
+        if len(values[index]) <= share:
+            remaining -= len(values[index])
+        else:
+            # This and every longer field get the same share
+            cap = share
+            break
+    if cap is None:
+        return values
+    return [value if len(value) <= cap else _trim_middle(value, cap) for value in values]
+
+
+@dataclass
+class TicketState:
+    """Structured state of a ticket as it moves through the workflow."""
+    ticket_id: str
+    title: str
+    description: str
+    severity: str = ""
+    category: str = ""
+    created_at: str = ""
+    memory_match: Optional[str] = None
+    analysis: Optional[str] = None
+    findings: Dict[str, str] = field(default_factory=dict)
+    resolution: Optional[str] = None
+    summary: Optional[str] = None
+
+    @classmethod
+    def from_ticket(cls, ticket: Dict[str, Any], description: Optional[str] = None) -> "TicketState":
+        """
+        Build the state for a ticket record.
+
+        Args:
+            ticket: Ticket record from DynamoDB
+            description: Description to use instead of the stored one (e.g. with image analysis)
+        """
+        return cls(
+            ticket_id=ticket["ticket_id"],
+            title=ticket["title"],
+            description=description if description is not None else ticket["description"],
+            severity=ticket.get("severity", ""),
+            category=ticket.get("category", ""),
+            created_at=ticket.get("created_at", ""),
+        )
+
+    def header(self) -> str:
+        """Ticket facts that every detailed view starts with (without the per-ticket ID and creation time)."""
+        return f"Title: {self.title}\nSeverity: {self.severity}\nCategory: {self.category}"
+
+    def field_value(self, name: str) -> str:
+        """Return the text of a state field for rendering."""
+        if name == "query":
+            return f"{self.title} {self.description}"
+        if name == "resolution":
+            return self.resolution or self.memory_match or ""
+        return getattr(self, name) or ""
+
+    def render(self, step: str, budget_tokens: Optional[int] = None) -> str:
+        """
+        Render the prompt for a workflow step.
+
+        Args:
+            step: Step name from STEP_VIEWS
+            budget_tokens: Token budget for the prompt (None or compaction disabled: no trimming)
+
+        Returns:
+            Prompt text containing only the fields the step needs
+        """
+        view = STEP_VIEWS[step]
+        names = [name for name in view["fields"] if name != "ticket"]
+        values = [self.field_value(name) for name in names]
+
+        fixed_parts = [view.get("preamble", ""), self.header() if "ticket" in view["fields"] else "",
+                       view.get("closing", "")]
+        fixed_parts += [f"{FIELD_LABELS[name]}:\n" if FIELD_LABELS[name] else "" for name in names]
+        if budget_tokens and CONTEXT_COMPACTION_ENABLED:
+            fixed_chars = sum(len(part) + 1 for part in fixed_parts)
+            values = _fit_fields(values, budget_tokens * CHARS_PER_TOKEN - fixed_chars)
+
+        sections = [view.get("preamble", "")]
+        if "ticket" in view["fields"]:
+            sections.append(self.header())
+        for name, value in zip(names, values):
+            sections.append(f"{FIELD_LABELS[name]}:\n{value}" if FIELD_LABELS[name] else value)
+        sections.append(view.get("closing", ""))
+        return "\n".join(section for section in sections if section)
+
+
+class ContextLedger:
+    """Per-agent token accounting for one workflow run."""
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None):
+        """
+        Initialize the ledger.
+
+        Args:
+            budgets: Token budget per agent name (defaults to CONTEXT_TOKEN_BUDGETS)
+        """
+        self.budgets = dict(CONTEXT_TOKEN_BUDGETS if budgets is None else budgets)
+        self._by_agent: Dict[str, Dict[str, int]] = {}
+        # Everything the swarm would carry in its shared conversation so far
+        self._history_tokens = 0
+
+    def budget_for(self, agent_name: str) -> Optional[int]:
+        """Token budget of an agent, if any."""
+        return self.budgets.get(agent_name)
+
+    def start(self, ticket_text: str) -> None:
+        """Count the initial ticket, which starts the shared conversation."""
+        self._history_tokens = estimate_tokens(ticket_text)
+
+    def record(self, agent_name: str, prompt: str, reply: str) -> Tuple[int, int]:
+        """
+        Record one agent call.
+
+        Returns:
+            (estimated input tokens, estimated output tokens)
+        """
+        input_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(reply)
+        entry = self._by_agent.setdefault(agent_name, {
+            "calls": 0, "input_tokens": 0, "output_tokens": 0, "uncompacted_input_tokens": 0
+        })
+        entry["calls"] += 1
+        entry["input_tokens"] += input_tokens
+        entry["output_tokens"] += output_tokens
+        entry["uncompacted_input_tokens"] += max(self._history_tokens, input_tokens)
+        self._history_tokens += output_tokens
+        return input_tokens, output_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Per-agent and total token estimates."""
+        totals = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "uncompacted_input_tokens": 0}
+        for entry in self._by_agent.values():
+            for key in totals:
+                totals[key] += entry[key]
+        return {"by_agent": {name: dict(entry) for name, entry in self._by_agent.items()}, "total": totals}
@@ -0,0 +1,366 @@
+"""
+Ticket Scheduler for Haunted Helpdesk
+
+Queues ticket workflows per severity and runs them under global and per-category
+concurrency caps, with admission control and queue position estimates.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from timeout_policy import percentile
+
+
+logger = logging.getLogger("haunted_helpdesk.scheduler")
+
+
+def _parse_mapping(value: str, cast: Callable[[str], Any]) -> Dict[str, Any]:
+    """Parse "key=value,key=value" configuration."""
+    mapping = {}
+    for item in value.split(","):
+        if "=" in item:
+            key, raw = item.split("=", 1)
+            mapping[key.strip().lower()] = cast(raw.strip())
+    return mapping
+
+
+# Scheduler configuration
+SCHEDULER_MAX_CONCURRENT = int(os.getenv("SCHEDULER_MAX_CONCURRENT", "4"))
+SCHEDULER_CATEGORY_LIMITS = _parse_mapping(os.getenv("SCHEDULER_CATEGORY_LIMITS", "network=2"), int)
+SCHEDULER_WEIGHTS = _parse_mapping(os.getenv("SCHEDULER_WEIGHTS", "critical=8,high=4,medium=2,low=1"), float)
+SCHEDULER_MAX_QUEUE = int(os.getenv("SCHEDULER_MAX_QUEUE", "100"))
+SCHEDULER_DEFAULT_SERVICE_SECONDS = float(os.getenv("SCHEDULER_DEFAULT_SERVICE_SECONDS", "60"))
+
+# Severities from highest to lowest priority; unknown severities are scheduled as medium
+SEVERITIES = ["critical", "high", "medium", "low"]
+DEFAULT_SEVERITY = "medium"
+
+# Smoothing of the workflow duration estimate, and samples kept per severity for percentiles
+SERVICE_TIME_ALPHA = 0.2
+STATS_WINDOW = 500
+
+
+class SchedulerFull(Exception):
+    """Raised when a ticket is not admitted because the queue is full."""
+
+
+class TicketAlreadyScheduled(Exception):
+    """Raised when a ticket's workflow is already queued or running."""
+
+
+@dataclass
+class ScheduledTicket:
+    """A ticket waiting for, or holding, a workflow slot."""
+    job_id: int
+    ticket_id: str
+    severity: str
+    category: str
+    job: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+
+
+class TicketScheduler:
+    """Priority scheduler for ticket workflows with concurrency caps and admission control."""
+
+    def __init__(
+        self,
+        max_concurrent: int = SCHEDULER_MAX_CONCURRENT,
+        category_limits: Optional[Dict[str, int]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        max_queue: int = SCHEDULER_MAX_QUEUE,
+        default_service_seconds: float = SCHEDULER_DEFAULT_SERVICE_SECONDS
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrent: Maximum workflows running at once
+            category_limits: Maximum running workflows per ticket category
+            weights: Dequeue weight per severity
+            max_queue: Queued tickets above which non-critical tickets are rejected
+            default_service_seconds: Workflow duration assumed until workflows have completed
+        """
+        self.max_concurrent = max_concurrent
+        self.category_limits = dict(SCHEDULER_CATEGORY_LIMITS if category_limits is None else category_limits)
+        self.weights = {severity: 1.0 for severity in SEVERITIES}
+        self.weights.update(SCHEDULER_WEIGHTS if weights is None else weights)
+        self.max_queue = max_queue
+        self.service_seconds = default_service_seconds
+
+        self._queues: Dict[str, Deque[ScheduledTicket]] = {severity: deque() for severity in SEVERITIES}
+        self._credits: Dict[str, float] = {severity: 0.0 for severity in SEVERITIES}
+        # Running workflows by job ID; tickets queued or running, so none runs twice at once
+        self._running: Dict[int, ScheduledTicket] = {}
+        self._scheduled: set = set()
+        self._job_ids = itertools.count(1)
+        self._tasks: set = set()
+        self._counters = {"admitted": 0, "rejected": 0, "duplicates": 0, "completed": 0, "failed": 0}
+        self._waits: Dict[str, Deque[float]] = {severity: deque(maxlen=STATS_WINDOW) for severity in SEVERITIES}
+        self._resolutions: Dict[str, Deque[float]] = {severity: deque(maxlen=STATS_WINDOW) for severity in SEVERITIES}
+
+    @staticmethod
+    def normalize_severity(severity: Optional[str]) -> str:
+        severity = (severity or "").strip().lower()
+        return severity if severity in SEVERITIES else DEFAULT_SEVERITY
+
+    def queued_count(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def check_admission(self, severity: Optional[str], ticket_id: Optional[str] = None) -> None:
+        """
+        Raise if a ticket would be refused now, without counting it.
+
+        Lets callers refuse a ticket before creating or updating it; submit() applies the
+        same check. A caller that turns the ticket away reports it with record_rejection().
+
+        Raises:
+            TicketAlreadyScheduled: If the ticket is already queued or running
+            SchedulerFull: If the queue is full and the ticket is not critical
+        """
+        if ticket_id is not None and ticket_id in self._scheduled:
+            raise TicketAlreadyScheduled(f"Ticket {ticket_id} is already queued or running")
+        if self.queued_count() >= self.max_queue and self.normalize_severity(severity) != "critical":
+            raise SchedulerFull(f"Ticket queue is full ({self.max_queue} tickets waiting)")
+
+    def record_rejection(self, error: Exception) -> None:
+        """Count a ticket turned away by check_admission() or submit()."""
+        self._counters["duplicates" if isinstance(error, TicketAlreadyScheduled) else "rejected"] += 1
+
+    def submit(
+        self,
+        ticket_id: str,
+        severity: Optional[str],
+        category: Optional[str],
+        job: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Future:
+        """
+        Queue a ticket's workflow. Must be called on the event loop.
+
+        Args:
+            ticket_id: Ticket the workflow runs for
+            severity: Ticket severity (low, medium, high, critical)
+            category: Ticket category (network, cloud, other)
+            job: Coroutine function running the workflow
+
+        Returns:
+            Future resolving to the job's result (awaiting it is optional)
+
+        Raises:
+            TicketAlreadyScheduled: If the ticket is already queued or running
+            SchedulerFull: If the queue is full and the ticket is not critical
+        """
+        try:
+            self.check_admission(severity, ticket_id)
+        except (SchedulerFull, TicketAlreadyScheduled) as e:
+            self.record_rejection(e)
+            raise
+        severity = self.normalize_severity(severity)
+        future = asyncio.get_running_loop().create_future()
+        # Fire-and-forget callers never retrieve a failure; the scheduler logs it instead
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        item = ScheduledTicket(next(self._job_ids), ticket_id, severity, (category or "other").strip().lower(),
+                               job, future)
+        self._scheduled.add(ticket_id)
+        self._queues[severity].append(item)
+        self._counters["admitted"] += 1
+        self._dispatch()
+        if item.started_at is None:
+            logger.info(f"Queued ticket {ticket_id} ({severity}, {item.category}) behind "
+                        f"{self.queued_count() - 1} tickets")
+        return future
+
+    # Dispatching
+
+    def _eligible_index(self, queue: Deque[ScheduledTicket], running_by_category: Dict[str, int]) -> Optional[int]:
+        """Index of the first ticket in a queue whose category is below its cap."""
+        for index, item in enumerate(queue):
+            limit = self.category_limits.get(item.category)
+            if limit is None or running_by_category.get(item.category, 0) < limit:
+                return index
+        return None
+
+    def _pick(self, queues: Dict[str, Deque[ScheduledTicket]], credits: Dict[str, float],
+              running_by_category: Optional[Dict[str, int]] = None) -> Optional[tuple]:
+        """
+        Choose the next ticket by smooth weighted round robin over the eligible queues.
+
+        Every eligible queue earns its weight in credits, the richest queue (ties go to
+        the higher severity) is served and pays back the total weight.
+
+        Returns:
+            (severity, index) of the chosen ticket, or None if no ticket may start
+        """
+        eligible = {}
+        for severity in SEVERITIES:
+            if running_by_category is None:
+                index = 0 if queues[severity] else None
+            else:
+                index = self._eligible_index(queues[severity], running_by_category)
+            if index is not None:
+                eligible[severity] = index
+        if not eligible:
+            return None
+        for severity in eligible:
+            credits[severity] += self.weights[severity]
+        chosen = max(eligible, key=lambda severity: credits[severity])
+        credits[chosen] -= sum(self.weights[severity] for severity in eligible)
+        return chosen, eligible[chosen]
+
+    def get_load(self) -> Dict[str, Dict[str, int]]:
+        """Queued tickets per severity and running workflows per category (cheap enough for every scrape)."""
+        return {
+            "queued": {severity: len(queue) for severity, queue in self._queues.items()},
+            "running": self._running_by_category(),
+        }
+
+    def _running_by_category(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for item in self._running.values():
+            counts[item.category] = counts.get(item.category, 0) + 1
+        return counts
+
+    def _dispatch(self) -> None:
+        """Start queued tickets while slots are free."""
+        while len(self._running) < self.max_concurrent:
+            choice = self._pick(self._queues, self._credits, self._running_by_category())
+            if choice is None:
+                return
+            severity, index = choice
+            queue = self._queues[severity]
+            item = queue[index]
+            del queue[index]
+            item.started_at = time.time()
+            self._running[item.job_id] = item
+            self._waits[severity].append(item.started_at - item.enqueued_at)
+            task = asyncio.get_running_loop().create_task(self._run(item))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, item: ScheduledTicket) -> None:
+        """Run one workflow, then free its slot and start the next ticket."""
+        try:
+            result = await item.job()
+            if not item.future.done():
+                item.future.set_result(result)
+            self._counters["completed"] += 1
+        except asyncio.CancelledError:
+            # Shutdown: don't start further workflows
+            item.future.cancel()
+            self._release(item)
+            raise
+        except Exception as e:
+            logger.error(f"Scheduled workflow for ticket {item.ticket_id} failed: {str(e)}")
+            if not item.future.done():
+                item.future.set_exception(e)
+            self._counters["failed"] += 1
+        finished = time.time()
+        self._release(item)
+        self.service_seconds += SERVICE_TIME_ALPHA * (finished - item.started_at - self.service_seconds)
+        self._resolutions[item.severity].append(finished - item.enqueued_at)
+        self._dispatch()
+
+    def _release(self, item: ScheduledTicket) -> None:
+        """Free a finished workflow's slot; its ticket may be scheduled again."""
+        self._running.pop(item.job_id, None)
+        self._scheduled.discard(item.ticket_id)
+
+    # Queue status
+
+    def _projected_order(self) -> List[ScheduledTicket]:
+        """Queued tickets in the order they are expected to start (category caps ignored)."""
+        queues = {severity: deque(queue) for severity, queue in self._queues.items()}
+        credits = dict(self._credits)
+        order = []
+        while True:
+            choice = self._pick(queues, credits)
+            if choice is None:
+                return order
+            order.append(queues[choice[0]].popleft())
+
+    def _projected_starts(self, now: float) -> Dict[str, tuple]:
+        """Projected (queue position, start time) per queued ticket."""
+        # Slot free times: running workflows finish after the typical duration
+        slots = [max(now, item.started_at + self.service_seconds) for item in self._running.values()]
+        slots += [now] * max(0, self.max_concurrent - len(slots))
+        heapq.heapify(slots)
+        starts = {}
+        for position, item in enumerate(self._projected_order(), start=1):
+            start = heapq.heappop(slots)
+            starts[item.ticket_id] = (position, start)
+            heapq.heappush(slots, start + self.service_seconds)
+        return starts
+
+    def get_queue_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Describe where every queued or running ticket is in the scheduler.
+
+        Returns:
+            Dictionary per ticket ID containing:
+            - state: "queued" or "running"
+            - queue_position: 1-based position among queued tickets (None when running)
+            - estimated_start_time: ISO 8601 projected start (actual start when running)
+        """
+        statuses = {
+            item.ticket_id: {"state": "running", "queue_position": None,
+                             "estimated_start_time": _isoformat(item.started_at)}
+            for item in self._running.values()
+        }
+        for ticket_id, (position, start) in self._projected_starts(time.time()).items():
+            statuses[ticket_id] = {"state": "queued", "queue_position": position,
+                                   "estimated_start_time": _isoformat(start)}
+        return statuses
+
+    def get_ticket_status(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        """Scheduler status of one ticket (see get_queue_status), None if not queued or running."""
+        return self.get_queue_status().get(ticket_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Report queue depth, running workflows and wait statistics.
+
+        Returns:
+            Dictionary containing:
+            - queued: Queued tickets per severity
+            - running: Running workflows per category
+            - max_concurrent, category_limits, weights, max_queue: Configuration
+            - service_seconds: Current workflow duration estimate
+            - admitted, rejected, duplicates, completed, failed: Counters
+            - by_severity: p50/p95 queue wait and time to resolution per severity (seconds)
+        """
+        by_severity = {}
+        for severity in SEVERITIES:
+            waits, resolutions = list(self._waits[severity]), list(self._resolutions[severity])
+            by_severity[severity] = {
+                "p50_wait_seconds": round(percentile(waits, 50), 3) if waits else None,
+                "p95_wait_seconds": round(percentile(waits, 95), 3) if waits else None,
+                "p95_resolution_seconds": round(percentile(resolutions, 95), 3) if resolutions else None,
+            }
+        return {
+            "queued": {severity: len(queue) for severity, queue in self._queues.items()},
+            "running": self._running_by_category(),
+            "max_concurrent": self.max_concurrent,
+            "category_limits": self.category_limits,
+            "weights": self.weights,
+            "max_queue": self.max_queue,
+            "service_seconds": round(self.service_seconds, 3),
+            **self._counters,
+            "by_severity": by_severity,
+        }
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+# Shared ticket scheduler
+ticket_scheduler = TicketScheduler()
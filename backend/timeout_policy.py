@@ -0,0 +1,313 @@
+"""
+Adaptive Timeout Policy for Haunted Helpdesk
+
+Learns workflow and agent timeouts and handoff limits per mode and category from
+recorded runs, falling back to the static defaults until enough samples exist.
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+logger = logging.getLogger("haunted_helpdesk.timeout_policy")
+
+
+# Static limits, used until enough workflows have completed
+SWARM_EXECUTION_TIMEOUT = float(os.getenv("SWARM_EXECUTION_TIMEOUT", "120"))
+SWARM_NODE_TIMEOUT = float(os.getenv("SWARM_NODE_TIMEOUT", "90"))
+SWARM_MAX_HANDOFFS = int(os.getenv("SWARM_MAX_HANDOFFS", "12"))
+SWARM_MAX_ITERATIONS = int(os.getenv("SWARM_MAX_ITERATIONS", "15"))
+
+# Adaptive timeout configuration
+TIMEOUT_POLICY_ENABLED = os.getenv("TIMEOUT_POLICY_ENABLED", "true").lower() == "true"
+TIMEOUT_POLICY_PATH = os.getenv("TIMEOUT_POLICY_PATH", "backend/cache/latency_history.sqlite3")
+TIMEOUT_POLICY_FACTOR = float(os.getenv("TIMEOUT_POLICY_FACTOR", "1.5"))
+TIMEOUT_POLICY_PERCENTILE = float(os.getenv("TIMEOUT_POLICY_PERCENTILE", "99"))
+TIMEOUT_POLICY_MIN_SAMPLES = int(os.getenv("TIMEOUT_POLICY_MIN_SAMPLES", "20"))
+TIMEOUT_POLICY_WINDOW = int(os.getenv("TIMEOUT_POLICY_WINDOW", "500"))
+EXECUTION_TIMEOUT_FLOOR = float(os.getenv("EXECUTION_TIMEOUT_FLOOR", "30"))
+EXECUTION_TIMEOUT_CEILING = float(os.getenv("EXECUTION_TIMEOUT_CEILING", "300"))
+NODE_TIMEOUT_FLOOR = float(os.getenv("NODE_TIMEOUT_FLOOR", "15"))
+NODE_TIMEOUT_CEILING = float(os.getenv("NODE_TIMEOUT_CEILING", "180"))
+MAX_HANDOFFS_FLOOR = int(os.getenv("MAX_HANDOFFS_FLOOR", "6"))
+MAX_HANDOFFS_CEILING = int(os.getenv("MAX_HANDOFFS_CEILING", "20"))
+
+# Extra handoffs allowed above the p99 handoff count, and iterations above the handoff limit
+HANDOFF_MARGIN = 2
+ITERATION_MARGIN = SWARM_MAX_ITERATIONS - SWARM_MAX_HANDOFFS
+
+# Sample kinds
+WORKFLOW_DURATION = "workflow_duration"
+WORKFLOW_HANDOFFS = "workflow_handoffs"
+AGENT_DURATION = "agent_duration"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _clamp(value: float, floor: float, ceiling: float) -> float:
+    return max(floor, min(ceiling, value))
+
+
+@dataclass
+class TimeoutPolicy:
+    """Limits for one ticket's workflow."""
+    execution_timeout: float = SWARM_EXECUTION_TIMEOUT
+    node_timeout: float = SWARM_NODE_TIMEOUT
+    max_handoffs: int = SWARM_MAX_HANDOFFS
+    max_iterations: int = SWARM_MAX_ITERATIONS
+    # Learned timeouts of individual agents (agents without enough samples use node_timeout)
+    agent_timeouts: Dict[str, float] = field(default_factory=dict)
+    category: str = "unknown"
+    mode: str = "swarm"
+    # "default" while the category has too few samples, "learned" otherwise
+    source: str = "default"
+    samples: int = 0
+
+    def timeout_for(self, agent_name: str) -> float:
+        """Timeout of one agent call."""
+        return self.agent_timeouts.get(agent_name, self.node_timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class LatencyHistory:
+    """SQLite store of recent workflow and agent latencies, bounded per key."""
+
+    def __init__(self, path: str = TIMEOUT_POLICY_PATH, window: int = TIMEOUT_POLICY_WINDOW):
+        """
+        Initialize the store. The SQLite file is opened on first use.
+
+        Args:
+            path: SQLite database path
+            window: Most recent samples kept per kind and key
+        """
+        self.path = path
+        self.window = window
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database and create the table. Caller must hold the lock."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS latency_samples ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, key TEXT NOT NULL, "
+                "value REAL NOT NULL, recorded_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_samples_key ON latency_samples (kind, key, id)")
+            self._conn.commit()
+        return self._conn
+
+    def add(self, samples: List[tuple]) -> None:
+        """
+        Record samples and trim each touched key to the window.
+
+        Args:
+            samples: (kind, key, value) tuples
+        """
+        if not samples:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.executemany(
+                    "INSERT INTO latency_samples (kind, key, value, recorded_at) VALUES (?, ?, ?, ?)",
+                    [(kind, key, float(value), now) for kind, key, value in samples]
+                )
+                for kind, key in {(kind, key) for kind, key, _ in samples}:
+                    conn.execute(
+                        "DELETE FROM latency_samples WHERE kind = ? AND key = ? AND id NOT IN ("
+                        "SELECT id FROM latency_samples WHERE kind = ? AND key = ? ORDER BY id DESC LIMIT ?)",
+                        (kind, key, kind, key, self.window)
+                    )
+                conn.commit()
+            except sqlite3.Error as e:
+                # Missing samples only delay learning
+                logger.warning(f"Failed to record latency samples: {str(e)}")
+
+    def values(self, kind: str, key: Optional[str] = None) -> Dict[str, List[float]]:
+        """
+        Return recorded values of a kind, by key.
+
+        Args:
+            kind: Sample kind
+            key: Only return this key (None returns all keys)
+        """
+        query = "SELECT key, value FROM latency_samples WHERE kind = ?"
+        params: tuple = (kind,)
+        if key is not None:
+            query += " AND key = ?"
+            params += (key,)
+        with self._lock:
+            rows = self._connection().execute(query, params).fetchall()
+        grouped: Dict[str, List[float]] = {}
+        for row_key, value in rows:
+            grouped.setdefault(row_key, []).append(value)
+        return grouped
+
+
+class AdaptiveTimeoutPolicy:
+    """Derives per-ticket workflow limits from the latency history."""
+
+    def __init__(
+        self,
+        history: Optional[LatencyHistory] = None,
+        factor: float = TIMEOUT_POLICY_FACTOR,
+        pct: float = TIMEOUT_POLICY_PERCENTILE,
+        min_samples: int = TIMEOUT_POLICY_MIN_SAMPLES
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            history: Latency store (defaults to a store at TIMEOUT_POLICY_PATH)
+            factor: Safety factor applied to the percentile latency
+            pct: Percentile of the recorded latencies the limits are based on
+            min_samples: Samples a category or agent needs before its limits are learned
+        """
+        self.history = history or LatencyHistory()
+        self.factor = factor
+        self.pct = pct
+        self.min_samples = min_samples
+
+    def _timeout(self, values: List[float], floor: float, ceiling: float) -> float:
+        return round(_clamp(percentile(values, self.pct) * self.factor, floor, ceiling), 1)
+
+    def policy_for(
+        self,
+        category: Optional[str],
+        mode: str = "swarm",
+        execution_timeout: float = SWARM_EXECUTION_TIMEOUT,
+        node_timeout: float = SWARM_NODE_TIMEOUT
+    ) -> TimeoutPolicy:
+        """
+        Choose the limits for a ticket of a category.
+
+        Args:
+            category: Ticket category (network, cloud, other)
+            mode: Workflow mode the limits are for (swarm or router)
+            execution_timeout: Workflow timeout until the category's is learned
+            node_timeout: Agent timeout until the agents' are learned
+
+        Returns:
+            TimeoutPolicy (the static defaults while the category has too few samples)
+        """
+        category = (category or "unknown").strip().lower()
+        policy = TimeoutPolicy(execution_timeout=execution_timeout, node_timeout=node_timeout,
+                               category=category, mode=mode)
+        key = f"{mode}:{category}"
+        try:
+            durations = self.history.values(WORKFLOW_DURATION, key).get(key, [])
+            handoffs = self.history.values(WORKFLOW_HANDOFFS, key).get(key, [])
+            agent_durations = {
+                agent_key.split(":", 1)[1]: values
+                for agent_key, values in self.history.values(AGENT_DURATION).items()
+                if agent_key.startswith(f"{mode}:")
+            }
+        except sqlite3.Error as e:
+            logger.warning(f"Latency history unavailable, using default timeouts: {str(e)}")
+            return policy
+
+        policy.agent_timeouts = {
+            agent: self._timeout(values, NODE_TIMEOUT_FLOOR, NODE_TIMEOUT_CEILING)
+            for agent, values in agent_durations.items() if len(values) >= self.min_samples
+        }
+        # The swarm has a single node timeout: it is learned only once every agent recorded in the mode is
+        if policy.agent_timeouts and len(policy.agent_timeouts) == len(agent_durations):
+            policy.node_timeout = max(policy.agent_timeouts.values())
+
+        policy.samples = len(durations)
+        if len(durations) < self.min_samples:
+            return policy
+
+        policy.source = "learned"
+        policy.execution_timeout = self._timeout(durations, EXECUTION_TIMEOUT_FLOOR, EXECUTION_TIMEOUT_CEILING)
+        if handoffs:
+            policy.max_handoffs = int(_clamp(
+                math.ceil(percentile(handoffs, self.pct)) + HANDOFF_MARGIN, MAX_HANDOFFS_FLOOR, MAX_HANDOFFS_CEILING
+            ))
+            policy.max_iterations = policy.max_handoffs + ITERATION_MARGIN
+        return policy
+
+    def record(self, category: Optional[str], execution_time: float, handoffs: int,
+               agent_durations: List[tuple], mode: str = "swarm") -> None:
+        """
+        Record a completed workflow.
+
+        Args:
+            category: Ticket category
+            execution_time: Workflow duration in seconds
+            handoffs: Number of agent invocations (or swarm handoffs)
+            agent_durations: (agent_name, seconds) per agent call
+            mode: Workflow mode that ran (swarm or router)
+        """
+        key = f"{mode}:{(category or 'unknown').strip().lower()}"
+        samples = [(WORKFLOW_DURATION, key, execution_time), (WORKFLOW_HANDOFFS, key, handoffs)]
+        samples += [(AGENT_DURATION, f"{mode}:{agent}", duration) for agent, duration in agent_durations]
+        self.history.add(samples)
+
+    def record_result(self, category: Optional[str], workflow_result: Dict[str, Any]) -> None:
+        """
+        Record a completed router workflow from its result.
+
+        Steps replayed from the response cache or resumed from checkpoints did not
+        run, and branches that timed out or failed did not finish, so they are left
+        out of the agent latencies.
+        """
+        steps = workflow_result.get("conversation_history", [])
+        self.record(
+            category,
+            workflow_result.get("execution_time", 0.0),
+            len(workflow_result.get("handoff_sequence", [])),
+            [(step["agent_name"], step["duration"]) for step in steps
+             if "duration" in step and "status" not in step and not step.get("cached") and not step.get("resumed")],
+            mode="router"
+        )
+
+    def record_swarm_result(self, category: Optional[str], result: Any, execution_time: float) -> None:
+        """Record a completed swarm workflow from its SwarmResult."""
+        node_results = getattr(result, "results", None) or {}
+        self.record(
+            category,
+            execution_time,
+            len(getattr(result, "node_history", None) or []),
+            [(name, node.execution_time / 1000) for name, node in node_results.items()
+             if getattr(node, "execution_time", 0)]
+        )
+
+    def get_policies(self) -> Dict[str, Any]:
+        """
+        Describe the current limits per recorded workflow mode and category.
+
+        Returns:
+            Dictionary containing:
+            - policies: TimeoutPolicy per "mode:category" key
+            - factor, percentile, min_samples: Policy parameters
+        """
+        keys = self.history.values(WORKFLOW_DURATION)
+        return {
+            "policies": {key: self.policy_for(key.split(":", 1)[1], key.split(":", 1)[0]).to_dict()
+                         for key in sorted(keys)},
+            "factor": self.factor,
+            "percentile": self.pct,
+            "min_samples": self.min_samples,
+        }
+
+
+# Shared timeout policy
+timeout_policy = AdaptiveTimeoutPolicy()
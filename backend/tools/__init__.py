@@ -4,14 +4,32 @@ Haunted Helpdesk Network and Cloud Diagnostic Tools
 This module provides diagnostic tools for network troubleshooting and cloud service operations.
 """
 
-from tools.network_tools import ping_host, traceroute_host, check_dns_resolution
-from tools.cloud_tools import list_all_buckets, get_bucket_location, check_bucket_exists
+from tools.network_tools import (
+    ping_host,
+    traceroute_host,
+    check_dns_resolution,
+    check_tcp_port,
+    check_tls_endpoint,
+    diagnose_hosts,
+)
+from tools.cloud_tools import (
+    list_all_buckets,
+    search_buckets,
+    get_bucket_location,
+    check_bucket_exists,
+    audit_buckets,
+)
 
 __all__ = [
     'ping_host',
     'traceroute_host',
     'check_dns_resolution',
+    'check_tcp_port',
+    'check_tls_endpoint',
+    'diagnose_hosts',
     'list_all_buckets',
+    'search_buckets',
     'get_bucket_location',
     'check_bucket_exists',
+    'audit_buckets',
 ]
@@ -2,75 +2,146 @@
 Cloud Service Tools for Haunted Helpdesk
 
 Provides AWS cloud troubleshooting capabilities including S3 bucket operations.
+Bucket listings and searches are answered from a local inventory snapshot (see
+s3_inventory); other successful results are shared across tickets for a short TTL
+(see result_cache). S3 calls pass through the S3 rate limiter and circuit breaker
+(see resilience).
 """
 
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
+import os
+import threading
+import time
 from strands.tools import tool
+from resilience import S3_RATE_PER_SECOND, DownstreamUnavailable, s3_downstream
+from tools.result_cache import cached_diagnostic
+from tools.s3_inventory import bucket_inventory
+
+
+# Batch audit configuration
+AUDIT_MAX_WORKERS = int(os.getenv("S3_AUDIT_MAX_WORKERS", "16"))
+AUDIT_REQUESTS_PER_SECOND = float(os.getenv("S3_AUDIT_REQUESTS_PER_SECOND", str(S3_RATE_PER_SECOND)))
+AUDIT_MAX_BUCKETS = int(os.getenv("S3_AUDIT_MAX_BUCKETS", "1000"))
+
+# ACL grantees that make a bucket public
+PUBLIC_ACL_GRANTEES = {
+    "http://acs.amazonaws.com/groups/global/AllUsers",
+    "http://acs.amazonaws.com/groups/global/AuthenticatedUsers",
+}
+
+
+def _inventory_error(e: Exception) -> str:
+    """Translate a failed inventory refresh into the error message returned to agents."""
+    if isinstance(e, NoCredentialsError):
+        return "AWS credentials not found. Please configure your AWS credentials."
+    if isinstance(e, DownstreamUnavailable):
+        return f"S3 is temporarily unavailable: {str(e)}"
+    if isinstance(e, ClientError):
+        error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+        if error_code == 'ExpiredToken':
+            return "AWS credentials have expired. Please refresh your AWS credentials and try again."
+        return f"AWS error ({error_code}): {str(e)}"
+    return f"Unexpected error listing buckets: {str(e)}"
 
 
 @tool
-def list_all_buckets() -> Dict[str, Any]:
+def list_all_buckets(limit: int = 100) -> Dict[str, Any]:
     """
-    List all S3 buckets in the AWS account.
+    List S3 buckets in the AWS account from the bucket inventory snapshot.
+    
+    Large accounts have thousands of buckets; only the first `limit` names are returned.
+    Use search_buckets to find specific buckets instead of listing everything.
+    
+    Args:
+        limit: Maximum number of bucket names to return (default: 100)
     
     Returns:
         Dictionary containing:
         - success: Boolean indicating if operation succeeded
-        - buckets: List of bucket names
-        - count: Number of buckets found
+        - buckets: List of bucket names (sorted, at most limit)
+        - count: Total number of buckets in the account
+        - truncated: True if more buckets exist than were returned
+        - snapshot_age_seconds: Age of the inventory snapshot
+        - stale: True if the snapshot could not be refreshed and may be outdated
         - error: Error message if operation failed
     """
     try:
-        s3_client = boto3.client('s3')
-        response = s3_client.list_buckets()
-        
-        bucket_names = [bucket['Name'] for bucket in response.get('Buckets', [])]
-        
-        return {
-            "success": True,
-            "buckets": bucket_names,
-            "count": len(bucket_names),
-            "error": None
-        }
-        
-    except ClientError as e:
-        error_code = e.response.get('Error', {}).get('Code', 'Unknown')
-        
-        if error_code == 'ExpiredToken':
-            return {
-                "success": False,
-                "buckets": [],
-                "count": 0,
-                "error": "AWS credentials have expired. Please refresh your AWS credentials and try again."
-            }
-        else:
-            return {
-                "success": False,
-                "buckets": [],
-                "count": 0,
-                "error": f"AWS error ({error_code}): {str(e)}"
-            }
-            
-    except NoCredentialsError:
+        fresh = bucket_inventory.ensure_fresh()
+    except Exception as e:
         return {
             "success": False,
             "buckets": [],
             "count": 0,
-            "error": "AWS credentials not found. Please configure your AWS credentials."
+            "truncated": False,
+            "snapshot_age_seconds": None,
+            "stale": True,
+            "error": _inventory_error(e)
         }
-        
+    
+    bucket_names = bucket_inventory.names()
+    
+    return {
+        "success": True,
+        "buckets": bucket_names[:limit],
+        "count": len(bucket_names),
+        "truncated": len(bucket_names) > limit,
+        "snapshot_age_seconds": bucket_inventory.get_status()["snapshot_age_seconds"],
+        "stale": not fresh,
+        "error": None
+    }
+
+
+@tool
+def search_buckets(pattern: str = "*", region: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+    """
+    Search the account's S3 buckets by name pattern and region without listing them all.
+    
+    Args:
+        pattern: Glob pattern such as "haunt*" or "*-logs"; a plain string matches as a prefix
+        region: Only return buckets in this AWS region (e.g. "us-west-1")
+        limit: Maximum number of buckets to return (default: 50)
+    
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if operation succeeded
+        - buckets: Matching buckets with name, region and creation date
+        - count: Total number of matching buckets
+        - truncated: True if more buckets matched than were returned
+        - snapshot_age_seconds: Age of the inventory snapshot
+        - stale: True if the snapshot could not be refreshed and may be outdated
+        - error: Error message if operation failed
+    """
+    try:
+        fresh = bucket_inventory.ensure_fresh()
     except Exception as e:
         return {
             "success": False,
             "buckets": [],
             "count": 0,
-            "error": f"Unexpected error listing buckets: {str(e)}"
+            "truncated": False,
+            "snapshot_age_seconds": None,
+            "stale": True,
+            "error": _inventory_error(e)
         }
+    
+    result = bucket_inventory.search(pattern, region=region, limit=limit)
+    
+    return {
+        "success": True,
+        "buckets": result["buckets"],
+        "count": result["count"],
+        "truncated": result["count"] > len(result["buckets"]),
+        "snapshot_age_seconds": bucket_inventory.get_status()["snapshot_age_seconds"],
+        "stale": not fresh,
+        "error": None
+    }
 
 
 @tool
+@cached_diagnostic(ttl=3600, cache_errors=False)
 def get_bucket_location(bucket_name: str) -> Dict[str, Any]:
     """
     Get the AWS region location of an S3 bucket.
@@ -85,9 +156,19 @@ def get_bucket_location(bucket_name: str) -> Dict[str, Any]:
         - region: The AWS region where the bucket is located
         - error: Error message if operation failed
     """
+    # Buckets in the account inventory are answered locally
+    record = bucket_inventory.get(bucket_name)
+    if record and record.get("region"):
+        return {
+            "success": True,
+            "bucket": bucket_name,
+            "region": record["region"],
+            "error": None
+        }
+    
     try:
         s3_client = boto3.client('s3')
-        response = s3_client.get_bucket_location(Bucket=bucket_name)
+        response = s3_downstream.call(s3_client.get_bucket_location, Bucket=bucket_name)
         
         # AWS returns None for us-east-1, so we need to handle that
         location = response.get('LocationConstraint')
@@ -132,6 +213,14 @@ def get_bucket_location(bucket_name: str) -> Dict[str, Any]:
                 "error": f"AWS error ({error_code}): {str(e)}"
             }
             
+    except DownstreamUnavailable as e:
+        return {
+            "success": False,
+            "bucket": bucket_name,
+            "region": None,
+            "error": f"S3 is temporarily unavailable: {str(e)}"
+        }
+        
     except NoCredentialsError:
         return {
             "success": False,
@@ -150,6 +239,7 @@ def get_bucket_location(bucket_name: str) -> Dict[str, Any]:
 
 
 @tool
+@cached_diagnostic(ttl=60, cache_errors=False)
 def check_bucket_exists(bucket_name: str) -> Dict[str, Any]:
     """
     Check if an S3 bucket exists and is accessible.
@@ -167,7 +257,7 @@ def check_bucket_exists(bucket_name: str) -> Dict[str, Any]:
     """
     try:
         s3_client = boto3.client('s3')
-        s3_client.head_bucket(Bucket=bucket_name)
+        s3_downstream.call(s3_client.head_bucket, Bucket=bucket_name)
         
         # If head_bucket succeeds, bucket exists and is accessible
         return {
@@ -217,6 +307,15 @@ def check_bucket_exists(bucket_name: str) -> Dict[str, Any]:
                 "error": f"AWS error ({error_code}): {str(e)}"
             }
             
+    except DownstreamUnavailable as e:
+        return {
+            "success": False,
+            "bucket": bucket_name,
+            "exists": None,
+            "accessible": None,
+            "error": f"S3 is temporarily unavailable: {str(e)}"
+        }
+        
     except NoCredentialsError:
         return {
             "success": False,
@@ -234,3 +333,247 @@ def check_bucket_exists(bucket_name: str) -> Dict[str, Any]:
             "accessible": None,
             "error": f"Unexpected error checking bucket: {str(e)}"
         }
+
+
+
+class _AuditCancelled(Exception):
+    """Raised in worker threads once the audit has been abandoned."""
+
+
+class _RequestRateLimiter:
+    """Spaces out S3 requests from all worker threads to a maximum rate."""
+    
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+    
+    def cancel(self) -> None:
+        """Stop handing out slots; waiting and later callers raise _AuditCancelled."""
+        self._cancelled.set()
+    
+    def wait(self) -> None:
+        """Block until the caller may send its next request."""
+        if self._cancelled.is_set():
+            raise _AuditCancelled()
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now and self._cancelled.wait(slot - now):
+            raise _AuditCancelled()
+
+
+class _CredentialError(Exception):
+    """Raised when a batch audit cannot continue because credentials are missing or expired."""
+
+
+def _audit_single_bucket(
+    bucket_name: str,
+    get_client: Any,
+    limiter: _RequestRateLimiter
+) -> List[Any]:
+    """
+    Run head/location/ACL/policy-status checks for one bucket.
+    
+    Buckets in the account inventory are known to exist and their region is known, so
+    only the ACL and policy status are requested. Other buckets take their region from
+    the HeadBucket response and fall back to GetBucketLocation only if it is missing.
+    
+    Returns:
+        Table row: [bucket, exists, accessible, region, public_acl, public_policy, error]
+    """
+    row = [bucket_name, None, None, None, None, None, None]
+    
+    def call(operation: str, client: Any, **kwargs: Any) -> Dict[str, Any]:
+        limiter.wait()
+        try:
+            return s3_downstream.call(getattr(client, operation), **kwargs)
+        except NoCredentialsError:
+            raise _CredentialError("AWS credentials not found. Please configure your AWS credentials.")
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('ExpiredToken', 'ExpiredTokenException'):
+                raise _CredentialError(
+                    "AWS credentials have expired. Please refresh your AWS credentials and try again."
+                )
+            raise
+    
+    record = bucket_inventory.get(bucket_name)
+    if record and record.get("region"):
+        row[1], row[3] = True, record["region"]
+    else:
+        try:
+            response = call("head_bucket", get_client(None), Bucket=bucket_name)
+            row[1], row[2] = True, True
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+            http_status = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+            if http_status == 404 or error_code in ('404', 'NoSuchBucket'):
+                row[1], row[2] = False, False
+            elif http_status == 403 or error_code in ('403', 'Forbidden'):
+                row[1], row[2] = True, False
+                row[6] = "access denied"
+            else:
+                row[6] = f"head: {error_code}"
+            return row
+        
+        row[3] = response.get('BucketRegion') or response.get(
+            'ResponseMetadata', {}).get('HTTPHeaders', {}).get('x-amz-bucket-region')
+        if not row[3]:
+            try:
+                location = call("get_bucket_location", get_client(None), Bucket=bucket_name).get('LocationConstraint')
+                row[3] = location if location else 'us-east-1'
+            except ClientError as e:
+                row[6] = f"location: {e.response.get('Error', {}).get('Code', 'Unknown')}"
+    
+    # ACL and policy status must be read from the bucket's own region
+    regional_client = get_client(row[3])
+    errors = [row[6]] if row[6] else []
+    
+    try:
+        grants = call("get_bucket_acl", regional_client, Bucket=bucket_name).get('Grants', [])
+        row[4] = any(grant.get('Grantee', {}).get('URI') in PUBLIC_ACL_GRANTEES for grant in grants)
+        row[2] = True
+    except ClientError as e:
+        error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+        if row[2] is None and error_code in ('AccessDenied', '403'):
+            # An inventory bucket we may not read; the policy status would be denied too
+            row[2], row[6] = False, "access denied"
+            return row
+        errors.append(f"acl: {error_code}")
+    
+    try:
+        status = call("get_bucket_policy_status", regional_client, Bucket=bucket_name)
+        row[5] = bool(status.get('PolicyStatus', {}).get('IsPublic', False))
+    except ClientError as e:
+        error_code = e.response.get('Error', {}).get('Code', 'Unknown')
+        if error_code == 'NoSuchBucketPolicy':
+            row[5] = False
+        else:
+            errors.append(f"policy: {error_code}")
+    
+    row[6] = "; ".join(errors) if errors else None
+    return row
+
+
+@tool
+@cached_diagnostic(ttl=60, cache_errors=False)
+def audit_buckets(bucket_names: Optional[List[str]] = None, all_buckets: bool = False) -> Dict[str, Any]:
+    """
+    Audit many S3 buckets in one call: existence, access, region, public ACL and public policy.
+    
+    Checks run concurrently with a bounded request rate. Use this instead of calling
+    check_bucket_exists / get_bucket_location once per bucket. If S3 becomes unavailable
+    partway through, the buckets audited so far are returned and the rest are marked
+    "not audited".
+    
+    Args:
+        bucket_names: Buckets to audit
+        all_buckets: Audit every bucket in the account inventory (bucket_names is ignored)
+    
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if every bucket was audited
+        - columns: Column names of the result table
+        - rows: One row per bucket: bucket, exists, accessible, region, public_acl, public_policy, error
+        - summary: Counts of audited, missing, access-denied, public and errored buckets
+          (and not_audited when the audit stopped early)
+        - truncated: True if more buckets matched than S3_AUDIT_MAX_BUCKETS
+        - duration_ms: Time taken for the whole audit
+        - error: Error message if the audit could not run or stopped early
+    """
+    columns = ["bucket", "exists", "accessible", "region", "public_acl", "public_policy", "error"]
+    start = time.perf_counter()
+    
+    def failure(error: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "columns": columns,
+            "rows": [],
+            "summary": {},
+            "truncated": False,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "error": error
+        }
+    
+    if all_buckets:
+        try:
+            bucket_inventory.ensure_fresh()
+        except Exception as e:
+            return failure(_inventory_error(e))
+        bucket_names = bucket_inventory.names()
+    
+    bucket_names = list(dict.fromkeys(bucket_names or []))
+    if not bucket_names:
+        return failure("Provide bucket_names or set all_buckets=True")
+    
+    truncated = len(bucket_names) > AUDIT_MAX_BUCKETS
+    bucket_names = bucket_names[:AUDIT_MAX_BUCKETS]
+    
+    # boto3 clients are thread-safe; share one per region across workers
+    clients: Dict[Optional[str], Any] = {}
+    clients_lock = threading.Lock()
+    
+    def get_client(region: Optional[str]) -> Any:
+        with clients_lock:
+            if region not in clients:
+                clients[region] = boto3.client('s3', region_name=region) if region else boto3.client('s3')
+            return clients[region]
+    
+    limiter = _RequestRateLimiter(AUDIT_REQUESTS_PER_SECOND)
+    results: Dict[str, List[Any]] = {}
+    abort_error: Optional[str] = None
+    
+    executor = ThreadPoolExecutor(max_workers=min(AUDIT_MAX_WORKERS, len(bucket_names)))
+    try:
+        futures = {
+            executor.submit(_audit_single_bucket, name, get_client, limiter): name for name in bucket_names
+        }
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except _CredentialError as e:
+                return failure(str(e))
+            except DownstreamUnavailable as e:
+                abort_error = f"S3 is temporarily unavailable: {str(e)}"
+                break
+            except Exception as e:
+                return failure(f"Unexpected error auditing buckets: {str(e)}")
+    finally:
+        # Drop queued buckets and stop in-flight ones at their next request
+        limiter.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+    
+    # Keep what was audited before S3 became unavailable, including buckets that
+    # finished while the pool shut down; mark the rest
+    for future, name in futures.items():
+        if name not in results and future.done() and not future.cancelled() and future.exception() is None:
+            results[name] = future.result()
+    audited = [results[name] for name in bucket_names if name in results]
+    rows = [
+        results.get(name) or [name, None, None, None, None, None, f"not audited: {abort_error}"]
+        for name in bucket_names
+    ]
+    
+    summary = {
+        "audited": len(audited),
+        "missing": sum(1 for row in audited if row[1] is False),
+        "access_denied": sum(1 for row in audited if row[1] and row[2] is False),
+        "public": sum(1 for row in audited if row[4] or row[5]),
+        "errors": sum(1 for row in audited if row[6] and row[6] != "access denied"),
+    }
+    if abort_error:
+        summary["not_audited"] = len(bucket_names) - len(audited)
+    
+    return {
+        "success": abort_error is None,
+        "columns": columns,
+        "rows": rows,
+        "summary": summary,
+        "truncated": truncated,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+        "error": abort_error
+    }
@@ -0,0 +1,280 @@
+"""
+Async Diagnostics Engine for Haunted Helpdesk
+
+Runs network probes as asyncio subprocesses in their own process groups, concurrently
+across hosts, and parses their output into compact metrics.
+"""
+
+import asyncio
+import os
+import platform
+import signal
+import subprocess
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from tools.native_probes import resolve_host
+from tools.output_parsers import parse_ping_output, parse_traceroute_output
+
+
+# Per-probe timeouts in seconds
+PROBE_TIMEOUTS = {
+    "ping": 30.0,
+    "traceroute": 60.0,
+    "dns": 5.0,
+}
+
+# Maximum number of diagnostic processes running at once
+MAX_CONCURRENT_PROBES = 8
+
+IS_WINDOWS = platform.system().lower() == "windows"
+
+
+class CommandTimeoutError(Exception):
+    """Raised when a diagnostic command exceeds its timeout."""
+
+    def __init__(self, cmd: List[str], timeout: float):
+        super().__init__(f"Command '{cmd[0]}' timed out after {timeout:g} seconds")
+        self.cmd = cmd
+        self.timeout = timeout
+
+
+def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill a subprocess together with any children it spawned."""
+    if process.returncode is not None:
+        return
+    try:
+        if IS_WINDOWS:
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def run_command(cmd: List[str], timeout: float) -> Dict[str, Any]:
+    """
+    Run a command asynchronously with a hard timeout.
+
+    Args:
+        cmd: Command and arguments
+        timeout: Timeout in seconds; the whole process group is killed when exceeded
+
+    Returns:
+        Dictionary containing return_code, stdout, stderr and duration_ms
+
+    Raises:
+        CommandTimeoutError: If the command did not finish in time
+        FileNotFoundError: If the command is not installed
+    """
+    start = time.perf_counter()
+
+    # A new session/process group lets us kill traceroute's children too
+    if IS_WINDOWS:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
+        )
+    else:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
+        )
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        _kill_process_group(process)
+        await process.wait()
+        raise CommandTimeoutError(cmd, timeout)
+    except asyncio.CancelledError:
+        # Don't leave orphaned probes running when the caller gives up
+        _kill_process_group(process)
+        await process.wait()
+        raise
+
+    return {
+        "return_code": process.returncode,
+        "stdout": stdout.decode(errors="replace"),
+        "stderr": stderr.decode(errors="replace"),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
+
+
+def build_probe_command(probe: str, hostname: str, count: int = 4) -> List[str]:
+    """
+    Build the OS-specific command line for a probe.
+
+    Args:
+        probe: One of "ping", "traceroute"
+        hostname: Target hostname or IP address
+        count: Number of ping packets (ping only)
+
+    Returns:
+        Command and arguments
+    """
+    if probe == "ping":
+        return ["ping", "-n" if IS_WINDOWS else "-c", str(count), hostname]
+    if probe == "traceroute":
+        return ["tracert", hostname] if IS_WINDOWS else ["traceroute", hostname]
+    raise ValueError(f"Probe '{probe}' does not run an external command")
+
+
+# Probe-specific failure messages, matching the original tool output
+_PROBE_MESSAGES = {
+    "ping": {
+        "label": "Ping",
+        "failed": "Ping failed or host unreachable",
+        "not_found": "Ping command not found on system",
+        "unexpected": "Unexpected error during ping",
+    },
+    "traceroute": {
+        "label": "Traceroute",
+        "failed": "Traceroute failed or incomplete",
+        "not_found": "Traceroute command not found on system. Install traceroute or use tracert on Windows.",
+        "unexpected": "Unexpected error during traceroute",
+    },
+}
+
+_PROBE_PARSERS = {
+    "ping": parse_ping_output,
+    "traceroute": parse_traceroute_output,
+}
+
+
+async def _run_dns_probe(hostname: str, timeout: float) -> Dict[str, Any]:
+    """Resolve a hostname natively and shape the result like the other probes."""
+    result = await resolve_host(hostname, timeout=timeout)
+    return {
+        "success": result["success"],
+        "probe": "dns",
+        "hostname": hostname,
+        "addresses": result["addresses"],
+        "records": result["records"],
+        "duration_ms": result["duration_ms"],
+        "error": result["error"]
+    }
+
+
+async def run_probe(
+    probe: str,
+    hostname: str,
+    count: int = 4,
+    timeout: Optional[float] = None,
+    include_raw: bool = False
+) -> Dict[str, Any]:
+    """
+    Run a single diagnostic probe and normalize its result.
+
+    Args:
+        probe: One of "ping", "traceroute", "dns"
+        hostname: Target hostname or IP address
+        count: Number of ping packets (ping only)
+        timeout: Override for the probe's default timeout
+        include_raw: Also return the raw command output
+
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if the probe succeeded
+        - probe: The probe that was run
+        - hostname: The target hostname
+        - metrics: Parsed metrics (DNS probes return addresses and records instead)
+        - return_code: Command return code (-1 if the command did not run to completion)
+        - duration_ms: Wall-clock duration of the probe
+        - error: Error message if the probe failed
+        - output: Raw command output (only when include_raw is set)
+    """
+    timeout = timeout if timeout is not None else PROBE_TIMEOUTS[probe]
+    if probe == "dns":
+        return await _run_dns_probe(hostname, timeout)
+
+    messages = _PROBE_MESSAGES[probe]
+    start = time.perf_counter()
+
+    def failure(error: str) -> Dict[str, Any]:
+        result = {
+            "success": False,
+            "probe": probe,
+            "hostname": hostname,
+            "metrics": None,
+            "return_code": -1,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "error": error
+        }
+        if include_raw:
+            result["output"] = ""
+        return result
+
+    try:
+        result = await run_command(build_probe_command(probe, hostname, count), timeout)
+    except CommandTimeoutError:
+        return failure(f"{messages['label']} operation timed out after {timeout:g} seconds for host {hostname}")
+    except FileNotFoundError:
+        return failure(messages["not_found"])
+    except Exception as e:
+        return failure(f"{messages['unexpected']}: {str(e)}")
+
+    success = result["return_code"] == 0
+    output = result["stdout"] if result["stdout"] else result["stderr"]
+    metrics = _PROBE_PARSERS[probe](output)
+
+    error = None
+    if not success:
+        # Surface what the command reported (e.g. "Destination Host Unreachable")
+        reported = getattr(metrics, "error_messages", None)
+        error = f"{messages['failed']}: {'; '.join(reported)}" if reported else messages["failed"]
+
+    probe_result = {
+        "success": success,
+        "probe": probe,
+        "hostname": hostname,
+        "metrics": metrics.to_dict(),
+        "return_code": result["return_code"],
+        "duration_ms": result["duration_ms"],
+        "error": error
+    }
+    if include_raw:
+        probe_result["output"] = output
+    return probe_result
+
+
+async def run_diagnostics(
+    hostnames: Iterable[str],
+    probes: Iterable[str] = ("ping", "dns", "traceroute"),
+    max_concurrency: int = MAX_CONCURRENT_PROBES,
+    include_raw: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fan out probes across hosts concurrently and yield results as they complete.
+
+    Args:
+        hostnames: Hosts to diagnose
+        probes: Probes to run against every host
+        max_concurrency: Maximum number of probes running at once
+        include_raw: Also return raw command output for each probe
+
+    Yields:
+        Probe result dictionaries (see run_probe) in completion order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(probe: str, hostname: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_probe(probe, hostname, include_raw=include_raw)
+
+    tasks = [
+        asyncio.ensure_future(bounded(probe, hostname))
+        for hostname in dict.fromkeys(hostnames)
+        for probe in probes
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # If the consumer stops early, cancel (and kill) the remaining probes
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
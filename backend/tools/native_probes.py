@@ -0,0 +1,292 @@
+"""
+Native Network Probes for Haunted Helpdesk
+
+In-process DNS resolution and TCP/TLS connect-latency probes. These replace shelling
+out to nslookup: no process spawn per call, no dependency on the tool being installed
+and no locale-dependent output parsing. All probes return structured results.
+"""
+
+import asyncio
+import socket
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# How long successful lookups are reused unless bypass_cache is requested
+DNS_CACHE_TTL_SECONDS = 30.0
+
+# Most lookups kept; hostnames come from tickets and agents, so the cache must be bounded
+DNS_CACHE_MAX_ENTRIES = 1024
+
+DEFAULT_PROBE_TIMEOUT = 5.0
+
+RECORD_TYPE_FAMILIES = {
+    "A": socket.AF_INET,
+    "AAAA": socket.AF_INET6,
+}
+
+# (hostname, record type) -> (expires at, addresses), oldest lookup first
+_resolver_cache: "OrderedDict[Tuple[str, str], Tuple[float, List[str]]]" = OrderedDict()
+_resolver_cache_lock = threading.Lock()
+
+
+def clear_resolver_cache() -> None:
+    """Forget all cached DNS lookups."""
+    with _resolver_cache_lock:
+        _resolver_cache.clear()
+
+
+def _cache_lookup(cache_key: Tuple[str, str], addresses: List[str]) -> None:
+    """Store a lookup, dropping expired entries and the oldest ones beyond the size bound."""
+    now = time.monotonic()
+    with _resolver_cache_lock:
+        _resolver_cache.pop(cache_key, None)
+        _resolver_cache[cache_key] = (now + DNS_CACHE_TTL_SECONDS, addresses)
+        # Entries share one TTL, so expired ones are always at the front
+        while _resolver_cache:
+            oldest = next(iter(_resolver_cache.values()))
+            if oldest[0] > now and len(_resolver_cache) <= DNS_CACHE_MAX_ENTRIES:
+                break
+            _resolver_cache.popitem(last=False)
+
+
+def _elapsed_ms(start: float) -> float:
+    """Milliseconds since a perf_counter() timestamp."""
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+async def _lookup(hostname: str, record_type: str, timeout: float, bypass_cache: bool) -> Dict[str, Any]:
+    """Resolve one record type for a hostname."""
+    cache_key = (hostname.lower(), record_type)
+    start = time.perf_counter()
+
+    if not bypass_cache:
+        cached = _resolver_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return {"addresses": cached[1], "duration_ms": _elapsed_ms(start), "cached": True, "error": None}
+
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await asyncio.wait_for(
+            loop.getaddrinfo(hostname, None, family=RECORD_TYPE_FAMILIES[record_type], type=socket.SOCK_STREAM),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        return {"addresses": [], "duration_ms": _elapsed_ms(start), "cached": False,
+                "error": f"{record_type} lookup timed out after {timeout:g} seconds"}
+    except socket.gaierror as e:
+        return {"addresses": [], "duration_ms": _elapsed_ms(start), "cached": False,
+                "error": f"{record_type} lookup failed: {e.strerror}"}
+
+    # getaddrinfo returns one entry per socket type/protocol; keep unique addresses in order
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    _cache_lookup(cache_key, addresses)
+    return {"addresses": addresses, "duration_ms": _elapsed_ms(start), "cached": False, "error": None}
+
+
+async def resolve_host(
+    hostname: str,
+    record_types: Iterable[str] = ("A", "AAAA"),
+    timeout: float = DEFAULT_PROBE_TIMEOUT,
+    bypass_cache: bool = False
+) -> Dict[str, Any]:
+    """
+    Resolve a hostname with the system resolver, one lookup per record type in parallel.
+
+    Args:
+        hostname: The hostname to resolve
+        record_types: Record types to look up ("A" and/or "AAAA")
+        timeout: Timeout per lookup in seconds
+        bypass_cache: Skip the in-process lookup cache and query the resolver
+
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if at least one address was found
+        - hostname: The target hostname
+        - addresses: All resolved addresses
+        - records: Per record type results (addresses, duration_ms, cached, error)
+        - duration_ms: Wall-clock time for all lookups
+        - error: Error message if resolution failed
+    """
+    record_types = list(dict.fromkeys(record_types))
+    unknown = [r for r in record_types if r not in RECORD_TYPE_FAMILIES]
+    if unknown:
+        return {
+            "success": False,
+            "hostname": hostname,
+            "addresses": [],
+            "records": {},
+            "duration_ms": 0.0,
+            "error": f"Unsupported record types: {', '.join(unknown)}. Supported: A, AAAA"
+        }
+
+    start = time.perf_counter()
+    lookups = await asyncio.gather(*(
+        _lookup(hostname, record_type, timeout, bypass_cache) for record_type in record_types
+    ))
+    records = dict(zip(record_types, lookups))
+    addresses = [address for record in lookups for address in record["addresses"]]
+
+    return {
+        "success": bool(addresses),
+        "hostname": hostname,
+        "addresses": addresses,
+        "records": records,
+        "duration_ms": _elapsed_ms(start),
+        "error": None if addresses else "DNS resolution failed or hostname not found"
+    }
+
+
+async def tcp_connect_probe(host: str, port: int, timeout: float = DEFAULT_PROBE_TIMEOUT) -> Dict[str, Any]:
+    """
+    Measure TCP connect latency to host:port.
+
+    Args:
+        host: Hostname or IP address
+        port: TCP port
+        timeout: Connect timeout in seconds
+
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if the connection was established
+        - host: The target host
+        - port: The target port
+        - address: Peer address that accepted the connection
+        - connect_ms: Time to establish the connection (includes DNS resolution)
+        - error: Error message if the connection failed
+    """
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+    except asyncio.TimeoutError:
+        return {"success": False, "host": host, "port": port, "address": None, "connect_ms": _elapsed_ms(start),
+                "error": f"TCP connect to {host}:{port} timed out after {timeout:g} seconds"}
+    except socket.gaierror as e:
+        return {"success": False, "host": host, "port": port, "address": None, "connect_ms": _elapsed_ms(start),
+                "error": f"Could not resolve {host}: {e.strerror}"}
+    except OSError as e:
+        return {"success": False, "host": host, "port": port, "address": None, "connect_ms": _elapsed_ms(start),
+                "error": f"TCP connect to {host}:{port} failed: {e.strerror or str(e)}"}
+
+    connect_ms = _elapsed_ms(start)
+    address = writer.get_extra_info("peername")[0]
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+
+    return {"success": True, "host": host, "port": port, "address": address, "connect_ms": connect_ms, "error": None}
+
+
+def _certificate_summary(cert: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a peer certificate to the fields useful for diagnosis."""
+    subject = dict(item for rdn in cert.get("subject", ()) for item in rdn)
+    issuer = dict(item for rdn in cert.get("issuer", ()) for item in rdn)
+    not_after = cert.get("notAfter")
+    days_until_expiry = None
+    if not_after:
+        expires = datetime.fromtimestamp(ssl.cert_time_to_seconds(not_after), tz=timezone.utc)
+        days_until_expiry = (expires - datetime.now(timezone.utc)).days
+
+    return {
+        "subject": subject.get("commonName"),
+        "issuer": issuer.get("organizationName") or issuer.get("commonName"),
+        "not_after": not_after,
+        "days_until_expiry": days_until_expiry,
+        "subject_alt_names": [value for kind, value in cert.get("subjectAltName", ()) if kind == "DNS"][:10]
+    }
+
+
+async def tls_connect_probe(
+    host: str,
+    port: int = 443,
+    timeout: float = DEFAULT_PROBE_TIMEOUT,
+    server_name: Optional[str] = None,
+    verify: bool = True,
+    ssl_context: Optional[ssl.SSLContext] = None
+) -> Dict[str, Any]:
+    """
+    Measure TCP connect and TLS handshake latency, and summarize the server certificate.
+
+    Args:
+        host: Hostname or IP address
+        port: TLS port (default: 443)
+        timeout: Timeout in seconds for each of connect and handshake
+        server_name: SNI / verification hostname (defaults to host)
+        verify: Verify the certificate chain and hostname
+        ssl_context: Custom SSL context (overrides verify)
+
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if the TLS handshake completed
+        - host, port: The target
+        - connect_ms: TCP connect time
+        - tls_handshake_ms: TLS handshake time
+        - tls_version, cipher: Negotiated parameters
+        - certificate: Subject, issuer, expiry and SANs (when verification is enabled)
+        - error: Error message if the connection or handshake failed
+    """
+    result = {
+        "success": False,
+        "host": host,
+        "port": port,
+        "connect_ms": None,
+        "tls_handshake_ms": None,
+        "tls_version": None,
+        "cipher": None,
+        "certificate": None,
+        "error": None
+    }
+
+    if ssl_context is None:
+        ssl_context = ssl.create_default_context()
+        if not verify:
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+    # Connect in plain TCP first so connect and handshake latency are reported separately
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+    except asyncio.TimeoutError:
+        result["connect_ms"] = _elapsed_ms(start)
+        result["error"] = f"TCP connect to {host}:{port} timed out after {timeout:g} seconds"
+        return result
+    except OSError as e:
+        result["connect_ms"] = _elapsed_ms(start)
+        result["error"] = f"TCP connect to {host}:{port} failed: {e.strerror or str(e)}"
+        return result
+    result["connect_ms"] = _elapsed_ms(start)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(
+            writer.start_tls(ssl_context, server_hostname=server_name or host),
+            timeout=timeout
+        )
+        result["tls_handshake_ms"] = _elapsed_ms(start)
+        ssl_object = writer.get_extra_info("ssl_object")
+        result["tls_version"] = ssl_object.version()
+        result["cipher"] = ssl_object.cipher()[0]
+        peer_cert = ssl_object.getpeercert()
+        result["certificate"] = _certificate_summary(peer_cert) if peer_cert else None
+        result["success"] = True
+    except asyncio.TimeoutError:
+        result["error"] = f"TLS handshake with {host}:{port} timed out after {timeout:g} seconds"
+    except ssl.SSLCertVerificationError as e:
+        result["error"] = f"Certificate verification failed: {e.verify_message}"
+    except (ssl.SSLError, OSError) as e:
+        result["error"] = f"TLS handshake failed: {str(e)}"
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ssl.SSLError, OSError):
+            pass
+
+    return result
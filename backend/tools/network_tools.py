@@ -2,209 +2,194 @@
 Network Diagnostic Tools for Haunted Helpdesk
 
 Provides network troubleshooting capabilities including ping, traceroute, and DNS resolution checks.
+Commands run through the async diagnostics engine, so tools never block the agent's event loop.
+DNS resolution and TCP/TLS connect checks run in-process without spawning a command.
+Results are shared across tickets for a short per-tool TTL (see result_cache).
 """
 
-import subprocess
-import platform
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from strands.tools import tool
+from tools.diagnostics_engine import run_probe, run_diagnostics, PROBE_TIMEOUTS
+from tools.native_probes import resolve_host, tcp_connect_probe, tls_connect_probe
+from tools.result_cache import cached_diagnostic
+
+
+def _without_probe_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop engine bookkeeping fields to keep the single-probe tool output unchanged."""
+    return {key: value for key, value in result.items() if key not in ("probe", "duration_ms")}
 
 
 @tool
-def ping_host(hostname: str, count: int = 4) -> Dict[str, Any]:
+@cached_diagnostic(ttl=15)
+async def ping_host(hostname: str, count: int = 4, include_raw: bool = False) -> Dict[str, Any]:
     """
     Test network connectivity to a host using ping.
-    
+
     Args:
         hostname: The hostname or IP address to ping
         count: Number of ping packets to send (default: 4)
-    
+        include_raw: Also return the raw ping output (default: False; metrics are usually enough)
+
     Returns:
         Dictionary containing:
         - success: Boolean indicating if ping completed
         - hostname: The target hostname
-        - output: Ping command output
+        - metrics: Packet loss %, min/avg/max/mdev RTT in ms, per-packet replies (seq, ttl, time_ms)
+          and any error messages ping reported
         - return_code: Command return code (0 = success, non-zero = failure)
         - error: Error message if operation failed
+        - output: Raw ping output (only when include_raw is True)
+        - cached / cache_age_seconds: Whether the result was shared from a recent identical call
     """
-    try:
-        # Determine ping command based on OS
-        system = platform.system().lower()
-        
-        if system == "windows":
-            cmd = ["ping", "-n", str(count), hostname]
-        else:  # Linux, macOS, etc.
-            cmd = ["ping", "-c", str(count), hostname]
-        
-        # Execute ping with timeout
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30  # 30 second timeout
-        )
-        
-        return {
-            "success": result.returncode == 0,
-            "hostname": hostname,
-            "output": result.stdout if result.stdout else result.stderr,
-            "return_code": result.returncode,
-            "error": None if result.returncode == 0 else "Ping failed or host unreachable"
-        }
-        
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "hostname": hostname,
-            "output": "",
-            "return_code": -1,
-            "error": f"Ping operation timed out after 30 seconds for host {hostname}"
-        }
-    except FileNotFoundError:
-        return {
-            "success": False,
-            "hostname": hostname,
-            "output": "",
-            "return_code": -1,
-            "error": "Ping command not found on system"
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "hostname": hostname,
-            "output": "",
-            "return_code": -1,
-            "error": f"Unexpected error during ping: {str(e)}"
-        }
+    return _without_probe_fields(await run_probe("ping", hostname, count=count, include_raw=include_raw))
 
 
 @tool
-def traceroute_host(hostname: str) -> Dict[str, Any]:
+@cached_diagnostic(ttl=60)
+async def traceroute_host(hostname: str, include_raw: bool = False) -> Dict[str, Any]:
     """
     Trace the network route to a host.
-    
+
     Args:
         hostname: The hostname or IP address to trace
-    
+        include_raw: Also return the raw traceroute output (default: False)
+
     Returns:
         Dictionary containing:
         - success: Boolean indicating if traceroute completed
         - hostname: The target hostname
-        - output: Traceroute command output showing hop-by-hop path
+        - metrics: Hop-by-hop path; each hop lists responding hosts/addresses, RTTs in ms,
+          lost probes and flags such as !H (host unreachable), plus reached_destination
         - return_code: Command return code
         - error: Error message if operation failed
+        - output: Raw traceroute output (only when include_raw is True)
     """
-    try:
-        # Determine traceroute command based on OS
-        system = platform.system().lower()
-        
-        if system == "windows":
-            cmd = ["tracert", hostname]
-        else:  # Linux, macOS, etc.
-            cmd = ["traceroute", hostname]
-        
-        # Execute traceroute with timeout
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60  # 60 second timeout for traceroute
-        )
-        
-        return {
-            "success": result.returncode == 0,
-            "hostname": hostname,
-            "output": result.stdout if result.stdout else result.stderr,
-            "return_code": result.returncode,
-            "error": None if result.returncode == 0 else "Traceroute failed or incomplete"
-        }
-        
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "hostname": hostname,
-            "output": "",
-            "return_code": -1,
-            "error": f"Traceroute operation timed out after 60 seconds for host {hostname}"
-        }
-    except FileNotFoundError:
-        return {
-            "success": False,
-            "hostname": hostname,
-            "output": "",
-            "return_code": -1,
-            "error": "Traceroute command not found on system. Install traceroute or use tracert on Windows."
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "hostname": hostname,
-            "output": "",
-            "return_code": -1,
-            "error": f"Unexpected error during traceroute: {str(e)}"
-        }
+    return _without_probe_fields(await run_probe("traceroute", hostname, include_raw=include_raw))
 
 
 @tool
-def check_dns_resolution(hostname: str) -> Dict[str, Any]:
+@cached_diagnostic(ttl=60, bypass_arg="bypass_cache")
+async def check_dns_resolution(
+    hostname: str,
+    record_types: Optional[List[str]] = None,
+    bypass_cache: bool = False
+) -> Dict[str, Any]:
     """
-    Check DNS resolution for a hostname using nslookup.
-    
+    Check DNS resolution for a hostname using the system resolver.
+
     Args:
         hostname: The hostname to resolve
-    
+        record_types: Record types to look up, "A" and/or "AAAA" (default: both)
+        bypass_cache: Ignore recently cached lookups and query the resolver again
+
     Returns:
         Dictionary containing:
         - success: Boolean indicating if DNS resolution succeeded
         - hostname: The target hostname
-        - output: DNS lookup results including IP addresses and DNS server info
-        - return_code: Command return code
+        - addresses: All resolved IP addresses
+        - records: Per record type addresses, lookup time and errors
+        - duration_ms: Total lookup time in milliseconds
         - error: Error message if operation failed
     """
-    try:
-        # nslookup is available on Windows, Linux, and macOS
-        cmd = ["nslookup", hostname]
-        
-        # Execute nslookup with timeout
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=15  # 15 second timeout
-        )
-        
-        # nslookup returns 0 on success, but we also check if output contains useful info
-        success = result.returncode == 0 and "Address" in result.stdout
-        
-        return {
-            "success": success,
-            "hostname": hostname,
-            "output": result.stdout if result.stdout else result.stderr,
-            "return_code": result.returncode,
-            "error": None if success else "DNS resolution failed or hostname not found"
-        }
-        
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "hostname": hostname,
-            "output": "",
-            "return_code": -1,
-            "error": f"DNS lookup timed out after 15 seconds for hostname {hostname}"
-        }
-    except FileNotFoundError:
-        return {
-            "success": False,
-            "hostname": hostname,
-            "output": "",
-            "return_code": -1,
-            "error": "nslookup command not found on system"
-        }
-    except Exception as e:
+    return await resolve_host(hostname, record_types=record_types or ("A", "AAAA"), bypass_cache=bypass_cache)
+
+
+@tool
+@cached_diagnostic(ttl=15)
+async def check_tcp_port(hostname: str, port: int, timeout: float = 5.0) -> Dict[str, Any]:
+    """
+    Check whether a TCP port accepts connections and measure connect latency.
+
+    Args:
+        hostname: The hostname or IP address
+        port: The TCP port to connect to (e.g. 22, 80, 5432)
+        timeout: Connect timeout in seconds (default: 5)
+
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if the connection was established
+        - host: The target host
+        - port: The target port
+        - address: IP address that accepted the connection
+        - connect_ms: Connection time in milliseconds
+        - error: Error message if the connection failed (refused, timed out, unresolvable)
+    """
+    return await tcp_connect_probe(hostname, port, timeout=timeout)
+
+
+@tool
+@cached_diagnostic(ttl=300)
+async def check_tls_endpoint(hostname: str, port: int = 443, timeout: float = 5.0) -> Dict[str, Any]:
+    """
+    Check a TLS endpoint: connect and handshake latency, protocol and certificate validity.
+
+    Args:
+        hostname: The hostname to connect to (also used for SNI and certificate checks)
+        port: The TLS port (default: 443)
+        timeout: Timeout in seconds for connect and handshake (default: 5)
+
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if the TLS handshake and certificate check passed
+        - connect_ms: TCP connect time in milliseconds
+        - tls_handshake_ms: TLS handshake time in milliseconds
+        - tls_version: Negotiated TLS version
+        - cipher: Negotiated cipher suite
+        - certificate: Subject, issuer, expiry date and days until expiry
+        - error: Error message if the connection, handshake or verification failed
+    """
+    return await tls_connect_probe(hostname, port, timeout=timeout)
+
+
+@tool
+@cached_diagnostic(ttl=15)
+async def diagnose_hosts(
+    hostnames: List[str],
+    probes: Optional[List[str]] = None,
+    include_raw: bool = False
+) -> Dict[str, Any]:
+    """
+    Run ping, DNS and traceroute against several hosts in parallel with a single call.
+
+    Use this instead of calling ping_host, check_dns_resolution and traceroute_host
+    one after another when a ticket mentions one or more hosts.
+
+    Args:
+        hostnames: The hostnames or IP addresses to diagnose
+        probes: Probes to run against every host; any of "ping", "dns", "traceroute"
+                (default: all three)
+        include_raw: Also return raw command output for each probe (default: False)
+
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if every probe succeeded
+        - hosts: Per-host results keyed by hostname, each mapping probe name to its result
+        - completion_order: "hostname:probe" entries in the order they finished
+        - error: Error message if the request was invalid
+    """
+    probes = probes or ["ping", "dns", "traceroute"]
+    unknown = [probe for probe in probes if probe not in PROBE_TIMEOUTS]
+    if not hostnames or unknown:
         return {
             "success": False,
-            "hostname": hostname,
-            "output": "",
-            "return_code": -1,
-            "error": f"Unexpected error during DNS lookup: {str(e)}"
+            "hosts": {},
+            "completion_order": [],
+            "error": (
+                f"Unknown probes: {', '.join(unknown)}" if unknown
+                else "At least one hostname is required"
+            )
         }
+
+    hosts: Dict[str, Dict[str, Any]] = {hostname: {} for hostname in hostnames}
+    completion_order = []
+
+    async for result in run_diagnostics(hostnames, probes, include_raw=include_raw):
+        hosts[result["hostname"]][result["probe"]] = result
+        completion_order.append(f"{result['hostname']}:{result['probe']}")
+
+    return {
+        "success": all(r["success"] for host in hosts.values() for r in host.values()),
+        "hosts": hosts,
+        "completion_order": completion_order,
+        "error": None
+    }
@@ -0,0 +1,212 @@
+"""
+Diagnostic Output Parsers for Haunted Helpdesk
+
+Turns raw ping and traceroute output into compact typed metrics, so agents read a few
+numbers instead of kilobytes of command output. Parsers target Linux (iputils ping,
+traceroute) output and also understand the BSD/macOS ping summary format.
+"""
+
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class PingReply:
+    """A single echo reply."""
+    seq: int
+    ttl: Optional[int]
+    time_ms: float
+
+
+@dataclass
+class PingMetrics:
+    """Summary of a ping run."""
+    target: Optional[str] = None
+    address: Optional[str] = None
+    packets_transmitted: Optional[int] = None
+    packets_received: Optional[int] = None
+    errors: int = 0
+    loss_percent: Optional[float] = None
+    rtt_min_ms: Optional[float] = None
+    rtt_avg_ms: Optional[float] = None
+    rtt_max_ms: Optional[float] = None
+    rtt_mdev_ms: Optional[float] = None
+    replies: List[PingReply] = field(default_factory=list)
+    error_messages: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+@dataclass
+class TracerouteHop:
+    """One hop of a traceroute; every probe either answered with an RTT or was lost."""
+    hop: int
+    hosts: List[str] = field(default_factory=list)
+    addresses: List[str] = field(default_factory=list)
+    rtts_ms: List[float] = field(default_factory=list)
+    lost: int = 0
+    flags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class TracerouteMetrics:
+    """Summary of a traceroute run."""
+    target: Optional[str] = None
+    address: Optional[str] = None
+    max_hops: Optional[int] = None
+    hop_count: int = 0
+    reached_destination: bool = False
+    hops: List[TracerouteHop] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+# Ping patterns
+_PING_HEADER = re.compile(r"^PING\s+(\S+)\s+\(([^)]+)\)")
+_PING_REPLY = re.compile(
+    r"icmp_seq=(\d+)(?:\s+ttl=(\d+))?\s+time[=<]([\d.]+)\s*ms", re.IGNORECASE
+)
+_PING_ERROR_LINE = re.compile(r"^From\s+\S+.*icmp_seq=\d+\s+(.+)$")
+_PING_SUMMARY = re.compile(
+    r"(\d+)\s+packets transmitted,\s+(\d+)\s+(?:packets\s+)?received"
+    r"(?:,\s+\+(\d+)\s+errors)?.*?,\s+([\d.]+)%\s+packet loss"
+)
+_PING_RTT = re.compile(r"(?:rtt|round-trip)\s+min/avg/max/(?:mdev|stddev)\s+=\s+([\d.]+)/([\d.]+)/([\d.]+)/([\d.]+)")
+_PING_WINDOWS_SUMMARY = re.compile(r"Sent\s+=\s+(\d+),\s+Received\s+=\s+(\d+),\s+Lost\s+=\s+\d+\s+\((\d+)%")
+_PING_WINDOWS_RTT = re.compile(r"Minimum\s+=\s+(\d+)ms,\s+Maximum\s+=\s+(\d+)ms,\s+Average\s+=\s+(\d+)ms")
+_PING_FATAL = re.compile(r"^ping:\s+(.+)$")
+
+
+def parse_ping_output(output: str) -> PingMetrics:
+    """
+    Parse ping output into loss, RTT statistics and per-packet timings.
+
+    Args:
+        output: Raw ping stdout/stderr
+
+    Returns:
+        PingMetrics; fields the output doesn't contain are left as None
+    """
+    metrics = PingMetrics()
+
+    for line in output.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        header = _PING_HEADER.match(line)
+        if header:
+            metrics.target, metrics.address = header.group(1), header.group(2)
+            continue
+
+        reply = _PING_REPLY.search(line)
+        if reply:
+            metrics.replies.append(PingReply(
+                seq=int(reply.group(1)),
+                ttl=int(reply.group(2)) if reply.group(2) else None,
+                time_ms=float(reply.group(3))
+            ))
+            continue
+
+        error_line = _PING_ERROR_LINE.match(line) or _PING_FATAL.match(line)
+        if error_line:
+            message = error_line.group(1).strip()
+            if message not in metrics.error_messages:
+                metrics.error_messages.append(message)
+            continue
+
+        summary = _PING_SUMMARY.search(line)
+        if summary:
+            metrics.packets_transmitted = int(summary.group(1))
+            metrics.packets_received = int(summary.group(2))
+            metrics.errors = int(summary.group(3) or 0)
+            metrics.loss_percent = round(float(summary.group(4)), 2)
+            continue
+
+        rtt = _PING_RTT.search(line)
+        if rtt:
+            metrics.rtt_min_ms, metrics.rtt_avg_ms, metrics.rtt_max_ms, metrics.rtt_mdev_ms = (
+                float(value) for value in rtt.groups()
+            )
+            continue
+
+        windows_summary = _PING_WINDOWS_SUMMARY.search(line)
+        if windows_summary:
+            metrics.packets_transmitted = int(windows_summary.group(1))
+            metrics.packets_received = int(windows_summary.group(2))
+            metrics.loss_percent = float(windows_summary.group(3))
+            continue
+
+        windows_rtt = _PING_WINDOWS_RTT.search(line)
+        if windows_rtt:
+            metrics.rtt_min_ms = float(windows_rtt.group(1))
+            metrics.rtt_max_ms = float(windows_rtt.group(2))
+            metrics.rtt_avg_ms = float(windows_rtt.group(3))
+
+    return metrics
+
+
+# Traceroute patterns
+_TRACEROUTE_HEADER = re.compile(r"^traceroute to\s+(\S+)\s+\(([^)]+)\),\s+(\d+)\s+hops max")
+_TRACEROUTE_HOP = re.compile(r"^\s*(\d+)\s+(.*)$")
+_TRACEROUTE_TOKEN = re.compile(
+    r"(?P<lost>\*)"
+    r"|(?P<rtt>[\d.]+)\s+ms"
+    r"|(?P<flag>![A-Za-z0-9<>]*)"
+    r"|(?P<host>\S+)\s+\((?P<address>[^)]+)\)"
+    r"|(?P<bare>\S+)"
+)
+
+
+def parse_traceroute_output(output: str) -> TracerouteMetrics:
+    """
+    Parse traceroute output into per-hop addresses and RTT lists.
+
+    Args:
+        output: Raw traceroute stdout
+
+    Returns:
+        TracerouteMetrics with one entry per hop
+    """
+    metrics = TracerouteMetrics()
+
+    for line in output.splitlines():
+        header = _TRACEROUTE_HEADER.match(line.strip())
+        if header:
+            metrics.target, metrics.address = header.group(1), header.group(2)
+            metrics.max_hops = int(header.group(3))
+            continue
+
+        hop_match = _TRACEROUTE_HOP.match(line)
+        if not hop_match:
+            continue
+
+        hop = TracerouteHop(hop=int(hop_match.group(1)))
+        for token in _TRACEROUTE_TOKEN.finditer(hop_match.group(2)):
+            if token.group("lost"):
+                hop.lost += 1
+            elif token.group("rtt"):
+                hop.rtts_ms.append(float(token.group("rtt")))
+            elif token.group("flag"):
+                if token.group("flag") not in hop.flags:
+                    hop.flags.append(token.group("flag"))
+            else:
+                # "host (address)" with name resolution, or a bare address with -n
+                host = token.group("host") or token.group("bare")
+                address = token.group("address") or token.group("bare")
+                if address not in hop.addresses:
+                    hop.hosts.append(host)
+                    hop.addresses.append(address)
+        metrics.hops.append(hop)
+
+    metrics.hop_count = len(metrics.hops)
+    if metrics.hops and metrics.address:
+        last_hop = metrics.hops[-1]
+        metrics.reached_destination = metrics.address in last_hop.addresses and not last_hop.flags
+
+    return metrics
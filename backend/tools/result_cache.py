@@ -0,0 +1,263 @@
+"""
+Diagnostic Result Cache for Haunted Helpdesk
+
+Shares diagnostic tool results across tickets for a short per-tool TTL and coalesces
+concurrent identical calls.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+DIAGNOSTIC_CACHE_ENABLED = os.getenv("DIAGNOSTIC_CACHE_ENABLED", "true").lower() == "true"
+DIAGNOSTIC_CACHE_MAX_ENTRIES = int(os.getenv("DIAGNOSTIC_CACHE_MAX_ENTRIES", "1024"))
+
+
+def _parse_ttl_overrides(value: str) -> Dict[str, float]:
+    """Parse "tool=seconds,tool=seconds" into a dictionary."""
+    overrides = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            overrides[name.strip()] = float(seconds)
+    return overrides
+
+
+# Per-tool TTL overrides, e.g. DIAGNOSTIC_CACHE_TTLS="ping_host=5,get_bucket_location=7200"
+DIAGNOSTIC_CACHE_TTL_OVERRIDES = _parse_ttl_overrides(os.getenv("DIAGNOSTIC_CACHE_TTLS", ""))
+
+
+class _OwnerAbandoned(Exception):
+    """Set on an in-flight call whose owner was cancelled; waiters look up again."""
+
+
+class DiagnosticResultCache:
+    """Thread-safe TTL cache with LRU bounding and single-flight call coalescing."""
+
+    def __init__(self, max_entries: int = DIAGNOSTIC_CACHE_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results (least recently used are dropped)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def lookup(self, key: str, ttl: float) -> Tuple[Optional[Tuple[float, Any]], Optional[concurrent.futures.Future], bool]:
+        """
+        Find a fresh entry, an in-flight call to join, or claim the call for this caller.
+
+        Returns:
+            (entry, in_flight_future, is_owner). Exactly one of entry / future is set,
+            unless is_owner is True, in which case the caller must compute the result
+            and call complete() or fail().
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[0] <= ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry, None, False
+                del self._entries[key]
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats["coalesced"] += 1
+                return None, future, False
+
+            self._stats["misses"] += 1
+            self._in_flight[key] = concurrent.futures.Future()
+            return None, None, True
+
+    def complete(self, key: str, value: Any, store: bool) -> None:
+        """Publish a computed result to waiters and (optionally) the cache."""
+        with self._lock:
+            future = self._in_flight.pop(key)
+            if store:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if not future.done():
+            future.set_result(value)
+
+    def fail(self, key: str, error: Exception) -> None:
+        """Propagate a failed computation to waiters without caching it."""
+        with self._lock:
+            future = self._in_flight.pop(key)
+        if not future.done():
+            future.set_exception(error)
+
+    def release(self, key: str) -> None:
+        """Give up an in-flight call without a result; one of its waiters runs it instead."""
+        with self._lock:
+            future = self._in_flight.pop(key)
+        if not future.done():
+            future.set_exception(_OwnerAbandoned())
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = round((stats["hits"] + stats["coalesced"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# Shared cache instance for all diagnostic tools
+diagnostic_cache = DiagnosticResultCache()
+
+
+def _normalize(value: Any) -> Any:
+    """Normalize argument values so equivalent calls share a cache key."""
+    if isinstance(value, str):
+        # Hostnames and bucket names are case-insensitive
+        return value.strip().lower()
+    if isinstance(value, (list, tuple, set)):
+        normalized = [_normalize(item) for item in value]
+        return sorted(normalized, key=repr)
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    return value
+
+
+def _with_cache_fields(result: Any, cached: bool, stored_at: float) -> Any:
+    """Annotate a dict result with cache freshness fields."""
+    if not isinstance(result, dict):
+        return result
+    annotated = dict(result)
+    annotated["cached"] = cached
+    annotated["cache_age_seconds"] = round(time.monotonic() - stored_at, 1) if cached else 0.0
+    return annotated
+
+
+def _should_store(result: Any, cache_errors: bool) -> bool:
+    """Decide whether a result is worth caching."""
+    if cache_errors:
+        return True
+    return not (isinstance(result, dict) and result.get("success") is False)
+
+
+def cached_diagnostic(
+    ttl: float,
+    cache_errors: bool = True,
+    bypass_arg: Optional[str] = None,
+    cache: Optional[DiagnosticResultCache] = None
+) -> Callable:
+    """
+    Cache a diagnostic tool's results for a TTL and coalesce concurrent identical calls.
+
+    Apply below @tool so the tool specification still sees the original signature:
+
+        @tool
+        @cached_diagnostic(ttl=15)
+        async def ping_host(hostname: str, count: int = 4) -> Dict[str, Any]: ...
+
+    Args:
+        ttl: Seconds a result stays fresh (overridable via DIAGNOSTIC_CACHE_TTLS)
+        cache_errors: Also cache results with success=False. Disable for tools whose
+                      failures are usually transient (credentials, permissions)
+        bypass_arg: Name of a boolean argument that, when true, forces a fresh call
+        cache: Cache instance (defaults to the shared diagnostic cache)
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        tool_name = func.__name__
+        effective_ttl = DIAGNOSTIC_CACHE_TTL_OVERRIDES.get(tool_name, ttl)
+        signature = inspect.signature(func)
+        result_cache = cache or diagnostic_cache
+
+        def make_key(args: tuple, kwargs: dict) -> Tuple[Optional[str], bool]:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            bypass = bool(bypass_arg and arguments.pop(bypass_arg, False))
+            key = json.dumps([tool_name, _normalize(arguments)], sort_keys=True, default=str)
+            return key, bypass
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                key, bypass = make_key(args, kwargs)
+                if not DIAGNOSTIC_CACHE_ENABLED or effective_ttl <= 0:
+                    return _with_cache_fields(await func(*args, **kwargs), False, 0)
+
+                while True:
+                    entry, in_flight, is_owner = result_cache.lookup(key, 0 if bypass else effective_ttl)
+                    if entry is not None:
+                        return _with_cache_fields(entry[1], True, entry[0])
+                    if in_flight is None:
+                        break
+                    try:
+                        # wrap_future works even if the owner runs on another event loop; the
+                        # shield keeps a cancelled waiter from cancelling the shared future
+                        return _with_cache_fields(await asyncio.shield(asyncio.wrap_future(in_flight)), False, 0)
+                    except _OwnerAbandoned:
+                        continue
+
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    result_cache.fail(key, e)
+                    raise
+                except BaseException:
+                    # Cancelled with its ticket: don't hand the cancellation to other tickets
+                    result_cache.release(key)
+                    raise
+                result_cache.complete(key, result, _should_store(result, cache_errors))
+                return _with_cache_fields(result, False, 0)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+            key, bypass = make_key(args, kwargs)
+            if not DIAGNOSTIC_CACHE_ENABLED or effective_ttl <= 0:
+                return _with_cache_fields(func(*args, **kwargs), False, 0)
+
+            while True:
+                entry, in_flight, is_owner = result_cache.lookup(key, 0 if bypass else effective_ttl)
+                if entry is not None:
+                    return _with_cache_fields(entry[1], True, entry[0])
+                if in_flight is None:
+                    break
+                try:
+                    return _with_cache_fields(in_flight.result(), False, 0)
+                except _OwnerAbandoned:
+                    continue
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                result_cache.fail(key, e)
+                raise
+            except BaseException:
+                result_cache.release(key)
+                raise
+            result_cache.complete(key, result, _should_store(result, cache_errors))
+            return _with_cache_fields(result, False, 0)
+
+        return sync_wrapper
+
+    return decorator
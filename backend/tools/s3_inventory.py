@@ -0,0 +1,304 @@
+"""
+S3 Bucket Inventory for Haunted Helpdesk
+
+Keeps a periodically refreshed on-disk snapshot of the account's buckets so cloud tools
+answer listing, search and region questions locally.
+"""
+
+import asyncio
+import bisect
+import fnmatch
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import boto3
+from botocore.exceptions import ClientError, ParamValidationError
+
+from resilience import s3_downstream
+
+
+logger = logging.getLogger("haunted_helpdesk.s3_inventory")
+
+
+# Inventory configuration
+S3_INVENTORY_PATH = os.getenv("S3_INVENTORY_PATH", "backend/cache/s3_inventory.json")
+S3_INVENTORY_REFRESH_SECONDS = float(os.getenv("S3_INVENTORY_REFRESH_SECONDS", "900"))
+S3_INVENTORY_LOCATION_WORKERS = int(os.getenv("S3_INVENTORY_LOCATION_WORKERS", "16"))
+
+# Page size for ListBuckets; paginated responses also carry each bucket's region
+LIST_BUCKETS_PAGE_SIZE = 1000
+
+_WILDCARDS = "*?["
+
+
+class BucketInventory:
+    """On-disk snapshot of the account's S3 buckets with in-memory lookup indexes."""
+
+    def __init__(
+        self,
+        snapshot_path: str = S3_INVENTORY_PATH,
+        refresh_interval: float = S3_INVENTORY_REFRESH_SECONDS
+    ):
+        """
+        Initialize the inventory and load the last snapshot from disk, if any.
+
+        Args:
+            snapshot_path: Path of the JSON snapshot file
+            refresh_interval: Seconds after which the snapshot is considered stale
+        """
+        self.snapshot_path = snapshot_path
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._buckets: Dict[str, Dict[str, Any]] = {}
+        self._names: List[str] = []
+        self._names_by_region: Dict[str, List[str]] = {}
+        self._refreshed_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        self._load_snapshot()
+
+    # Snapshot persistence
+
+    def _load_snapshot(self) -> None:
+        """Load the snapshot from disk and build the indexes."""
+        try:
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return
+        self._install(snapshot.get("buckets", []), snapshot.get("refreshed_at"))
+
+    def _save_snapshot(self, buckets: List[Dict[str, Any]], refreshed_at: float) -> None:
+        """Atomically write the snapshot to disk."""
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"refreshed_at": refreshed_at, "buckets": buckets}, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _install(self, buckets: List[Dict[str, Any]], refreshed_at: Optional[float]) -> None:
+        """Swap in a new set of buckets and rebuild the lookup indexes."""
+        by_name = {bucket["name"]: bucket for bucket in buckets}
+        by_region: Dict[str, List[str]] = {}
+        for name in sorted(by_name):
+            by_region.setdefault(by_name[name].get("region") or "unknown", []).append(name)
+
+        with self._lock:
+            self._buckets = by_name
+            self._names = sorted(by_name)
+            self._names_by_region = by_region
+            self._refreshed_at = refreshed_at
+
+    # Refresh
+
+    def _fetch_buckets(self) -> List[Dict[str, Any]]:
+        """List every bucket with its region and creation date from S3."""
+        s3_client = boto3.client('s3')
+        buckets = []
+        kwargs: Dict[str, Any] = {"MaxBuckets": LIST_BUCKETS_PAGE_SIZE}
+        while True:
+            try:
+                response = s3_downstream.call(s3_client.list_buckets, **kwargs)
+            except ParamValidationError:
+                if "ContinuationToken" in kwargs:
+                    raise
+                # botocore releases without ListBuckets pagination reject MaxBuckets; list in one call
+                logger.info("ListBuckets pagination unsupported by this botocore; listing without it")
+                kwargs = {}
+                response = s3_downstream.call(s3_client.list_buckets)
+            for bucket in response.get('Buckets', []):
+                created = bucket.get('CreationDate')
+                buckets.append({
+                    "name": bucket['Name'],
+                    "region": bucket.get('BucketRegion'),
+                    "created": created.isoformat() if hasattr(created, "isoformat") else created,
+                })
+            token = response.get('ContinuationToken')
+            if not token:
+                break
+            kwargs["ContinuationToken"] = token
+
+        # Fall back to GetBucketLocation for buckets the listing didn't place
+        unplaced = [bucket for bucket in buckets if not bucket["region"]]
+        if unplaced:
+            def locate(bucket: Dict[str, Any]) -> None:
+                try:
+                    location = s3_downstream.call(
+                        s3_client.get_bucket_location, Bucket=bucket["name"]
+                    ).get('LocationConstraint')
+                    bucket["region"] = location if location else 'us-east-1'
+                except ClientError as e:
+                    logger.warning(f"Could not locate bucket {bucket['name']}: {str(e)}")
+
+            with ThreadPoolExecutor(max_workers=min(S3_INVENTORY_LOCATION_WORKERS, len(unplaced))) as executor:
+                list(executor.map(locate, unplaced))
+
+        return buckets
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        Rebuild the snapshot from S3 and persist it.
+
+        Concurrent callers wait for the refresh already in progress instead of
+        starting another one.
+
+        Returns:
+            Dictionary containing:
+            - buckets: Number of buckets in the new snapshot
+            - duration_ms: Time taken to rebuild the snapshot
+
+        Raises:
+            ClientError, NoCredentialsError: If S3 could not be listed
+        """
+        started_at = self._refreshed_at
+        with self._refresh_lock:
+            if self._refreshed_at != started_at and not self.is_stale():
+                # Another caller refreshed while we were waiting
+                return {"buckets": len(self._names), "duration_ms": 0.0}
+
+            start = time.perf_counter()
+            try:
+                buckets = self._fetch_buckets()
+            except Exception as e:
+                self._last_error = str(e)
+                raise
+            refreshed_at = time.time()
+            self._save_snapshot(buckets, refreshed_at)
+            self._install(buckets, refreshed_at)
+            self._last_error = None
+
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"S3 inventory refreshed: {len(buckets)} buckets in {duration_ms}ms")
+        return {"buckets": len(buckets), "duration_ms": duration_ms}
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        """Whether the snapshot is missing or older than the refresh interval."""
+        if self._refreshed_at is None:
+            return True
+        return (now or time.time()) - self._refreshed_at > self.refresh_interval
+
+    def ensure_fresh(self) -> bool:
+        """
+        Refresh the snapshot if it is stale.
+
+        A failed refresh is tolerated while an older snapshot exists.
+
+        Returns:
+            True if the served snapshot is fresh, False if a stale snapshot is served
+
+        Raises:
+            ClientError, NoCredentialsError: If there is no snapshot and S3 could not be listed
+        """
+        if not self.is_stale():
+            return True
+        try:
+            self.refresh()
+            return True
+        except Exception as e:
+            if self._refreshed_at is None:
+                raise
+            logger.warning(f"S3 inventory refresh failed, serving stale snapshot: {str(e)}")
+            return False
+
+    def invalidate(self) -> None:
+        """Forget the in-memory snapshot so the next lookup refreshes from S3."""
+        self._install([], None)
+
+    async def _refresh_loop(self, interval_seconds: float) -> None:
+        """Refresh the snapshot periodically off the event loop."""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"S3 inventory refresh failed: {str(e)}")
+            await asyncio.sleep(interval_seconds)
+
+    def start_background_refresh(self, interval_seconds: Optional[float] = None) -> None:
+        """Start the periodic refresh task on the running event loop."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(
+                self._refresh_loop(interval_seconds or self.refresh_interval)
+            )
+
+    async def stop_background_refresh(self) -> None:
+        """Cancel the periodic refresh task."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    # Lookups
+
+    def get(self, bucket_name: str) -> Optional[Dict[str, Any]]:
+        """Return the snapshot record of a bucket, or None if the account doesn't own it."""
+        return self._buckets.get(bucket_name.strip().lower())
+
+    def names(self) -> List[str]:
+        """Return all bucket names in sorted order."""
+        return list(self._names)
+
+    def search(self, pattern: str = "*", region: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        """
+        Find buckets by name pattern and optionally region.
+
+        A pattern without wildcards is treated as a prefix. The literal part before the
+        first wildcard narrows the search to a contiguous range of the sorted index.
+
+        Args:
+            pattern: Glob pattern such as "haunt*" or "*-logs"
+            region: Only return buckets in this region
+            limit: Maximum number of records returned
+
+        Returns:
+            Dictionary containing:
+            - buckets: Matching records (name, region, created), at most limit
+            - count: Total number of matches
+        """
+        pattern = (pattern or "*").strip().lower()
+        if not any(char in pattern for char in _WILDCARDS):
+            pattern += "*"
+        cut = min((pattern.index(char) for char in _WILDCARDS if char in pattern), default=len(pattern))
+        prefix = pattern[:cut]
+
+        with self._lock:
+            names = self._names_by_region.get(region, []) if region else self._names
+            buckets = self._buckets
+
+        matches = []
+        count = 0
+        for index in range(bisect.bisect_left(names, prefix), len(names)):
+            name = names[index]
+            if not name.startswith(prefix):
+                break
+            if fnmatch.fnmatchcase(name, pattern):
+                count += 1
+                if len(matches) < limit:
+                    matches.append(buckets[name])
+
+        return {"buckets": matches, "count": count}
+
+    def get_status(self) -> Dict[str, Any]:
+        """Report snapshot size and freshness."""
+        age = round(time.time() - self._refreshed_at, 1) if self._refreshed_at else None
+        return {
+            "buckets": len(self._names),
+            "regions": {region: len(names) for region, names in self._names_by_region.items()},
+            "snapshot_age_seconds": age,
+            "stale": self.is_stale(),
+            "last_error": self._last_error,
+        }
+
+
+# Shared inventory instance for cloud tools
+bucket_inventory = BucketInventory()
@@ -0,0 +1,459 @@
+"""
+Workflow Tracing for Haunted Helpdesk
+
+Traces each ticket workflow as a tree of timed spans keyed by ticket_id, exported to a
+JSON Lines file and served as a waterfall on GET /api/tickets/{id}/trace.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from strands.hooks import (
+    AfterInvocationEvent, AfterModelCallEvent, AfterToolCallEvent, BeforeInvocationEvent, BeforeModelCallEvent,
+    BeforeToolCallEvent, HookProvider, HookRegistry,
+)
+
+from metrics import TRACE_SPANS_DROPPED
+
+
+logger = logging.getLogger("haunted_helpdesk.tracing")
+
+
+# Tracing configuration
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "backend/cache/traces.jsonl")
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+TRACE_MEMORY_TRACES = int(os.getenv("TRACE_MEMORY_TRACES", "200"))
+TRACE_QUEUE_SIZE = int(os.getenv("TRACE_QUEUE_SIZE", "10000"))
+
+# Sentinel for "use the current span as parent"
+_CURRENT = object()
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("haunted_helpdesk_span", default=None)
+
+
+class Span:
+    """One timed operation in a trace."""
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        parent: Optional["Span"] = None,
+        trace_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        start: Optional[float] = None
+    ):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.span_id = uuid.uuid4().hex[:16]
+        self._trace_id = trace_id
+        self.attributes = dict(attributes or {})
+        self.start = time.time() if start is None else start
+        self.end: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    @property
+    def trace_id(self) -> Optional[str]:
+        """The span's trace id, inherited from its ancestors if the span has none of its own."""
+        span = self
+        while span is not None:
+            if span._trace_id is not None:
+                return span._trace_id
+            span = span.parent
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: Any) -> None:
+        self.status = "error"
+        self.error = str(error)[:500]
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.end if self.end is not None else time.time()
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "end": end,
+            "duration_ms": round((end - self.start) * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class JsonlSpanExporter:
+    """
+    Appends finished spans to a JSON Lines file, rotating it once it grows too large.
+
+    export() only puts the span on a bounded queue; a writer thread appends queued
+    spans in batches, so ending a span never touches the disk on the event loop.
+    """
+
+    def __init__(self, path: str = TRACE_EXPORT_PATH, max_bytes: int = TRACE_FILE_MAX_BYTES,
+                 queue_size: int = TRACE_QUEUE_SIZE):
+        """
+        Initialize the exporter.
+
+        Args:
+            path: JSON Lines file spans are appended to
+            max_bytes: Size after which the file is rotated to "<path>.1"
+            queue_size: Spans buffered for the writer thread (more are dropped)
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict[str, Any]) -> None:
+        """Queue a span for the writer thread; drops it if the queue is full."""
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="span-writer", daemon=True)
+                self._writer.start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            TRACE_SPANS_DROPPED.inc()
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 500:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [span for span in batch if span is not None]
+            if spans:
+                self._append(spans)
+            for _ in batch:
+                self._queue.task_done()
+            if len(spans) < len(batch):
+                return
+
+    def _append(self, spans: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+            with open(self.path, "a") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.error(f"Failed to export {len(spans)} spans: {str(e)}")
+
+    def flush(self) -> None:
+        """Block until every queued span has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write the queued spans and stop the writer thread (export() starts a new one)."""
+        with self._lock:
+            writer = self._writer
+            self._writer = None
+            if writer is None or not writer.is_alive():
+                return
+            self._queue.put(None)
+        writer.join()
+
+    def read_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Read every exported span of a trace (rotated file first); blocks on file I/O."""
+        self.flush()
+        spans = []
+        for path in (f"{self.path}.1", self.path):
+            try:
+                with open(path, "r") as f:
+                    for line in f:
+                        if trace_id not in line:
+                            continue
+                        try:
+                            span = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if span.get("trace_id") == trace_id:
+                            spans.append(span)
+            except FileNotFoundError:
+                continue
+        return spans
+
+
+class Tracer:
+    """Creates spans, tracks the current span and keeps recent traces in memory."""
+
+    def __init__(
+        self,
+        exporter: Optional[JsonlSpanExporter] = None,
+        enabled: bool = TRACING_ENABLED,
+        memory_traces: int = TRACE_MEMORY_TRACES
+    ):
+        """
+        Initialize the tracer.
+
+        Args:
+            exporter: Span exporter (defaults to the JSON Lines exporter)
+            enabled: False makes every tracing call a no-op
+            memory_traces: Number of recent traces kept in memory for lookups
+        """
+        self.exporter = exporter if exporter is not None else JsonlSpanExporter()
+        self.enabled = enabled
+        self.memory_traces = memory_traces
+        self._recent: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def start_span(
+        self,
+        name: str,
+        kind: str,
+        parent: Any = _CURRENT,
+        trace_id: Optional[str] = None,
+        root: bool = False,
+        **attributes: Any
+    ) -> Optional[Span]:
+        """
+        Start a span without making it current (see span() for a scoped span).
+
+        Args:
+            name: Operation name, e.g. "tool.ping_host"
+            kind: api, queue, workflow, multimodal, agent, model, tool or dynamodb
+            parent: Parent span (defaults to the current span)
+            trace_id: Trace id; spans without one inherit their parent's
+            root: Start a span even without a parent or trace id (bound to a trace later)
+            **attributes: Attributes recorded on the span
+
+        Returns:
+            The span, or None when tracing is disabled or there is no trace to join
+        """
+        if not self.enabled:
+            return None
+        if parent is _CURRENT:
+            parent = _current_span.get()
+        if parent is None and trace_id is None and not root:
+            return None
+        return Span(name, kind, parent=parent, trace_id=trace_id, attributes=attributes)
+
+    def end_span(self, span: Optional[Span], error: Any = None, end: Optional[float] = None) -> None:
+        """End a span (now, unless an end time is given) and export it if it belongs to a trace."""
+        if span is None or span.end is not None:
+            return
+        span.end = time.time() if end is None else end
+        if error is not None:
+            span.set_error(error)
+        if span.trace_id is None:
+            return
+        record = span.to_dict()
+        with self._lock:
+            spans = self._recent.get(record["trace_id"])
+            if spans is None:
+                spans = self._recent[record["trace_id"]] = []
+                while len(self._recent) > self.memory_traces:
+                    self._recent.popitem(last=False)
+            else:
+                self._recent.move_to_end(record["trace_id"])
+            spans.append(record)
+        self.exporter.export(record)
+
+    @contextmanager
+    def span(self, name: str, kind: str, parent: Any = _CURRENT, trace_id: Optional[str] = None,
+             root: bool = False, **attributes: Any):
+        """
+        Run a block inside a span that is current for the block (see start_span for arguments).
+
+        Yields:
+            The span, or None when nothing is traced
+        """
+        span = self.start_span(name, kind, parent=parent, trace_id=trace_id, root=root, **attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def bind_trace(self, trace_id: str) -> None:
+        """Make the current span tree (e.g. an API request) part of the given trace."""
+        span = _current_span.get()
+        if span is None:
+            return
+        while span.parent is not None:
+            span = span.parent
+        if span._trace_id is None:
+            span._trace_id = trace_id
+
+    def record_span(self, name: str, kind: str, start: float, end: float, parent: Optional[Span] = None,
+                    trace_id: Optional[str] = None, **attributes: Any) -> None:
+        """Record an already finished operation, such as time spent waiting in a queue."""
+        if not self.enabled or (parent is None and trace_id is None):
+            return
+        self.end_span(Span(name, kind, parent=parent, trace_id=trace_id, attributes=attributes, start=start), end=end)
+
+    def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a trace as a waterfall.
+
+        Args:
+            trace_id: Trace id (the ticket id)
+
+        Returns:
+            None if no spans were recorded, otherwise a dictionary containing:
+            - trace_id: The trace id
+            - start_time: ISO 8601 start of the earliest span
+            - duration_ms: Time from the earliest span start to the latest span end
+            - span_count: Number of spans
+            - by_kind: Total span time and count per kind (api, agent, tool, ...)
+            - spans: Spans ordered by start with start_offset_ms, duration_ms and depth
+        """
+        with self._lock:
+            spans = list(self._recent.get(trace_id, []))
+        if not spans:
+            spans = self.exporter.read_trace(trace_id)
+        if not spans:
+            return None
+
+        spans.sort(key=lambda span: span["start"])
+        trace_start = spans[0]["start"]
+        trace_end = max(span["end"] for span in spans)
+        parents = {span["span_id"]: span.get("parent_id") for span in spans}
+
+        def depth(span_id: str) -> int:
+            level = 0
+            parent_id = parents.get(span_id)
+            while parent_id in parents and level < len(parents):
+                level += 1
+                parent_id = parents[parent_id]
+            return level
+
+        by_kind: Dict[str, Dict[str, Any]] = {}
+        waterfall = []
+        for span in spans:
+            totals = by_kind.setdefault(span["kind"], {"count": 0, "total_ms": 0.0})
+            totals["count"] += 1
+            totals["total_ms"] = round(totals["total_ms"] + span["duration_ms"], 3)
+            waterfall.append({
+                "span_id": span["span_id"],
+                "parent_id": span.get("parent_id"),
+                "name": span["name"],
+                "kind": span["kind"],
+                "status": span["status"],
+                "error": span.get("error"),
+                "start_offset_ms": round((span["start"] - trace_start) * 1000, 3),
+                "duration_ms": span["duration_ms"],
+                "depth": depth(span["span_id"]),
+                "attributes": span.get("attributes", {}),
+            })
+
+        return {
+            "trace_id": trace_id,
+            "start_time": datetime.fromtimestamp(trace_start, tz=timezone.utc).isoformat(),
+            "duration_ms": round((trace_end - trace_start) * 1000, 3),
+            "span_count": len(waterfall),
+            "by_kind": by_kind,
+            "spans": waterfall,
+        }
+
+
+# Shared tracer
+tracer = Tracer()
+
+atexit.register(tracer.exporter.close)
+
+
+class AgentTracingHooks(HookProvider):
+    """
+    Traces an agent's turns, model calls and tool calls as nested spans.
+
+    An agent handles one invocation at a time, so its open spans are kept on the
+    provider; register one instance per agent (Agent(hooks=[AgentTracingHooks()])).
+    """
+
+    def __init__(self, tracer: Optional[Tracer] = None):
+        self.tracer = tracer
+        self._agent_span: Optional[Span] = None
+        self._outer_span: Optional[Span] = None
+        self._model_span: Optional[Span] = None
+        self._tool_spans: Dict[str, Span] = {}
+
+    @property
+    def _tracer(self) -> Tracer:
+        return self.tracer if self.tracer is not None else tracer
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(BeforeInvocationEvent, self._before_invocation)
+        registry.add_callback(AfterInvocationEvent, self._after_invocation)
+        registry.add_callback(BeforeModelCallEvent, self._before_model_call)
+        registry.add_callback(AfterModelCallEvent, self._after_model_call)
+        registry.add_callback(BeforeToolCallEvent, self._before_tool_call)
+        registry.add_callback(AfterToolCallEvent, self._after_tool_call)
+
+    def _before_invocation(self, event: BeforeInvocationEvent) -> None:
+        self._outer_span = _current_span.get()
+        self._agent_span = self._tracer.start_span(f"agent.{event.agent.name}", "agent", agent=event.agent.name)
+        if self._agent_span is not None:
+            # Spans opened while the agent runs (e.g. DynamoDB calls from tools) nest under it
+            _current_span.set(self._agent_span)
+
+    def _after_invocation(self, event: AfterInvocationEvent) -> None:
+        if self._agent_span is None:
+            return
+        self._tracer.end_span(self._agent_span, error=None if event.result is not None else "invocation failed")
+        _current_span.set(self._outer_span)
+        self._agent_span = None
+
+    def _before_model_call(self, event: BeforeModelCallEvent) -> None:
+        if self._agent_span is not None:
+            self._model_span = self._tracer.start_span("model.call", "model", parent=self._agent_span,
+                                                       agent=event.agent.name)
+
+    def _after_model_call(self, event: AfterModelCallEvent) -> None:
+        if self._model_span is None:
+            return
+        if event.stop_response is not None:
+            self._model_span.set_attribute("stop_reason", str(event.stop_response.stop_reason))
+        self._tracer.end_span(self._model_span, error=event.exception)
+        self._model_span = None
+
+    def _before_tool_call(self, event: BeforeToolCallEvent) -> None:
+        if self._agent_span is None:
+            return
+        name = event.tool_use.get("name", "unknown")
+        span = self._tracer.start_span(f"tool.{name}", "tool", parent=self._agent_span, tool=name)
+        if span is not None:
+            self._tool_spans[event.tool_use.get("toolUseId", name)] = span
+
+    def _after_tool_call(self, event: AfterToolCallEvent) -> None:
+        name = event.tool_use.get("name", "unknown")
+        span = self._tool_spans.pop(event.tool_use.get("toolUseId", name), None)
+        if span is None:
+            return
+        error = event.exception
+        if error is None and (event.result or {}).get("status") == "error":
+            error = "tool returned an error"
+        self._tracer.end_span(span, error=error)
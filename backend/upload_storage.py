@@ -0,0 +1,459 @@
+"""
+Upload Storage Lifecycle for Haunted Helpdesk
+
+Stores ticket screenshots on local disk or S3, tracks which tickets reference them and
+garbage-collects orphaned, expired and over-quota uploads.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from resilience import s3_downstream
+
+
+logger = logging.getLogger("haunted_helpdesk.uploads")
+
+
+# Upload storage configuration
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "backend/uploads")
+UPLOAD_STORAGE_BACKEND = os.getenv("UPLOAD_STORAGE_BACKEND", "local")
+UPLOAD_S3_BUCKET = os.getenv("UPLOAD_S3_BUCKET", "")
+UPLOAD_S3_PREFIX = os.getenv("UPLOAD_S3_PREFIX", "uploads/")
+UPLOAD_QUOTA_MB = float(os.getenv("UPLOAD_QUOTA_MB", "500"))
+UPLOAD_MAX_AGE_HOURS = float(os.getenv("UPLOAD_MAX_AGE_HOURS", "168"))
+UPLOAD_ORPHAN_GRACE_MINUTES = float(os.getenv("UPLOAD_ORPHAN_GRACE_MINUTES", "30"))
+UPLOAD_GC_INTERVAL_SECONDS = float(os.getenv("UPLOAD_GC_INTERVAL_SECONDS", "600"))
+
+INDEX_FILE_NAME = ".upload_index.json"
+# Journal entries after which the index is rewritten outside garbage collection
+INDEX_JOURNAL_MAX_ENTRIES = 1000
+
+
+class LocalUploadBackend:
+    """Stores uploads as files in a local directory."""
+
+    name = "local"
+
+    def __init__(self, directory: str = UPLOAD_DIR):
+        """
+        Initialize the local backend.
+
+        Args:
+            directory: Directory where uploaded files are written
+        """
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def put(self, key: str, fileobj: BinaryIO) -> int:
+        """Write an upload and return its size in bytes."""
+        path = os.path.join(self.directory, key)
+        with open(path, "wb") as buffer:
+            shutil.copyfileobj(fileobj, buffer)
+        return os.path.getsize(path)
+
+    def delete(self, key: str) -> None:
+        """Delete an upload, ignoring files that are already gone."""
+        try:
+            os.remove(os.path.join(self.directory, key))
+        except FileNotFoundError:
+            pass
+
+    def list_objects(self) -> Dict[str, Dict[str, float]]:
+        """List stored uploads as {key: {"size": bytes, "modified": epoch seconds}}."""
+        objects = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                # Dotfiles (.gitkeep, the index) are not uploads
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                objects[entry.name] = {"size": stat.st_size, "modified": stat.st_mtime}
+        return objects
+
+    def local_path(self, key: str) -> str:
+        """Return a local filesystem path for the upload."""
+        return os.path.join(self.directory, key)
+
+
+class S3UploadBackend:
+    """
+    Stores uploads in an S3-compatible bucket.
+
+    Image analysis needs a file path, so objects are downloaded into a local
+    cache directory on demand.
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = UPLOAD_S3_PREFIX,
+        client: Any = None,
+        cache_dir: str = UPLOAD_DIR
+    ):
+        """
+        Initialize the S3 backend.
+
+        Args:
+            bucket: Bucket that holds uploads
+            prefix: Key prefix for uploads inside the bucket
+            client: S3 client (defaults to boto3.client('s3'))
+            cache_dir: Local directory for downloaded copies
+        """
+        if client is None:
+            import boto3
+            client = boto3.client("s3")
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def put(self, key: str, fileobj: BinaryIO) -> int:
+        """Upload an object and return its size in bytes."""
+        body = fileobj.read()
+        s3_downstream.call(self.client.put_object, Bucket=self.bucket, Key=self.prefix + key, Body=body)
+        return len(body)
+
+    def delete(self, key: str) -> None:
+        """Delete an object and its local cached copy."""
+        s3_downstream.call(self.client.delete_object, Bucket=self.bucket, Key=self.prefix + key)
+        try:
+            os.remove(os.path.join(self.cache_dir, key))
+        except FileNotFoundError:
+            pass
+
+    def list_objects(self) -> Dict[str, Dict[str, float]]:
+        """List stored uploads as {key: {"size": bytes, "modified": epoch seconds}}."""
+        objects = {}
+        kwargs = {"Bucket": self.bucket, "Prefix": self.prefix}
+        while True:
+            response = s3_downstream.call(self.client.list_objects_v2, **kwargs)
+            for item in response.get("Contents", []):
+                key = item["Key"][len(self.prefix):]
+                modified = item.get("LastModified")
+                objects[key] = {
+                    "size": item.get("Size", 0),
+                    "modified": modified.timestamp() if hasattr(modified, "timestamp") else time.time()
+                }
+            if not response.get("IsTruncated"):
+                break
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+        return objects
+
+    def local_path(self, key: str) -> str:
+        """Download the object into the cache directory (if needed) and return its path."""
+        path = os.path.join(self.cache_dir, key)
+        if not os.path.exists(path):
+            s3_downstream.call(self.client.download_file, self.bucket, self.prefix + key, path)
+        return path
+
+
+def create_upload_backend(backend_name: str = UPLOAD_STORAGE_BACKEND):
+    """
+    Create the configured upload backend.
+
+    Args:
+        backend_name: "local" or "s3"
+
+    Returns:
+        Upload backend instance
+    """
+    if backend_name == "s3":
+        if not UPLOAD_S3_BUCKET:
+            raise ValueError("UPLOAD_S3_BUCKET must be set when UPLOAD_STORAGE_BACKEND=s3")
+        return S3UploadBackend(bucket=UPLOAD_S3_BUCKET)
+    return LocalUploadBackend()
+
+
+class UploadStorageManager:
+    """Tracks uploads, their ticket references, and enforces retention and quota."""
+
+    def __init__(
+        self,
+        backend: Any = None,
+        index_path: Optional[str] = None,
+        quota_bytes: int = int(UPLOAD_QUOTA_MB * 1024 * 1024),
+        max_age_seconds: float = UPLOAD_MAX_AGE_HOURS * 3600,
+        orphan_grace_seconds: float = UPLOAD_ORPHAN_GRACE_MINUTES * 60
+    ):
+        """
+        Initialize the upload storage manager.
+
+        Args:
+            backend: Storage backend (defaults to the configured backend)
+            index_path: Path of the JSON index (defaults to UPLOAD_DIR/.upload_index.json); its
+                journal is kept at the same path plus ".journal"
+            quota_bytes: Maximum total size of stored uploads
+            max_age_seconds: Maximum age of an upload referenced by a ticket
+            orphan_grace_seconds: How long an unreferenced upload is kept
+        """
+        self.backend = backend if backend is not None else create_upload_backend()
+        self.index_path = index_path or os.path.join(UPLOAD_DIR, INDEX_FILE_NAME)
+        self.journal_path = f"{self.index_path}.journal"
+        self.quota_bytes = quota_bytes
+        self.max_age_seconds = max_age_seconds
+        self.orphan_grace_seconds = orphan_grace_seconds
+
+        self._lock = threading.Lock()
+        self._journal_entries = 0
+        self._records = self._load_index()
+        self._gc_task: Optional[asyncio.Task] = None
+        self._stats = {"gc_runs": 0, "files_removed": 0, "bytes_freed": 0, "evictions": 0, "last_gc": None}
+
+    # Index persistence
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load the upload index from disk and replay its journal."""
+        try:
+            with open(self.index_path, "r") as f:
+                records = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            records = {}
+        try:
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a line cut short by a crash
+                    if entry["record"] is None:
+                        records.pop(entry["key"], None)
+                    else:
+                        records[entry["key"]] = entry["record"]
+                    self._journal_entries += 1
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _save_index(self) -> None:
+        """Atomically write the upload index to disk and empty the journal. Caller must hold the lock."""
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._records, f)
+        os.replace(tmp_path, self.index_path)
+        # Replaying the journal onto the new index would be harmless, so a crash here loses nothing
+        open(self.journal_path, "w").close()
+        self._journal_entries = 0
+
+    def _journal(self, key: str) -> None:
+        """Append the current state of one record to the journal. Caller must hold the lock."""
+        if self._journal_entries >= INDEX_JOURNAL_MAX_ENTRIES:
+            self._save_index()
+            return
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        with open(self.journal_path, "a") as f:
+            f.write(json.dumps({"key": key, "record": self._records.get(key)}) + "\n")
+        self._journal_entries += 1
+
+    # Upload lifecycle
+
+    def save_upload(
+        self,
+        fileobj: BinaryIO,
+        original_filename: str,
+        ticket_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Store an uploaded file under a unique key.
+
+        Args:
+            fileobj: Readable binary file object
+            original_filename: Filename supplied by the client
+            ticket_id: Ticket the upload belongs to, if already known
+
+        Returns:
+            Upload record including the key and a local path for analysis
+        """
+        file_extension = os.path.splitext(original_filename)[1]
+        key = f"{uuid.uuid4()}{file_extension}"
+        size = self.backend.put(key, fileobj)
+        now = time.time()
+
+        record = {
+            "key": key,
+            "original_filename": original_filename,
+            "size": size,
+            "created_at": now,
+            "last_accessed": now,
+            "tickets": [ticket_id] if ticket_id else []
+        }
+        with self._lock:
+            self._records[key] = record
+            self._journal(key)
+
+        return {**record, "path": self.backend.local_path(key)}
+
+    def attach_to_ticket(self, key: str, ticket_id: str) -> bool:
+        """
+        Record that a ticket references an upload.
+
+        Returns:
+            True if the upload is known, False otherwise
+        """
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                return False
+            if ticket_id not in record["tickets"]:
+                record["tickets"].append(ticket_id)
+                self._journal(key)
+            return True
+
+    def get_path(self, key: str) -> Optional[str]:
+        """Return a local path for an upload and mark it as recently used."""
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                return None
+            record["last_accessed"] = time.time()
+            # Journaled so eviction keeps its LRU order across restarts
+            self._journal(key)
+        return self.backend.local_path(key)
+
+    def uploads_for_ticket(self, ticket_id: str) -> List[Dict[str, Any]]:
+        """List the upload records referenced by a ticket."""
+        with self._lock:
+            return [dict(r) for r in self._records.values() if ticket_id in r["tickets"]]
+
+    # Garbage collection
+
+    def _remove(self, key: str, reason: str) -> int:
+        """Delete an upload from the backend and the index. Caller must hold the lock."""
+        record = self._records.pop(key, None)
+        size = record["size"] if record else 0
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            logger.warning(f"Failed to delete upload {key}: {str(e)}")
+        logger.info(f"Removed upload {key} ({reason}, {size} bytes)")
+        self._stats["files_removed"] += 1
+        self._stats["bytes_freed"] += size
+        return size
+
+    def collect_garbage(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Apply the retention tiers and the size quota.
+
+        Args:
+            now: Current time in epoch seconds (defaults to time.time())
+
+        Returns:
+            Dictionary with the number of files removed and bytes freed per tier
+        """
+        now = now if now is not None else time.time()
+        result = {"untracked": 0, "orphaned": 0, "expired": 0, "evicted": 0, "bytes_freed": 0}
+
+        # Listing runs without the lock; uploads saved meanwhile may be missing from it
+        listed_at = time.time()
+        stored_objects = self.backend.list_objects()
+
+        with self._lock:
+            # Files on storage that the index doesn't know about (e.g. from before the index existed)
+            for key, info in stored_objects.items():
+                if key not in self._records and now - info["modified"] > self.orphan_grace_seconds:
+                    self._records[key] = {"size": info["size"]}
+                    result["bytes_freed"] += self._remove(key, "untracked")
+                    result["untracked"] += 1
+
+            # Index entries whose file disappeared (uploads recorded after the listing started are kept)
+            for key, record in list(self._records.items()):
+                if key not in stored_objects and record["created_at"] < listed_at:
+                    self._records.pop(key)
+
+            for key, record in list(self._records.items()):
+                age = now - record["created_at"]
+                if not record["tickets"] and age > self.orphan_grace_seconds:
+                    result["bytes_freed"] += self._remove(key, "orphaned")
+                    result["orphaned"] += 1
+                elif age > self.max_age_seconds:
+                    result["bytes_freed"] += self._remove(key, "expired")
+                    result["expired"] += 1
+
+            # LRU eviction down to the quota; orphans go before referenced uploads
+            total_bytes = sum(r["size"] for r in self._records.values())
+            if total_bytes > self.quota_bytes:
+                candidates = sorted(
+                    self._records.values(),
+                    key=lambda r: (bool(r["tickets"]), r["last_accessed"])
+                )
+                for record in candidates:
+                    if total_bytes <= self.quota_bytes:
+                        break
+                    total_bytes -= self._remove(record["key"], "quota")
+                    result["bytes_freed"] += record["size"]
+                    result["evicted"] += 1
+                    self._stats["evictions"] += 1
+
+            self._stats["gc_runs"] += 1
+            self._stats["last_gc"] = now
+            self._save_index()
+
+        return result
+
+    async def _gc_loop(self, interval_seconds: float) -> None:
+        """Run garbage collection periodically off the event loop."""
+        while True:
+            try:
+                result = await asyncio.to_thread(self.collect_garbage)
+                if result["bytes_freed"]:
+                    logger.info(f"Upload GC freed {result['bytes_freed']} bytes: {result}")
+            except Exception as e:
+                logger.error(f"Upload garbage collection failed: {str(e)}")
+            await asyncio.sleep(interval_seconds)
+
+    def start_background_gc(self, interval_seconds: float = UPLOAD_GC_INTERVAL_SECONDS) -> None:
+        """Start the periodic garbage collection task on the running event loop."""
+        if self._gc_task is None or self._gc_task.done():
+            self._gc_task = asyncio.get_running_loop().create_task(self._gc_loop(interval_seconds))
+
+    async def stop_background_gc(self) -> None:
+        """Cancel the periodic garbage collection task."""
+        if self._gc_task is not None:
+            self._gc_task.cancel()
+            try:
+                await self._gc_task
+            except asyncio.CancelledError:
+                pass
+            self._gc_task = None
+
+    # Metrics
+
+    def get_usage_metrics(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Report disk usage and lifecycle statistics.
+
+        Returns:
+            Dictionary with file counts, bytes used, quota utilization and GC counters
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            records = list(self._records.values())
+            stats = dict(self._stats)
+
+        total_bytes = sum(r["size"] for r in records)
+        oldest = min((r["created_at"] for r in records), default=None)
+
+        return {
+            "backend": self.backend.name,
+            "file_count": len(records),
+            "total_bytes": total_bytes,
+            "quota_bytes": self.quota_bytes,
+            "quota_utilization": round(total_bytes / self.quota_bytes, 4) if self.quota_bytes else None,
+            "orphaned_files": sum(1 for r in records if not r["tickets"]),
+            "oldest_upload_age_seconds": round(now - oldest, 1) if oldest is not None else None,
+            **stats
+        }
+
+
+# Singleton instance for global access
+upload_storage = UploadStorageManager()
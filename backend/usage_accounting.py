@@ -0,0 +1,296 @@
+"""
+Usage Accounting for Haunted Helpdesk
+
+Records Bedrock token usage and latency per ticket, agent, category and day, and
+enforces per-ticket and daily token budgets.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from strands.hooks import AfterModelCallEvent
+
+from ticket_context import estimate_tokens
+
+
+logger = logging.getLogger("haunted_helpdesk.usage")
+
+
+# Usage accounting configuration
+USAGE_STATS_PATH = os.getenv("USAGE_STATS_PATH", "backend/cache/usage_stats.json")
+USAGE_BUDGET_MODE = os.getenv("USAGE_BUDGET_MODE", "monitor")  # off, monitor or enforce
+TICKET_TOKEN_BUDGET = int(os.getenv("TICKET_TOKEN_BUDGET", "60000"))
+DAILY_TOKEN_BUDGET = int(os.getenv("DAILY_TOKEN_BUDGET", "0"))  # 0 = unlimited
+DEGRADED_CONTEXT_FACTOR = float(os.getenv("DEGRADED_CONTEXT_FACTOR", "0.5"))
+BEDROCK_INPUT_COST_PER_1K = float(os.getenv("BEDROCK_INPUT_COST_PER_1K", "0.003"))
+BEDROCK_OUTPUT_COST_PER_1K = float(os.getenv("BEDROCK_OUTPUT_COST_PER_1K", "0.015"))
+
+# Workflow steps that can be skipped when a budget is exhausted
+OPTIONAL_STEPS = {"routing", "memory_store", "ticket_close"}
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"calls": 0, "input_tokens": 0, "output_tokens": 0, "latency_ms": 0, "retries": 0, "cost_usd": 0.0}
+
+
+def _add_call(totals: Dict[str, Any], call: Dict[str, Any]) -> None:
+    """Add one call (or another totals dict) into a totals dict."""
+    for key in ("calls", "input_tokens", "output_tokens", "latency_ms", "retries"):
+        totals[key] += call.get(key, 1 if key == "calls" else 0)
+    totals["cost_usd"] = round(totals["cost_usd"] + call.get("cost_usd", 0.0), 6)
+
+
+def estimate_cost(input_tokens: int, output_tokens: int) -> float:
+    """Estimate the Bedrock cost of a call in USD."""
+    return round(input_tokens / 1000 * BEDROCK_INPUT_COST_PER_1K + output_tokens / 1000 * BEDROCK_OUTPUT_COST_PER_1K, 6)
+
+
+class ModelRetryCounter:
+    """Counts failed model calls of an agent; the agent retries each of them."""
+
+    def __init__(self):
+        self.count = 0
+
+    def attach(self, agent: Any) -> "ModelRetryCounter":
+        """Register the counter on an agent's hooks (agents without hooks are ignored)."""
+        hooks = getattr(agent, "hooks", None)
+        if hooks is not None:
+            hooks.add_callback(AfterModelCallEvent, self._on_model_call)
+        return self
+
+    def _on_model_call(self, event: AfterModelCallEvent) -> None:
+        if event.exception is not None:
+            self.count += 1
+
+
+class UsageAggregator:
+    """Running usage totals per agent, category and day, persisted as JSON."""
+
+    def __init__(self, stats_path: str = USAGE_STATS_PATH):
+        """
+        Initialize the aggregator and load previous totals from disk.
+
+        Args:
+            stats_path: Path of the JSON statistics file
+        """
+        self.stats_path = stats_path
+        self._lock = threading.Lock()
+        self._stats = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.stats_path, "r") as f:
+                stats = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            stats = {}
+        for dimension in ("by_agent", "by_category", "by_day"):
+            stats.setdefault(dimension, {})
+        return stats
+
+    def _save(self) -> None:
+        """Atomically write the statistics to disk. Caller must hold the lock."""
+        try:
+            os.makedirs(os.path.dirname(self.stats_path) or ".", exist_ok=True)
+            tmp_path = f"{self.stats_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._stats, f)
+            os.replace(tmp_path, self.stats_path)
+        except OSError as e:
+            logger.error(f"Failed to save usage statistics: {str(e)}")
+
+    def add_calls(self, calls: List[Dict[str, Any]], category: str) -> None:
+        """
+        Add agent calls to the running totals.
+
+        Args:
+            calls: Call records (agent, day, tokens, latency, retries, cost)
+            category: Ticket category, or "system" for calls outside tickets
+        """
+        if not calls:
+            return
+        with self._lock:
+            for call in calls:
+                for dimension, key in (("by_agent", call["agent"]), ("by_category", category or "unknown"),
+                                       ("by_day", call["day"])):
+                    _add_call(self._stats[dimension].setdefault(key, _empty_totals()), call)
+            self._save()
+
+    def tokens_today(self) -> int:
+        """Total tokens used so far today (UTC)."""
+        with self._lock:
+            day = self._stats["by_day"].get(datetime.now(timezone.utc).date().isoformat())
+            return day["input_tokens"] + day["output_tokens"] if day else 0
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Return a copy of all totals plus the configured budgets."""
+        with self._lock:
+            summary = json.loads(json.dumps(self._stats))
+        summary["budgets"] = {
+            "mode": USAGE_BUDGET_MODE,
+            "ticket_tokens": TICKET_TOKEN_BUDGET,
+            "daily_tokens": DAILY_TOKEN_BUDGET,
+        }
+        return summary
+
+
+# Shared aggregator instance
+usage_aggregator = UsageAggregator()
+
+
+class UsageLedger:
+    """Usage of one ticket across all its agent calls."""
+
+    def __init__(
+        self,
+        ticket_id: Optional[str] = None,
+        category: str = "unknown",
+        aggregator: Optional[UsageAggregator] = None,
+        mode: str = USAGE_BUDGET_MODE,
+        ticket_budget: int = TICKET_TOKEN_BUDGET,
+        daily_budget: int = DAILY_TOKEN_BUDGET
+    ):
+        """
+        Initialize the ledger.
+
+        Args:
+            ticket_id: Ticket the usage belongs to
+            category: Ticket category used for aggregation
+            aggregator: Aggregator that receives the calls on finalize()
+            mode: Budget mode: "off", "monitor" (log only) or "enforce" (degrade)
+            ticket_budget: Token budget per ticket (0 = unlimited)
+            daily_budget: Token budget per UTC day across all tickets (0 = unlimited)
+        """
+        self.ticket_id = ticket_id
+        self.category = category
+        self.aggregator = aggregator if aggregator is not None else usage_aggregator
+        self.mode = mode
+        self.ticket_budget = ticket_budget
+        self.daily_budget = daily_budget
+        self.calls: List[Dict[str, Any]] = []
+        self.skipped_steps: List[str] = []
+        self._flushed = 0
+        self._warned = False
+
+    def record(
+        self,
+        agent_name: str,
+        input_tokens: int,
+        output_tokens: int,
+        latency_ms: int = 0,
+        retries: int = 0,
+        estimated: bool = False,
+        cached: bool = False
+    ) -> Dict[str, Any]:
+        """Record one agent call and return its record."""
+        call = {
+            "agent": agent_name,
+            "day": datetime.now(timezone.utc).date().isoformat(),
+            "input_tokens": int(input_tokens),
+            "output_tokens": int(output_tokens),
+            "latency_ms": int(latency_ms),
+            "retries": int(retries),
+            "cost_usd": estimate_cost(input_tokens, output_tokens),
+            "estimated": estimated,
+            "cached": cached,
+        }
+        self.calls.append(call)
+        return call
+
+    def record_agent_result(
+        self,
+        agent_name: str,
+        result: Any,
+        prompt: str = "",
+        retries: int = 0,
+        cached: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Record an agent invocation from its AgentResult metrics.
+
+        Results without metrics are recorded with token estimates from the text.
+
+        Args:
+            agent_name: Name of the invoked agent
+            result: AgentResult returned by the agent
+            prompt: Prompt sent (used for estimates)
+            retries: Failed model calls the agent retried
+            cached: Whether the response was replayed from the model response cache
+        """
+        metrics = getattr(result, "metrics", None)
+        usage = getattr(metrics, "accumulated_usage", None)
+        if usage:
+            return self.record(
+                agent_name,
+                usage.get("inputTokens", 0),
+                usage.get("outputTokens", 0),
+                latency_ms=getattr(metrics, "accumulated_metrics", {}).get("latencyMs", 0),
+                retries=retries,
+                cached=cached
+            )
+        return self.record(agent_name, estimate_tokens(prompt), estimate_tokens(str(result)), retries=retries,
+                           estimated=True, cached=cached)
+
+    def total_tokens(self) -> int:
+        """Input plus output tokens recorded so far."""
+        return sum(call["input_tokens"] + call["output_tokens"] for call in self.calls)
+
+    def over_budget(self) -> bool:
+        """Whether this ticket or today's usage has exceeded its budget."""
+        if self.mode == "off":
+            return False
+        over = bool(self.ticket_budget and self.total_tokens() >= self.ticket_budget)
+        if not over and self.daily_budget:
+            pending = sum(call["input_tokens"] + call["output_tokens"] for call in self.calls[self._flushed:])
+            over = self.aggregator.tokens_today() + pending >= self.daily_budget
+        if over and not self._warned:
+            logger.warning(f"Token budget exceeded: ticket_id={self.ticket_id}, tokens={self.total_tokens()}, mode={self.mode}")
+            self._warned = True
+        return over
+
+    @property
+    def degraded(self) -> bool:
+        """Whether the workflow should run in degraded mode."""
+        return self.mode == "enforce" and self.over_budget()
+
+    def should_skip(self, step: str) -> bool:
+        """
+        Decide whether an optional step is skipped to save tokens.
+
+        Returns:
+            True (and records the step as skipped) when the step is optional and the
+            ledger is degraded
+        """
+        if step in OPTIONAL_STEPS and self.degraded:
+            self.skipped_steps.append(step)
+            return True
+        return False
+
+    def context_budget(self, budget_tokens: Optional[int]) -> Optional[int]:
+        """Shrink a prompt token budget while degraded."""
+        if budget_tokens and self.degraded:
+            return max(int(budget_tokens * DEGRADED_CONTEXT_FACTOR), 1)
+        return budget_tokens
+
+    def finalize(self) -> None:
+        """Hand calls not yet aggregated to the aggregator."""
+        self.aggregator.add_calls(self.calls[self._flushed:], self.category)
+        self._flushed = len(self.calls)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Ticket totals, per-agent totals and budget state."""
+        totals = _empty_totals()
+        by_agent: Dict[str, Dict[str, Any]] = {}
+        for call in self.calls:
+            _add_call(totals, call)
+            _add_call(by_agent.setdefault(call["agent"], _empty_totals()), call)
+        return {
+            "total": totals,
+            "by_agent": by_agent,
+            "budget_exceeded": self.mode != "off" and self.over_budget(),
+            "degraded": self.degraded,
+            "skipped_steps": list(self.skipped_steps),
+        }
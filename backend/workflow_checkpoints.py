@@ -0,0 +1,144 @@
+"""
+Workflow Checkpoints for Haunted Helpdesk
+
+Stores each completed router step per ticket in a local SQLite file so reprocessing
+a ticket resumes from the last good step.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+logger = logging.getLogger("haunted_helpdesk.checkpoints")
+
+
+# Workflow checkpoint configuration
+WORKFLOW_CHECKPOINTS_ENABLED = os.getenv("WORKFLOW_CHECKPOINTS_ENABLED", "true").lower() == "true"
+WORKFLOW_CHECKPOINT_PATH = os.getenv("WORKFLOW_CHECKPOINT_PATH", "backend/cache/workflow_checkpoints.sqlite3")
+WORKFLOW_CHECKPOINT_RETENTION_SECONDS = float(os.getenv("WORKFLOW_CHECKPOINT_RETENTION_SECONDS", "604800"))
+
+
+def input_fingerprint(ticket_id: str, title: str, description: str) -> str:
+    """Fingerprint of the ticket input a workflow ran on."""
+    return hashlib.sha256(json.dumps([ticket_id, title, description]).encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """SQLite store of completed workflow steps per ticket."""
+
+    def __init__(self, path: str = WORKFLOW_CHECKPOINT_PATH, retention: float = WORKFLOW_CHECKPOINT_RETENTION_SECONDS):
+        """
+        Initialize the store. The SQLite file is opened on first use.
+
+        Args:
+            path: SQLite database path
+            retention: Seconds after which checkpoints of abandoned workflows are dropped
+        """
+        self.path = path
+        self.retention = retention
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database and create the table. Caller must hold the lock."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "ticket_id TEXT NOT NULL, step_key TEXT NOT NULL, seq INTEGER NOT NULL, "
+                "fingerprint TEXT NOT NULL, entry TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (ticket_id, step_key))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def save(self, ticket_id: str, step_key: str, entry: Dict[str, Any], fingerprint: str) -> None:
+        """
+        Record a completed step.
+
+        Args:
+            ticket_id: Ticket the workflow runs for
+            step_key: Step identifier (step and agent name)
+            entry: Conversation history entry of the step
+            fingerprint: Input fingerprint of the workflow run
+        """
+        with self._lock:
+            try:
+                conn = self._connection()
+                seq = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) + 1 FROM checkpoints WHERE ticket_id = ?", (ticket_id,)
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints (ticket_id, step_key, seq, fingerprint, entry, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (ticket_id, step_key, seq, fingerprint, json.dumps(entry, default=str), time.time())
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                # A missing checkpoint only costs a re-run of the step
+                logger.warning(f"Failed to checkpoint {step_key} for ticket {ticket_id}: {str(e)}")
+
+    def load(self, ticket_id: str, fingerprint: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the completed steps of a ticket's unfinished workflow.
+
+        Checkpoints recorded for a different input fingerprint, or older than the
+        retention period, are discarded.
+
+        Args:
+            ticket_id: Ticket to resume
+            fingerprint: Input fingerprint of the new run (None accepts any)
+
+        Returns:
+            Step entries by step key, in execution order
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM checkpoints WHERE created_at < ?", (time.time() - self.retention,))
+            if fingerprint is not None:
+                conn.execute("DELETE FROM checkpoints WHERE ticket_id = ? AND fingerprint != ?", (ticket_id, fingerprint))
+            conn.commit()
+            rows = conn.execute(
+                "SELECT step_key, entry FROM checkpoints WHERE ticket_id = ? ORDER BY seq", (ticket_id,)
+            ).fetchall()
+        return {step_key: json.loads(entry) for step_key, entry in rows}
+
+    def clear(self, ticket_id: str) -> None:
+        """Remove all checkpoints of a ticket."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM checkpoints WHERE ticket_id = ?", (ticket_id,))
+            conn.commit()
+
+    def get_status(self, ticket_id: str) -> Dict[str, Any]:
+        """
+        Describe the checkpointed progress of a ticket.
+
+        Returns:
+            Dictionary containing:
+            - ticket_id: Ticket identifier
+            - steps: Completed step keys in execution order
+            - handoff_sequence: Agent names of the completed steps
+            - last_checkpoint_at: Timestamp of the latest checkpoint (None without checkpoints)
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT step_key, entry, created_at FROM checkpoints WHERE ticket_id = ? ORDER BY seq", (ticket_id,)
+            ).fetchall()
+        return {
+            "ticket_id": ticket_id,
+            "steps": [step_key for step_key, _, _ in rows],
+            "handoff_sequence": [json.loads(entry).get("agent_name") for _, entry, _ in rows],
+            "last_checkpoint_at": rows[-1][2] if rows else None,
+        }
+
+
+# Shared checkpoint store
+workflow_checkpoints = CheckpointStore()
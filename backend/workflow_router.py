@@ -0,0 +1,566 @@
+"""
+Deterministic Workflow Router for Haunted Helpdesk
+
+Runs the orchestrator's fixed routing table in code (memory → ticketing → worker →
+memory → summarization → ticketing), consulting the LLM orchestrator only for
+tickets the classifier can't place; WORKFLOW_MODE=swarm keeps the all-LLM swarm.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.orchestrator_agent import create_orchestrator_agent
+from agents.memory_agent import create_memory_agent
+from agents.ticketing_agent import create_ticketing_agent
+from agents.network_diagnostic_agent import create_network_diagnostic_agent
+from agents.cloud_service_agent import create_cloud_service_agent
+from agents.summarization_agent import create_summarization_agent
+from bedrock_model import replayed_from_cache
+from event_stream import AgentOutputPublisher, TicketEventBroker, ticket_events
+from ticket_context import ContextLedger, TicketState
+from timeout_policy import TIMEOUT_POLICY_ENABLED, AdaptiveTimeoutPolicy, TimeoutPolicy, timeout_policy
+from workflow_checkpoints import WORKFLOW_CHECKPOINTS_ENABLED, CheckpointStore, input_fingerprint, workflow_checkpoints
+from usage_accounting import ModelRetryCounter, UsageLedger
+
+
+logger = logging.getLogger("haunted_helpdesk.router")
+
+
+# Router configuration
+WORKFLOW_MODE = os.getenv("WORKFLOW_MODE", "router")
+ROUTER_MIN_CONFIDENCE = float(os.getenv("ROUTER_MIN_CONFIDENCE", "0.6"))
+ROUTER_LLM_FALLBACK = os.getenv("ROUTER_LLM_FALLBACK", "true").lower() == "true"
+ROUTER_PARALLEL_DIAGNOSTICS = os.getenv("ROUTER_PARALLEL_DIAGNOSTICS", "true").lower() == "true"
+ROUTER_PARALLEL_MIN_SCORE = float(os.getenv("ROUTER_PARALLEL_MIN_SCORE", "2"))
+ROUTER_PARALLEL_MIN_SHARE = float(os.getenv("ROUTER_PARALLEL_MIN_SHARE", "0.2"))
+WORKER_TIMEOUT_SECONDS = float(os.getenv("WORKER_TIMEOUT_SECONDS", "90"))
+ROUTER_EXECUTION_TIMEOUT = float(os.getenv("ROUTER_EXECUTION_TIMEOUT", "120"))
+ROUTER_NODE_TIMEOUT = float(os.getenv("ROUTER_NODE_TIMEOUT", "90"))
+
+NETWORK_WORKER = "network_diagnostic_agent"
+CLOUD_WORKER = "cloud_service_agent"
+
+# Keyword weights for the local classifier; phrases are matched on word boundaries
+NETWORK_KEYWORDS = {
+    "ping": 2, "traceroute": 3, "dns": 3, "nslookup": 3, "latency": 2, "packet": 2,
+    "packet loss": 3, "unreachable": 2, "timeout": 1, "timed out": 1, "connection refused": 2,
+    "connect": 1, "connecting": 2, "connectivity": 2, "connection": 1, "port": 1, "tcp": 2,
+    "tls": 2, "ssl": 2, "certificate": 2, "handshake": 2, "vpn": 3, "firewall": 2, "gateway": 2, "router": 2, "hostname": 2,
+    "host": 1, "resolve": 2, "network": 2, "wifi": 3, "ip address": 2, "http": 1, "website": 1,
+}
+CLOUD_KEYWORDS = {
+    "s3": 3, "bucket": 3, "buckets": 3, "aws": 2, "iam": 3, "credentials": 2, "credential": 2,
+    "expired token": 3, "access denied": 2, "permission": 1, "permissions": 1, "policy": 1,
+    "region": 2, "ec2": 3, "lambda": 3, "dynamodb": 3, "cloudfront": 3, "bedrock": 3,
+    "cloud": 2, "object": 1, "upload": 1, "storage": 1, "arn": 3,
+}
+
+# A ticket's category counts as this much keyword evidence for its worker
+CATEGORY_WEIGHT = 4
+CATEGORY_WORKERS = {"network": NETWORK_WORKER, "cloud": CLOUD_WORKER}
+
+
+async def _run_with_timeout(coro: Any, timeout: float) -> Any:
+    """
+    Await a coroutine, cancelling it after timeout seconds.
+
+    Unlike nested asyncio.wait_for calls, a cancellation that arrives while the
+    coroutine finishes is never swallowed, so the run's timeout holds even when it
+    expires together with a step's.
+
+    Raises:
+        asyncio.TimeoutError: If the coroutine didn't finish in time
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        await asyncio.wait({task})
+        raise asyncio.TimeoutError()
+    return task.result()
+
+
+def _compile_keywords(keywords: Dict[str, int]) -> List[Any]:
+    return [(re.compile(rf"\b{re.escape(phrase)}\b"), weight) for phrase, weight in keywords.items()]
+
+
+_NETWORK_PATTERNS = _compile_keywords(NETWORK_KEYWORDS)
+_CLOUD_PATTERNS = _compile_keywords(CLOUD_KEYWORDS)
+
+
+class WorkflowTimeout(asyncio.TimeoutError):
+    """Raised when an agent call or a whole routed workflow exceeds its timeout."""
+
+
+@dataclass
+class RoutingDecision:
+    """Which worker(s) handle a ticket and why; workers[0] is the primary worker."""
+    worker: str
+    method: str
+    confidence: float
+    scores: Dict[str, float] = field(default_factory=dict)
+    workers: List[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if not self.workers:
+            self.workers = [self.worker]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+def classify_ticket(title: str, description: str, category: Optional[str] = None) -> RoutingDecision:
+    """
+    Score a ticket against network and cloud keywords plus its category.
+
+    Args:
+        title: Ticket title
+        description: Ticket description
+        category: Ticket category (network, cloud, other)
+
+    Returns:
+        RoutingDecision with method "classifier"; confidence is the winning
+        share of the total score (0.0 when nothing matched). When the text alone
+        has substantial evidence for both workers, both are listed in workers.
+    """
+    text = f"{title} {description}".lower()
+    scores = {
+        NETWORK_WORKER: float(sum(weight for pattern, weight in _NETWORK_PATTERNS if pattern.search(text))),
+        CLOUD_WORKER: float(sum(weight for pattern, weight in _CLOUD_PATTERNS if pattern.search(text))),
+    }
+    keyword_total = sum(scores.values())
+    spans_both = keyword_total > 0 and all(
+        score >= ROUTER_PARALLEL_MIN_SCORE and score / keyword_total >= ROUTER_PARALLEL_MIN_SHARE
+        for score in scores.values()
+    )
+
+    category_worker = CATEGORY_WORKERS.get((category or "").strip().lower())
+    if category_worker:
+        scores[category_worker] += CATEGORY_WEIGHT
+
+    total = sum(scores.values())
+    worker = max(scores, key=lambda name: (scores[name], name == NETWORK_WORKER))
+    confidence = round(scores[worker] / total, 3) if total else 0.0
+
+    workers = [worker] + [name for name in scores if name != worker] if spans_both else [worker]
+
+    return RoutingDecision(worker=worker, method="classifier", confidence=confidence, scores=scores, workers=workers)
+
+
+def format_ticket_content(ticket: Dict[str, Any], description: Optional[str] = None) -> str:
+    """
+    Render a ticket as the text handed to the agents.
+
+    Args:
+        ticket: Ticket record from DynamoDB
+        description: Description to use instead of the stored one (e.g. with image analysis)
+
+    Returns:
+        Ticket content string
+    """
+    return f"""
+Ticket ID: {ticket['ticket_id']}
+Title: {ticket['title']}
+Description: {description if description is not None else ticket['description']}
+Severity: {ticket['severity']}
+Category: {ticket['category']}
+Created: {ticket['created_at']}
+"""
+
+
+DEFAULT_AGENT_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "orchestrator_agent": create_orchestrator_agent,
+    "memory_agent": create_memory_agent,
+    "ticketing_agent": create_ticketing_agent,
+    NETWORK_WORKER: create_network_diagnostic_agent,
+    CLOUD_WORKER: create_cloud_service_agent,
+    "summarization_agent": create_summarization_agent,
+}
+
+
+@dataclass
+class WorkflowRun:
+    """Per-ticket state of one router run."""
+    state: TicketState
+    context: ContextLedger
+    usage: UsageLedger
+    steps: List[Dict[str, Any]] = field(default_factory=list)
+    # Checkpointed steps of an earlier, failed run of the same input, by step key
+    restored: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    fingerprint: str = ""
+    # Limits chosen for this ticket (None without a timeout policy)
+    timeouts: Optional[TimeoutPolicy] = None
+
+
+class WorkflowRouter:
+    """Runs a ticket through the helpdesk routing table without orchestrator hops."""
+
+    def __init__(
+        self,
+        agent_factories: Optional[Dict[str, Callable[[], Any]]] = None,
+        min_confidence: float = ROUTER_MIN_CONFIDENCE,
+        llm_fallback: bool = ROUTER_LLM_FALLBACK,
+        parallel_diagnostics: bool = ROUTER_PARALLEL_DIAGNOSTICS,
+        worker_timeout: float = WORKER_TIMEOUT_SECONDS,
+        execution_timeout: float = ROUTER_EXECUTION_TIMEOUT,
+        node_timeout: float = ROUTER_NODE_TIMEOUT,
+        events: Optional[TicketEventBroker] = None,
+        checkpoints: Optional[CheckpointStore] = None,
+        timeout_policy: Optional[AdaptiveTimeoutPolicy] = None
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            agent_factories: Agent constructors by agent name (defaults to the helpdesk agents)
+            min_confidence: Classifier confidence below which a ticket counts as ambiguous
+            llm_fallback: Ask the orchestrator agent to route ambiguous tickets
+            parallel_diagnostics: Run both workers for tickets that span network and cloud
+            worker_timeout: Per-branch timeout in seconds for parallel workers (without a
+                learned timeout for the worker)
+            execution_timeout: Timeout in seconds for the whole run (until learned)
+            node_timeout: Timeout in seconds for each agent call (until learned)
+            events: Broker receiving streamed agent output (defaults to the shared ticket events)
+            checkpoints: Store for completed steps (None disables checkpointing and resuming)
+            timeout_policy: Learns agent and workflow timeouts from completed runs (None keeps the
+                static timeouts)
+        """
+        self.agent_factories = dict(DEFAULT_AGENT_FACTORIES)
+        self.agent_factories.update(agent_factories or {})
+        self.min_confidence = min_confidence
+        self.llm_fallback = llm_fallback
+        self.parallel_diagnostics = parallel_diagnostics
+        self.worker_timeout = worker_timeout
+        self.execution_timeout = execution_timeout
+        self.node_timeout = node_timeout
+        self.events = events if events is not None else ticket_events
+        self.checkpoints = checkpoints
+        self.timeout_policy = timeout_policy
+
+    @staticmethod
+    async def _call_agent(agent: Any, prompt: str, output: AgentOutputPublisher) -> Any:
+        """Invoke an agent, streaming its text to the event stream when the agent supports it."""
+        if not hasattr(agent, "stream_async"):
+            return await agent.invoke_async(prompt)
+        result = None
+        async for event in agent.stream_async(prompt):
+            if "data" in event:
+                output.write(event["data"])
+            elif "result" in event:
+                result = event["result"]
+        output.flush()
+        return result
+
+    async def _invoke(self, agent_name: str, step: str, run: WorkflowRun,
+                      steps: Optional[List[Dict[str, Any]]] = None, timeout: Optional[float] = None) -> str:
+        """
+        Render the step's view of the ticket, invoke a freshly created agent and record the call.
+
+        Steps completed by an earlier run of the same input are replayed from their
+        checkpoint instead of invoking the agent again.
+
+        Raises:
+            WorkflowTimeout: If the agent doesn't answer within timeout (default: the agent's
+                learned timeout, else the node timeout)
+        """
+        ticket_id = run.state.ticket_id
+        step_key = f"{step}:{agent_name}"
+        if step_key in run.restored:
+            entry = dict(run.restored.pop(step_key), resumed=True)
+            (run.steps if steps is None else steps).append(entry)
+            self.events.publish(ticket_id, "agent_completed", entry)
+            return entry["content"]
+
+        budget = run.usage.context_budget(run.context.budget_for(agent_name))
+        prompt = run.state.render(step, budget)
+        agent = self.agent_factories[agent_name]()
+        retry_counter = ModelRetryCounter().attach(agent)
+        self.events.publish(ticket_id, "agent_started", {"agent_name": agent_name, "step": step})
+        start = time.time()
+        if timeout is None:
+            timeout = run.timeouts.timeout_for(agent_name) if run.timeouts is not None else self.node_timeout
+        try:
+            result = await _run_with_timeout(
+                self._call_agent(agent, prompt, AgentOutputPublisher(self.events, ticket_id, agent_name, step)),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            raise WorkflowTimeout(f"{agent_name} timed out after {timeout:.0f}s ({step})") from None
+        content = str(result).strip()
+        input_tokens, output_tokens = run.context.record(agent_name, prompt, content)
+        cached = replayed_from_cache(agent)
+        run.usage.record_agent_result(agent_name, result, prompt, retries=retry_counter.count, cached=cached)
+        entry = {
+            "agent_name": agent_name,
+            "step": step,
+            "content": content,
+            "role": "assistant",
+            "duration": round(time.time() - start, 3),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cached": cached,
+        }
+        (run.steps if steps is None else steps).append(entry)
+        if self.checkpoints is not None:
+            # SQLite insert and commit; keep them off the event loop
+            await asyncio.to_thread(self.checkpoints.save, ticket_id, step_key, entry, run.fingerprint)
+        self.events.publish(ticket_id, "agent_completed", entry)
+        return content
+
+    async def choose_worker(self, run: WorkflowRun) -> RoutingDecision:
+        """
+        Pick the network and/or cloud worker for a ticket.
+
+        Clear-cut and mixed tickets are routed locally. Ambiguous ones are routed
+        by the orchestrator agent when the LLM fallback is enabled (and the token
+        budget allows), otherwise by the classifier's best guess.
+        """
+        state = run.state
+        decision = classify_ticket(state.title, state.description, state.category)
+        if not self.parallel_diagnostics:
+            decision.workers = [decision.worker]
+        if len(decision.workers) > 1 or decision.confidence >= self.min_confidence:
+            return decision
+
+        if not self.llm_fallback or run.usage.should_skip("routing"):
+            decision.method = "classifier_default"
+            return decision
+
+        answer = await self._invoke("orchestrator_agent", "routing", run)
+        chosen = [worker for worker in (CLOUD_WORKER, NETWORK_WORKER) if worker in answer]
+        if chosen:
+            workers = chosen if self.parallel_diagnostics else chosen[:1]
+            return RoutingDecision(worker=workers[0], method="orchestrator", confidence=decision.confidence,
+                                   scores=decision.scores, workers=workers)
+
+        decision.method = "classifier_default"
+        return decision
+
+    async def _run_branch(self, worker: str, run: WorkflowRun) -> Dict[str, Any]:
+        """Run one worker of a parallel stage under its own timeout; never raises."""
+        branch_steps: List[Dict[str, Any]] = []
+        timeout = self.worker_timeout
+        if run.timeouts is not None and worker in run.timeouts.agent_timeouts:
+            timeout = run.timeouts.timeout_for(worker)
+        start = time.time()
+        try:
+            content = await self._invoke(worker, "diagnosis", run, steps=branch_steps, timeout=timeout)
+            status = "completed"
+        except asyncio.TimeoutError:
+            content, status = f"Did not finish within {timeout:.0f}s", "timeout"
+        except Exception as e:
+            content, status = f"Failed: {str(e)}", "error"
+
+        if status != "completed":
+            logger.warning(f"Parallel worker {worker} {status}: {content}")
+            branch_steps.append({"agent_name": worker, "step": "diagnosis", "content": content,
+                                 "role": "assistant", "duration": round(time.time() - start, 3),
+                                 "status": status})
+        return {"worker": worker, "status": status, "content": content, "steps": branch_steps,
+                "duration": round(time.time() - start, 3)}
+
+    async def run_workers(self, workers: List[str], run: WorkflowRun) -> Dict[str, Any]:
+        """
+        Run the diagnostic stage with one or more workers and record their findings.
+
+        Several workers run concurrently on the same ticket context, so the stage takes as
+        long as the slowest branch rather than the sum. A branch that times out or
+        fails is reported in the merged findings; the stage only fails if every
+        branch does.
+
+        Returns:
+            Dictionary containing:
+            - resolution: Worker findings (merged, labeled per worker, for several workers)
+            - branches: Status and duration per worker (empty for a single worker)
+        """
+        if len(workers) == 1:
+            resolution = await self._invoke(workers[0], "diagnosis", run)
+            run.state.findings[workers[0]] = resolution
+            return {"resolution": resolution, "branches": []}
+
+        branches = await asyncio.gather(*(self._run_branch(worker, run) for worker in workers))
+        for branch in branches:
+            run.steps.extend(branch["steps"])
+            run.state.findings[branch["worker"]] = branch["content"]
+
+        if all(branch["status"] != "completed" for branch in branches):
+            raise RuntimeError("All diagnostic workers failed: " + "; ".join(
+                f"{branch['worker']}: {branch['content']}" for branch in branches
+            ))
+
+        resolution = "\n\n".join(f"[{branch['worker']}]\n{branch['content']}" for branch in branches)
+        return {
+            "resolution": resolution,
+            "branches": [{key: branch[key] for key in ("worker", "status", "duration")} for branch in branches],
+        }
+
+    async def _run_steps(self, run: WorkflowRun) -> tuple:
+        """
+        Run the routing table's steps for a ticket.
+
+        Returns:
+            Tuple of (final reply, terminating agent, routing decision or None, parallel branches)
+        """
+        state = run.state
+        decision: Optional[RoutingDecision] = None
+        branches: List[Dict[str, Any]] = []
+
+        # 1. Look for a past resolution
+        memory_reply = await self._invoke("memory_agent", "memory_lookup", run)
+
+        if "MEMORY_FOUND:" in memory_reply and "NO_MEMORY_FOUND" not in memory_reply:
+            # 2a. Known issue: summarize the stored resolution
+            state.memory_match = memory_reply
+        else:
+            # 2b. New issue: analyze, diagnose with the chosen worker(s), then remember the fix
+            state.analysis = await self._invoke("ticketing_agent", "ticket_analysis", run)
+            decision = await self.choose_worker(run)
+            logger.info(
+                f"Routed ticket {state.ticket_id} to {', '.join(decision.workers)} "
+                f"(method={decision.method}, confidence={decision.confidence})"
+            )
+            self.events.publish(state.ticket_id, "routing", decision.to_dict())
+
+            stage = await self.run_workers(decision.workers, run)
+            state.resolution, branches = stage["resolution"], stage["branches"]
+            if not run.usage.should_skip("memory_store"):
+                await self._invoke("memory_agent", "memory_store", run)
+
+        # 3. Summarize, then let the ticketing agent close the ticket
+        summary_reply = await self._invoke("summarization_agent", "summarization", run)
+        state.summary = summary_reply.split("WORKFLOW_COMPLETE")[0].strip()
+        if run.usage.should_skip("ticket_close"):
+            final_reply, terminated_by = state.summary, "router"
+        else:
+            final_reply = await self._invoke("ticketing_agent", "ticket_close", run)
+            terminated_by = "ticketing_agent"
+        return final_reply, terminated_by, decision, branches
+
+    async def run(
+        self,
+        ticket: Dict[str, Any],
+        description: Optional[str] = None,
+        usage: Optional[UsageLedger] = None,
+        resume: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Process a ticket through the routing table.
+
+        Args:
+            ticket: Ticket record from DynamoDB
+            description: Description to use instead of the stored one
+            usage: Usage ledger of the ticket (e.g. already holding image analysis calls)
+            resume: Reuse checkpointed steps of an earlier failed run (False starts over)
+
+        Returns:
+            Dictionary containing:
+            - final_response: Last agent's response
+            - handoff_sequence: Agent names in execution order
+            - conversation_history: One entry per agent invocation
+            - execution_time: Time taken in seconds
+            - status: "completed"
+            - summary: Resolution summary (without the WORKFLOW_COMPLETE marker)
+            - terminated_by: Agent that ended the workflow ("router" if the closing call was skipped)
+            - routing: How the worker(s) were chosen (None for memory hits)
+            - parallel_branches: Status and duration per worker when several ran
+            - agent_invocations: Number of agents invoked
+            - context_tokens: Estimated input/output tokens per agent, with the input
+              the same calls would have had carrying the full conversation
+            - usage: Bedrock tokens, latency, retries and cost of the ticket (see usage_accounting)
+            - cached_steps: Steps whose response was replayed from the model response cache
+            - resumed_steps: Steps reused from the checkpoints of an earlier failed run
+            - timeout_policy: Limits chosen for the ticket (None without a timeout policy)
+        """
+        start = time.time()
+        run = WorkflowRun(
+            state=TicketState.from_ticket(ticket, description),
+            context=ContextLedger(),
+            usage=usage or UsageLedger(ticket.get("ticket_id"), ticket.get("category", "unknown")),
+        )
+        run.fingerprint = input_fingerprint(run.state.ticket_id, run.state.title, run.state.description)
+        if self.timeout_policy is not None:
+            run.timeouts = await asyncio.to_thread(self.timeout_policy.policy_for, run.state.category,
+                                                   mode="router", execution_timeout=self.execution_timeout,
+                                                   node_timeout=self.node_timeout)
+        if self.checkpoints is not None:
+            if not resume:
+                await asyncio.to_thread(self.checkpoints.clear, run.state.ticket_id)
+            run.restored = await asyncio.to_thread(self.checkpoints.load, run.state.ticket_id, run.fingerprint)
+            if run.restored:
+                logger.info(f"Resuming ticket {run.state.ticket_id} after {len(run.restored)} checkpointed steps")
+        run.context.start(format_ticket_content(ticket, description))
+        state = run.state
+        execution_timeout = run.timeouts.execution_timeout if run.timeouts is not None else self.execution_timeout
+
+        try:
+            final_reply, terminated_by, decision, branches = await _run_with_timeout(
+                self._run_steps(run), execution_timeout
+            )
+        except WorkflowTimeout:
+            raise
+        except asyncio.TimeoutError:
+            raise WorkflowTimeout(
+                f"Workflow for ticket {state.ticket_id} timed out after {execution_timeout:.0f}s"
+            ) from None
+        finally:
+            run.usage.finalize()
+
+        if self.checkpoints is not None:
+            await asyncio.to_thread(self.checkpoints.clear, state.ticket_id)
+
+        result = {
+            "final_response": final_reply,
+            "handoff_sequence": [step["agent_name"] for step in run.steps],
+            "conversation_history": run.steps,
+            "execution_time": time.time() - start,
+            "status": "completed",
+            "summary": state.summary,
+            "terminated_by": terminated_by,
+            "routing": decision.to_dict() if decision else None,
+            "parallel_branches": branches,
+            "agent_invocations": len(run.steps),
+            "context_tokens": run.context.to_dict(),
+            "usage": run.usage.to_dict(),
+            "cached_steps": [step["step"] for step in run.steps if step.get("cached")],
+            "resumed_steps": [step["step"] for step in run.steps if step.get("resumed")],
+            "timeout_policy": run.timeouts.to_dict() if run.timeouts else None,
+        }
+        if self.timeout_policy is not None:
+            await asyncio.to_thread(self.timeout_policy.record_result, state.category, result)
+        return result
+
+
+async def run_routed_workflow(
+    ticket: Dict[str, Any],
+    description: Optional[str] = None,
+    usage: Optional[UsageLedger] = None,
+    resume: bool = True
+) -> Dict[str, Any]:
+    """
+    Process a ticket with the default router, checkpointing completed steps and learning
+    worker timeouts when enabled.
+
+    Args:
+        ticket: Ticket record from DynamoDB
+        description: Description to use instead of the stored one
+        usage: Usage ledger of the ticket, if calls were already recorded for it
+        resume: Reuse checkpointed steps of an earlier failed run
+
+    Returns:
+        Workflow result (see WorkflowRouter.run)
+    """
+    router = WorkflowRouter(
+        checkpoints=workflow_checkpoints if WORKFLOW_CHECKPOINTS_ENABLED else None,
+        timeout_policy=timeout_policy if TIMEOUT_POLICY_ENABLED else None
+    )
+    return await router.run(ticket, description, usage, resume=resume)
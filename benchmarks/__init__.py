@@ -0,0 +1,18 @@
+"""
+Performance Benchmarks for Haunted Helpdesk
+
+The test suite only checks correctness, so a slower memory lookup or ticket
+serializer showed up in production first. These benchmarks time the hot paths on
+synthetic data at several sizes and write machine-readable reports that are
+compared against a saved baseline:
+
+- generators: deterministic memories and tickets (1k, 100k, 1m)
+- harness: timing, JSON reports and baseline comparison
+- bench_memory, bench_dynamodb, bench_api: the benchmark groups, with the ticket table
+  held in memory (storage_backends.InMemoryTable) instead of DynamoDB
+- loadtest: offline load test of the whole ticket workflow
+
+Run from the repository root:
+
+    PYTHONPATH=backend python -m benchmarks.run --sizes 1k,100k --baseline benchmarks/baseline.json
+"""
@@ -0,0 +1,71 @@
+"""
+API benchmarks: TicketResponse construction and FastAPI routes served in-process
+(httpx ASGITransport, no network) with the ticket table replaced by an in-memory
+table. Routes that start agent workflows are not benchmarked.
+"""
+
+import asyncio
+import random
+from typing import List
+
+from benchmarks.bench_dynamodb import make_manager
+from benchmarks.generators import generate_tickets
+from benchmarks.harness import Benchmark
+
+
+GROUP = "api"
+REQUESTS_PER_ROUND = 100
+
+
+def benchmarks(size: str, count: int, workdir: str) -> List[Benchmark]:
+    """
+    Build the API benchmarks for one size.
+
+    Args:
+        size: Size label used in benchmark keys
+        count: Number of tickets in the table
+        workdir: Unused
+
+    Returns:
+        Benchmarks in the order they should run
+    """
+    import httpx
+
+    import main
+
+    tickets = generate_tickets(count)
+    standin = make_manager(tickets)
+    main.db_manager.table = standin.table
+    main.db_manager.downstream = standin.downstream
+
+    ids = [ticket["ticket_id"] for ticket in random.Random(5).sample(tickets, min(REQUESTS_PER_ROUND, count))]
+    new_ticket = {"title": "VPN down", "description": "VPN tunnel to eu-west-1 dropping packets",
+                  "severity": "high", "category": "network"}
+
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://benchmark")
+
+    def requests(method: str, paths: List[str], **kwargs):
+        async def send() -> None:
+            for path in paths:
+                response = await client.request(method, path, **kwargs)
+                response.raise_for_status()
+        return lambda: loop.run_until_complete(send())
+
+    def build_responses() -> None:
+        for ticket in tickets:
+            main.TicketResponse(**ticket)
+
+    return [
+        Benchmark(GROUP, "ticket_response_model", size, build_responses, items=count),
+        Benchmark(GROUP, "get_ticket_route", size, requests("GET", [f"/api/tickets/{i}" for i in ids]),
+                  items=len(ids)),
+        Benchmark(GROUP, "list_tickets_route", size, requests("GET", ["/api/tickets"]), items=count),
+        Benchmark(GROUP, "health_route", size, requests("GET", ["/health"] * REQUESTS_PER_ROUND),
+                  items=REQUESTS_PER_ROUND),
+        Benchmark(GROUP, "metrics_route", size, requests("GET", ["/metrics"] * 10), items=10),
+        # Last, since every round adds tickets to the table
+        Benchmark(GROUP, "create_ticket_route", size,
+                  requests("POST", ["/api/tickets"] * REQUESTS_PER_ROUND, json=new_ticket),
+                  items=REQUESTS_PER_ROUND),
+    ]
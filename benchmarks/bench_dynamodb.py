@@ -0,0 +1,71 @@
+"""
+Ticket storage benchmarks: DynamoDBManager serialization and table calls against
+the in-memory table backend (the resilience guard is disabled, tracing and metrics
+stay on as in production).
+"""
+
+import random
+from typing import List
+
+from benchmarks.generators import generate_tickets
+from benchmarks.harness import Benchmark
+
+
+GROUP = "dynamodb"
+LOOKUPS_PER_ROUND = 1000
+
+
+def make_manager(tickets: list):
+    """DynamoDBManager backed by an in-memory table holding the given tickets."""
+    from dynamodb_utils import DynamoDBManager
+    from resilience import Downstream
+    from storage_backends import InMemoryBackend
+
+    manager = DynamoDBManager(table_name="BenchmarkTickets",
+                              downstream=Downstream("dynamodb", 0.0, 1.0, enabled=False),
+                              backend=InMemoryBackend(indexes={}, latency="fixed:0", read_capacity=0,
+                                                      write_capacity=0))
+    manager.table.load([manager._serialize_for_dynamodb(ticket) for ticket in tickets])
+    return manager
+
+
+def benchmarks(size: str, count: int, workdir: str) -> List[Benchmark]:
+    """
+    Build the storage benchmarks for one size.
+
+    Args:
+        size: Size label used in benchmark keys
+        count: Number of tickets
+        workdir: Unused (the table is in memory)
+
+    Returns:
+        Benchmarks in the order they should run
+    """
+    tickets = generate_tickets(count)
+    manager = make_manager(tickets)
+    serialized = [manager._serialize_for_dynamodb(ticket) for ticket in tickets]
+    ids = [ticket["ticket_id"] for ticket in random.Random(3).sample(tickets, min(LOOKUPS_PER_ROUND, count))]
+
+    def serialize() -> None:
+        for ticket in tickets:
+            manager._serialize_for_dynamodb(ticket)
+
+    def deserialize() -> None:
+        for item in serialized:
+            manager._deserialize_from_dynamodb(item)
+
+    def get_tickets() -> None:
+        for ticket_id in ids:
+            manager.get_ticket(ticket_id)
+
+    def update_tickets() -> None:
+        for ticket_id in ids:
+            manager.update_ticket(ticket_id, {"status": "processing"})
+
+    return [
+        Benchmark(GROUP, "serialize_for_dynamodb", size, serialize, items=count),
+        Benchmark(GROUP, "deserialize_from_dynamodb", size, deserialize, items=count),
+        Benchmark(GROUP, "get_ticket", size, get_tickets, items=len(ids)),
+        Benchmark(GROUP, "update_ticket", size, update_tickets, items=len(ids)),
+        Benchmark(GROUP, "list_tickets", size, manager.list_tickets, items=count),
+    ]
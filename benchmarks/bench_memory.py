@@ -0,0 +1,63 @@
+"""
+Memory agent benchmarks: retrieve_memory and store_memory on memory files of each size.
+
+Both tools read (and store_memory rewrites) the whole JSON file on every call, so
+the file is generated once per size in the work directory and the agent's
+MEMORY_FILE_PATH is pointed at it.
+"""
+
+import json
+import os
+from typing import List
+
+from benchmarks.generators import generate_memories, generate_queries
+from benchmarks.harness import Benchmark
+
+
+GROUP = "memory"
+
+
+def benchmarks(size: str, count: int, workdir: str) -> List[Benchmark]:
+    """
+    Build the memory benchmarks for one size.
+
+    Args:
+        size: Size label used in benchmark keys
+        count: Number of stored memories
+        workdir: Directory the memory file is written to
+
+    Returns:
+        Benchmarks in the order they should run
+    """
+    from agents import memory_agent
+
+    path = os.path.join(workdir, f"memories_{size}.json")
+    memories = generate_memories(count)
+    with open(path, "w") as f:
+        json.dump(memories, f, indent=2)
+    memory_agent.MEMORY_FILE_PATH = path
+
+    queries = generate_queries(50)
+    rounds = {"next": 0}
+
+    def next_query() -> str:
+        rounds["next"] += 1
+        return queries[rounds["next"] % len(queries)]
+
+    def retrieve() -> None:
+        memory_agent.retrieve_memory(next_query())
+
+    def score_loaded() -> None:
+        # Matching alone, without reading the file, to separate parsing from scoring
+        query = next_query()
+        for memory in memories:
+            memory_agent._keyword_match_score(query, memory["query"])
+
+    def store() -> None:
+        memory_agent.store_memory(next_query(), "Restarted the gateway and verified connectivity")
+
+    return [
+        Benchmark(GROUP, "retrieve_memory", size, retrieve),
+        Benchmark(GROUP, "keyword_match_scan", size, score_loaded, items=count),
+        Benchmark(GROUP, "store_memory", size, store),
+    ]
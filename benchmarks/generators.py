@@ -0,0 +1,131 @@
+"""
+Synthetic data generators for the benchmarks.
+
+Data is generated from a seeded random.Random, so every run (and the baseline)
+works on identical inputs.
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+SEVERITIES = ["low", "medium", "high", "critical"]
+CATEGORIES = ["network", "cloud", "other"]
+STATUSES = ["pending", "queued", "processing", "resolved", "error"]
+
+COMPONENTS = [
+    "gateway", "router", "switch", "firewall", "load balancer", "dns resolver", "vpn tunnel", "s3 bucket",
+    "ec2 instance", "rds database", "lambda function", "iam role", "security group", "nat gateway",
+    "api gateway", "cloudfront distribution", "kubernetes node", "ldap server", "mail relay", "proxy",
+]
+SYMPTOMS = [
+    "not responding", "timing out", "dropping packets", "returning access denied", "refusing connections",
+    "showing high latency", "failing health checks", "unreachable from office", "throwing 503 errors",
+    "resolving wrong address", "running out of memory", "rejecting credentials", "stuck in pending state",
+]
+RESOLUTIONS = [
+    "Restarted the {component} and verified connectivity",
+    "Updated the {component} policy to allow the required principal",
+    "Rotated credentials used by the {component}",
+    "Increased capacity of the {component} and cleared the backlog",
+    "Corrected the {component} route table entry",
+    "Rolled back the latest {component} configuration change",
+]
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1", "ap-southeast-2"]
+
+
+def parse_size(size: str) -> int:
+    """Parse a size label ("1k", "100k", "1m") or a plain number."""
+    label = size.strip().lower()
+    return SIZES[label] if label in SIZES else int(label)
+
+
+def _issue(rng: random.Random) -> tuple:
+    component = rng.choice(COMPONENTS)
+    return component, (
+        f"{component} in {rng.choice(REGIONS)} {rng.choice(SYMPTOMS)} "
+        f"for {rng.choice(['all', 'some', 'remote', 'internal'])} users since {rng.randint(1, 12)} hours"
+    )
+
+
+def generate_memories(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate memory entries in the memory agent's file format.
+
+    Args:
+        count: Number of memories
+        seed: Random seed
+
+    Returns:
+        List of memory dictionaries (id, query, resolution, timestamp, keywords)
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    memories = []
+    for index in range(count):
+        component, query = _issue(rng)
+        words = query.lower().split()
+        memories.append({
+            "id": f"mem_{index + 1}_{(start + timedelta(minutes=index)).strftime('%Y%m%d%H%M%S')}",
+            "query": query,
+            "resolution": rng.choice(RESOLUTIONS).format(component=component),
+            "timestamp": (start + timedelta(minutes=index)).isoformat(),
+            "keywords": [word for word in words if len(word) > 3],
+        })
+    return memories
+
+
+def generate_queries(count: int, seed: int = 7) -> List[str]:
+    """Generate issue descriptions to look up in the memory store."""
+    rng = random.Random(seed)
+    return [_issue(rng)[1] for _ in range(count)]
+
+
+def iter_tickets(count: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """
+    Generate tickets as the API stores them.
+
+    Args:
+        count: Number of tickets
+        seed: Random seed
+
+    Yields:
+        Ticket dictionaries; resolved tickets carry a resolution and a usage summary
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for index in range(count):
+        component, description = _issue(rng)
+        status = rng.choice(STATUSES)
+        created = start + timedelta(seconds=index * 37)
+        ticket = {
+            "ticket_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "title": f"{component.title()} issue #{index + 1}",
+            "description": description,
+            "severity": rng.choice(SEVERITIES),
+            "category": rng.choice(CATEGORIES),
+            "status": status,
+            "created_at": created.isoformat(),
+            "updated_at": (created + timedelta(seconds=rng.randint(5, 600))).isoformat(),
+            "resolution": None,
+        }
+        if status == "resolved":
+            ticket["resolution"] = rng.choice(RESOLUTIONS).format(component=component)
+            ticket["usage"] = {
+                "input_tokens": rng.randint(2_000, 40_000),
+                "output_tokens": rng.randint(200, 4_000),
+                "model_calls": rng.randint(3, 20),
+                "retries": rng.randint(0, 3),
+                "cost_usd": round(rng.uniform(0.01, 0.6), 4),
+                "agents": {name: rng.randint(1, 5) for name in ("orchestrator_agent", "memory_agent")},
+            }
+        yield ticket
+
+
+def generate_tickets(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Generate a list of tickets (see iter_tickets)."""
+    return list(iter_tickets(count, seed))
@@ -0,0 +1,203 @@
+"""
+Timing, reports and baseline comparison for the benchmarks.
+
+A benchmark is a named callable timed for a number of rounds (at least
+MIN_ROUNDS, more while the time budget allows). Reports are JSON documents
+keyed by "<group>.<name>[<size>]", so a report from one commit can be compared
+with a baseline saved from another.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+REPORT_VERSION = 1
+MIN_ROUNDS = 3
+MAX_ROUNDS = 50
+TIME_BUDGET_SECONDS = 2.0
+REGRESSION_THRESHOLD = 0.25
+
+
+@dataclass
+class Benchmark:
+    """A timed operation; `items` is the work done per round, for throughput."""
+
+    group: str
+    name: str
+    size: str
+    func: Callable[[], Any]
+    items: int = 1
+    setup: Optional[Callable[[], Any]] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.group}.{self.name}[{self.size}]"
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of one benchmark in seconds."""
+
+    key: str
+    group: str
+    name: str
+    size: str
+    rounds: int
+    items: int
+    timings: List[float] = field(repr=False, default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.timings)
+        median = statistics.median(ordered)
+        return {
+            "group": self.group,
+            "name": self.name,
+            "size": self.size,
+            "rounds": self.rounds,
+            "items": self.items,
+            "min_s": ordered[0],
+            "median_s": median,
+            "p95_s": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "mean_s": statistics.fmean(ordered),
+            "stdev_s": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+            "items_per_second": self.items / median if median > 0 else None,
+        }
+
+
+def run_benchmark(
+    benchmark: Benchmark,
+    min_rounds: int = MIN_ROUNDS,
+    max_rounds: int = MAX_ROUNDS,
+    time_budget: float = TIME_BUDGET_SECONDS
+) -> BenchmarkResult:
+    """
+    Time a benchmark.
+
+    Args:
+        benchmark: Benchmark to run
+        min_rounds: Rounds always run, whatever the budget
+        max_rounds: Upper bound on rounds
+        time_budget: Seconds after which no further rounds are started (beyond min_rounds)
+
+    Returns:
+        The benchmark's timings
+    """
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_rounds:
+        if benchmark.setup is not None:
+            benchmark.setup()
+        begin = time.perf_counter()
+        benchmark.func()
+        timings.append(time.perf_counter() - begin)
+        if len(timings) >= min_rounds and time.perf_counter() - started >= time_budget:
+            break
+    return BenchmarkResult(benchmark.key, benchmark.group, benchmark.name, benchmark.size,
+                           len(timings), benchmark.items, timings)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def build_report(results: List[BenchmarkResult]) -> Dict[str, Any]:
+    """Build a JSON report with the environment the results were measured in."""
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "git_commit": _git_commit(),
+        },
+        "results": {result.key: result.to_dict() for result in results},
+    }
+
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare_reports(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = REGRESSION_THRESHOLD
+) -> Dict[str, Any]:
+    """
+    Compare median timings against a baseline.
+
+    Args:
+        current: Report of this run
+        baseline: Saved baseline report
+        threshold: Relative slowdown counted as a regression (0.25 = 25% slower)
+
+    Returns:
+        Dictionary containing:
+        - threshold: The threshold used
+        - comparisons: Per benchmark key, baseline and current medians and their ratio
+        - regressions: Keys slower than the threshold allows
+        - improvements: Keys faster by more than the threshold
+        - missing: Baseline keys not measured in this run
+    """
+    comparisons = {}
+    regressions, improvements = [], []
+    baseline_results = baseline.get("results", {})
+    for key, result in current.get("results", {}).items():
+        reference = baseline_results.get(key)
+        if reference is None or not reference.get("median_s"):
+            continue
+        ratio = result["median_s"] / reference["median_s"]
+        comparisons[key] = {
+            "baseline_median_s": reference["median_s"],
+            "current_median_s": result["median_s"],
+            "ratio": round(ratio, 4),
+        }
+        if ratio > 1 + threshold:
+            regressions.append(key)
+        elif ratio < 1 / (1 + threshold):
+            improvements.append(key)
+    return {
+        "threshold": threshold,
+        "comparisons": comparisons,
+        "regressions": regressions,
+        "improvements": improvements,
+        "missing": sorted(set(baseline_results) - set(current.get("results", {}))),
+    }
+
+
+def format_table(report: Dict[str, Any], comparison: Optional[Dict[str, Any]] = None) -> str:
+    """Render a report (and its baseline comparison) as a plain text table."""
+    rows = [f"{'benchmark':<52} {'median':>12} {'p95':>12} {'items/s':>14} {'vs baseline':>12}"]
+    for key, result in report["results"].items():
+        ratio = ""
+        if comparison is not None and key in comparison["comparisons"]:
+            ratio = f"{comparison['comparisons'][key]['ratio']:.2f}x"
+            if key in comparison["regressions"]:
+                ratio += " !"
+        throughput = f"{result['items_per_second']:,.0f}" if result["items_per_second"] else "-"
+        rows.append(
+            f"{key:<52} {result['median_s'] * 1000:>10.3f}ms {result['p95_s'] * 1000:>10.3f}ms "
+            f"{throughput:>14} {ratio:>12}"
+        )
+    return "\n".join(rows)
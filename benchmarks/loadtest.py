@@ -0,0 +1,256 @@
+"""
+Offline load test: submit tickets through /api/submit-ticket at a fixed rate and
+measure how the workflow pipeline copes.
+
+The API is served in-process (httpx ASGITransport) with MODEL_BACKEND=simulated,
+simulated network/cloud tools and TICKET_STORAGE_BACKEND=memory, so no AWS access or
+network is needed. Scheduler, rate limiters, retries, metrics and tracing run as
+configured (e.g. SCHEDULER_MAX_CONCURRENT=8 to try a larger worker pool), as do the
+in-memory table's latency and provisioned capacity (MEMORY_STORAGE_*).
+
+The report covers submission latency and rejections, throughput, queueing delay
+(time in the scheduler queue), end-to-end latency, event-loop lag and latency per
+stage (agent, model call, tool, DynamoDB call) taken from the tickets' traces.
+
+Example (from the repository root):
+
+    PYTHONPATH=backend python -m benchmarks.loadtest --rate 4 --duration 60 --time-scale 0.1
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from benchmarks.generators import iter_tickets
+from benchmarks.harness import save_report
+
+
+DEFAULT_OUTPUT = "benchmarks/results/loadtest.json"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Haunted Helpdesk offline load test")
+    parser.add_argument("--rate", type=float, default=2.0, help="Tickets submitted per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep submitting")
+    parser.add_argument("--poisson", action="store_true", help="Exponential inter-arrival times instead of fixed")
+    parser.add_argument("--drain-timeout", type=float, default=600.0,
+                        help="Seconds to wait for queued workflows after the last submission")
+    parser.add_argument("--seed", type=int, help="Simulation seed (SIM_SEED)")
+    parser.add_argument("--time-scale", type=float, help="Multiplier for every simulated delay (SIM_TIME_SCALE)")
+    parser.add_argument("--model-latency", help="Model latency distribution (SIM_MODEL_LATENCY)")
+    parser.add_argument("--tool-latency", help="Tool latency distribution (SIM_TOOL_LATENCY)")
+    parser.add_argument("--throttle-rate", type=float, help="Share of model calls throttled (SIM_THROTTLE_RATE)")
+    parser.add_argument("--stream-error-rate", type=float,
+                        help="Share of model calls failing mid-stream (SIM_STREAM_ERROR_RATE)")
+    parser.add_argument("--memory-hit-rate", type=float, help="Share of tickets with a stored resolution")
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="Event-loop lag sampling interval")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Report path")
+    return parser.parse_args(argv)
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    """Count, mean, percentiles and maximum of durations in milliseconds."""
+    from timeout_policy import percentile
+
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 3),
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(max(values), 3),
+    }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps for a fixed interval."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lags_ms: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags_ms.append(max(0.0, (time.perf_counter() - started - self.interval) * 1000))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+def configure_environment(workdir: str, args: argparse.Namespace) -> None:
+    """Point every backend file at the work directory and select the simulated model.
+
+    Must run before backend modules are imported, since they read configuration at import.
+    """
+    os.environ["MODEL_BACKEND"] = "simulated"
+    os.environ["TICKET_STORAGE_BACKEND"] = "memory"
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("TRACE_MEMORY_TRACES", str(max(1000, int(args.rate * args.duration * 2))))
+    for variable, name in (("TRACE_EXPORT_PATH", "traces.jsonl"),
+                           ("TIMEOUT_POLICY_PATH", "latency_history.sqlite3"),
+                           ("WORKFLOW_CHECKPOINT_PATH", "workflow_checkpoints.sqlite3"),
+                           ("MODEL_CACHE_PATH", "model_responses.sqlite3"),
+                           ("USAGE_STATS_PATH", "usage_stats.json"),
+                           ("UPLOAD_DIR", "uploads")):
+        os.environ.setdefault(variable, os.path.join(workdir, name))
+    for variable, value in (("SIM_SEED", args.seed), ("SIM_TIME_SCALE", args.time_scale),
+                            ("SIM_MODEL_LATENCY", args.model_latency), ("SIM_TOOL_LATENCY", args.tool_latency),
+                            ("SIM_THROTTLE_RATE", args.throttle_rate),
+                            ("SIM_STREAM_ERROR_RATE", args.stream_error_rate),
+                            ("SIM_MEMORY_HIT_RATE", args.memory_hit_rate)):
+        if value is not None:
+            os.environ[variable] = str(value)
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    """Submit tickets at the configured rate, wait for their workflows and build the report."""
+    import httpx
+
+    import main
+    from resilience import get_resilience_status
+    from simulation import simulation_config
+    from ticket_scheduler import ticket_scheduler
+    from tracing import tracer
+
+    monitor = LoopLagMonitor(args.lag_interval)
+    monitor.start()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://loadtest",
+                               timeout=None)
+    arrivals = random.Random(simulation_config.seed)
+    submissions: List[Dict[str, Any]] = []
+
+    async def submit(ticket: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        response = await client.post("/api/submit-ticket", data={
+            key: ticket[key] for key in ("title", "description", "severity", "category")})
+        entry = {"status_code": response.status_code, "latency_ms": (time.perf_counter() - started) * 1000}
+        if response.status_code == 200:
+            entry["ticket_id"] = response.json()["ticket_id"]
+        submissions.append(entry)
+
+    # Open loop: arrivals don't wait for earlier submissions to return
+    started = time.perf_counter()
+    pending = []
+    tickets = iter_tickets(int(args.rate * args.duration) + 1, seed=simulation_config.seed)
+    next_at = 0.0
+    while next_at < args.duration:
+        delay = started + next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        pending.append(asyncio.create_task(submit(next(tickets))))
+        next_at += arrivals.expovariate(args.rate) if args.poisson else 1 / args.rate
+    await asyncio.gather(*pending)
+    submitted_for = time.perf_counter() - started
+
+    deadline = time.perf_counter() + args.drain_timeout
+    while time.perf_counter() < deadline:
+        load = ticket_scheduler.get_load()
+        if not sum(load["queued"].values()) and not sum(load["running"].values()):
+            break
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+    await client.aclose()
+
+    accepted = [entry["ticket_id"] for entry in submissions if "ticket_id" in entry]
+    statuses: Dict[str, int] = defaultdict(int)
+    queue_delays, end_to_end = [], []
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for ticket_id in accepted:
+        ticket = main.db_manager.get_ticket(ticket_id) or {}
+        statuses[ticket.get("status", "missing")] += 1
+        trace = tracer.get_trace(ticket_id)
+        if trace is None:
+            continue
+        end_to_end.append(trace["duration_ms"])
+        for span in trace["spans"]:
+            if span["kind"] == "queue":
+                queue_delays.append(span["duration_ms"])
+            elif span["kind"] != "api":
+                stages[span["name"]].append(span["duration_ms"])
+    completed = statuses.get("resolved", 0)
+
+    return {
+        "config": {
+            "rate_per_second": args.rate,
+            "duration_s": args.duration,
+            "arrivals": "poisson" if args.poisson else "fixed",
+            "simulation": {key: value for key, value in vars(simulation_config).items()
+                           if not key.endswith("_distribution")},
+            "scheduler_max_concurrent": ticket_scheduler.max_concurrent,
+        },
+        "submitted": len(submissions),
+        "accepted": len(accepted),
+        "rejected": sum(1 for entry in submissions if entry["status_code"] == 503),
+        "submit_errors": sum(1 for entry in submissions if entry["status_code"] not in (200, 503)),
+        "ticket_statuses": dict(statuses),
+        "drained": not any(status in statuses for status in ("queued", "processing")),
+        "submit_seconds": round(submitted_for, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(completed / elapsed, 4) if elapsed else 0.0,
+        "submit_latency": summarize([entry["latency_ms"] for entry in submissions]),
+        "queue_delay": summarize(queue_delays),
+        "end_to_end": summarize(end_to_end),
+        "event_loop_lag": summarize(monitor.lags_ms),
+        "stages": {name: summarize(values) for name, values in sorted(stages.items())},
+        "storage": main.db_manager.table.get_stats(),
+        "scheduler": ticket_scheduler.get_stats(),
+        "resilience": get_resilience_status(),
+    }
+
+
+def format_summary(report: Dict[str, Any]) -> str:
+    """Render the headline numbers and per-stage latencies as plain text."""
+    lines = [
+        f"submitted {report['submitted']} (accepted {report['accepted']}, rejected {report['rejected']}, "
+        f"errors {report['submit_errors']}) in {report['submit_seconds']}s; statuses {report['ticket_statuses']}",
+        f"throughput {report['throughput_per_second']}/s over {report['elapsed_seconds']}s",
+        f"storage {report['storage']['read_capacity_units']} RCU, {report['storage']['write_capacity_units']} WCU, "
+        f"throttled {report['storage']['throttled_reads']} reads / {report['storage']['throttled_writes']} writes",
+    ]
+    for name in ("submit_latency", "queue_delay", "end_to_end", "event_loop_lag"):
+        summary = report[name]
+        if summary["count"]:
+            lines.append(f"{name:<16} p50 {summary['p50_ms']:>10.1f}ms  p95 {summary['p95_ms']:>10.1f}ms  "
+                         f"max {summary['max_ms']:>10.1f}ms")
+    lines.append(f"{'stage':<40} {'count':>7} {'p50':>12} {'p95':>12}")
+    for name, summary in report["stages"].items():
+        lines.append(f"{name:<40} {summary['count']:>7} {summary['p50_ms']:>10.1f}ms {summary['p95_ms']:>10.1f}ms")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="helpdesk-load-") as workdir:
+        configure_environment(workdir, args)
+        # Agents echo streamed text to stdout; keep it out of the summary
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            report = asyncio.run(run_load(args))
+    save_report(report, args.output)
+    print(format_summary(report))
+    return 0 if report["drained"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
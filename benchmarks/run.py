@@ -0,0 +1,94 @@
+"""
+Run the benchmarks, write a JSON report and compare it with a baseline.
+
+Examples (from the repository root):
+
+    # Measure and save a baseline
+    PYTHONPATH=backend python -m benchmarks.run --sizes 1k,100k --save-baseline benchmarks/baseline.json
+
+    # Compare a change against it, failing on regressions (exit code 1)
+    PYTHONPATH=backend python -m benchmarks.run --sizes 1k,100k --baseline benchmarks/baseline.json \\
+        --fail-on-regression
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+from typing import List, Optional
+
+from benchmarks.generators import parse_size
+from benchmarks.harness import (
+    MAX_ROUNDS, MIN_ROUNDS, REGRESSION_THRESHOLD, TIME_BUDGET_SECONDS, build_report, compare_reports, format_table,
+    load_report, run_benchmark, save_report,
+)
+
+
+GROUPS = {"memory": "benchmarks.bench_memory", "dynamodb": "benchmarks.bench_dynamodb", "api": "benchmarks.bench_api"}
+DEFAULT_OUTPUT = "benchmarks/results/latest.json"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Haunted Helpdesk performance benchmarks")
+    parser.add_argument("--sizes", default="1k,100k", help="Comma-separated data sizes: 1k, 10k, 100k, 1m or a number")
+    parser.add_argument("--groups", default=",".join(GROUPS), help=f"Comma-separated groups: {', '.join(GROUPS)}")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose key contains this text")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Report path")
+    parser.add_argument("--baseline", help="Baseline report to compare with")
+    parser.add_argument("--save-baseline", help="Also write the report to this baseline path")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative slowdown counted as a regression (0.25 = 25%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    parser.add_argument("--min-rounds", type=int, default=MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    parser.add_argument("--time-budget", type=float, default=TIME_BUDGET_SECONDS,
+                        help="Seconds per benchmark after which no more rounds start")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    workdir = tempfile.TemporaryDirectory(prefix="helpdesk-bench-")
+
+    # Keep benchmark runs away from real state: quiet logs, spans in the work directory.
+    # Must be set before backend modules are imported, since they read configuration at import.
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("TRACE_EXPORT_PATH", os.path.join(workdir.name, "traces.jsonl"))
+
+    results = []
+    with workdir:
+        for size in [size for size in args.sizes.split(",") if size.strip()]:
+            count = parse_size(size)
+            for group in [group.strip() for group in args.groups.split(",") if group.strip()]:
+                module = importlib.import_module(GROUPS[group])
+                for benchmark in module.benchmarks(size.strip().lower(), count, workdir.name):
+                    if args.filter and args.filter not in benchmark.key:
+                        continue
+                    result = run_benchmark(benchmark, args.min_rounds, args.max_rounds, args.time_budget)
+                    print(f"{result.key}: median {result.to_dict()['median_s'] * 1000:.3f}ms "
+                          f"over {result.rounds} rounds", file=sys.stderr)
+                    results.append(result)
+
+    report = build_report(results)
+    comparison = None
+    if args.baseline:
+        comparison = compare_reports(report, load_report(args.baseline), args.threshold)
+        report["comparison"] = {"baseline": args.baseline, **comparison}
+
+    save_report(report, args.output)
+    if args.save_baseline:
+        save_report({key: value for key, value in report.items() if key != "comparison"}, args.save_baseline)
+
+    print(format_table(report, comparison))
+    if comparison is not None:
+        print(json.dumps({key: comparison[key] for key in ("regressions", "improvements", "missing")}, indent=2))
+        if comparison["regressions"] and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,16 @@
+"""
+Shared pytest setup for Haunted Helpdesk.
+
+The backend modules import each other by name (main.py is run from backend/), so the
+tests need backend/ on the import path, plus the repository root for the benchmarks package.
+"""
+
+import os
+import sys
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+for path in (ROOT, os.path.join(ROOT, "backend")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,52 @@
+"""
+Smoke tests for the benchmark suite: generators, the DynamoDB stand-in, the harness and
+baseline comparison, run on tiny sizes so the suite does not rot between benchmark runs.
+"""
+
+from agents import memory_agent
+from benchmarks import bench_dynamodb, bench_memory
+from benchmarks.generators import generate_memories, generate_tickets, parse_size
+from benchmarks.harness import build_report, compare_reports, run_benchmark
+from storage_backends import InMemoryTable
+
+
+def test_generators_are_deterministic_and_sized():
+    """The same seed yields the same data, and size labels map to counts."""
+    assert generate_tickets(20) == generate_tickets(20)
+    assert generate_memories(5)[0]["id"].startswith("mem_1_")
+    assert [parse_size(size) for size in ("1k", "100k", "1M", "250")] == [1_000, 100_000, 1_000_000, 250]
+
+
+def test_standin_table_supports_the_manager_calls(monkeypatch):
+    """put, get, SET updates and paginated scans behave like the table DynamoDBManager uses."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    table = InMemoryTable(page_size=2)
+    table.load([{"ticket_id": str(n), "status": "pending"} for n in range(5)])
+    table.update_item(Key={"ticket_id": "3"}, UpdateExpression="SET #status = :status, #note = :note",
+                      ExpressionAttributeNames={"#status": "status", "#note": "note"},
+                      ExpressionAttributeValues={":status": "resolved", ":note": "done"})
+    assert table.get_item(Key={"ticket_id": "3"})["Item"] == {"ticket_id": "3", "status": "resolved", "note": "done"}
+
+    manager = bench_dynamodb.make_manager(generate_tickets(5))
+    manager.table.page_size = 2
+    assert len(manager.list_tickets()) == 5
+
+
+def test_benchmarks_run_and_compare_against_a_baseline(tmp_path, monkeypatch):
+    """Memory and storage benchmarks run on tiny data and a slower run is reported as a regression."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setattr(memory_agent, "MEMORY_FILE_PATH", memory_agent.MEMORY_FILE_PATH)
+    benchmarks = bench_memory.benchmarks("tiny", 20, str(tmp_path)) + bench_dynamodb.benchmarks("tiny", 20, "")
+    results = [run_benchmark(benchmark, min_rounds=1, max_rounds=2, time_budget=0) for benchmark in benchmarks]
+
+    report = build_report(results)
+    assert "memory.retrieve_memory[tiny]" in report["results"]
+    assert report["results"]["dynamodb.list_tickets[tiny]"]["items"] == 20
+
+    baseline = {"results": {key: dict(result) for key, result in report["results"].items()}}
+    baseline["results"]["dynamodb.get_ticket[tiny]"]["median_s"] = report["results"]["dynamodb.get_ticket[tiny]"][
+        "median_s"] / 2
+    baseline["results"]["dynamodb.removed[tiny]"] = {"median_s": 1.0}
+    comparison = compare_reports(report, baseline, threshold=0.25)
+    assert comparison["regressions"] == ["dynamodb.get_ticket[tiny]"]
+    assert comparison["missing"] == ["dynamodb.removed[tiny]"]
@@ -0,0 +1,212 @@
+"""
+Unit tests for the batched S3 bucket audit tool.
+Uses a local stand-in for the S3 client instead of AWS.
+"""
+
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+from resilience import DownstreamUnavailable
+from tools import cloud_tools
+from tools.result_cache import diagnostic_cache
+from tools.s3_inventory import bucket_inventory
+
+
+def client_error(code, status):
+    """Build a botocore ClientError like S3 returns."""
+    return ClientError(
+        {"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        "operation"
+    )
+
+
+class StandInS3:
+    """Tracks calls and answers from a fixed bucket table."""
+
+    BUCKETS = {
+        "haunted-assets": {"region": None, "public_acl": False, "policy": False},
+        "haunted-logs-eu": {"region": "eu-west-1", "public_acl": False, "policy": None},
+        "haunted-public-site": {"region": "us-west-1", "public_acl": True, "policy": True},
+    }
+    DENIED = {"someone-elses-bucket"}
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _record(self, operation, bucket):
+        with self.lock:
+            self.calls.append((operation, bucket))
+        time.sleep(self.delay)
+
+    def head_bucket(self, Bucket):
+        self._record("head_bucket", Bucket)
+        if Bucket in self.DENIED:
+            raise client_error("403", 403)
+        if Bucket not in self.BUCKETS:
+            raise client_error("404", 404)
+        return {"BucketRegion": self.BUCKETS[Bucket]["region"] or "us-east-1"}
+
+    def get_bucket_location(self, Bucket):
+        self._record("get_bucket_location", Bucket)
+        return {"LocationConstraint": self.BUCKETS[Bucket]["region"]}
+
+    def get_bucket_acl(self, Bucket):
+        self._record("get_bucket_acl", Bucket)
+        grants = [{"Grantee": {"Type": "CanonicalUser", "ID": "owner"}, "Permission": "FULL_CONTROL"}]
+        if self.BUCKETS[Bucket]["public_acl"]:
+            grants.append({"Grantee": {"Type": "Group", "URI": "http://acs.amazonaws.com/groups/global/AllUsers"},
+                           "Permission": "READ"})
+        return {"Grants": grants}
+
+    def get_bucket_policy_status(self, Bucket):
+        self._record("get_bucket_policy_status", Bucket)
+        policy = self.BUCKETS[Bucket]["policy"]
+        if policy is None:
+            raise client_error("NoSuchBucketPolicy", 404)
+        return {"PolicyStatus": {"IsPublic": policy}}
+
+    def list_buckets(self, **kwargs):
+        return {"Buckets": [{"Name": name, "BucketRegion": bucket["region"] or "us-east-1"}
+                            for name, bucket in self.BUCKETS.items()]}
+
+
+def install_stand_in(monkeypatch, stand_in):
+    """Route every boto3 S3 client in cloud_tools to the stand-in."""
+    monkeypatch.setattr(cloud_tools.boto3, "client", lambda *args, **kwargs: stand_in)
+    monkeypatch.setattr(bucket_inventory, "_save_snapshot", lambda *args: None)
+    bucket_inventory.invalidate()
+    diagnostic_cache.clear()
+
+
+def test_audit_builds_table(monkeypatch):
+    """Every bucket gets one row with existence, region and public flags."""
+    install_stand_in(monkeypatch, StandInS3())
+    result = cloud_tools.audit_buckets(
+        bucket_names=["haunted-assets", "haunted-logs-eu", "haunted-public-site", "missing-bucket", "someone-elses-bucket"]
+    )
+
+    assert result["success"] is True
+    rows = {row[0]: dict(zip(result["columns"], row)) for row in result["rows"]}
+    assert rows["haunted-assets"]["region"] == "us-east-1"
+    assert rows["haunted-logs-eu"]["region"] == "eu-west-1"
+    assert rows["haunted-logs-eu"]["public_policy"] is False
+    assert rows["haunted-public-site"]["public_acl"] is True
+    assert rows["missing-bucket"]["exists"] is False
+    assert rows["someone-elses-bucket"]["accessible"] is False
+
+    assert result["summary"] == {"audited": 5, "missing": 1, "access_denied": 1, "public": 1, "errors": 0}
+
+
+def test_audit_all_buckets(monkeypatch):
+    """all_buckets audits every bucket in the account inventory."""
+    install_stand_in(monkeypatch, StandInS3())
+    result = cloud_tools.audit_buckets(all_buckets=True)
+    assert sorted(row[0] for row in result["rows"]) == sorted(StandInS3.BUCKETS)
+
+
+def test_audit_skips_lookups_it_can_answer(monkeypatch):
+    """Inventory buckets cost two calls; others take their region from HeadBucket."""
+    stand_in = StandInS3()
+    install_stand_in(monkeypatch, stand_in)
+    bucket_inventory.refresh()
+    stand_in.calls.clear()
+
+    result = cloud_tools.audit_buckets(all_buckets=True)
+    assert result["summary"]["public"] == 1
+    assert sorted(operation for operation, _ in stand_in.calls) == (
+        ["get_bucket_acl"] * 3 + ["get_bucket_policy_status"] * 3)
+
+    # A bucket outside the inventory: head, ACL and policy status, but no GetBucketLocation
+    bucket_inventory.invalidate()
+    diagnostic_cache.clear()
+    stand_in.calls.clear()
+    result = cloud_tools.audit_buckets(bucket_names=["haunted-logs-eu"])
+    assert result["rows"][0][3] == "eu-west-1"
+    assert [operation for operation, _ in stand_in.calls] == [
+        "head_bucket", "get_bucket_acl", "get_bucket_policy_status"]
+
+
+def test_audit_runs_concurrently(monkeypatch):
+    """Bucket checks run in parallel instead of one after another."""
+    stand_in = StandInS3(delay=0.05)
+    install_stand_in(monkeypatch, stand_in)
+    monkeypatch.setattr(cloud_tools, "AUDIT_REQUESTS_PER_SECOND", 0)
+
+    start = time.perf_counter()
+    cloud_tools.audit_buckets(bucket_names=[f"missing-{i}" for i in range(32)])
+    elapsed = time.perf_counter() - start
+
+    # 32 sequential head requests would take at least 1.6s
+    assert elapsed < 1.0
+    assert len(stand_in.calls) == 32
+
+
+def test_audit_rate_limited(monkeypatch):
+    """The request rate stays within the configured bound."""
+    install_stand_in(monkeypatch, StandInS3())
+    monkeypatch.setattr(cloud_tools, "AUDIT_REQUESTS_PER_SECOND", 100)
+
+    start = time.perf_counter()
+    cloud_tools.audit_buckets(bucket_names=[f"missing-{i}" for i in range(20)])
+    assert time.perf_counter() - start >= 0.18
+
+
+def test_audit_reports_expired_credentials(monkeypatch):
+    """Credential problems abort the audit with a single clear error."""
+    class ExpiredS3(StandInS3):
+        def head_bucket(self, Bucket):
+            raise client_error("ExpiredToken", 400)
+
+    install_stand_in(monkeypatch, ExpiredS3())
+    result = cloud_tools.audit_buckets(bucket_names=["haunted-assets"])
+    assert result["success"] is False
+    assert "expired" in result["error"]
+
+
+def test_audit_stops_after_credential_failure(monkeypatch):
+    """Once credentials fail, buckets still queued are not sent to S3."""
+    class ExpiredS3(StandInS3):
+        def head_bucket(self, Bucket):
+            self._record("head_bucket", Bucket)
+            raise client_error("ExpiredToken", 400)
+
+    stand_in = ExpiredS3(delay=0.02)
+    install_stand_in(monkeypatch, stand_in)
+    monkeypatch.setattr(cloud_tools, "AUDIT_MAX_WORKERS", 4)
+    monkeypatch.setattr(cloud_tools, "AUDIT_REQUESTS_PER_SECOND", 0)
+
+    result = cloud_tools.audit_buckets(bucket_names=[f"bucket-{i}" for i in range(100)])
+    assert result["success"] is False
+    assert "expired" in result["error"]
+    assert len(stand_in.calls) <= 8
+
+
+def test_audit_keeps_rows_when_s3_becomes_unavailable(monkeypatch):
+    """Buckets audited before S3 became unavailable are returned; the rest are marked."""
+    class FailingS3(StandInS3):
+        def head_bucket(self, Bucket):
+            if Bucket == "missing-2":
+                raise DownstreamUnavailable("s3", "s3 is unavailable (circuit open); retry in 30s", 30)
+            return super().head_bucket(Bucket)
+
+    stand_in = FailingS3()
+    install_stand_in(monkeypatch, stand_in)
+    monkeypatch.setattr(cloud_tools, "AUDIT_MAX_WORKERS", 1)
+
+    result = cloud_tools.audit_buckets(bucket_names=[f"missing-{i}" for i in range(5)])
+    assert result["success"] is False
+    assert "temporarily unavailable" in result["error"]
+    assert [row[1] for row in result["rows"][:2]] == [False, False]
+    assert all(row[6].startswith("not audited") for row in result["rows"][2:])
+    assert result["summary"]["audited"] == 2 and result["summary"]["not_audited"] == 3
+    assert len(stand_in.calls) == 2
+
+
+def test_audit_requires_buckets(monkeypatch):
+    """Calling without buckets is rejected."""
+    install_stand_in(monkeypatch, StandInS3())
+    assert cloud_tools.audit_buckets()["success"] is False
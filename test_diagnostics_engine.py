@@ -0,0 +1,99 @@
+"""
+Unit tests for the async network diagnostics engine.
+Uses harmless shell commands in place of ping/traceroute/nslookup.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from tools import diagnostics_engine
+from tools.diagnostics_engine import CommandTimeoutError, run_command, run_diagnostics, run_probe
+from tools.network_tools import diagnose_hosts
+from tools.result_cache import diagnostic_cache
+
+
+def fake_probe_command(delays):
+    """Build a replacement for build_probe_command that sleeps per probe and echoes."""
+    def build(probe, hostname, count=4):
+        return ["sh", "-c", f"sleep {delays.get(probe, 0)}; echo 'Address: {hostname} {probe}'"]
+    return build
+
+
+def test_run_command_captures_output():
+    """Commands return their exit code and output."""
+    result = asyncio.run(run_command(["sh", "-c", "echo hello; exit 3"], timeout=5))
+    assert result["return_code"] == 3
+    assert result["stdout"].strip() == "hello"
+    assert result["duration_ms"] >= 0
+
+
+def test_run_command_timeout_kills_process_group():
+    """A timeout kills the command and the children it spawned."""
+    start = time.perf_counter()
+    with pytest.raises(CommandTimeoutError):
+        asyncio.run(run_command(["sh", "-c", "sleep 30 & sleep 30; wait"], timeout=0.3))
+    assert time.perf_counter() - start < 5
+
+
+def test_run_command_missing_binary():
+    """Missing commands raise FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(run_command(["definitely-not-a-real-command"], timeout=1))
+
+
+def test_run_probe_normalizes_failures(monkeypatch):
+    """Timeouts and missing commands become failed probe results."""
+    monkeypatch.setattr(diagnostics_engine, "build_probe_command", lambda *a, **k: ["sh", "-c", "sleep 5"])
+    result = asyncio.run(run_probe("ping", "example.com", timeout=0.2))
+    assert result["success"] is False
+    assert result["return_code"] == -1
+    assert "timed out" in result["error"]
+
+    monkeypatch.setattr(diagnostics_engine, "build_probe_command", lambda *a, **k: ["no-such-ping"])
+    result = asyncio.run(run_probe("ping", "example.com"))
+    assert result["error"] == "Ping command not found on system"
+
+
+def test_run_diagnostics_concurrent_and_in_completion_order(monkeypatch):
+    """Probes run concurrently and results arrive as they complete."""
+    monkeypatch.setattr(
+        diagnostics_engine, "build_probe_command",
+        fake_probe_command({"ping": 0.1, "traceroute": 0.4})
+    )
+
+    async def collect():
+        return [r async for r in run_diagnostics(["a.example", "b.example", "c.example"], ["traceroute", "ping"])]
+
+    start = time.perf_counter()
+    results = asyncio.run(collect())
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 6
+    assert all(r["success"] for r in results)
+    # Serial execution would take at least 1.5s
+    assert elapsed < 1.2
+    assert [r["probe"] for r in results[:3]] == ["ping", "ping", "ping"]
+    assert [r["probe"] for r in results[-3:]] == ["traceroute", "traceroute", "traceroute"]
+
+
+def test_diagnose_hosts_tool(monkeypatch):
+    """The batch tool groups results per host and probe."""
+    async def fake_resolve_host(hostname, timeout):
+        return {"success": True, "addresses": ["192.0.2.1"], "records": {}, "duration_ms": 0.1, "error": None}
+
+    monkeypatch.setattr(diagnostics_engine, "build_probe_command", fake_probe_command({}))
+    monkeypatch.setattr(diagnostics_engine, "resolve_host", fake_resolve_host)
+    diagnostic_cache.clear()
+    result = asyncio.run(diagnose_hosts(["a.example", "b.example"], ["ping", "dns"]))
+
+    assert result["success"] is True
+    assert set(result["hosts"]) == {"a.example", "b.example"}
+    assert set(result["hosts"]["a.example"]) == {"ping", "dns"}
+    assert len(result["completion_order"]) == 4
+    assert result["hosts"]["b.example"]["dns"]["addresses"] == ["192.0.2.1"]
+
+    invalid = asyncio.run(diagnose_hosts(["a.example"], ["bogus"]))
+    assert invalid["success"] is False
+    assert "bogus" in invalid["error"]
@@ -0,0 +1,135 @@
+"""
+Unit tests for the ticket event stream and streamed agent output in the router.
+"""
+
+import asyncio
+import time
+
+from event_stream import TicketEventBroker, format_sse
+from workflow_router import NETWORK_WORKER, WorkflowRouter
+
+
+async def collect(broker, ticket_id, keepalive=5):
+    return [event async for event in broker.subscribe(ticket_id, keepalive=keepalive)]
+
+
+def test_late_subscriber_replays_history_and_stops_at_completion():
+    """A client connecting mid-run gets earlier events, then live ones, and the stream ends."""
+    async def scenario():
+        broker = TicketEventBroker()
+        broker.publish("t-1", "workflow_started", {"mode": "router"})
+        broker.publish("t-1", "agent_output", {"text": "Checking DNS"})
+        follower = asyncio.create_task(collect(broker, "t-1"))
+        await asyncio.sleep(0)
+        broker.publish("t-1", "workflow_completed", {"status": "resolved"})
+        broker.publish("t-2", "workflow_started", {})
+        return await asyncio.wait_for(follower, 1)
+
+    events = asyncio.run(scenario())
+    assert [event["event"] for event in events] == ["workflow_started", "agent_output", "workflow_completed"]
+    assert [event["id"] for event in events] == [1, 2, 3]
+
+
+def test_new_run_resets_history_and_keeps_followers():
+    """A new run starts a fresh history; clients already following receive it."""
+    async def scenario():
+        broker = TicketEventBroker()
+        broker.publish("t-1", "workflow_started", {})
+        broker.publish("t-1", "agent_started", {"agent_name": "memory_agent"})
+        follower = asyncio.create_task(collect(broker, "t-1"))
+        await asyncio.sleep(0)
+        broker.publish("t-1", "workflow_started", {})
+        broker.publish("t-1", "workflow_completed", {})
+        return broker.history("t-1"), await asyncio.wait_for(follower, 1)
+
+    history, followed = asyncio.run(scenario())
+    assert [event["event"] for event in history] == ["workflow_started", "workflow_completed"]
+    assert [event["event"] for event in followed] == [
+        "workflow_started", "agent_started", "workflow_started", "workflow_completed"
+    ]
+
+
+def test_keepalive_and_sse_format():
+    """Idle streams yield keepalives and events are framed as SSE messages."""
+    async def scenario():
+        broker = TicketEventBroker()
+        stream = broker.subscribe("t-1", keepalive=0.01)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(scenario()) is None
+    message = format_sse({"id": 4, "event": "routing", "data": {"workers": [NETWORK_WORKER]}})
+    assert message == 'id: 4\nevent: routing\ndata: {"workers": ["network_diagnostic_agent"]}\n\n'
+
+
+
+def test_idle_channels_without_followers_are_pruned():
+    """Channels of tickets whose workflow never started are dropped once idle past retention."""
+    async def scenario():
+        broker = TicketEventBroker(retention=0.05)
+        for ticket_id in ("bogus-1", "bogus-2"):
+            stream = broker.subscribe(ticket_id, keepalive=0.01)
+            await stream.__anext__()
+            await stream.aclose()
+        followed = broker.subscribe("followed", keepalive=0.01)
+        await followed.__anext__()
+        broker.publish("running", "agent_started", {})
+        await asyncio.sleep(0.1)
+        broker.publish("t-1", "workflow_started", {})
+        remaining = set(broker._channels)
+        await followed.aclose()
+        return remaining
+
+    assert asyncio.run(scenario()) == {"followed", "t-1"}
+
+class StreamingAgent:
+    """Streams its reply in chunks, pausing between them."""
+
+    def __init__(self, chunks, pause=0.0):
+        self.chunks = chunks
+        self.pause = pause
+
+    async def stream_async(self, prompt):
+        for chunk in self.chunks:
+            yield {"data": chunk}
+            await asyncio.sleep(self.pause)
+        yield {"result": "".join(self.chunks)}
+
+
+def test_router_publishes_streamed_output_before_steps_finish():
+    """The first diagnostic text reaches followers while the worker is still running."""
+    factories = {
+        "memory_agent": lambda: StreamingAgent(["NO_MEMORY_FOUND"]),
+        "ticketing_agent": lambda: StreamingAgent(["Type: network\n"]),
+        NETWORK_WORKER: lambda: StreamingAgent(["DNS server 10.0.0.2 is down.\n", "Switched resolvers."], pause=0.3),
+        "summarization_agent": lambda: StreamingAgent(["DNS failed.\n", "WORKFLOW_COMPLETE"]),
+    }
+    ticket = {"ticket_id": "t-5", "title": "Ping fails", "description": "DNS lookups time out",
+              "severity": "high", "category": "network", "created_at": "2026-10-31"}
+
+    async def scenario():
+        broker = TicketEventBroker()
+        broker.publish("t-5", "workflow_started", {})
+        router = WorkflowRouter(agent_factories=factories, events=broker)
+        start = time.perf_counter()
+        first_finding = None
+        follower = asyncio.create_task(collect(broker, "t-5"))
+        run = asyncio.create_task(router.run(ticket))
+        while first_finding is None:
+            await asyncio.sleep(0.01)
+            if any(event["event"] == "agent_output" and event["data"]["agent_name"] == NETWORK_WORKER
+                   for event in broker.history("t-5")):
+                first_finding = time.perf_counter() - start
+        result = await run
+        broker.publish("t-5", "workflow_completed", {})
+        return first_finding, time.perf_counter() - start, result, await follower
+
+    first_finding, total, result, events = asyncio.run(scenario())
+
+    assert first_finding < 0.2 < total
+    assert result["summary"] == "DNS failed."
+    worker_events = [event for event in events if event["data"].get("agent_name") == NETWORK_WORKER]
+    assert [event["event"] for event in worker_events] == ["agent_started", "agent_output", "agent_output", "agent_completed"]
+    assert worker_events[-1]["data"]["content"] == "DNS server 10.0.0.2 is down.\nSwitched resolvers."
+    assert any(event["event"] == "routing" for event in events)
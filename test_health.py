@@ -0,0 +1,108 @@
+"""
+Unit tests for the health monitor: background probes, passive signals from real traffic and
+readiness answered from memory. Probes are replaced by stand-ins so no AWS calls are made.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import health
+from health import HealthMonitor, check_bedrock
+from resilience import CircuitBreaker, Downstream
+
+
+def make_downstream():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=60.0)
+    return Downstream("bedrock", 0.0, 1.0, breaker=breaker, enabled=True)
+
+
+def timed_out():
+    raise TimeoutError("read timed out")
+
+
+class Probe:
+    """Check stand-in that counts calls."""
+
+    def __init__(self, available=True, delay=0.0):
+        self.available = available
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {"available": self.available, "status": "operational" if self.available else "error",
+                "message": "probed"}
+
+
+def test_readiness_follows_probes_and_goes_stale():
+    """Not ready before the first round, ready once every service answers, not ready once statuses age."""
+    monitor = HealthMonitor(stale_seconds=0.05)
+    monitor.register("bedrock", Probe())
+    monitor.register("dynamodb", Probe())
+    assert monitor.readiness()["status"] == "starting"
+
+    asyncio.run(monitor.probe_all())
+    ready = monitor.readiness()
+    assert ready["ready"] and ready["services"]["bedrock"]["source"] == "probe"
+    assert monitor.get_health()["status"] == "healthy"
+
+    time.sleep(0.06)
+    stale = monitor.readiness()
+    assert (stale["ready"], stale["status"], stale["services"]["dynamodb"]["status"]) == (False, "not_ready", "stale")
+
+
+def test_optional_services_and_failed_probes():
+    """A failing optional service degrades health without making the instance unready."""
+    monitor = HealthMonitor(timeout_seconds=0.05)
+    monitor.register("bedrock", Probe())
+    monitor.register("s3", Probe(delay=0.2), required=False)
+    asyncio.run(monitor.probe_all())
+
+    assert monitor.readiness()["ready"]
+    health_status = monitor.get_health()
+    assert health_status["status"] == "degraded"
+    assert health_status["services"]["s3"]["status"] == "timeout"
+
+
+def test_recent_traffic_replaces_the_probe_and_open_circuits_are_not_probed():
+    """Real calls that just succeeded answer for the service; an open breaker is reported without a call."""
+    downstream = make_downstream()
+    probe = Probe()
+    monitor = HealthMonitor(passive_window_seconds=60)
+    monitor.register("bedrock", probe, downstream)
+
+    downstream.call(lambda: None)
+    asyncio.run(monitor.probe_all())
+    assert probe.calls == 0
+    assert monitor.get_health()["services"]["bedrock"]["source"] == "traffic"
+
+    with pytest.raises(TimeoutError):
+        downstream.call(timed_out)
+    asyncio.run(monitor.probe_all())
+    service = monitor.get_health()["services"]["bedrock"]
+    assert probe.calls == 0
+    assert (service["available"], service["status"]) == (False, "circuit_open")
+    assert monitor.get_health()["probes"] == {"rounds": 2, "probes": 0, "passive": 1, "circuit_open": 1}
+
+
+def test_bedrock_check_uses_the_control_plane(monkeypatch):
+    """The Bedrock probe looks up the inference profile instead of invoking the model."""
+    calls = []
+
+    class FakeBedrock:
+        def get_inference_profile(self, **kwargs):
+            calls.append(("get_inference_profile", kwargs))
+            return {"status": "ACTIVE"}
+
+        def get_foundation_model(self, **kwargs):
+            calls.append(("get_foundation_model", kwargs))
+            return {"modelDetails": {"modelLifecycle": {"status": "ACTIVE"}}}
+
+    monkeypatch.setattr(health.boto3, "client", lambda service: FakeBedrock())
+
+    assert check_bedrock("us.anthropic.claude-3-5-sonnet-20241022-v2:0")["available"]
+    assert check_bedrock("anthropic.claude-3-5-sonnet-20241022-v2:0")["status"] == "operational"
+    assert [name for name, _ in calls] == ["get_inference_profile", "get_foundation_model"]
@@ -0,0 +1,92 @@
+"""
+Unit tests for the logging subsystem: JSON records with ticket context, sampling of repeated
+errors, the non-blocking queue handler and per-module levels.
+"""
+
+import io
+import json
+import logging
+import queue
+import sys
+
+from logging_config import (
+    ContextFilter, ErrorSamplingFilter, JsonFormatter, NonBlockingQueueHandler, configure_logging, parse_levels,
+    stop_logging,
+)
+from metrics import LOG_RECORDS_DROPPED
+from tracing import JsonlSpanExporter, Tracer
+
+
+def make_record(msg, level=logging.ERROR, name="haunted_helpdesk.workflow", args=(), exc_info=None):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, exc_info)
+
+
+def test_json_records_carry_ticket_and_agent_from_the_current_span(tmp_path, monkeypatch):
+    """Records logged inside an agent span of a ticket's trace carry the ticket_id and agent."""
+    test_tracer = Tracer(exporter=JsonlSpanExporter(str(tmp_path / "traces.jsonl")), enabled=True)
+    monkeypatch.setattr("logging_config.tracer", test_tracer)
+
+    record = make_record("Ping to %s failed", args=("gw-1",))
+    with test_tracer.span("workflow", "workflow", trace_id="ticket-1"):
+        with test_tracer.span("agent.network_diagnostic_agent", "agent", agent="network_diagnostic_agent"):
+            with test_tracer.span("tool.ping_host", "tool"):
+                ContextFilter().filter(record)
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Ping to gw-1 failed"
+    assert (entry["level"], entry["ticket_id"], entry["agent"]) == ("ERROR", "ticket-1", "network_diagnostic_agent")
+
+
+def test_repeated_errors_are_sampled_per_message():
+    """After the burst, identical errors (ids masked) are suppressed and the count is reported later."""
+    sampler = ErrorSamplingFilter(window_seconds=60, burst=2)
+    results = [sampler.filter(make_record(f"Error processing ticket {n}: timed out")) for n in range(5)]
+    assert results == [True, True, False, False, False]
+    assert sampler.filter(make_record("DynamoDB throttled")) is True
+    assert sampler.filter(make_record("Debug detail 1", level=logging.INFO)) is True
+
+    sampler.window_seconds = 0
+    record = make_record("Error processing ticket 9: timed out")
+    assert sampler.filter(record) is True
+    assert record.suppressed == 3
+
+
+def test_queue_handler_drops_records_when_full_and_keeps_tracebacks():
+    """A full queue drops records without blocking; tracebacks are rendered before queueing."""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    dropped = LOG_RECORDS_DROPPED.value()
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        handler.handle(make_record("first", exc_info=sys.exc_info()))
+    handler.handle(make_record("second"))
+
+    assert LOG_RECORDS_DROPPED.value() == dropped + 1
+    queued = handler.queue.get_nowait()
+    assert queued.exc_info is None and "ValueError: boom" in queued.exc_text
+    assert "ValueError: boom" in json.loads(JsonFormatter().format(queued))["exception"]
+
+
+def test_configure_logging_writes_json_through_the_listener_with_module_levels():
+    """Configured logging writes JSON lines from the listener thread and honours per-module levels."""
+    assert parse_levels("haunted_helpdesk.router=DEBUG, botocore=warning,bad,x=NOPE") == {
+        "haunted_helpdesk.router": logging.DEBUG, "botocore": logging.WARNING}
+
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    stream = io.StringIO()
+    try:
+        configure_logging(level="WARNING", log_format="json", module_levels="test.verbose=DEBUG", stream=stream)
+        logging.getLogger("test.verbose").debug("kept")
+        logging.getLogger("test.quiet").info("filtered")
+        stop_logging()
+    finally:
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
+        logging.getLogger("test.verbose").setLevel(logging.NOTSET)
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(line["logger"], line["message"]) for line in lines] == [("test.verbose", "kept")]
@@ -0,0 +1,111 @@
+"""
+Unit tests for the metrics registry: text exposition, histograms and the agent/tool hooks.
+Bedrock streaming is replaced by a scripted stream so no Bedrock calls are made.
+"""
+
+import asyncio
+
+import pytest
+from strands import tool
+from strands.agent import Agent
+from strands.models.bedrock import BedrockModel
+
+from bedrock_model import HelpdeskBedrockModel
+from metrics import (
+    AGENT_HANDOFFS, AGENT_INVOCATION_DURATION, MODEL_CALL_DURATION, TOOL_CALL_DURATION, WORKFLOW_HANDOFFS,
+    AgentMetricsHooks, MetricsRegistry, observe_workflow,
+)
+
+
+def test_text_exposition_of_all_metric_types():
+    """Counters, computed gauges and cumulative histogram buckets render in the Prometheus format."""
+    registry = MetricsRegistry(enabled=True)
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    depth = registry.gauge("queue_depth", "Queued tickets", ("severity",))
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+
+    requests.inc(route='/api/"tickets"')
+    requests.inc(2, route='/api/"tickets"')
+    depth.set_function(lambda: {"critical": 1, "low": 4})
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, route="/health")
+
+    text = registry.render()
+    assert '# TYPE requests_total counter\nrequests_total{route="/api/\\"tickets\\""} 3' in text
+    assert 'queue_depth{severity="critical"} 1\nqueue_depth{severity="low"} 4' in text
+    assert 'latency_seconds_bucket{route="/health",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/health",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/health",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{route="/health"} 5.55' in text
+    assert 'latency_seconds_count{route="/health"} 3' in text
+
+
+def test_timer_records_outcome_and_disabled_registry_records_nothing():
+    """Timing a failing block labels it as an error; a disabled registry is a no-op."""
+    registry = MetricsRegistry(enabled=True)
+    calls = registry.histogram("call_seconds", "Calls", ("operation", "outcome"))
+    with calls.time(operation="get_item"):
+        pass
+    with pytest.raises(ValueError):
+        with calls.time(operation="get_item"):
+            raise ValueError("boom")
+    assert calls.count(operation="get_item", outcome="success") == 1
+    assert calls.count(operation="get_item", outcome="error") == 1
+
+    disabled = MetricsRegistry(enabled=False)
+    counter = disabled.counter("ignored_total", "Ignored")
+    counter.inc()
+    assert counter.value() == 0
+
+
+def test_workflow_handoffs_are_counted_per_transition():
+    """A workflow's handoff sequence feeds the per-workflow histogram and the agent-to-agent counter."""
+    before = AGENT_HANDOFFS.value(from_agent="memory_agent", to_agent="ticketing_agent")
+    workflows = WORKFLOW_HANDOFFS.count(mode="router")
+
+    observe_workflow("router", "network", "completed", 12.5,
+                     ["memory_agent", "ticketing_agent", "network_diagnostic_agent", "summarization_agent"])
+
+    assert AGENT_HANDOFFS.value(from_agent="memory_agent", to_agent="ticketing_agent") == before + 1
+    assert WORKFLOW_HANDOFFS.count(mode="router") == workflows + 1
+
+
+@tool
+def lookup_gateway(host: str) -> dict:
+    """Look up a gateway.
+
+    Args:
+        host: Host name
+    """
+    return {"success": True, "host": host}
+
+
+def test_agent_hooks_record_invocation_model_and_tool_latency(monkeypatch):
+    """One agent step with a tool call records the step, both model calls and the tool call."""
+    replies = [
+        [{"messageStart": {"role": "assistant"}},
+         {"contentBlockStart": {"start": {"toolUse": {"toolUseId": "tool-1", "name": "lookup_gateway"}}}},
+         {"contentBlockDelta": {"delta": {"toolUse": {"input": '{"host": "gw-1"}'}}}},
+         {"contentBlockStop": {}},
+         {"messageStop": {"stopReason": "tool_use"}}],
+        [{"messageStart": {"role": "assistant"}},
+         {"contentBlockDelta": {"delta": {"text": "Gateway gw-1 is up."}}},
+         {"contentBlockStop": {}},
+         {"messageStop": {"stopReason": "end_turn"}}],
+    ]
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        for event in replies.pop(0):
+            yield event
+
+    monkeypatch.setattr(BedrockModel, "stream", stream)
+    model = HelpdeskBedrockModel(agent_name="metrics_test_agent", cache_responses=False, region_name="us-east-1")
+    agent = Agent(name="metrics_test_agent", model=model, tools=[lookup_gateway], hooks=[AgentMetricsHooks()],
+                  callback_handler=None)
+
+    result = asyncio.run(agent.invoke_async("Is the gateway up?"))
+
+    assert "gw-1 is up" in str(result)
+    assert AGENT_INVOCATION_DURATION.count(agent="metrics_test_agent", outcome="success") == 1
+    assert MODEL_CALL_DURATION.count(agent="metrics_test_agent", outcome="success") == 2
+    assert TOOL_CALL_DURATION.count(tool="lookup_gateway", outcome="success") == 1
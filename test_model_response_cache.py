@@ -0,0 +1,142 @@
+"""
+Unit tests for the model response cache at the Bedrock call boundary.
+Bedrock streaming is replaced by a scripted stream so no Bedrock calls are made.
+"""
+
+import asyncio
+
+from strands.agent import Agent
+from strands.models.bedrock import BedrockModel
+
+from bedrock_model import HelpdeskBedrockModel, ModelResponseCache, replayed_from_cache, response_cache_key
+from ticket_context import TicketState
+
+
+MESSAGES = [{"role": "user", "content": [{"text": "Summarize: DNS server was down, resolver switched."}]}]
+
+
+def scripted_stream(monkeypatch, text="DNS outage resolved.", stop_reason="end_turn"):
+    """Replace BedrockModel.stream with a scripted response and count the calls."""
+    calls = []
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        calls.append(messages)
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockDelta": {"delta": {"text": text}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": stop_reason}}
+        yield {"metadata": {"usage": {"inputTokens": 120, "outputTokens": 30, "totalTokens": 150},
+                            "metrics": {"latencyMs": 800}}}
+
+    monkeypatch.setattr(BedrockModel, "stream", stream)
+    return calls
+
+
+def make_model(cache, agent_name="summarization_agent", **kwargs):
+    return HelpdeskBedrockModel(agent_name=agent_name, response_cache=cache, region_name="us-east-1",
+                                temperature=0.2, **kwargs)
+
+
+async def collect(model, messages=MESSAGES, system_prompt="You summarize incidents."):
+    return [event async for event in model.stream(messages, system_prompt=system_prompt)]
+
+
+def test_identical_call_is_replayed(monkeypatch, tmp_path):
+    """A repeated call is served from the cache with zero usage."""
+    calls = scripted_stream(monkeypatch)
+    cache = ModelResponseCache(str(tmp_path / "responses.sqlite3"))
+
+    first = asyncio.run(collect(make_model(cache)))
+    model = make_model(cache)
+    second = asyncio.run(collect(model))
+
+    assert len(calls) == 1
+    assert model.cache_hits == 1
+    assert second[:4] == first[:4]
+    assert second[-1]["metadata"]["usage"]["totalTokens"] == 0
+    stats = cache.get_stats()
+    assert stats["hit_rate"] == 0.5
+    assert stats["by_agent"]["summarization_agent"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_tool_calls_and_other_agents_are_not_cached(monkeypatch, tmp_path):
+    """Tool-use responses aren't stored and agents that didn't opt in always call Bedrock."""
+    calls = scripted_stream(monkeypatch, stop_reason="tool_use")
+    cache = ModelResponseCache(str(tmp_path / "responses.sqlite3"))
+
+    asyncio.run(collect(make_model(cache)))
+    asyncio.run(collect(make_model(cache)))
+    asyncio.run(collect(make_model(cache, agent_name="network_diagnostic_agent")))
+
+    assert len(calls) == 3
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_key_covers_prompt_and_temperature():
+    """Whitespace differences share a key; system prompt and temperature changes don't."""
+    padded = [{"role": "user", "content": [{"text": "  " + MESSAGES[0]["content"][0]["text"] + "\n"}]}]
+    key = response_cache_key("model", "system", MESSAGES, 0.2)
+
+    assert response_cache_key("model", "system", padded, 0.2) == key
+    assert response_cache_key("model", "other system", MESSAGES, 0.2) != key
+    assert response_cache_key("model", "system", MESSAGES, 0.4) != key
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    """Expired entries miss and the least recently used entry is evicted first."""
+    cache = ModelResponseCache(str(tmp_path / "responses.sqlite3"), ttl=3600, max_entries=2)
+    cache.put("a", [{"messageStop": {"stopReason": "end_turn"}}])
+    cache.put("b", [{"messageStop": {"stopReason": "end_turn"}}])
+    assert cache.get("a") is not None  # "a" is now more recently used than "b"
+    cache.put("c", [{"messageStop": {"stopReason": "end_turn"}}])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get_stats()["evictions"] == 1
+
+    expired = ModelResponseCache(str(tmp_path / "expired.sqlite3"), ttl=0)
+    expired.put("a", [{"messageStop": {"stopReason": "end_turn"}}])
+    assert expired.get("a") is None
+
+
+def test_agent_reports_cached_replay(monkeypatch, tmp_path):
+    """An agent whose response was replayed is flagged and reports no token usage."""
+    scripted_stream(monkeypatch)
+    cache = ModelResponseCache(str(tmp_path / "responses.sqlite3"))
+
+    def make_agent():
+        return Agent(name="summarization_agent", model=make_model(cache), system_prompt="You summarize incidents.",
+                     tools=[], callback_handler=None)
+
+    first = make_agent()
+    asyncio.run(first.invoke_async("Summarize the DNS outage"))
+    second = make_agent()
+    result = asyncio.run(second.invoke_async("Summarize the DNS outage"))
+
+    assert replayed_from_cache(first) is False
+    assert replayed_from_cache(second) is True
+    assert str(result).strip() == "DNS outage resolved."
+    assert result.metrics.accumulated_usage["inputTokens"] == 0
+
+
+def test_repeat_tickets_share_cached_answers(monkeypatch, tmp_path):
+    """Two tickets differing only in ID and creation time render the same prompts and share answers."""
+    calls = scripted_stream(monkeypatch)
+    cache = ModelResponseCache(str(tmp_path / "responses.sqlite3"))
+    ticket = {"title": "VPN drops every hour", "description": "The tunnel to the office resets hourly",
+              "severity": "medium", "category": "network"}
+    states = [
+        TicketState.from_ticket(dict(ticket, ticket_id="ticket-a", created_at="2026-10-30T08:00:00")),
+        TicketState.from_ticket(dict(ticket, ticket_id="ticket-b", created_at="2026-10-31T17:45:12")),
+    ]
+
+    for state in states:
+        state.resolution = "Rekey interval raised to 8 hours."
+        for step, agent_name in (("ticket_analysis", "ticketing_agent"), ("summarization", "summarization_agent")):
+            prompt = state.render(step)
+            assert state.ticket_id not in prompt and state.created_at not in prompt
+            messages = [{"role": "user", "content": [{"text": prompt}]}]
+            asyncio.run(collect(make_model(cache, agent_name=agent_name), messages=messages))
+
+    assert len(calls) == 2
+    assert cache.get_stats()["by_agent"]["summarization_agent"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
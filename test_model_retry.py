@@ -0,0 +1,138 @@
+"""
+Unit tests for per-model-call retries: error classification, backoff and the retry budget.
+Bedrock streaming is replaced by a scripted stream so no Bedrock calls are made.
+"""
+
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+from strands.agent import Agent
+from strands.models.bedrock import BedrockModel
+from strands.types.exceptions import ModelThrottledException
+
+from bedrock_model import HelpdeskBedrockModel
+from model_retry import (
+    AUTH, OTHER, STREAM_ERROR, THROTTLING, TIMEOUT,
+    HelpdeskRetryStrategy, RetryBudget, RetryPolicy, RetryStats, classify_error, retry_after_seconds,
+)
+from resilience import Downstream
+from usage_accounting import ModelRetryCounter
+
+
+def client_error(code, headers=None):
+    response = {"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPHeaders": headers or {}}}
+    return ClientError(response, "ConverseStream")
+
+
+def test_errors_are_classified():
+    """Throttling, stream errors, timeouts and auth failures are told apart, including wrapped errors."""
+    wrapped = ModelThrottledException("Too many requests")
+    wrapped.__cause__ = client_error("ThrottlingException")
+
+    assert classify_error(wrapped) == THROTTLING
+    assert classify_error(client_error("ModelStreamErrorException")) == STREAM_ERROR
+    assert classify_error(ReadTimeoutError(endpoint_url="https://bedrock")) == TIMEOUT
+    assert classify_error(client_error("ExpiredTokenException")) == AUTH
+    assert classify_error(ValueError("bad tool input")) == OTHER
+
+
+def test_backoff_has_jitter_and_honors_retry_after():
+    """Delays stay within the exponential window, respect retry-after and are capped."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=10.0)
+    delays = [policy.delay(3) for _ in range(200)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+    assert retry_after_seconds(client_error("ThrottlingException", {"retry-after": "7"})) == 7.0
+    assert policy.delay(1, retry_after=7.0) == 7.0
+    assert policy.delay(1, retry_after=60.0) == 10.0
+    assert retry_after_seconds(client_error("ThrottlingException")) is None
+
+
+def test_retry_budget_is_shared_and_refills():
+    """The bucket denies retries once empty and refills over time."""
+    budget = RetryBudget(capacity=2, refill_per_second=0)
+    assert budget.try_acquire() and budget.try_acquire()
+    assert budget.try_acquire() is False
+
+    refilling = RetryBudget(capacity=1, refill_per_second=1000)
+    assert refilling.try_acquire()
+    asyncio.run(asyncio.sleep(0.01))
+    assert refilling.try_acquire()
+
+
+def failing_stream(monkeypatch, failures):
+    """Replace BedrockModel.stream: raise the given errors first, then answer."""
+    calls = []
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        calls.append(len(messages))
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockDelta": {"delta": {"text": "Gateway restarted."}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+
+    monkeypatch.setattr(BedrockModel, "stream", stream)
+    return calls
+
+
+def make_agent(budget=None, stats=None):
+    model = HelpdeskBedrockModel(agent_name="network_diagnostic_agent", cache_responses=False, region_name="us-east-1")
+    strategy = HelpdeskRetryStrategy(policy=RetryPolicy(max_attempts=4, base_delay=0.01, max_delay=0.05),
+                                     budget=budget or RetryBudget(capacity=10, refill_per_second=0), stats=stats)
+    return Agent(name="network_diagnostic_agent", model=model, retry_strategy=strategy, tools=[],
+                 callback_handler=None)
+
+
+def test_transient_failures_retry_the_model_call_only(monkeypatch):
+    """A throttled call and a stream error are retried in place and the agent still answers."""
+    calls = failing_stream(monkeypatch, [ModelThrottledException("throttled"), client_error("ModelStreamErrorException")])
+    stats = RetryStats()
+    agent = make_agent(stats=stats)
+    counter = ModelRetryCounter().attach(agent)
+
+    result = asyncio.run(agent.invoke_async("Diagnose the gateway"))
+
+    assert str(result).strip() == "Gateway restarted."
+    assert calls == [1, 1, 1]  # the same conversation was resent, nothing was lost or duplicated
+    assert counter.count == 2
+    assert stats.get_stats() == {THROTTLING: {"retried": 1}, STREAM_ERROR: {"retried": 1}}
+
+
+def test_auth_errors_and_empty_budget_fail_fast(monkeypatch):
+    """Non-retryable errors surface immediately, as do retryable ones once the budget is spent."""
+    calls = failing_stream(monkeypatch, [client_error("ExpiredTokenException")])
+    with pytest.raises(ClientError):
+        asyncio.run(make_agent().invoke_async("Diagnose the gateway"))
+    assert len(calls) == 1
+
+    calls = failing_stream(monkeypatch, [ModelThrottledException("throttled")])
+    stats = RetryStats()
+    with pytest.raises(ModelThrottledException):
+        asyncio.run(make_agent(budget=RetryBudget(capacity=0, refill_per_second=0), stats=stats).invoke_async("Diagnose"))
+    assert len(calls) == 1
+    assert stats.get_stats() == {THROTTLING: {"budget_denied": 1}}
+
+
+def test_attempts_are_counted_per_invocation(monkeypatch):
+    """An exhausted invocation doesn't use up the attempts of the agent's next invocation."""
+    calls = failing_stream(monkeypatch, [ModelThrottledException("throttled")] * 4)
+    stats = RetryStats()
+    # A private guard, so the failures don't open the shared Bedrock breaker
+    model = HelpdeskBedrockModel(agent_name="network_diagnostic_agent", cache_responses=False, region_name="us-east-1",
+                                 downstream=Downstream("bedrock", 1000, 1000, enabled=False))
+    strategy = HelpdeskRetryStrategy(policy=RetryPolicy(max_attempts=4, base_delay=0.001, max_delay=0.002),
+                                     budget=RetryBudget(capacity=10, refill_per_second=0), stats=stats)
+    agent = Agent(name="network_diagnostic_agent", model=model, retry_strategy=strategy, tools=[],
+                  callback_handler=None)
+    with pytest.raises(ModelThrottledException):
+        asyncio.run(agent.invoke_async("Diagnose the gateway"))
+    assert len(calls) == 4
+
+    calls = failing_stream(monkeypatch, [ModelThrottledException("throttled")] * 3)
+    assert str(asyncio.run(agent.invoke_async("Diagnose again"))).strip() == "Gateway restarted."
+    assert len(calls) == 4
+    assert stats.get_stats() == {THROTTLING: {"retried": 6, "exhausted": 1}}
@@ -0,0 +1,148 @@
+"""
+Unit tests for native DNS resolution and TCP/TLS connect probes.
+All probes run against localhost, so no external network access is needed.
+"""
+
+import asyncio
+import os
+import shutil
+import socket
+import ssl
+import subprocess
+import tempfile
+import time
+
+import pytest
+
+from tools import native_probes
+from tools.native_probes import clear_resolver_cache, resolve_host, tcp_connect_probe, tls_connect_probe
+
+
+def test_resolve_localhost():
+    """localhost resolves to the loopback address with per-record results."""
+    clear_resolver_cache()
+    result = asyncio.run(resolve_host("localhost", record_types=["A"]))
+
+    assert result["success"] is True
+    assert "127.0.0.1" in result["addresses"]
+    assert result["records"]["A"]["cached"] is False
+    assert result["records"]["A"]["duration_ms"] >= 0
+
+
+def test_resolver_cache_and_bypass():
+    """Repeated lookups are served from cache unless bypass_cache is set."""
+    clear_resolver_cache()
+    asyncio.run(resolve_host("localhost", record_types=["A"]))
+
+    cached = asyncio.run(resolve_host("localhost", record_types=["A"]))
+    assert cached["records"]["A"]["cached"] is True
+
+    fresh = asyncio.run(resolve_host("localhost", record_types=["A"], bypass_cache=True))
+    assert fresh["records"]["A"]["cached"] is False
+
+
+def test_resolver_cache_is_bounded(monkeypatch):
+    """Old lookups are dropped once the cache is full, and expired ones on the next insert."""
+    clear_resolver_cache()
+    monkeypatch.setattr(native_probes, "DNS_CACHE_MAX_ENTRIES", 2)
+    for address in ("127.0.0.1", "127.0.0.2", "127.0.0.3"):
+        asyncio.run(resolve_host(address, record_types=["A"]))
+    assert list(native_probes._resolver_cache) == [("127.0.0.2", "A"), ("127.0.0.3", "A")]
+
+    clear_resolver_cache()
+    monkeypatch.setattr(native_probes, "DNS_CACHE_TTL_SECONDS", 0.05)
+    asyncio.run(resolve_host("127.0.0.1", record_types=["A"]))
+    time.sleep(0.1)
+    asyncio.run(resolve_host("127.0.0.2", record_types=["A"]))
+    assert list(native_probes._resolver_cache) == [("127.0.0.2", "A")]
+    clear_resolver_cache()
+
+
+def test_resolve_rejects_unknown_record_type():
+    """Unsupported record types are reported instead of raising."""
+    result = asyncio.run(resolve_host("localhost", record_types=["MX"]))
+    assert result["success"] is False
+    assert "MX" in result["error"]
+
+
+def test_resolve_unknown_host():
+    """Names under the reserved .invalid TLD fail cleanly."""
+    result = asyncio.run(resolve_host("does-not-exist.invalid", bypass_cache=True))
+    assert result["success"] is False
+    assert result["addresses"] == []
+
+
+async def _with_server(handler, probe, ssl_context=None):
+    """Run a probe against a temporary local server."""
+    server = await asyncio.start_server(handler, "127.0.0.1", 0, ssl=ssl_context)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await probe(port)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+async def _close_handler(reader, writer):
+    writer.close()
+
+
+def test_tcp_connect_probe_open_port():
+    """An open port reports success and connect latency."""
+    result = asyncio.run(_with_server(_close_handler, lambda port: tcp_connect_probe("127.0.0.1", port)))
+    assert result["success"] is True
+    assert result["address"] == "127.0.0.1"
+    assert result["connect_ms"] >= 0
+
+
+def test_tcp_connect_probe_refused():
+    """A closed port reports a connection failure."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    result = asyncio.run(tcp_connect_probe("127.0.0.1", port, timeout=2))
+    assert result["success"] is False
+    assert "failed" in result["error"]
+
+
+@pytest.fixture
+def self_signed_context():
+    """Server SSL context with a throwaway self-signed certificate."""
+    if not shutil.which("openssl"):
+        pytest.skip("openssl not available")
+    with tempfile.TemporaryDirectory() as directory:
+        cert = os.path.join(directory, "cert.pem")
+        key = os.path.join(directory, "key.pem")
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+             "-subj", "/CN=localhost", "-keyout", key, "-out", cert],
+            check=True, capture_output=True
+        )
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert, key)
+        yield context
+
+
+def test_tls_probe_handshake(self_signed_context):
+    """The TLS probe reports connect and handshake timings separately."""
+    result = asyncio.run(_with_server(
+        _close_handler,
+        lambda port: tls_connect_probe("127.0.0.1", port, verify=False),
+        ssl_context=self_signed_context
+    ))
+    assert result["success"] is True
+    assert result["tls_version"].startswith("TLS")
+    assert result["connect_ms"] >= 0
+    assert result["tls_handshake_ms"] >= 0
+
+
+def test_tls_probe_rejects_untrusted_certificate(self_signed_context):
+    """With verification on, a self-signed certificate fails the probe."""
+    result = asyncio.run(_with_server(
+        _close_handler,
+        lambda port: tls_connect_probe("127.0.0.1", port, server_name="localhost"),
+        ssl_context=self_signed_context
+    ))
+    assert result["success"] is False
+    assert "Certificate verification failed" in result["error"]
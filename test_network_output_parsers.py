@@ -0,0 +1,137 @@
+"""
+Unit tests for ping and traceroute output parsing.
+Parses captured Linux outputs from test_fixtures/network_outputs.
+"""
+
+import asyncio
+import os
+
+from tools import diagnostics_engine
+from tools.diagnostics_engine import run_probe
+from tools.output_parsers import parse_ping_output, parse_traceroute_output
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "test_fixtures", "network_outputs")
+
+
+def load_fixture(name: str) -> str:
+    """Read a captured command output."""
+    with open(os.path.join(FIXTURE_DIR, name)) as f:
+        return f.read()
+
+
+def test_ping_success():
+    """A clean run yields zero loss, RTT statistics and every reply."""
+    metrics = parse_ping_output(load_fixture("ping_linux_success.txt"))
+
+    assert metrics.target == "example.com"
+    assert metrics.address == "93.184.216.34"
+    assert metrics.packets_transmitted == 4
+    assert metrics.packets_received == 4
+    assert metrics.loss_percent == 0.0
+    assert (metrics.rtt_min_ms, metrics.rtt_avg_ms, metrics.rtt_max_ms, metrics.rtt_mdev_ms) == (
+        11.570, 11.720, 11.896, 0.124
+    )
+    assert [reply.seq for reply in metrics.replies] == [1, 2, 3, 4]
+    assert metrics.replies[1].ttl == 56
+    assert metrics.replies[1].time_ms == 11.9
+
+
+def test_ping_partial_loss():
+    """Lost packets show up in loss % and as gaps in the reply sequence."""
+    metrics = parse_ping_output(load_fixture("ping_linux_partial_loss.txt"))
+
+    assert metrics.packets_transmitted == 6
+    assert metrics.packets_received == 4
+    assert metrics.loss_percent == 33.33
+    assert [reply.seq for reply in metrics.replies] == [1, 3, 4, 6]
+    assert metrics.rtt_max_ms == 212.717
+
+
+def test_ping_host_unreachable():
+    """ICMP errors are counted and their messages collected once."""
+    metrics = parse_ping_output(load_fixture("ping_linux_host_unreachable.txt"))
+
+    assert metrics.loss_percent == 100.0
+    assert metrics.errors == 3
+    assert metrics.replies == []
+    assert metrics.rtt_avg_ms is None
+    assert metrics.error_messages == ["Destination Host Unreachable"]
+
+
+def test_ping_timeout_and_unknown_host():
+    """Silent loss and resolution failures both parse without raising."""
+    timeout = parse_ping_output(load_fixture("ping_linux_timeout.txt"))
+    assert timeout.loss_percent == 100.0
+    assert timeout.error_messages == []
+
+    unknown = parse_ping_output(load_fixture("ping_linux_unknown_host.txt"))
+    assert unknown.packets_transmitted is None
+    assert unknown.error_messages == ["haunted-db.internal.invalid: Name or service not known"]
+
+
+def test_ping_macos_summary():
+    """The BSD/macOS summary format is understood too."""
+    metrics = parse_ping_output(
+        "3 packets transmitted, 3 packets received, 0.0% packet loss\n"
+        "round-trip min/avg/max/stddev = 10.101/10.202/10.303/0.082 ms\n"
+    )
+    assert metrics.packets_received == 3
+    assert metrics.rtt_avg_ms == 10.202
+
+
+def test_traceroute_success():
+    """Hops carry hostnames, addresses and RTTs, including multi-path hops."""
+    metrics = parse_traceroute_output(load_fixture("traceroute_linux_success.txt"))
+
+    assert metrics.target == "example.com"
+    assert metrics.max_hops == 30
+    assert metrics.hop_count == 5
+    assert metrics.reached_destination is True
+
+    first = metrics.hops[0]
+    assert first.hosts == ["_gateway"]
+    assert first.addresses == ["192.168.1.1"]
+    assert first.rtts_ms == [0.512, 0.478, 0.455]
+
+    multipath = metrics.hops[3]
+    assert multipath.addresses == ["129.250.2.10", "129.250.3.22"]
+    assert len(multipath.rtts_ms) == 3
+
+
+def test_traceroute_timeouts():
+    """Unanswered probes are counted per hop."""
+    metrics = parse_traceroute_output(load_fixture("traceroute_linux_timeouts.txt"))
+
+    assert metrics.reached_destination is False
+    assert metrics.hops[1].lost == 1
+    assert metrics.hops[1].rtts_ms == [3.402, 3.377]
+    assert all(hop.lost == 3 and hop.addresses == [] for hop in metrics.hops[2:])
+
+
+def test_traceroute_unreachable_flags():
+    """ICMP unreachable annotations are kept as hop flags."""
+    metrics = parse_traceroute_output(load_fixture("traceroute_linux_unreachable.txt"))
+
+    assert metrics.hops[-1].flags == ["!H"]
+    assert metrics.reached_destination is False
+
+
+def test_traceroute_numeric_output():
+    """traceroute -n output (no hostnames) is parsed as addresses."""
+    metrics = parse_traceroute_output(" 1  192.168.1.1  0.512 ms  0.478 ms  0.455 ms\n")
+    assert metrics.hops[0].addresses == ["192.168.1.1"]
+    assert metrics.hops[0].rtts_ms == [0.512, 0.478, 0.455]
+
+
+def test_probe_returns_metrics_and_raw_on_request(monkeypatch):
+    """Probes return parsed metrics by default and raw output only when asked."""
+    fixture = os.path.join(FIXTURE_DIR, "ping_linux_partial_loss.txt")
+    monkeypatch.setattr(diagnostics_engine, "build_probe_command", lambda *a, **k: ["cat", fixture])
+
+    compact = asyncio.run(run_probe("ping", "10.0.4.17"))
+    assert "output" not in compact
+    assert compact["metrics"]["loss_percent"] == 33.33
+
+    verbose = asyncio.run(run_probe("ping", "10.0.4.17", include_raw=True))
+    assert verbose["output"] == load_fixture("ping_linux_partial_loss.txt")
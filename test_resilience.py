@@ -0,0 +1,152 @@
+"""
+Unit tests for the resilience layer: token-bucket rate limiting and per-downstream circuit breakers.
+Downstream calls are replaced by stand-ins so no AWS calls are made.
+"""
+
+import asyncio
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+from strands.models.bedrock import BedrockModel
+from strands.types.exceptions import ModelThrottledException
+
+from bedrock_model import HelpdeskBedrockModel
+from resilience import (
+    CLOSED, HALF_OPEN, OPEN,
+    CircuitBreaker, CircuitOpenError, Downstream, RateLimitedError, TokenBucket, is_downstream_failure,
+)
+
+
+def client_error(code, status=400):
+    response = {"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": status}}
+    return ClientError(response, "GetItem")
+
+
+def make_downstream(threshold=2, recovery=60.0, rate=0.0, burst=1.0, max_wait=0.0):
+    breaker = CircuitBreaker(failure_threshold=threshold, recovery_seconds=recovery, half_open_probes=1)
+    return Downstream("test", rate, burst, breaker=breaker, max_wait=max_wait, enabled=True)
+
+
+def fail(error):
+    raise error
+
+
+def test_token_bucket_waits_briefly_and_denies_long_waits():
+    """A burst is served at once; the next caller waits for a token or is turned away."""
+    bucket = TokenBucket(rate_per_second=10, burst=2)
+    assert bucket.reserve(max_wait=0) == 0.0
+    assert bucket.reserve(max_wait=0) == 0.0
+    assert bucket.reserve(max_wait=0) is None  # nothing reserved
+    assert 0 < bucket.reserve(max_wait=0.5) <= 0.1
+    assert bucket.reserve(max_wait=0.1) is None  # the earlier reservation is in line first
+
+    downstream = make_downstream(rate=10, burst=1)
+    downstream.call(lambda: None)
+    with pytest.raises(RateLimitedError) as raised:
+        downstream.call(lambda: None)
+    assert raised.value.status_code == 429 and raised.value.retry_after > 0
+    assert downstream.get_status()["rate_limited"] == 1
+
+
+def test_breaker_opens_after_consecutive_failures_and_fails_fast():
+    """Throttling and server errors open the circuit; calls are then rejected without being made."""
+    downstream = make_downstream(threshold=2)
+    calls = []
+
+    for error in (client_error("ProvisionedThroughputExceededException"), client_error("InternalError", 500)):
+        with pytest.raises(ClientError):
+            downstream.call(lambda: calls.append(1) or fail(error))
+    with pytest.raises(CircuitOpenError) as raised:
+        downstream.call(lambda: calls.append(1))
+
+    assert len(calls) == 2
+    assert raised.value.status_code == 503 and 0 < raised.value.retry_after <= 60
+    status = downstream.get_status()
+    assert (status["state"], status["failures"], status["rejected_open"]) == (OPEN, 2, 1)
+
+
+def test_client_errors_show_the_downstream_is_up():
+    """A missing item or bucket is an answer, not an outage, and resets the failure count."""
+    assert not is_downstream_failure(client_error("NoSuchBucket", 404))
+    assert is_downstream_failure(ModelThrottledException("throttled"))
+
+    downstream = make_downstream(threshold=2)
+    for error in (client_error("ThrottlingException"), client_error("ResourceNotFoundException"),
+                  client_error("ThrottlingException")):
+        with pytest.raises(ClientError):
+            downstream.call(fail, error)
+    assert downstream.breaker.state == CLOSED
+    assert downstream.breaker.consecutive_failures == 1
+
+
+def test_half_open_probe_closes_or_reopens_the_circuit():
+    """After the recovery period one probe is let through; its outcome decides the circuit."""
+    downstream = make_downstream(threshold=1, recovery=0.05)
+    with pytest.raises(ClientError):
+        downstream.call(fail, client_error("SlowDown", 503))
+    time.sleep(0.06)
+
+    with pytest.raises(ClientError):
+        downstream.call(fail, client_error("SlowDown", 503))
+    assert downstream.breaker.state == OPEN  # a failed probe reopens at once
+    time.sleep(0.06)
+
+    with downstream.guard():
+        assert downstream.breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            downstream.call(lambda: None)  # only one probe at a time
+    assert downstream.breaker.state == CLOSED
+    assert downstream.call(lambda: "ok") == "ok"
+
+
+def test_bedrock_model_stops_calling_a_throttled_model(monkeypatch):
+    """Once Bedrock keeps throttling, model calls fail fast instead of adding load."""
+    calls = []
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        calls.append(1)
+        raise ModelThrottledException("throttled")
+        yield
+
+    monkeypatch.setattr(BedrockModel, "stream", stream)
+    model = HelpdeskBedrockModel(agent_name="network_diagnostic_agent", cache_responses=False,
+                                 downstream=make_downstream(threshold=2), region_name="us-east-1")
+    messages = [{"role": "user", "content": [{"text": "Diagnose the gateway"}]}]
+
+    async def consume():
+        async for _ in model.stream(messages):
+            pass
+
+    for _ in range(2):
+        with pytest.raises(ModelThrottledException):
+            asyncio.run(consume())
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(consume())
+    assert len(calls) == 2
+
+
+class FailingTable:
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def get_item(self, **kwargs):
+        self.calls += 1
+        raise self.error
+
+
+def test_ticket_table_calls_are_guarded(monkeypatch):
+    """DynamoDB throttling opens the table's circuit and later reads fail fast."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    from dynamodb_utils import DynamoDBManager  # creates the shared manager, which needs a region
+
+    manager = DynamoDBManager(downstream=make_downstream(threshold=2))
+    manager.table = FailingTable(client_error("ProvisionedThroughputExceededException"))
+
+    for _ in range(2):
+        with pytest.raises(ClientError):
+            manager.get_ticket("ticket-1")
+    with pytest.raises(CircuitOpenError):
+        manager.get_ticket("ticket-1")
+    assert manager.table.calls == 2
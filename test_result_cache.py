@@ -0,0 +1,200 @@
+"""
+Unit tests for the diagnostic tool result cache.
+Covers TTL expiry, argument normalization, single-flight coalescing and bypass.
+"""
+
+import asyncio
+import threading
+import time
+
+from tools.result_cache import DiagnosticResultCache, cached_diagnostic
+
+
+def test_sync_results_cached_until_ttl():
+    """Identical calls within the TTL are served from cache with their age."""
+    cache = DiagnosticResultCache()
+    calls = []
+
+    @cached_diagnostic(ttl=0.2, cache=cache)
+    def check_bucket(bucket_name: str):
+        calls.append(bucket_name)
+        return {"success": True, "bucket": bucket_name}
+
+    first = check_bucket("haunted-assets")
+    second = check_bucket("  HAUNTED-assets ")
+    assert calls == ["haunted-assets"]
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["cache_age_seconds"] >= 0
+
+    time.sleep(0.25)
+    third = check_bucket("haunted-assets")
+    assert third["cached"] is False
+    assert len(calls) == 2
+
+
+def test_defaults_and_list_order_share_key():
+    """Defaults are applied and list arguments are order-insensitive."""
+    cache = DiagnosticResultCache()
+    calls = []
+
+    @cached_diagnostic(ttl=60, cache=cache)
+    def diagnose(hostnames, probes=None):
+        calls.append(1)
+        return {"success": True}
+
+    diagnose(["b.example", "a.example"])
+    diagnose(hostnames=["a.example", "b.example"], probes=None)
+    assert len(calls) == 1
+
+
+def test_errors_not_cached_when_disabled():
+    """Tools can opt out of caching failed results."""
+    cache = DiagnosticResultCache()
+    calls = []
+
+    @cached_diagnostic(ttl=60, cache_errors=False, cache=cache)
+    def list_buckets():
+        calls.append(1)
+        return {"success": False, "error": "AWS credentials have expired"}
+
+    list_buckets()
+    list_buckets()
+    assert len(calls) == 2
+
+
+def test_bypass_argument_forces_fresh_call():
+    """A bypass argument skips the cached result."""
+    cache = DiagnosticResultCache()
+    calls = []
+
+    @cached_diagnostic(ttl=60, bypass_arg="bypass_cache", cache=cache)
+    def resolve(hostname, bypass_cache=False):
+        calls.append(1)
+        return {"success": True}
+
+    resolve("example.com")
+    assert resolve("example.com")["cached"] is True
+    assert resolve("example.com", bypass_cache=True)["cached"] is False
+    assert len(calls) == 2
+
+
+def test_async_single_flight():
+    """Concurrent identical async calls run the tool once."""
+    cache = DiagnosticResultCache()
+    calls = []
+
+    @cached_diagnostic(ttl=60, cache=cache)
+    async def ping(hostname):
+        calls.append(hostname)
+        await asyncio.sleep(0.1)
+        return {"success": True, "hostname": hostname}
+
+    async def burst():
+        return await asyncio.gather(*(ping("db.internal") for _ in range(10)))
+
+    results = asyncio.run(burst())
+    assert calls == ["db.internal"]
+    assert all(r["success"] for r in results)
+    assert cache.get_stats()["coalesced"] == 9
+
+
+def test_sync_single_flight_across_threads():
+    """Concurrent identical sync calls from worker threads run the tool once."""
+    cache = DiagnosticResultCache()
+    calls = []
+    results = []
+
+    @cached_diagnostic(ttl=60, cache=cache)
+    def head_bucket(bucket_name):
+        calls.append(bucket_name)
+        time.sleep(0.1)
+        return {"success": True}
+
+    threads = [threading.Thread(target=lambda: results.append(head_bucket("b"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["b"]
+    assert len(results) == 5
+
+
+def test_exceptions_propagate_and_are_not_cached():
+    """A raising tool propagates to the caller and is retried next time."""
+    cache = DiagnosticResultCache()
+    calls = []
+
+    @cached_diagnostic(ttl=60, cache=cache)
+    def flaky():
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    for _ in range(2):
+        try:
+            flaky()
+        except RuntimeError:
+            pass
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_leaves_owner_result_intact():
+    """Cancelling a coalesced caller neither breaks the owner's call nor its caching."""
+    cache = DiagnosticResultCache()
+
+    @cached_diagnostic(ttl=60, cache=cache)
+    async def ping(hostname):
+        await asyncio.sleep(0.1)
+        return {"success": True}
+
+    async def run():
+        owner = asyncio.create_task(ping("db.internal"))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(ping("db.internal"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        results = await asyncio.gather(owner, waiter, return_exceptions=True)
+        return [type(result).__name__ for result in results], await ping("db.internal")
+
+    outcomes, later = asyncio.run(run())
+    assert outcomes == ["dict", "CancelledError"]
+    assert later["cached"] is True
+
+
+def test_cancelled_owner_hands_call_to_waiter():
+    """When the owning caller is cancelled, a waiter runs the tool instead of being cancelled too."""
+    cache = DiagnosticResultCache()
+    calls = []
+
+    @cached_diagnostic(ttl=60, cache=cache)
+    async def ping(hostname):
+        calls.append(hostname)
+        await asyncio.sleep(0.1)
+        return {"success": True}
+
+    async def run():
+        owner = asyncio.create_task(ping("db.internal"))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(ping("db.internal")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(run())
+    assert all(result["success"] for result in results)
+    assert len(calls) == 2
+
+
+def test_lru_bound():
+    """The cache never holds more than max_entries results."""
+    cache = DiagnosticResultCache(max_entries=2)
+
+    @cached_diagnostic(ttl=60, cache=cache)
+    def probe(hostname):
+        return {"success": True}
+
+    for host in ["a", "b", "c"]:
+        probe(host)
+    assert cache.get_stats()["entries"] == 2
+    assert probe("a")["cached"] is False
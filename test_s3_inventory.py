@@ -0,0 +1,166 @@
+"""
+Unit tests for the S3 bucket inventory snapshot and the tools that use it.
+Uses a local stand-in for the S3 client instead of AWS.
+"""
+
+import datetime
+import time
+
+from botocore.exceptions import ClientError, ParamValidationError
+
+from tools import cloud_tools, s3_inventory
+from tools.result_cache import diagnostic_cache
+from tools.s3_inventory import BucketInventory
+
+
+CREATED = datetime.datetime(2024, 10, 31, tzinfo=datetime.timezone.utc)
+
+
+class ListingS3:
+    """Answers ListBuckets in pages; buckets without a region need GetBucketLocation."""
+
+    def __init__(self, buckets, page_size=2):
+        self.buckets = buckets
+        self.page_size = page_size
+        self.list_calls = 0
+        self.location_calls = []
+
+    def list_buckets(self, MaxBuckets=None, ContinuationToken=None):
+        self.list_calls += 1
+        start = int(ContinuationToken or 0)
+        page = self.buckets[start:start + self.page_size]
+        response = {"Buckets": [
+            {"Name": name, "CreationDate": CREATED, **({"BucketRegion": region} if region else {})}
+            for name, region in page
+        ]}
+        if start + self.page_size < len(self.buckets):
+            response["ContinuationToken"] = str(start + self.page_size)
+        return response
+
+    def get_bucket_location(self, Bucket):
+        self.location_calls.append(Bucket)
+        return {"LocationConstraint": None}
+
+
+BUCKETS = [
+    ("haunted-assets", "us-west-1"),
+    ("haunted-logs", "eu-west-1"),
+    ("haunted-site", "us-west-1"),
+    ("legacy-bucket", None),
+    ("zombie-archive", "us-west-1"),
+]
+
+
+def make_inventory(monkeypatch, tmp_path, stand_in, refresh_interval=900):
+    """Build an inventory backed by the stand-in client and a temporary snapshot file."""
+    monkeypatch.setattr(s3_inventory.boto3, "client", lambda *args, **kwargs: stand_in)
+    return BucketInventory(str(tmp_path / "inventory.json"), refresh_interval=refresh_interval)
+
+
+def test_refresh_pages_and_locates(monkeypatch, tmp_path):
+    """All pages are read and buckets listed without a region are located."""
+    stand_in = ListingS3(BUCKETS)
+    inventory = make_inventory(monkeypatch, tmp_path, stand_in)
+
+    assert inventory.refresh()["buckets"] == 5
+    assert stand_in.list_calls == 3
+    assert stand_in.location_calls == ["legacy-bucket"]
+    assert inventory.get("legacy-bucket")["region"] == "us-east-1"
+    assert inventory.get("HAUNTED-LOGS")["created"] == CREATED.isoformat()
+    assert inventory.get("missing") is None
+
+
+def test_refresh_without_listing_pagination(monkeypatch, tmp_path):
+    """Older botocore rejects MaxBuckets; the inventory falls back to a single unpaginated listing."""
+    class UnpaginatedS3(ListingS3):
+        def list_buckets(self, **kwargs):
+            if kwargs:
+                raise ParamValidationError(report=f"Unknown parameter in input: {sorted(kwargs)}")
+            self.list_calls += 1
+            return {"Buckets": [{"Name": name, "CreationDate": CREATED} for name, _ in self.buckets]}
+
+    stand_in = UnpaginatedS3(BUCKETS)
+    inventory = make_inventory(monkeypatch, tmp_path, stand_in)
+    inventory.refresh()
+    assert inventory.names() == sorted(name for name, _ in BUCKETS)
+    assert stand_in.list_calls == 1
+    assert len(stand_in.location_calls) == len(BUCKETS)
+
+
+def test_snapshot_survives_restart(monkeypatch, tmp_path):
+    """A new inventory instance serves the persisted snapshot without calling S3."""
+    inventory = make_inventory(monkeypatch, tmp_path, ListingS3(BUCKETS))
+    inventory.refresh()
+
+    fresh_client = ListingS3(BUCKETS)
+    reloaded = make_inventory(monkeypatch, tmp_path, fresh_client)
+    assert reloaded.ensure_fresh() is True
+    assert fresh_client.list_calls == 0
+    assert reloaded.names() == sorted(name for name, _ in BUCKETS)
+
+
+def test_search_prefix_glob_and_region(monkeypatch, tmp_path):
+    """Searches match glob patterns, plain prefixes and region filters."""
+    inventory = make_inventory(monkeypatch, tmp_path, ListingS3(BUCKETS))
+    inventory.refresh()
+
+    assert [b["name"] for b in inventory.search("haunt*")["buckets"]] == ["haunted-assets", "haunted-logs", "haunted-site"]
+    assert [b["name"] for b in inventory.search("haunt*", region="us-west-1")["buckets"]] == ["haunted-assets", "haunted-site"]
+    assert [b["name"] for b in inventory.search("legacy")["buckets"]] == ["legacy-bucket"]
+    assert [b["name"] for b in inventory.search("*-archive")["buckets"]] == ["zombie-archive"]
+
+    limited = inventory.search("*", limit=2)
+    assert limited["count"] == 5
+    assert len(limited["buckets"]) == 2
+
+
+def test_stale_snapshot_served_when_refresh_fails(monkeypatch, tmp_path):
+    """A failed refresh falls back to the previous snapshot."""
+    inventory = make_inventory(monkeypatch, tmp_path, ListingS3(BUCKETS), refresh_interval=0.01)
+    inventory.refresh()
+    time.sleep(0.02)
+
+    class ExpiredS3(ListingS3):
+        def list_buckets(self, **kwargs):
+            raise ClientError({"Error": {"Code": "ExpiredToken", "Message": "expired"}}, "ListBuckets")
+
+    monkeypatch.setattr(s3_inventory.boto3, "client", lambda *args, **kwargs: ExpiredS3([]))
+    assert inventory.ensure_fresh() is False
+    assert inventory.get("haunted-site") is not None
+    assert inventory.get_status()["last_error"]
+
+
+def test_tools_use_inventory(monkeypatch, tmp_path):
+    """list_all_buckets truncates, search_buckets filters and locations come from the snapshot."""
+    stand_in = ListingS3(BUCKETS)
+    inventory = make_inventory(monkeypatch, tmp_path, stand_in)
+    monkeypatch.setattr(cloud_tools, "bucket_inventory", inventory)
+    diagnostic_cache.clear()
+
+    listing = cloud_tools.list_all_buckets(limit=2)
+    assert listing["count"] == 5
+    assert listing["buckets"] == ["haunted-assets", "haunted-logs"]
+    assert listing["truncated"] is True
+
+    found = cloud_tools.search_buckets("haunt*", region="us-west-1")
+    assert found["success"] is True
+    assert found["count"] == 2
+    assert found["buckets"][0] == {"name": "haunted-assets", "region": "us-west-1", "created": CREATED.isoformat()}
+
+    location = cloud_tools.get_bucket_location("zombie-archive")
+    assert location["region"] == "us-west-1"
+    assert stand_in.location_calls == ["legacy-bucket"]
+
+
+def test_tools_report_missing_credentials(monkeypatch, tmp_path):
+    """Without a snapshot, listing errors are returned to the agent."""
+    class ExpiredS3(ListingS3):
+        def list_buckets(self, **kwargs):
+            raise ClientError({"Error": {"Code": "ExpiredToken", "Message": "expired"}}, "ListBuckets")
+
+    inventory = make_inventory(monkeypatch, tmp_path, ExpiredS3([]))
+    monkeypatch.setattr(cloud_tools, "bucket_inventory", inventory)
+
+    result = cloud_tools.search_buckets("haunt*")
+    assert result["success"] is False
+    assert "expired" in result["error"]
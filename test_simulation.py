@@ -0,0 +1,110 @@
+"""
+Unit tests for the offline simulation: latency distributions, scripted replies, simulated
+tools and the simulated Bedrock model driving a real agent with retries. Delays are scaled
+to zero so no test waits.
+"""
+
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+from strands.agent import Agent
+from strands.types.exceptions import ModelThrottledException
+
+from model_retry import STREAM_ERROR, THROTTLING, HelpdeskRetryStrategy, RetryBudget, RetryPolicy, RetryStats
+from resilience import Downstream
+from simulation import (
+    LatencyDistribution, SimulatedBedrockModel, SimulationConfig, agent_tools, conversation_digest, scripted_reply,
+    simulated_tool,
+)
+from tools.network_tools import diagnose_hosts
+
+
+def make_agent(config, stats=None, with_tools=True):
+    # A private guard, so simulated failures don't open the shared Bedrock breaker
+    model = SimulatedBedrockModel("network_diagnostic_agent", config=config, region_name="us-east-1",
+                                  downstream=Downstream("bedrock", 1000, 1000, enabled=False))
+    strategy = HelpdeskRetryStrategy(policy=RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.002),
+                                     budget=RetryBudget(capacity=10, refill_per_second=0), stats=stats)
+    return Agent(name="network_diagnostic_agent", model=model, retry_strategy=strategy,
+                 tools=[simulated_tool(diagnose_hosts, config)] if with_tools else [], callback_handler=None)
+
+
+def test_latency_distributions_parse_and_sample():
+    """Each kind takes its parameters, samples are reproducible per seed and bad specs are rejected."""
+    config = SimulationConfig(seed=7, model_latency="uniform:0.2,1", tool_latency="fixed:0.5")
+    assert config.tool_distribution.sample(config.rng("a")) == 0.5
+    samples = [config.model_distribution.sample(config.rng("call", n)) for n in range(50)]
+    assert all(0.2 <= sample <= 1 for sample in samples)
+    assert samples == [config.model_distribution.sample(config.rng("call", n)) for n in range(50)]
+    assert LatencyDistribution("lognormal:0,0.5").sample(config.rng()) == 0.0
+
+    for spec in ("gamma:1,2", "uniform:1", "fixed"):
+        with pytest.raises(ValueError):
+            LatencyDistribution(spec)
+
+
+def test_scripted_replies_follow_the_workflow_steps():
+    """The memory agent stores or looks up, and the ticketing agent closes on WORKFLOW_COMPLETE."""
+    def ask(agent_name, prompt, **settings):
+        return scripted_reply(agent_name, [{"role": "user", "content": [{"text": prompt}]}],
+                              SimulationConfig(**settings))
+
+    assert ask("memory_agent", "STORE this resolution.").startswith("Memory stored")
+    assert ask("memory_agent", "Search memories", memory_hit_rate=1).startswith("MEMORY_FOUND")
+    assert ask("memory_agent", "Search memories", memory_hit_rate=0) == "NO_MEMORY_FOUND"
+    assert "WORKFLOW_COMPLETE" in ask("ticketing_agent", "WORKFLOW_COMPLETE: Update the ticket with this summary.")
+    assert "WORKFLOW_COMPLETE" not in ask("ticketing_agent", "Analyze this ticket")
+
+
+def test_simulated_agent_calls_its_tool_then_answers_reproducibly():
+    """The worker calls its scripted tool once, answers from the script, and reruns match."""
+    config = SimulationConfig(time_scale=0)
+
+    def run():
+        agent = make_agent(config)
+        result = asyncio.run(agent.invoke_async("VPN tunnel drops packets"))
+        tool_results = [block["toolResult"] for message in agent.messages for block in message["content"]
+                        if "toolResult" in block]
+        return str(result), tool_results
+
+    text, tool_results = run()
+    assert "**Root Cause Analysis**" in text
+    assert len(tool_results) == 1
+    assert tool_results[0]["content"][0]["json"]["simulated"] is True
+    assert run()[0] == text
+
+
+def test_replayed_conversations_are_identical():
+    """Tool-use ids come from the seed, so a rerun hashes every model call to the same conversation."""
+    config = SimulationConfig(time_scale=0)
+
+    def run():
+        agent = make_agent(config)
+        asyncio.run(agent.invoke_async("VPN tunnel drops packets"))
+        # The digest of every prefix is the seed input of a model call
+        return [conversation_digest(agent.messages[:end]) for end in range(1, len(agent.messages) + 1)]
+
+    first, second = run(), run()
+    assert len(first) == 4
+    assert first == second
+
+
+def test_simulated_failures_are_retried_by_the_agent():
+    """Throttled calls and mid-stream errors reach the retry strategy like real Bedrock failures."""
+    stats = RetryStats()
+    with pytest.raises(ModelThrottledException):
+        asyncio.run(make_agent(SimulationConfig(time_scale=0, throttle_rate=1), stats).invoke_async("Diagnose"))
+    assert stats.get_stats() == {THROTTLING: {"retried": 2, "exhausted": 1}}
+
+    stats = RetryStats()
+    # Without tools the model answers with text right away, which is where stream errors happen
+    agent = make_agent(SimulationConfig(time_scale=0, stream_error_rate=1), stats, with_tools=False)
+    with pytest.raises(ClientError):
+        asyncio.run(agent.invoke_async("Diagnose"))
+    assert stats.get_stats() == {STREAM_ERROR: {"retried": 2, "exhausted": 1}}
+
+
+def test_real_tools_are_kept_outside_simulation():
+    """With the default MODEL_BACKEND the agents keep their real tools."""
+    assert agent_tools([diagnose_hosts]) == [diagnose_hosts]
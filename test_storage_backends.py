@@ -0,0 +1,133 @@
+"""
+Unit tests for the ticket storage backends: the in-memory table's item operations, update and
+condition expressions, indexes and paging, its capacity model, and DynamoDBManager running on it
+without any AWS configuration.
+"""
+
+import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from storage_backends import InMemoryBackend, InMemoryTable, create_storage_backend, item_size, parse_indexes
+
+
+def tickets(count):
+    return [{"ticket_id": f"t{n:03d}", "status": "pending" if n % 2 else "resolved",
+             "created_at": f"2026-01-{n % 28 + 1:02d}T00:00:{n:02d}", "title": f"Ticket {n}"}
+            for n in range(count)]
+
+
+def test_item_operations_and_expressions():
+    """put/get/update/delete follow DynamoDB semantics for conditions, update clauses and ReturnValues."""
+    table = InMemoryTable()
+    table.put_item(Item={"ticket_id": "t1", "status": "pending", "tags": ["vpn"]})
+    with pytest.raises(ClientError) as error:
+        table.put_item(Item={"ticket_id": "t1"}, ConditionExpression=Attr("ticket_id").not_exists())
+    assert error.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+
+    response = table.update_item(
+        Key={"ticket_id": "t1"},
+        UpdateExpression="SET #status = :status, #count = if_not_exists(#count, :zero) + :one, "
+                         "tags = list_append(tags, :tags) REMOVE obsolete ADD seen :one",
+        ExpressionAttributeNames={"#status": "status", "#count": "count"},
+        ExpressionAttributeValues={":status": "resolved", ":zero": 0, ":one": 1, ":tags": ["dns"]},
+        ConditionExpression=Attr("status").eq("pending"),
+        ReturnValues="UPDATED_NEW")
+    assert response["Attributes"] == {"status": "resolved", "count": 1, "tags": ["vpn", "dns"], "seen": 1}
+
+    item = table.get_item(Key={"ticket_id": "t1"})["Item"]
+    item["tags"].append("mutated")
+    assert table.get_item(Key={"ticket_id": "t1"})["Item"]["tags"] == ["vpn", "dns"]
+
+    # Updating a missing item creates it; key attributes can't be changed
+    assert table.update_item(Key={"ticket_id": "t2"}, UpdateExpression="SET a = :a",
+                             ExpressionAttributeValues={":a": 1}, ReturnValues="ALL_NEW")["Attributes"] == {
+        "ticket_id": "t2", "a": 1}
+    with pytest.raises(ClientError):
+        table.update_item(Key={"ticket_id": "t2"}, UpdateExpression="SET ticket_id = :a",
+                          ExpressionAttributeValues={":a": "t3"})
+
+    assert table.delete_item(Key={"ticket_id": "t2"}, ReturnValues="ALL_OLD")["Attributes"]["a"] == 1
+    assert "Item" not in table.get_item(Key={"ticket_id": "t2"})
+
+
+def test_index_queries_and_paged_scans():
+    """GSI queries sort by the index sort key and page with LastEvaluatedKey; scans stop at the page size."""
+    table = InMemoryTable(indexes=parse_indexes("status-index=status:created_at"))
+    table.load(tickets(30) + [{"ticket_id": "no-status"}])
+
+    pages, start = [], None
+    while True:
+        kwargs = {"ExclusiveStartKey": start} if start else {}
+        response = table.query(IndexName="status-index", KeyConditionExpression=Key("status").eq("pending"),
+                               ScanIndexForward=False, Limit=4, **kwargs)
+        pages.append(response["Items"])
+        start = response.get("LastEvaluatedKey")
+        if start is None:
+            break
+    created = [item["created_at"] for page in pages for item in page]
+    assert len(created) == 15 and created == sorted(created, reverse=True)
+    assert len(pages) == 4
+
+    recent = table.query(IndexName="status-index",
+                         KeyConditionExpression=Key("status").eq("resolved") & Key("created_at").gte("2026-01-20"),
+                         FilterExpression=Attr("title").begins_with("Ticket 2"))
+    assert all(item["title"].startswith("Ticket 2") for item in recent["Items"])
+    assert recent["ScannedCount"] >= recent["Count"]
+
+    # The sparse index leaves out the item without a status; scans cover the whole table
+    assert len(table.scan(IndexName="status-index")["Items"]) == 30
+    small_pages = InMemoryTable(page_bytes=200)
+    small_pages.load(tickets(10))
+    first = small_pages.scan()
+    assert first["Count"] < 10 and "LastEvaluatedKey" in first
+    with pytest.raises(ClientError):
+        table.query(IndexName="status-index", KeyConditionExpression=Key("status").eq("pending"),
+                    ConsistentRead=True)
+
+
+def test_consumed_capacity_and_throttling():
+    """Calls report consumed units, index writes are charged, and spent provisioned capacity throttles."""
+    table = InMemoryTable(indexes={"status-index": ("status", None)}, read_capacity=1, burst_seconds=1)
+    item = {"ticket_id": "t1", "status": "pending", "description": "x" * 3000}
+    assert item_size(item) > 3000
+
+    put = table.put_item(Item=item, ReturnConsumedCapacity="INDEXES")["ConsumedCapacity"]
+    assert put["Table"]["CapacityUnits"] == 3.0
+    assert put["GlobalSecondaryIndexes"] == {"status-index": {"CapacityUnits": 3.0}}
+
+    read = table.get_item(Key={"ticket_id": "t1"}, ReturnConsumedCapacity="TOTAL")["ConsumedCapacity"]
+    assert read["CapacityUnits"] == 0.5
+    assert table.get_item(Key={"ticket_id": "t1"}, ConsistentRead=True,
+                          ReturnConsumedCapacity="TOTAL")["ConsumedCapacity"]["CapacityUnits"] == 1.0
+
+    with pytest.raises(ClientError) as error:
+        table.get_item(Key={"ticket_id": "t1"})
+    assert error.value.response["Error"]["Code"] == "ProvisionedThroughputExceededException"
+    stats = table.get_stats()
+    assert stats["throttled_reads"] == 1 and stats["write_capacity_units"] == 6.0
+    assert stats["operations"] == {"PutItem": 1, "GetItem": 3}
+
+
+def test_manager_runs_on_the_memory_backend_without_aws(monkeypatch):
+    """DynamoDBManager opens its table lazily, so the memory backend needs no region or credentials."""
+    from dynamodb_utils import DynamoDBManager
+    from metrics import DYNAMODB_CONSUMED_CAPACITY
+    from resilience import Downstream
+
+    monkeypatch.delenv("AWS_DEFAULT_REGION", raising=False)
+    monkeypatch.delenv("AWS_REGION", raising=False)
+    manager = DynamoDBManager(downstream=Downstream("dynamodb", 0.0, 1.0, enabled=False), backend="memory")
+    before = DYNAMODB_CONSUMED_CAPACITY.value(operation="put_item")
+
+    manager.create_ticket({"ticket_id": "t1", "title": "VPN down", "attachments": [{"name": "a.png"}]})
+    assert manager.update_ticket("t1", {"status": "resolved"})["status"] == "resolved"
+    assert manager.get_ticket("t1")["attachments"] == [{"name": "a.png"}]
+    assert [ticket["ticket_id"] for ticket in manager.list_tickets()] == ["t1"]
+    assert manager.check_table()["available"] is True
+    assert DYNAMODB_CONSUMED_CAPACITY.value(operation="put_item") == before + 1.0
+
+    shared = InMemoryBackend(indexes={})
+    assert shared.open_table("Tickets") is shared.open_table("Tickets")
+    with pytest.raises(ValueError):
+        create_storage_backend("sqlite")
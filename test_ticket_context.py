@@ -0,0 +1,74 @@
+"""
+Unit tests for per-step ticket context views, token budgets and token accounting.
+"""
+
+from ticket_context import ContextLedger, TicketState, estimate_tokens
+
+
+TICKET = {
+    "ticket_id": "ticket-7",
+    "title": "Haunted portal is slow",
+    "description": "Users report timeouts. " + "Image analysis: stack trace line\n" * 400,
+    "severity": "high",
+    "category": "network",
+    "created_at": "2026-10-31T00:00:00",
+}
+
+
+def test_views_only_include_needed_fields():
+    """Late steps don't see the raw description or diagnostics."""
+    state = TicketState.from_ticket(TICKET)
+    state.analysis = "Type: network, priority: high"
+    state.resolution = "traceroute: " + "hop data " * 500
+    state.summary = "The portal was slow because of a congested gateway."
+
+    closing = state.render("ticket_close")
+    assert "Image analysis" not in closing
+    assert "traceroute" not in closing
+    assert closing.startswith("WORKFLOW_COMPLETE")
+    assert state.summary in closing
+
+    diagnosis = state.render("diagnosis")
+    assert "Ticketing analysis:\nType: network" in diagnosis
+    assert "traceroute" not in diagnosis
+
+
+def test_budget_trims_longest_fields():
+    """A prompt over budget is trimmed to fit, keeping short fields intact."""
+    state = TicketState.from_ticket(TICKET)
+    state.resolution = "Gateway 10.0.0.1 dropped packets; " + "probe output " * 600
+
+    unbounded = state.render("summarization")
+    compacted = state.render("summarization", budget_tokens=1000)
+
+    assert estimate_tokens(unbounded) > 2000
+    assert estimate_tokens(compacted) <= 1000 + 50
+    assert "Title: Haunted portal is slow" in compacted
+    assert "ticket-7" not in compacted and TICKET["created_at"] not in compacted
+    assert "characters omitted" in compacted
+    assert "Gateway 10.0.0.1 dropped packets" in compacted
+
+
+def test_prompt_under_budget_is_unchanged():
+    """Prompts that fit their budget are not trimmed."""
+    state = TicketState.from_ticket(dict(TICKET, description="Ping fails"))
+    assert state.render("memory_lookup", budget_tokens=1000) == state.render("memory_lookup")
+
+
+def test_ledger_tracks_per_agent_tokens_and_history_baseline():
+    """The ledger sums calls per agent and the input a shared conversation would carry."""
+    ledger = ContextLedger(budgets={"memory_agent": 500})
+    ledger.start("x" * 400)
+
+    ledger.record("memory_agent", "y" * 40, "z" * 800)
+    ledger.record("summarization_agent", "w" * 80, "v" * 40)
+
+    report = ledger.to_dict()
+    assert ledger.budget_for("memory_agent") == 500
+    assert ledger.budget_for("summarization_agent") is None
+    assert report["by_agent"]["memory_agent"] == {
+        "calls": 1, "input_tokens": 10, "output_tokens": 200, "uncompacted_input_tokens": 100
+    }
+    # The summarization call would have carried the ticket and the memory reply
+    assert report["by_agent"]["summarization_agent"]["uncompacted_input_tokens"] == 300
+    assert report["total"]["input_tokens"] == 30
@@ -0,0 +1,155 @@
+"""
+Unit tests for the ticket scheduler: severity queues, concurrency caps and admission control.
+Workflows are replaced by coroutines that wait on events, so no agents run.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from ticket_scheduler import SchedulerFull, TicketAlreadyScheduled, TicketScheduler
+
+
+class Gate:
+    """Workflow stand-in that records its start and finishes when released."""
+
+    def __init__(self, name, started):
+        self.name = name
+        self.started = started
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.started.append(self.name)
+        await self.release.wait()
+        return self.name
+
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_weighted_fair_order_favors_critical_without_starving_low():
+    """With one slot busy, queued tickets start by weighted round robin across severities."""
+    async def scenario():
+        scheduler = TicketScheduler(max_concurrent=1, category_limits={},
+                                    weights={"critical": 3, "high": 1, "medium": 1, "low": 1})
+        started = []
+        blocker = Gate("blocker", started)
+        scheduler.submit("blocker", "low", "other", blocker)
+        gates = {}
+        for name, severity in [("low-1", "low"), ("low-2", "low"), ("crit-1", "critical"), ("crit-2", "critical"),
+                               ("crit-3", "critical"), ("crit-4", "critical")]:
+            gates[name] = Gate(name, started)
+            scheduler.submit(name, severity, "other", gates[name])
+        await drain()
+
+        assert scheduler.get_ticket_status("low-1")["queue_position"] == 3
+        blocker.release.set()
+        while len(started) < 7:
+            await drain()
+            gates[started[-1]].release.set()
+        return started
+
+    started = asyncio.run(scenario())
+    assert started == ["blocker", "crit-1", "crit-2", "low-1", "crit-3", "crit-4", "low-2"]
+
+
+def test_global_and_category_caps():
+    """No more than max_concurrent workflows run, and capped categories wait while others start."""
+    async def scenario():
+        scheduler = TicketScheduler(max_concurrent=3, category_limits={"network": 1})
+        started = []
+        tickets = [("net-0", "network"), ("net-1", "network"), ("cloud-0", "cloud"), ("cloud-1", "cloud"), ("cloud-2", "cloud")]
+        gates = [Gate(name, started) for name, _ in tickets]
+        for gate, (name, category) in zip(gates, tickets):
+            scheduler.submit(name, "high", category, gate)
+        await drain()
+        first = list(started)
+        stats = scheduler.get_stats()
+        gates[0].release.set()
+        await drain()
+        return first, list(started), stats
+
+    first, after_release, stats = asyncio.run(scenario())
+    assert first == ["net-0", "cloud-0", "cloud-1"]
+    assert stats["running"] == {"network": 1, "cloud": 2}
+    assert stats["queued"]["high"] == 2
+    assert after_release == first + ["net-1"]
+
+
+def test_queue_position_and_estimated_start():
+    """Queued tickets get a position and a start estimate from the typical workflow duration."""
+    async def scenario():
+        scheduler = TicketScheduler(max_concurrent=1, category_limits={}, default_service_seconds=60)
+        started = []
+        scheduler.submit("running", "medium", "other", Gate("running", started))
+        scheduler.submit("next", "medium", "other", Gate("next", started))
+        scheduler.submit("after", "medium", "other", Gate("after", started))
+        await drain()
+        return scheduler.get_queue_status()
+
+    status = asyncio.run(scenario())
+    assert status["running"]["state"] == "running"
+    assert (status["next"]["queue_position"], status["after"]["queue_position"]) == (1, 2)
+    next_start = datetime.fromisoformat(status["next"]["estimated_start_time"])
+    after_start = datetime.fromisoformat(status["after"]["estimated_start_time"])
+    assert abs((after_start - next_start).total_seconds() - 60) < 1
+
+
+def test_full_queue_rejects_all_but_critical_and_results_propagate():
+    """Admission control turns away non-critical tickets; awaiting a submission yields its result or error."""
+    async def failing():
+        raise RuntimeError("Bedrock unavailable")
+
+    async def scenario():
+        scheduler = TicketScheduler(max_concurrent=1, category_limits={}, max_queue=1)
+        started = []
+        blocker = Gate("blocker", started)
+        scheduler.submit("blocker", "low", "other", blocker)
+        failed = scheduler.submit("queued", "low", "other", failing)
+        with pytest.raises(SchedulerFull):
+            scheduler.submit("rejected", "high", "other", Gate("rejected", started))
+        critical_gate = Gate("critical", started)
+        critical = scheduler.submit("critical", "critical", "other", critical_gate)
+        blocker.release.set()
+        await drain()
+        started_next = started[-1]
+        assert not failed.done()
+        critical_gate.release.set()
+        await drain()
+        return started_next, failed, await critical, scheduler.get_stats()
+
+    started_next, failed, critical_result, stats = asyncio.run(scenario())
+    assert started_next == "critical"
+    assert critical_result == "critical"
+    assert (stats["admitted"], stats["rejected"], stats["completed"], stats["failed"]) == (3, 1, 2, 1)
+    with pytest.raises(RuntimeError):
+        failed.result()
+
+
+def test_duplicate_submission_is_rejected_and_cap_holds():
+    """A ticket already queued or running is refused, so the global cap holds; it may run again once done."""
+    async def scenario():
+        scheduler = TicketScheduler(max_concurrent=2, category_limits={})
+        started = []
+        gates = {name: Gate(name, started) for name in ("t1", "t2", "t3")}
+        scheduler.submit("t1", "high", "other", gates["t1"])
+        with pytest.raises(TicketAlreadyScheduled):
+            scheduler.submit("t1", "high", "other", Gate("t1-again", started))
+        scheduler.submit("t2", "high", "other", gates["t2"])
+        scheduler.submit("t3", "high", "other", gates["t3"])
+        await drain()
+        running = sum(scheduler.get_stats()["running"].values())
+        with pytest.raises(TicketAlreadyScheduled):
+            scheduler.check_admission("high", "t3")
+        gates["t1"].release.set()
+        await drain()
+        scheduler.check_admission("high", "t1")
+        return running, list(started), scheduler.get_stats()
+
+    running, started, stats = asyncio.run(scenario())
+    assert running == 2
+    assert started == ["t1", "t2", "t3"]
+    assert (stats["admitted"], stats["duplicates"], stats["rejected"]) == (3, 1, 0)
@@ -0,0 +1,140 @@
+"""
+Unit tests for the adaptive timeout policy: limits learned from recorded workflow latencies.
+Agents are replaced by scripted stand-ins so no Bedrock calls are made.
+"""
+
+import asyncio
+
+import pytest
+
+import timeout_policy
+from Helpdesk_swarm import create_Haunted_Helpdesk_swarm
+from timeout_policy import AdaptiveTimeoutPolicy, LatencyHistory, TimeoutPolicy, percentile
+from workflow_router import CLOUD_WORKER, NETWORK_WORKER, WorkflowRouter, WorkflowTimeout
+
+
+def make_policy(tmp_path, **kwargs):
+    history = LatencyHistory(str(tmp_path / "latency.sqlite3"), window=kwargs.pop("window", 500))
+    return AdaptiveTimeoutPolicy(history=history, factor=1.5, pct=99, min_samples=kwargs.pop("min_samples", 5))
+
+
+def test_percentile_uses_nearest_rank():
+    """Percentiles pick a recorded value, so a single slow run sets the p99 of a small sample."""
+    assert percentile([5.0], 99) == 5.0
+    assert percentile(list(range(1, 101)), 99) == 99
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+
+
+def test_defaults_until_enough_samples(tmp_path):
+    """A category with too few completed workflows keeps the static limits."""
+    policy = make_policy(tmp_path)
+    for _ in range(4):
+        policy.record("network", 40.0, 9, [(NETWORK_WORKER, 30.0)])
+
+    chosen = policy.policy_for("network")
+    assert chosen.source == "default"
+    assert chosen.samples == 4
+    assert (chosen.execution_timeout, chosen.max_handoffs) == (TimeoutPolicy().execution_timeout, TimeoutPolicy().max_handoffs)
+
+
+def test_fast_categories_tighten_and_heavy_ones_loosen(tmp_path):
+    """Limits follow each category's p99 times the factor, within the floors and ceilings."""
+    policy = make_policy(tmp_path)
+    for _ in range(10):
+        policy.record("other", 12.0, 4, [("memory_agent", 4.0), ("summarization_agent", 6.0)])
+        policy.record("network", 150.0, 9, [("memory_agent", 4.0), (NETWORK_WORKER, 100.0)])
+
+    fast, heavy = policy.policy_for("other"), policy.policy_for("network")
+
+    assert fast.source == heavy.source == "learned"
+    assert fast.execution_timeout == timeout_policy.EXECUTION_TIMEOUT_FLOOR  # 18s is below the floor
+    assert heavy.execution_timeout == 225.0
+    assert fast.max_handoffs == timeout_policy.MAX_HANDOFFS_FLOOR
+    assert heavy.max_handoffs == 11 and heavy.max_iterations == 14
+    assert heavy.timeout_for(NETWORK_WORKER) == 150.0
+    assert heavy.timeout_for("memory_agent") == timeout_policy.NODE_TIMEOUT_FLOOR
+    assert heavy.node_timeout == 150.0  # the swarm's single node timeout fits the slowest agent
+
+
+def test_modes_are_learned_separately_and_window_is_bounded(tmp_path):
+    """Router runs don't shorten swarm limits, and only the most recent samples count."""
+    policy = make_policy(tmp_path, window=5)
+    for _ in range(5):
+        policy.record("cloud", 10.0, 5, [(CLOUD_WORKER, 2.0)], mode="router")
+        policy.record("other", 60.0, 9, [(CLOUD_WORKER, 40.0)])
+    assert policy.policy_for("cloud").source == "default"
+    assert policy.policy_for("cloud", mode="router").source == "learned"
+    assert policy.policy_for("cloud").agent_timeouts == {CLOUD_WORKER: 60.0}
+    assert policy.policy_for("cloud", mode="router").agent_timeouts == {CLOUD_WORKER: timeout_policy.NODE_TIMEOUT_FLOOR}
+
+    for _ in range(5):
+        policy.record("cloud", 100.0, 5, [], mode="router")
+    assert policy.policy_for("cloud", mode="router").execution_timeout == 150.0
+    assert list(policy.get_policies()["policies"]) == ["router:cloud", "swarm:other"]
+
+
+def test_swarm_uses_the_chosen_limits():
+    """The swarm is configured with the ticket's limits instead of hardcoded ones."""
+    swarm = create_Haunted_Helpdesk_swarm(TimeoutPolicy(execution_timeout=45.0, node_timeout=20.0,
+                                                        max_handoffs=7, max_iterations=10))
+    assert (swarm.execution_timeout, swarm.node_timeout, swarm.max_handoffs, swarm.max_iterations) == (45.0, 20.0, 7, 10)
+
+
+class ScriptedAgent:
+    def __init__(self, reply, delay=0.0):
+        self.reply = reply
+        self.delay = delay
+
+    async def invoke_async(self, prompt):
+        await asyncio.sleep(self.delay)
+        return self.reply(prompt) if callable(self.reply) else self.reply
+
+
+def test_router_times_out_workers_from_their_latencies_and_records_runs(tmp_path, monkeypatch):
+    """A worker slower than its learned timeout is cut off; the run is recorded and the policy reported."""
+    monkeypatch.setattr(timeout_policy, "NODE_TIMEOUT_FLOOR", 0.01)
+    policy = make_policy(tmp_path)
+    for _ in range(5):
+        policy.record("cloud", 1.0, 7, [(NETWORK_WORKER, 0.05)], mode="router")
+
+    replies = {
+        "memory_agent": ScriptedAgent(lambda prompt: "Memory stored" if prompt.startswith("STORE") else "NO_MEMORY_FOUND"),
+        "ticketing_agent": ScriptedAgent(lambda prompt: "TERMINATE_WORKFLOW" if "WORKFLOW_COMPLETE" in prompt else "Type: cloud"),
+        NETWORK_WORKER: ScriptedAgent("Route to S3 endpoint is fine.", delay=1.0),
+        CLOUD_WORKER: ScriptedAgent("Bucket policy denies the role.", delay=0.2),
+        "summarization_agent": ScriptedAgent("Bucket policy fixed.\nWORKFLOW_COMPLETE"),
+    }
+    router = WorkflowRouter(agent_factories={name: (lambda agent=agent: agent) for name, agent in replies.items()},
+                            worker_timeout=5.0, timeout_policy=policy)
+    ticket = {"ticket_id": "ticket-4", "title": "S3 bucket not connecting", "severity": "high", "category": "cloud",
+              "description": "Uploads to the S3 bucket fail with connectivity errors", "created_at": "2026-10-31T00:00:00"}
+
+    result = asyncio.run(router.run(ticket))
+
+    statuses = {branch["worker"]: branch["status"] for branch in result["parallel_branches"]}
+    assert statuses == {NETWORK_WORKER: "timeout", CLOUD_WORKER: "completed"}  # the cloud worker keeps the 5s default
+    assert result["timeout_policy"]["agent_timeouts"] == {NETWORK_WORKER: 0.1}
+    assert result["timeout_policy"]["mode"] == "router"
+    assert policy.policy_for("cloud", mode="router").samples == 6
+    assert len(policy.history.values(timeout_policy.AGENT_DURATION)[f"router:{NETWORK_WORKER}"]) == 5  # the timeout isn't a latency
+
+
+def test_router_enforces_the_learned_execution_timeout(tmp_path, monkeypatch):
+    """A category whose router runs are fast gets a tight execution timeout that cuts off a slow run."""
+    monkeypatch.setattr(timeout_policy, "EXECUTION_TIMEOUT_FLOOR", 0.01)
+    policy = make_policy(tmp_path)
+    for _ in range(5):
+        policy.record("network", 0.1, 6, [], mode="router")
+
+    replies = {
+        "memory_agent": ScriptedAgent("NO_MEMORY_FOUND", delay=0.1),
+        "ticketing_agent": ScriptedAgent("Type: network", delay=0.1),
+        NETWORK_WORKER: ScriptedAgent("DNS server is down.", delay=0.1),
+    }
+    router = WorkflowRouter(agent_factories={name: (lambda agent=agent: agent) for name, agent in replies.items()},
+                            timeout_policy=policy)
+    ticket = {"ticket_id": "ticket-5", "title": "DNS fails", "severity": "high", "category": "network",
+              "description": "nslookup times out", "created_at": "2026-10-31T00:00:00"}
+
+    with pytest.raises(WorkflowTimeout, match="timed out after 0s"):
+        asyncio.run(router.run(ticket))
@@ -0,0 +1,142 @@
+"""
+Unit tests for workflow tracing: span nesting, binding request spans to a ticket's trace,
+the JSON Lines exporter and the agent hooks. Bedrock streaming is replaced by a scripted
+stream so no Bedrock calls are made.
+"""
+
+import asyncio
+import threading
+
+from strands import tool
+from strands.agent import Agent
+from strands.models.bedrock import BedrockModel
+
+from bedrock_model import HelpdeskBedrockModel
+from tracing import AgentTracingHooks, JsonlSpanExporter, Tracer
+
+
+def make_tracer(tmp_path):
+    return Tracer(exporter=JsonlSpanExporter(str(tmp_path / "traces.jsonl")), enabled=True)
+
+
+def test_nested_spans_form_a_waterfall(tmp_path):
+    """Spans opened inside a span nest under it and the waterfall reports depth and offsets."""
+    tracer = make_tracer(tmp_path)
+    with tracer.span("workflow", "workflow", trace_id="ticket-1"):
+        with tracer.span("agent.memory_agent", "agent"):
+            with tracer.span("dynamodb.get_item", "dynamodb", table="tickets"):
+                pass
+        tracer.record_span("scheduler.queue", "queue", 0.0, 0.0, trace_id="ticket-1")
+
+    trace = tracer.get_trace("ticket-1")
+    spans = {span["name"]: span for span in trace["spans"]}
+    assert trace["span_count"] == 4
+    assert [spans[name]["depth"] for name in ("workflow", "agent.memory_agent", "dynamodb.get_item")] == [0, 1, 2]
+    assert spans["dynamodb.get_item"]["attributes"] == {"table": "tickets"}
+    assert spans["agent.memory_agent"]["start_offset_ms"] >= spans["workflow"]["start_offset_ms"]
+    assert trace["by_kind"]["dynamodb"]["count"] == 1
+
+
+def test_spans_outside_a_trace_are_not_recorded(tmp_path):
+    """Without a trace to join (or with tracing disabled) nothing is recorded."""
+    tracer = make_tracer(tmp_path)
+    with tracer.span("dynamodb.scan", "dynamodb") as span:
+        assert span is None
+    assert not (tmp_path / "traces.jsonl").exists()
+
+    disabled = Tracer(exporter=JsonlSpanExporter(str(tmp_path / "disabled.jsonl")), enabled=False)
+    with disabled.span("workflow", "workflow", trace_id="ticket-1") as span:
+        assert span is None
+    assert disabled.get_trace("ticket-1") is None
+
+
+def test_request_span_is_bound_to_the_ticket_and_read_back_from_the_file(tmp_path):
+    """A root request span joins the ticket's trace once bound, and old traces are read from the file."""
+    tracer = make_tracer(tmp_path)
+    with tracer.span("POST /api/tickets", "api", root=True):
+        tracer.bind_trace("ticket-2")
+        with tracer.span("dynamodb.put_item", "dynamodb"):
+            pass
+    with tracer.span("GET /health", "api", root=True):
+        pass
+
+    tracer._recent.clear()
+    trace = tracer.get_trace("ticket-2")
+    assert [span["name"] for span in trace["spans"]] == ["POST /api/tickets", "dynamodb.put_item"]
+    assert trace["spans"][1]["depth"] == 1
+    assert tracer.get_trace("missing") is None
+
+
+def test_spans_are_written_by_the_writer_thread(tmp_path):
+    """Ending a span only queues it; the writer thread appends it and close() drains the queue."""
+    exporter = JsonlSpanExporter(str(tmp_path / "traces.jsonl"))
+    writers = []
+    append = exporter._append
+    exporter._append = lambda spans: (writers.append(threading.current_thread().name), append(spans))
+    tracer = Tracer(exporter=exporter, enabled=True)
+
+    for n in range(20):
+        with tracer.span(f"tool.probe_{n}", "tool", trace_id="ticket-3"):
+            pass
+    exporter.close()
+    assert writers and set(writers) == {"span-writer"}
+    assert len((tmp_path / "traces.jsonl").read_text().splitlines()) == 20
+
+    # Exporting after close starts a new writer
+    tracer.record_span("scheduler.queue", "queue", 0.0, 0.0, trace_id="ticket-4")
+    exporter.flush()
+    assert len((tmp_path / "traces.jsonl").read_text().splitlines()) == 21
+    exporter.close()
+
+
+@tool
+def lookup_gateway(host: str) -> dict:
+    """Look up a gateway.
+
+    Args:
+        host: Host name
+    """
+    return {"success": True, "host": host}
+
+
+def test_agent_hooks_trace_agent_model_and_tool_calls(tmp_path, monkeypatch):
+    """An agent step with a tool call produces an agent span with two model spans and a tool span."""
+    replies = [
+        [{"messageStart": {"role": "assistant"}},
+         {"contentBlockStart": {"start": {"toolUse": {"toolUseId": "tool-1", "name": "lookup_gateway"}}}},
+         {"contentBlockDelta": {"delta": {"toolUse": {"input": '{"host": "gw-1"}'}}}},
+         {"contentBlockStop": {}},
+         {"messageStop": {"stopReason": "tool_use"}}],
+        [{"messageStart": {"role": "assistant"}},
+         {"contentBlockDelta": {"delta": {"text": "Gateway gw-1 is up."}}},
+         {"contentBlockStop": {}},
+         {"messageStop": {"stopReason": "end_turn"}}],
+    ]
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        for event in replies.pop(0):
+            yield event
+
+    monkeypatch.setattr(BedrockModel, "stream", stream)
+    tracer = make_tracer(tmp_path)
+    model = HelpdeskBedrockModel(agent_name="tracing_test_agent", cache_responses=False, region_name="us-east-1")
+    agent = Agent(name="tracing_test_agent", model=model, tools=[lookup_gateway],
+                  hooks=[AgentTracingHooks(tracer=tracer)], callback_handler=None)
+
+    async def run():
+        with tracer.span("workflow", "workflow", trace_id="ticket-3"):
+            await agent.invoke_async("Is the gateway up?")
+        assert tracer.current_span() is None
+
+    asyncio.run(run())
+
+    spans = tracer.get_trace("ticket-3")["spans"]
+    by_name = {}
+    for span in spans:
+        by_name.setdefault(span["name"], []).append(span)
+    agent_span = by_name["agent.tracing_test_agent"][0]
+    assert agent_span["depth"] == 1
+    assert len(by_name["model.call"]) == 2
+    assert all(span["parent_id"] == agent_span["span_id"] for span in by_name["model.call"])
+    assert by_name["tool.lookup_gateway"][0]["parent_id"] == agent_span["span_id"]
+    assert by_name["tool.lookup_gateway"][0]["status"] == "ok"
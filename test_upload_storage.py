@@ -0,0 +1,222 @@
+"""
+Unit tests for upload storage lifecycle management.
+Covers ticket references, retention tiers, LRU quota eviction and the S3 backend.
+"""
+
+import io
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from upload_storage import LocalUploadBackend, S3UploadBackend, UploadStorageManager
+
+
+class LocalS3StandIn:
+    """Minimal in-memory stand-in for the S3 client calls used by S3UploadBackend."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = (Body, datetime.now(timezone.utc))
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def list_objects_v2(self, Bucket, Prefix, **kwargs):
+        contents = [
+            {"Key": key, "Size": len(body), "LastModified": modified}
+            for (bucket, key), (body, modified) in self.objects.items()
+            if bucket == Bucket and key.startswith(Prefix)
+        ]
+        return {"Contents": contents, "IsTruncated": False}
+
+    def download_file(self, Bucket, Key, Filename):
+        with open(Filename, "wb") as f:
+            f.write(self.objects[(Bucket, Key)][0])
+
+
+def make_manager(directory, **kwargs):
+    """Create a manager backed by a temporary local directory."""
+    return UploadStorageManager(
+        backend=LocalUploadBackend(directory),
+        index_path=f"{directory}/.upload_index.json",
+        **kwargs
+    )
+
+
+def test_save_and_attach_upload():
+    """Saved uploads are tracked and linked to tickets."""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = make_manager(directory)
+        upload = manager.save_upload(io.BytesIO(b"screenshot"), "error.png")
+
+        assert upload["key"].endswith(".png")
+        assert upload["size"] == len(b"screenshot")
+        assert manager.attach_to_ticket(upload["key"], "ticket-1")
+        assert [u["key"] for u in manager.uploads_for_ticket("ticket-1")] == [upload["key"]]
+
+        # The index survives a restart
+        reloaded = make_manager(directory)
+        assert reloaded.uploads_for_ticket("ticket-1")[0]["key"] == upload["key"]
+
+
+def test_orphans_collected_after_grace_period():
+    """Unreferenced uploads are removed once the grace period has passed."""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = make_manager(directory, orphan_grace_seconds=60)
+        orphan = manager.save_upload(io.BytesIO(b"a" * 10), "orphan.png")
+        kept = manager.save_upload(io.BytesIO(b"b" * 10), "kept.png")
+        manager.attach_to_ticket(kept["key"], "ticket-1")
+
+        assert manager.collect_garbage()["orphaned"] == 0
+
+        result = manager.collect_garbage(now=time.time() + 120)
+        assert result["orphaned"] == 1
+        assert result["bytes_freed"] == 10
+        assert orphan["key"] not in manager.backend.list_objects()
+        assert kept["key"] in manager.backend.list_objects()
+
+
+def test_referenced_uploads_expire():
+    """Uploads older than the maximum age are removed even when referenced."""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = make_manager(directory, max_age_seconds=3600)
+        upload = manager.save_upload(io.BytesIO(b"data"), "old.png", ticket_id="ticket-1")
+
+        result = manager.collect_garbage(now=time.time() + 7200)
+        assert result["expired"] == 1
+        assert manager.uploads_for_ticket("ticket-1") == []
+        assert upload["key"] not in manager.backend.list_objects()
+
+
+def test_quota_evicts_least_recently_used():
+    """Quota enforcement evicts orphans first, then the least recently used uploads."""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = make_manager(directory, quota_bytes=250, orphan_grace_seconds=3600)
+        first = manager.save_upload(io.BytesIO(b"1" * 100), "first.png", ticket_id="t1")
+        second = manager.save_upload(io.BytesIO(b"2" * 100), "second.png", ticket_id="t2")
+        orphan = manager.save_upload(io.BytesIO(b"3" * 100), "orphan.png")
+
+        # Touch the first upload so the second becomes least recently used
+        time.sleep(0.01)
+        manager.get_path(first["key"])
+
+        result = manager.collect_garbage()
+        remaining = manager.backend.list_objects()
+        assert result["evicted"] == 1
+        assert orphan["key"] not in remaining
+
+        manager.quota_bytes = 150
+        manager.collect_garbage()
+        remaining = manager.backend.list_objects()
+        assert first["key"] in remaining
+        assert second["key"] not in remaining
+
+
+def test_uploads_saved_while_listing_are_kept():
+    """An upload recorded after the GC listed the store is neither dropped from the index nor deleted."""
+    with tempfile.TemporaryDirectory() as directory:
+        saved = []
+
+        class ListingThenUpload(LocalUploadBackend):
+            def list_objects(self):
+                listed = super().list_objects()
+                if not saved:
+                    saved.append(manager.save_upload(io.BytesIO(b"new"), "new.png", ticket_id="t1"))
+                return listed
+
+        manager = UploadStorageManager(backend=ListingThenUpload(directory),
+                                       index_path=f"{directory}/.upload_index.json", orphan_grace_seconds=60)
+        manager.collect_garbage()
+        assert [u["key"] for u in manager.uploads_for_ticket("t1")] == [saved[0]["key"]]
+
+        # The next run sees the file; well past the grace period it's still referenced and kept
+        assert manager.collect_garbage(now=time.time() + 120)["untracked"] == 0
+        assert saved[0]["key"] in manager.backend.list_objects()
+
+
+def test_index_changes_are_journaled_and_compacted_by_gc():
+    """Saves append to the journal instead of rewriting the index; a restart replays it and GC compacts it."""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = make_manager(directory)
+        manager.collect_garbage()
+        with open(manager.index_path) as f:
+            index_before = f.read()
+
+        first = manager.save_upload(io.BytesIO(b"1"), "first.png")
+        manager.attach_to_ticket(first["key"], "ticket-1")
+        manager.save_upload(io.BytesIO(b"2"), "second.png", ticket_id="ticket-2")
+        with open(manager.index_path) as f:
+            assert f.read() == index_before
+        with open(manager.journal_path) as f:
+            assert len(f.readlines()) == 3
+
+        reloaded = make_manager(directory)
+        assert [u["key"] for u in reloaded.uploads_for_ticket("ticket-1")] == [first["key"]]
+        reloaded.collect_garbage()
+        with open(reloaded.journal_path) as f:
+            assert f.read() == ""
+        assert make_manager(directory).get_usage_metrics()["file_count"] == 2
+
+
+def test_access_order_survives_restart():
+    """Reads are journaled, so a restarted manager still evicts the least recently used upload."""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = make_manager(directory, quota_bytes=150)
+        first = manager.save_upload(io.BytesIO(b"1" * 100), "first.png", ticket_id="t1")
+        second = manager.save_upload(io.BytesIO(b"2" * 100), "second.png", ticket_id="t2")
+        time.sleep(0.01)
+        manager.get_path(first["key"])
+
+        reloaded = make_manager(directory, quota_bytes=150)
+        reloaded.collect_garbage()
+        remaining = reloaded.backend.list_objects()
+        assert first["key"] in remaining
+        assert second["key"] not in remaining
+
+
+def test_untracked_files_collected():
+    """Files on disk that the index doesn't know about are treated as orphans."""
+    with tempfile.TemporaryDirectory() as directory:
+        with open(f"{directory}/legacy.png", "wb") as f:
+            f.write(b"legacy")
+        manager = make_manager(directory, orphan_grace_seconds=60)
+
+        result = manager.collect_garbage(now=time.time() + 120)
+        assert result["untracked"] == 1
+        assert manager.backend.list_objects() == {}
+
+
+def test_usage_metrics():
+    """Usage metrics report sizes, quota utilization and orphan counts."""
+    with tempfile.TemporaryDirectory() as directory:
+        manager = make_manager(directory, quota_bytes=1000)
+        manager.save_upload(io.BytesIO(b"x" * 100), "a.png", ticket_id="t1")
+        manager.save_upload(io.BytesIO(b"y" * 50), "b.png")
+
+        metrics = manager.get_usage_metrics()
+        assert metrics["backend"] == "local"
+        assert metrics["file_count"] == 2
+        assert metrics["total_bytes"] == 150
+        assert metrics["quota_utilization"] == 0.15
+        assert metrics["orphaned_files"] == 1
+
+
+def test_s3_backend_with_local_stand_in():
+    """The S3 backend stores, lists, downloads and deletes objects under its prefix."""
+    with tempfile.TemporaryDirectory() as directory:
+        client = LocalS3StandIn()
+        backend = S3UploadBackend(bucket="uploads", prefix="tickets/", client=client, cache_dir=directory)
+        manager = make_manager(directory)
+        manager.backend = backend
+
+        upload = manager.save_upload(io.BytesIO(b"remote"), "remote.png")
+        assert ("uploads", f"tickets/{upload['key']}") in client.objects
+
+        with open(upload["path"], "rb") as f:
+            assert f.read() == b"remote"
+
+        manager.orphan_grace_seconds = 0
+        manager.collect_garbage(now=time.time() + 1)
+        assert client.objects == {}
@@ -0,0 +1,122 @@
+"""
+Unit tests for per-ticket usage accounting, aggregation and budget enforcement.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from strands.hooks import AfterModelCallEvent, HookRegistry
+
+from usage_accounting import ModelRetryCounter, UsageAggregator, UsageLedger
+from workflow_router import NETWORK_WORKER, WorkflowRouter
+
+
+def agent_result(input_tokens, output_tokens, latency_ms):
+    """Build an object shaped like a strands AgentResult."""
+    metrics = SimpleNamespace(
+        accumulated_usage={"inputTokens": input_tokens, "outputTokens": output_tokens, "totalTokens": input_tokens + output_tokens},
+        accumulated_metrics={"latencyMs": latency_ms},
+    )
+    return SimpleNamespace(metrics=metrics)
+
+
+def test_records_agent_metrics_and_estimates(tmp_path):
+    """Token counts come from agent metrics, or are estimated when metrics are missing."""
+    ledger = UsageLedger("ticket-1", "network", aggregator=UsageAggregator(str(tmp_path / "usage.json")))
+    ledger.record_agent_result("memory_agent", agent_result(1200, 80, 950))
+    ledger.record_agent_result("ticketing_agent", "plain text reply", prompt="x" * 400)
+
+    report = ledger.to_dict()
+    assert report["by_agent"]["memory_agent"]["input_tokens"] == 1200
+    assert report["by_agent"]["memory_agent"]["latency_ms"] == 950
+    assert report["by_agent"]["ticketing_agent"]["input_tokens"] == 100
+    assert ledger.calls[1]["estimated"] is True
+    assert report["total"]["calls"] == 2
+    assert report["total"]["cost_usd"] > 0
+
+
+def test_aggregates_per_agent_category_and_day(tmp_path):
+    """Finalized ledgers roll up into persisted per-agent, category and day totals."""
+    path = str(tmp_path / "usage.json")
+    aggregator = UsageAggregator(path)
+    for category in ("network", "cloud"):
+        ledger = UsageLedger(category=category, aggregator=aggregator)
+        ledger.record("summarization_agent", 500, 100)
+        ledger.finalize()
+        ledger.finalize()  # calls are only aggregated once
+
+    summary = UsageAggregator(path).get_summary()
+    assert summary["by_agent"]["summarization_agent"]["calls"] == 2
+    assert summary["by_category"]["cloud"]["input_tokens"] == 500
+    assert list(summary["by_day"].values())[0]["output_tokens"] == 200
+    assert aggregator.tokens_today() == 1200
+
+
+def test_budget_enforcement_degrades(tmp_path):
+    """Over budget, enforce mode skips optional steps and shrinks prompts; monitor mode doesn't."""
+    aggregator = UsageAggregator(str(tmp_path / "usage.json"))
+    enforced = UsageLedger(aggregator=aggregator, mode="enforce", ticket_budget=1000)
+    monitored = UsageLedger(aggregator=aggregator, mode="monitor", ticket_budget=1000)
+    for ledger in (enforced, monitored):
+        assert ledger.should_skip("memory_store") is False
+        ledger.record("network_diagnostic_agent", 900, 200)
+
+    assert enforced.should_skip("memory_store") is True
+    assert enforced.should_skip("summarization") is False
+    assert enforced.context_budget(3000) == 1500
+    assert enforced.to_dict()["skipped_steps"] == ["memory_store"]
+
+    assert monitored.over_budget() is True
+    assert monitored.should_skip("memory_store") is False
+    assert monitored.context_budget(3000) == 3000
+
+
+def test_daily_budget_counts_other_tickets(tmp_path):
+    """The daily budget includes tokens already used by other tickets today."""
+    aggregator = UsageAggregator(str(tmp_path / "usage.json"))
+    earlier = UsageLedger(aggregator=aggregator)
+    earlier.record("cloud_service_agent", 4000, 1000)
+    earlier.finalize()
+
+    ledger = UsageLedger(aggregator=aggregator, mode="enforce", ticket_budget=0, daily_budget=5500)
+    assert ledger.degraded is False
+    ledger.record("memory_agent", 400, 100)
+    assert ledger.degraded is True
+
+
+def test_retry_counter_counts_failed_model_calls():
+    """Failed model calls seen by the agent's hooks are counted as retries."""
+    agent = SimpleNamespace(hooks=HookRegistry())
+    counter = ModelRetryCounter().attach(agent)
+
+    agent.hooks.invoke_callbacks(AfterModelCallEvent(agent=agent, exception=RuntimeError("throttled")))
+    agent.hooks.invoke_callbacks(AfterModelCallEvent(agent=agent))
+    assert counter.count == 1
+
+
+def test_router_skips_optional_agents_when_over_budget(tmp_path):
+    """An exhausted ticket budget skips memory storage and the closing ticketing call."""
+    class Scripted:
+        def __init__(self, reply):
+            self.reply = reply
+
+        async def invoke_async(self, prompt):
+            return self.reply
+
+    factories = {
+        "memory_agent": lambda: Scripted("NO_MEMORY_FOUND"),
+        "ticketing_agent": lambda: Scripted("Type: network"),
+        NETWORK_WORKER: lambda: Scripted("Gateway restarted."),
+        "summarization_agent": lambda: Scripted("Gateway was down.\nWORKFLOW_COMPLETE"),
+    }
+    ticket = {"ticket_id": "t-9", "title": "Ping fails", "description": "traceroute stops at gateway",
+              "severity": "low", "category": "network", "created_at": "2026-10-31"}
+    ledger = UsageLedger("t-9", "network", aggregator=UsageAggregator(str(tmp_path / "usage.json")),
+                         mode="enforce", ticket_budget=10)
+
+    result = asyncio.run(WorkflowRouter(agent_factories=factories).run(ticket, usage=ledger))
+
+    assert result["handoff_sequence"] == ["memory_agent", "ticketing_agent", NETWORK_WORKER, "summarization_agent"]
+    assert result["usage"]["skipped_steps"] == ["memory_store", "ticket_close"]
+    assert result["terminated_by"] == "router"
+    assert result["final_response"] == "Gateway was down."
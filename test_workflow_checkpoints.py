@@ -0,0 +1,104 @@
+"""
+Unit tests for workflow checkpoints and resuming failed router runs.
+Agents are replaced by scripted stand-ins so no Bedrock calls are made.
+"""
+
+import asyncio
+
+import pytest
+
+from workflow_checkpoints import CheckpointStore
+from workflow_router import NETWORK_WORKER, WorkflowRouter
+
+
+TICKET = {
+    "ticket_id": "ticket-3",
+    "title": "Cannot reach the haunted portal",
+    "description": "Ping to portal.haunted.internal times out",
+    "severity": "high",
+    "category": "network",
+    "created_at": "2026-10-31T00:00:00",
+}
+
+
+def test_store_keeps_steps_in_order_per_input(tmp_path):
+    """Steps load in execution order; checkpoints of a different input are discarded."""
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    store.save("t-1", "memory_lookup:memory_agent", {"agent_name": "memory_agent", "content": "NO_MEMORY_FOUND"}, "fp-1")
+    store.save("t-1", "ticket_analysis:ticketing_agent", {"agent_name": "ticketing_agent", "content": "Type: network"}, "fp-1")
+
+    assert list(store.load("t-1", "fp-1")) == ["memory_lookup:memory_agent", "ticket_analysis:ticketing_agent"]
+    assert store.get_status("t-1")["handoff_sequence"] == ["memory_agent", "ticketing_agent"]
+    assert store.load("t-1", "fp-2") == {}
+    assert store.get_status("t-1")["steps"] == []
+
+
+def test_old_checkpoints_expire(tmp_path):
+    """Checkpoints past the retention period are not resumed."""
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"), retention=0)
+    store.save("t-1", "memory_lookup:memory_agent", {"content": "NO_MEMORY_FOUND"}, "fp-1")
+    assert store.load("t-1", "fp-1") == {}
+
+
+class CountingAgent:
+    """Scripted agent that counts its invocations."""
+
+    def __init__(self, name, reply, calls):
+        self.name = name
+        self.reply = reply
+        self.calls = calls
+
+    async def invoke_async(self, prompt):
+        self.calls.append(self.name)
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return self.reply(prompt) if callable(self.reply) else self.reply
+
+
+def router_with(store, calls, summarizer_reply):
+    replies = {
+        "memory_agent": lambda prompt: "Memory stored" if prompt.startswith("STORE") else "NO_MEMORY_FOUND",
+        "ticketing_agent": lambda prompt: "TERMINATE_WORKFLOW" if "WORKFLOW_COMPLETE" in prompt else "Type: network",
+        NETWORK_WORKER: "Gateway 10.0.0.1 was down; restarted it.",
+        "summarization_agent": summarizer_reply,
+    }
+    factories = {name: (lambda name=name, reply=reply: CountingAgent(name, reply, calls)) for name, reply in replies.items()}
+    return WorkflowRouter(agent_factories=factories, checkpoints=store)
+
+
+def test_failed_run_resumes_from_last_good_step(tmp_path):
+    """After a summarization failure, reprocessing skips memory, analysis and diagnostics."""
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    calls = []
+    with pytest.raises(TimeoutError):
+        asyncio.run(router_with(store, calls, TimeoutError("Read timeout")).run(TICKET))
+    assert store.get_status("ticket-3")["handoff_sequence"] == [
+        "memory_agent", "ticketing_agent", NETWORK_WORKER, "memory_agent"
+    ]
+
+    calls.clear()
+    result = asyncio.run(router_with(store, calls, "Gateway restarted.\nWORKFLOW_COMPLETE").run(TICKET))
+
+    assert calls == ["summarization_agent", "ticketing_agent"]
+    assert result["resumed_steps"] == ["memory_lookup", "ticket_analysis", "diagnosis", "memory_store"]
+    assert result["handoff_sequence"][:3] == ["memory_agent", "ticketing_agent", NETWORK_WORKER]
+    assert result["summary"] == "Gateway restarted."
+    assert store.get_status("ticket-3")["steps"] == []
+
+
+def test_resume_disabled_or_changed_ticket_starts_over(tmp_path):
+    """resume=False, or a ticket whose description changed, runs every step again."""
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    calls = []
+    with pytest.raises(TimeoutError):
+        asyncio.run(router_with(store, calls, TimeoutError("Read timeout")).run(TICKET))
+
+    calls.clear()
+    edited = dict(TICKET, description="Ping and traceroute to the portal time out")
+    with pytest.raises(TimeoutError):
+        asyncio.run(router_with(store, calls, TimeoutError("Read timeout")).run(edited))
+    assert calls.count("memory_agent") == 2 and NETWORK_WORKER in calls
+
+    calls.clear()
+    asyncio.run(router_with(store, calls, "Done.\nWORKFLOW_COMPLETE").run(edited, resume=False))
+    assert calls[:3] == ["memory_agent", "ticketing_agent", NETWORK_WORKER]
@@ -0,0 +1,190 @@
+"""
+Unit tests for the deterministic workflow router.
+Agents are replaced by scripted stand-ins so no Bedrock calls are made.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from workflow_router import CLOUD_WORKER, NETWORK_WORKER, WorkflowRouter, WorkflowTimeout, classify_ticket
+
+
+TICKET = {
+    "ticket_id": "ticket-1",
+    "title": "Cannot reach the haunted portal",
+    "description": "Ping to portal.haunted.internal times out and DNS lookups fail",
+    "severity": "high",
+    "category": "network",
+    "created_at": "2026-10-31T00:00:00",
+}
+
+
+class ScriptedAgent:
+    """Replies with a fixed text and records the prompts it received."""
+
+    def __init__(self, name, reply, prompts):
+        self.name = name
+        self.reply = reply
+        self.prompts = prompts
+
+    async def invoke_async(self, prompt):
+        self.prompts.append((self.name, prompt))
+        return self.reply(prompt) if callable(self.reply) else self.reply
+
+
+def scripted_router(replies, **kwargs):
+    """Build a router whose agents answer from the replies mapping."""
+    prompts = []
+    factories = {
+        name: (lambda name=name, reply=reply: ScriptedAgent(name, reply, prompts))
+        for name, reply in replies.items()
+    }
+    return WorkflowRouter(agent_factories=factories, **kwargs), prompts
+
+
+BASE_REPLIES = {
+    "memory_agent": lambda prompt: "Memory stored" if prompt.startswith("STORE") else "NO_MEMORY_FOUND",
+    "ticketing_agent": lambda prompt: "TERMINATE_WORKFLOW" if "WORKFLOW_COMPLETE" in prompt else "Type: network, priority: high",
+    NETWORK_WORKER: "DNS server 10.0.0.2 is down; switched resolvers.",
+    CLOUD_WORKER: "Bucket policy fixed.",
+    "summarization_agent": "The portal was unreachable because DNS failed.\nWORKFLOW_COMPLETE: Summary created successfully.",
+    "orchestrator_agent": f"{CLOUD_WORKER}",
+}
+
+
+def test_classifier_uses_keywords_and_category():
+    """Keywords and category point at the right worker."""
+    network = classify_ticket("VPN drops", "traceroute shows packet loss at the gateway", "network")
+    assert network.worker == NETWORK_WORKER
+    assert network.confidence > 0.9
+
+    cloud = classify_ticket("Uploads failing", "S3 bucket returns access denied", "other")
+    assert cloud.worker == CLOUD_WORKER
+
+    unknown = classify_ticket("Help", "Something is broken", "other")
+    assert unknown.confidence == 0.0
+
+
+def test_new_ticket_follows_routing_table():
+    """A new ticket visits memory, ticketing, worker, memory STORE, summarization and ticketing."""
+    router, prompts = scripted_router(BASE_REPLIES)
+    result = asyncio.run(router.run(TICKET))
+
+    assert result["handoff_sequence"] == [
+        "memory_agent", "ticketing_agent", NETWORK_WORKER, "memory_agent", "summarization_agent", "ticketing_agent"
+    ]
+    assert "orchestrator_agent" not in result["handoff_sequence"]
+    assert result["routing"]["method"] == "classifier"
+    assert result["summary"] == "The portal was unreachable because DNS failed."
+    assert result["agent_invocations"] == 6
+    assert prompts[3][1].startswith("STORE")
+    assert "DNS server 10.0.0.2 is down" in prompts[3][1]
+
+
+def test_memory_hit_skips_diagnostics():
+    """A stored resolution goes straight to summarization and ticket closure."""
+    replies = dict(BASE_REPLIES, memory_agent="MEMORY_FOUND: Restart the DNS resolver")
+    router, _ = scripted_router(replies)
+    result = asyncio.run(router.run(TICKET))
+
+    assert result["handoff_sequence"] == ["memory_agent", "summarization_agent", "ticketing_agent"]
+    assert result["routing"] is None
+
+
+def test_ambiguous_ticket_asks_orchestrator():
+    """Tickets the classifier can't place are routed by the LLM orchestrator."""
+    vague = dict(TICKET, title="Help", description="Something is broken", category="other")
+    router, _ = scripted_router(BASE_REPLIES)
+    result = asyncio.run(router.run(vague))
+
+    assert result["routing"]["method"] == "orchestrator"
+    assert CLOUD_WORKER in result["handoff_sequence"]
+
+
+def test_ambiguous_ticket_without_fallback():
+    """With the fallback disabled, the classifier's best guess is used."""
+    vague = dict(TICKET, title="Help", description="Something is broken", category="other")
+    router, _ = scripted_router(BASE_REPLIES, llm_fallback=False)
+    result = asyncio.run(router.run(vague))
+
+    assert result["routing"]["method"] == "classifier_default"
+    assert "orchestrator_agent" not in result["handoff_sequence"]
+
+
+def test_mixed_ticket_runs_both_workers_concurrently():
+    """Tickets spanning network and cloud run both workers in parallel and merge their findings."""
+    class SlowAgent(ScriptedAgent):
+        async def invoke_async(self, prompt):
+            await asyncio.sleep(0.2)
+            return await super().invoke_async(prompt)
+
+    mixed = dict(TICKET, title="S3 bucket not connecting", description="Uploads to the S3 bucket fail with connectivity errors",
+                 category="cloud")
+    router, prompts = scripted_router(BASE_REPLIES)
+    router.agent_factories[NETWORK_WORKER] = lambda: SlowAgent(NETWORK_WORKER, "Route to S3 endpoint is fine.", prompts)
+    router.agent_factories[CLOUD_WORKER] = lambda: SlowAgent(CLOUD_WORKER, "Bucket policy denies the role.", prompts)
+
+    start = time.perf_counter()
+    result = asyncio.run(router.run(mixed))
+    elapsed = time.perf_counter() - start
+
+    assert result["routing"]["workers"] == [CLOUD_WORKER, NETWORK_WORKER]
+    assert elapsed < 0.35
+    assert [branch["status"] for branch in result["parallel_branches"]] == ["completed", "completed"]
+    store_prompt = next(prompt for name, prompt in prompts if prompt.startswith("STORE"))
+    assert "Bucket policy denies the role." in store_prompt
+    assert "Route to S3 endpoint is fine." in store_prompt
+
+
+def test_parallel_branch_timeout_keeps_other_findings():
+    """A branch that exceeds its timeout is reported while the other branch's result is used."""
+    class HangingAgent(ScriptedAgent):
+        async def invoke_async(self, prompt):
+            await asyncio.sleep(5)
+
+    mixed = dict(TICKET, title="S3 bucket not connecting", description="DNS for the S3 bucket endpoint times out",
+                 category="other")
+    router, prompts = scripted_router(BASE_REPLIES, worker_timeout=0.1)
+    router.agent_factories[NETWORK_WORKER] = lambda: HangingAgent(NETWORK_WORKER, "", prompts)
+
+    result = asyncio.run(router.run(mixed))
+
+    statuses = {branch["worker"]: branch["status"] for branch in result["parallel_branches"]}
+    assert statuses == {NETWORK_WORKER: "timeout", CLOUD_WORKER: "completed"}
+    assert result["status"] == "completed"
+
+
+def test_every_agent_call_and_the_whole_run_are_timed_out():
+    """A hanging single worker hits the node timeout; slow steps that add up hit the execution timeout."""
+    class SlowAgent(ScriptedAgent):
+        async def invoke_async(self, prompt):
+            await asyncio.sleep(self.reply)
+            return "NO_MEMORY_FOUND"
+
+    router, prompts = scripted_router(BASE_REPLIES, node_timeout=0.1)
+    router.agent_factories[NETWORK_WORKER] = lambda: SlowAgent(NETWORK_WORKER, 5, prompts)
+    with pytest.raises(WorkflowTimeout, match=f"{NETWORK_WORKER} timed out"):
+        asyncio.run(router.run(TICKET))
+
+    # The run's deadline falls together with the end of the second step
+    router, prompts = scripted_router(BASE_REPLIES, node_timeout=1.0, execution_timeout=0.2)
+    for name in ("memory_agent", "ticketing_agent"):
+        router.agent_factories[name] = lambda name=name: SlowAgent(name, 0.1, prompts)
+    with pytest.raises(WorkflowTimeout, match="Workflow for ticket ticket-1 timed out"):
+        asyncio.run(router.run(TICKET))
+
+
+def test_context_is_compacted_per_step():
+    """The closing ticketing call only sees the summary and token use is reported per agent."""
+    router, prompts = scripted_router(BASE_REPLIES)
+    result = asyncio.run(router.run(TICKET))
+
+    closing_prompt = prompts[-1][1]
+    assert "DNS server 10.0.0.2 is down" not in closing_prompt
+    assert "WORKFLOW_COMPLETE" in closing_prompt
+
+    tokens = result["context_tokens"]
+    assert tokens["by_agent"]["ticketing_agent"]["calls"] == 2
+    assert tokens["total"]["input_tokens"] < tokens["total"]["uncompacted_input_tokens"]